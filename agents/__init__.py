@@ -40,6 +40,9 @@ from .quality_controller import QualityControllerAgent
 # Brief synthesis
 from .brief_synthesizer import BriefSynthesizerAgent
 
+# Fused creative perspectives (one call for several agents)
+from .fused_perspectives import FusedPerspectivesAgent
+
 # === V3 AGENTS (new workflow) ===
 from .orchestrator_v3 import OrchestratorV3
 
@@ -77,6 +80,7 @@ __all__ = [
     "ReelsAgent",
     "QualityControllerAgent",
     "BriefSynthesizerAgent",
+    "FusedPerspectivesAgent",
     # V3 New
     "OrchestratorV3",
     "ExplorationAgent",
@@ -1,12 +1,11 @@
 """Agent: Antropolog Treści - perspektywa etnograficzna, socjologiczna, psychologiczna."""
 
 import json
-import re
 from dataclasses import dataclass, field
 from typing import Optional, List
 
 from .base import BaseAgent, AgentResult
-from core.openrouter import OpenRouterClient
+from core.openrouter import OpenRouterClient, APIResponse
 
 
 @dataclass
@@ -277,47 +276,22 @@ PAMIĘTAJ: Każdy insight = cytat z tekstu!
             {"role": "user", "content": input_text},
         ]
 
-        response = self.client.chat(
+        response = self._chat(
             messages=messages,
-            model_key=self.model_key,
             temperature=0.7,
             max_tokens=4000,
+            response_schema=self.response_schema,
         )
 
-        return self._parse_response(response.content)
+        return self._parse_response(response.content, api_response=response)
 
-    def _parse_response(self, response: str) -> AnthropologyReport:
+    def _parse_response(self, response: str, api_response: Optional[APIResponse] = None) -> AnthropologyReport:
         """Parsuje odpowiedź JSON do AnthropologyReport."""
         import logging
         logger = logging.getLogger(__name__)
 
         try:
-            # 1. Spróbuj normalnego regex z zamykającym tagiem
-            json_match = re.search(r'```json\s*(.*?)\s*```', response, re.DOTALL)
-            if json_match:
-                json_str = json_match.group(1)
-            else:
-                # 2. Fallback: wyciągnij JSON po ```json (nawet bez zamknięcia - ucięta odpowiedź)
-                json_start = re.search(r'```json\s*', response)
-                if json_start:
-                    json_str = response[json_start.end():]
-                    # Usuń końcowy ``` jeśli jest
-                    if '```' in json_str:
-                        json_str = json_str[:json_str.rfind('```')]
-                    logger.warning("Anthropologist: Używam fallback parsowania (możliwe ucięcie odpowiedzi)")
-                else:
-                    # 3. Może JSON jest bezpośrednio (bez znaczników)
-                    json_str = response
-
-            # Próba naprawy uciętego JSON
-            json_str = json_str.strip()
-            try:
-                data = json.loads(json_str)
-            except json.JSONDecodeError:
-                # Spróbuj naprawić ucięty JSON - zamknij otwarte struktury
-                logger.warning("Anthropologist: Próba naprawy uciętego JSON...")
-                repaired = self._repair_truncated_json(json_str)
-                data = json.loads(repaired)
+            data = self._parse_json(response, api_response=api_response)
 
             return AnthropologyReport(
                 etnografia=data.get("etnografia", []),
@@ -338,30 +312,6 @@ PAMIĘTAJ: Każdy insight = cytat z tekstu!
             logger.error(f"Anthropologist: Unexpected error: {e}")
             return AnthropologyReport()
 
-    def _repair_truncated_json(self, json_str: str) -> str:
-        """Próbuje naprawić ucięty JSON zamykając otwarte struktury."""
-        # Zlicz otwarte nawiasy
-        open_braces = json_str.count('{') - json_str.count('}')
-        open_brackets = json_str.count('[') - json_str.count(']')
-
-        # Usuń niedokończony element (po ostatnim przecinku)
-        last_complete = max(
-            json_str.rfind('},'),
-            json_str.rfind('],'),
-            json_str.rfind('",'),
-        )
-
-        if last_complete > 0:
-            json_str = json_str[:last_complete + 1]
-            open_braces = json_str.count('{') - json_str.count('}')
-            open_brackets = json_str.count('[') - json_str.count(']')
-
-        # Zamknij otwarte struktury
-        json_str += ']' * open_brackets
-        json_str += '}' * open_braces
-
-        return json_str
-
     # Aliasy dla kompatybilności wstecznej
     def deepen(
         self,
@@ -1,5 +1,7 @@
 """Base agent class for all social media analysis agents."""
 
+import json
+import logging
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
 from typing import Optional, Callable
@@ -7,6 +9,32 @@ from pathlib import Path
 
 from core.openrouter import OpenRouterClient, APIResponse
 from core.config import PlatformConfig, PLATFORM_PROFILES
+from core.response_schemas import get_response_schema
+from core.json_parser import parse_json_response
+from core.parse_stats import (
+    ParseRecord, record_parse, OUTCOME_OK, OUTCOME_LOCAL_REPAIR, OUTCOME_MODEL_REPAIR, OUTCOME_FAILED,
+)
+from core.agent_registry import MODEL_TIERS
+from core.schema_validator import validate_report
+from core.tracing import span, start_span
+
+logger = logging.getLogger(__name__)
+
+JSON_REPAIR_PROMPT = """Naprawiasz uszkodzony JSON z odpowiedzi innego modelu.
+
+- Zwróć WYŁĄCZNIE poprawny JSON zgodny ze schematem - bez komentarzy
+- Popraw tylko składnię: cudzysłowy, przecinki, nawiasy, escape'y
+- NIE zmieniaj treści wartości i NIE dopisuj nowych elementów
+- Niedokończony element na końcu usuń"""
+
+# Górny limit tokenów odpowiedzi naprawczej
+JSON_REPAIR_MAX_TOKENS = 16000
+
+REASK_PROMPT = """Twoja odpowiedź nie jest zgodna z wymaganym formatem JSON:
+
+{errors}
+
+Zwróć CAŁĄ odpowiedź ponownie - ta sama treść, poprawione typy pól (obiekt / lista / wartość)."""
 
 
 @dataclass
@@ -62,6 +90,247 @@ class BaseAgent(ABC):
         """Return default prompt if file not found."""
         pass
 
+    @property
+    def response_schema(self) -> Optional[dict]:
+        """Schemat JSON odpowiedzi agenta (None = odpowiedź tekstowa)."""
+        return get_response_schema(self.name)
+
+    def _chat(
+        self,
+        messages: list[dict],
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = 4096,
+        model_key: Optional[str] = None,
+        agent_name: Optional[str] = None,
+        on_retry: Optional[Callable[[int, str], None]] = None,
+        response_schema: Optional[dict] = None,
+    ) -> APIResponse:
+        """
+        Wysyła zapytanie do modelu w imieniu agenta.
+
+        Zużycie tokenów jest przypisywane do agenta (logs/usage.jsonl),
+        co pozwala kalibrować estymacje kosztów. Z response_schema dostawca
+        zwraca czysty JSON (structured output) - parsowanie ```json w agentach
+        zostaje jako fallback; bez structured output strumień jest przerywany
+        po zamknięciu obiektu JSON.
+
+        Parametry zapytania trafiają do response.request - _parse_json ponawia
+        pytanie z tą samą rozmową, niezależnie od późniejszych wywołań agenta.
+        """
+        request = {
+            "messages": messages,
+            "model_key": model_key or self.model_key,
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+            "agent_name": agent_name or self.name,
+            "response_schema": response_schema,
+        }
+        with span(agent_name or self.name, "agent", model=model_key or self.model_key) as agent_span:
+            response = self.client.chat(
+                messages=messages,
+                model_key=model_key or self.model_key,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                on_retry=on_retry,
+                agent_name=agent_name or self.name,
+                response_schema=response_schema,
+                stop_on_json=response_schema is not None,
+            )
+            agent_span.set(
+                provider=response.provider,
+                input_tokens=response.input_tokens,
+                output_tokens=response.output_tokens,
+                cost_usd=round(response.cost_usd, 6),
+                retries=response.retries,
+                continuations=response.continuations,
+                stopped_early=response.stopped_early,
+                api_error=response.error_message,
+            )
+        response.request = request
+        return response
+
+    def _parse_json(
+        self,
+        response: str,
+        schema_name: Optional[str] = None,
+        model_key: Optional[str] = None,
+        api_response: Optional[APIResponse] = None,
+        response_schema: Optional[dict] = None,
+    ) -> dict:
+        """
+        Odczytuje obiekt JSON z odpowiedzi modelu (core.json_parser).
+
+        Obsługuje blok ```json, czysty JSON (structured output) i JSON otoczony
+        tekstem; ucięte odpowiedzi są naprawiane strukturalnie. Gdy to nie
+        wystarczy, uszkodzona odpowiedź + schemat idą do szybkiego modelu
+        (config.json_repair). Odczytany obiekt jest walidowany względem schematu
+        (core.schema_validator). Wynik trafia do logs/parse_stats.jsonl.
+
+        Args:
+            response: Surowa odpowiedź modelu
+            schema_name: Schemat odpowiedzi (domyślnie schemat agenta)
+            model_key: Model, który wygenerował odpowiedź (domyślnie model agenta)
+            api_response: Odpowiedź API, z której pochodzi tekst - jej zapytanie
+                (request) jest ponawiane przy niezgodności ze schematem, a zużycie
+                naprawy i ponownego pytania jest do niej doliczane (tokeny i koszt agenta)
+            response_schema: Schemat dla naprawy modelem, gdy nie ma go pod nazwą
+                (np. schemat złożony fuzji); domyślnie schemat z api_response.request,
+                a bez niego - schema_name / schemat agenta
+
+        Raises:
+            json.JSONDecodeError: gdy w odpowiedzi nie ma poprawnego obiektu -
+                agenci obsługują go tak jak dotąd (pusty raport)
+        """
+        agent = schema_name or self.name
+        record = ParseRecord(agent=agent, model_key=model_key or self.model_key, outcome=OUTCOME_OK, chars=len(response))
+
+        parse_span = start_span(agent, "parse", chars=len(response))
+        result = parse_json_response(response)
+        diagnostics = result.diagnostics
+        try:
+            if result.ok and isinstance(result.data, dict):
+                if diagnostics.repaired:
+                    record.outcome = OUTCOME_LOCAL_REPAIR
+                    logger.warning(f"{self.name}: naprawiono JSON ({diagnostics.summary()})")
+                return self._validate_json(result.data, response, agent, record, api_response)
+
+            repaired = self._repair_json_with_model(response, schema_name, record, api_response, response_schema)
+            if repaired is not None:
+                record.outcome = OUTCOME_MODEL_REPAIR
+                return self._validate_json(repaired, response, agent, record, api_response)
+
+            record.outcome = OUTCOME_FAILED
+            raise json.JSONDecodeError(
+                diagnostics.error or "Odpowiedź nie jest obiektem JSON",
+                response,
+                diagnostics.error_pos,
+            )
+        finally:
+            parse_span.set(outcome=record.outcome, validation_errors=record.validation_errors or None)
+            parse_span.finish()
+            record_parse(record)
+
+    def _validate_json(
+        self,
+        data: dict,
+        response: str,
+        schema_name: str,
+        record: ParseRecord,
+        api_response: Optional[APIResponse] = None,
+    ) -> dict:
+        """
+        Walidacja względem schematu. Przy błędach - jedno ponowne pytanie tylko tego
+        agenta (config.validation_reask); co nadal niezgodne, jest usuwane, więc
+        raport dostaje wartości domyślne zamiast złych typów.
+        """
+        errors = validate_report(schema_name, data)
+        if not errors:
+            return data
+
+        record.validation_errors = len(errors)
+        logger.warning(f"{self.name}: odpowiedź niezgodna ze schematem ({len(errors)}): {'; '.join(errors[:3])}")
+
+        retried = self._reask_invalid(response, errors, api_response)
+        if retried is not None:
+            record.reasked = True
+            retry_errors = validate_report(schema_name, retried)
+            if len(retry_errors) < len(errors):
+                data, errors = retried, retry_errors
+
+        if errors:
+            validate_report(schema_name, data, prune=True)
+        return data
+
+    def _reask_invalid(
+        self,
+        response: str,
+        errors: list[str],
+        api_response: Optional[APIResponse] = None,
+    ) -> Optional[dict]:
+        """
+        Ponowne pytanie z odpowiedzią i listą błędów (None = wyłączone, brak zapytania
+        lub nieudane). Rozmowa pochodzi z api_response.request, a zużycie ponownego
+        pytania jest doliczane do api_response.
+        """
+        request = api_response.request if api_response is not None else None
+        config = getattr(self.client, "config", None)
+        if not request or not getattr(config, "validation_reask", False):
+            return None
+
+        messages = request["messages"] + [
+            {"role": "assistant", "content": response},
+            {"role": "user", "content": REASK_PROMPT.format(errors="\n".join(f"- {e}" for e in errors))},
+        ]
+        try:
+            retried = self._chat(**{**request, "messages": messages})
+        except Exception as e:
+            logger.error(f"{self.name}: ponowne pytanie nieudane: {e}")
+            return None
+
+        api_response.add_usage(retried)
+        if retried.error_message:
+            return None
+        result = parse_json_response(retried.content)
+        return result.data if result.ok and isinstance(result.data, dict) else None
+
+    def _repair_json_with_model(
+        self,
+        response: str,
+        schema_name: Optional[str],
+        record: ParseRecord,
+        api_response: Optional[APIResponse] = None,
+        response_schema: Optional[dict] = None,
+    ) -> Optional[dict]:
+        """
+        Naprawa składni JSON szybkim modelem (None = wyłączona lub nieudana).
+
+        Wywołanie idzie przez _chat (span agenta "json_repair"), a jego zużycie
+        jest doliczane do api_response - koszt naprawy widać w wyniku agenta.
+        """
+        config = getattr(self.client, "config", None)
+        if not response.strip() or not getattr(config, "json_repair", False):
+            return None
+
+        schema = response_schema
+        if schema is None and api_response is not None and api_response.request:
+            schema = api_response.request.get("response_schema")
+        if schema is None:
+            schema = get_response_schema(schema_name) if schema_name else self.response_schema
+        repair_model = MODEL_TIERS["fast"]
+        if not self.client.supports_model(repair_model):
+            repair_model = self.model_key
+        record.repair_model = repair_model
+
+        schema_text = json.dumps(schema, ensure_ascii=False) if schema else "(brak - zachowaj strukturę z odpowiedzi)"
+        messages = [
+            {"role": "system", "content": JSON_REPAIR_PROMPT},
+            {"role": "user", "content": f"## SCHEMAT\n{schema_text}\n\n## USZKODZONA ODPOWIEDŹ\n{response}"},
+        ]
+
+        logger.warning(f"{self.name}: JSON nie do odczytania - naprawa modelem {repair_model}")
+        try:
+            repaired = self._chat(
+                messages=messages,
+                temperature=0.0,
+                max_tokens=min(max(1024, len(response) // 2), JSON_REPAIR_MAX_TOKENS),
+                model_key=repair_model,
+                agent_name="json_repair",
+                response_schema=schema,
+            )
+        except Exception as e:
+            logger.error(f"{self.name}: naprawa JSON nieudana: {e}")
+            return None
+
+        if api_response is not None:
+            api_response.add_usage(repaired)
+        if repaired.error_message:
+            return None
+        result = parse_json_response(repaired.content)
+        if result.ok and isinstance(result.data, dict):
+            logger.info(f"{self.name}: JSON naprawiony przez {repair_model}")
+            return result.data
+        return None
+
     def _build_platform_context(self, platform: PlatformConfig, humor_dial: int) -> str:
         """Build platform context section for the prompt."""
         return f"""
@@ -179,9 +448,8 @@ class BaseAgent(ABC):
                 if on_progress:
                     on_progress(f"Próba {attempt} nie powiodła się, ponawiam...")
 
-            response = self.client.chat(
+            response = self._chat(
                 messages=messages,
-                model_key=self.model_key,
                 temperature=0.7,
                 max_tokens=4096,
                 on_retry=on_retry,
@@ -1,13 +1,13 @@
 """Agent: Brief Synthesizer - tworzy zwięzły brief z outputów wszystkich agentów."""
 
 import json
-import re
 import logging
 from dataclasses import dataclass, field
 from typing import Optional, List, Dict, Any
 
 from .base import BaseAgent, AgentResult
-from core.openrouter import OpenRouterClient
+from core.openrouter import OpenRouterClient, APIResponse
+from core.response_schemas import get_response_schema
 
 logger = logging.getLogger(__name__)
 
@@ -52,9 +52,15 @@ class BriefSynthesizerAgent(BaseAgent):
     # Model do syntezy (główny)
     SYNTHESIS_MODEL = "claude-sonnet-4-20250514"
 
-    def __init__(self, client: OpenRouterClient, model_key: str = "claude-sonnet-4-20250514"):
+    def __init__(
+        self,
+        client: OpenRouterClient,
+        model_key: str = "claude-sonnet-4-20250514",
+        extraction_model: Optional[str] = None,
+    ):
         super().__init__(client, model_key)
         self.synthesis_model = model_key
+        self.extraction_model = extraction_model or self.EXTRACTION_MODEL
 
     def _get_default_prompt(self) -> str:
         return """# SYNTETYZATOR BRIEFU
@@ -139,20 +145,18 @@ FORMAT:
         ]
 
         try:
-            response = self.client.chat(
+            response = self._chat(
                 messages=messages,
-                model_key=self.EXTRACTION_MODEL,
+                model_key=self.extraction_model,
+                agent_name="brief_extraction",
                 temperature=0.3,
                 max_tokens=800,
+                response_schema=get_response_schema("brief_extraction"),
             )
 
-            # Parse JSON
-            json_match = re.search(r'```json\s*(.*?)\s*```', response.content, re.DOTALL)
-            if json_match:
-                return json.loads(json_match.group(1))
-            else:
-                # Spróbuj parsować bezpośrednio
-                return json.loads(response.content)
+            return self._parse_json(
+                response.content, "brief_extraction", self.extraction_model, api_response=response
+            )
 
         except Exception as e:
             logger.warning(f"Extraction failed for {agent_name}: {e}")
@@ -191,25 +195,20 @@ FORMAT:
             {"role": "user", "content": compressed_input + "\n\nStwórz BRIEF z najlepszymi elementami."},
         ]
 
-        response = self.client.chat(
+        response = self._chat(
             messages=messages,
             model_key=self.synthesis_model,
             temperature=0.5,
             max_tokens=1500,
+            response_schema=self.response_schema,
         )
 
-        return self._parse_response(response.content)
+        return self._parse_response(response.content, api_response=response)
 
-    def _parse_response(self, response: str) -> BriefReport:
+    def _parse_response(self, response: str, api_response: Optional[APIResponse] = None) -> BriefReport:
         """Parsuje odpowiedź JSON do BriefReport."""
         try:
-            json_match = re.search(r'```json\s*(.*?)\s*```', response, re.DOTALL)
-            if json_match:
-                json_str = json_match.group(1)
-            else:
-                json_str = response
-
-            data = json.loads(json_str.strip())
+            data = self._parse_json(response, api_response=api_response)
 
             return BriefReport(
                 najlepsze_hooki=data.get("najlepsze_hooki", []),
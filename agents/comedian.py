@@ -1,13 +1,12 @@
 """Komik - finds opportunities for wit and humor."""
 
 import json
-import re
 import logging
 from dataclasses import dataclass
 from typing import Optional
 
 from .base import BaseAgent, AgentResult
-from core.openrouter import OpenRouterClient
+from core.openrouter import OpenRouterClient, APIResponse
 
 logger = logging.getLogger(__name__)
 
@@ -146,48 +145,33 @@ Gdy analizujesz gotowy post - szukasz:
             {"role": "user", "content": input_text},
         ]
 
-        response = self.client.chat(
+        response = self._chat(
             messages=messages,
-            model_key=self.model_key,
             temperature=0.8,  # Wyższa temperatura dla kreatywności
             max_tokens=3000,
+            response_schema=self.response_schema,
         )
 
-        return self._parse_response(response.content)
+        return self._parse_response(response.content, api_response=response)
+
+    def report_from_data(self, data: dict) -> HumorReport:
+        """Buduje HumorReport ze sparsowanego JSON (także z sekcji trybu fuzji)."""
+        return HumorReport(
+            humor_potential=data.get("potencjal_humoru", 5),
+            recommended_dial=data.get("rekomendowany_dial", 3),
+            humor_opportunities=data.get("okazje_na_humor", []),
+            self_deprecation_moments=data.get("momenty_self_deprecation", []),
+            rewrite_options=data.get("wersje_wg_dial", {}),
+            humor_warnings=data.get("ostrzezenia", []),
+            techniques=data.get("techniki", []),
+        )
 
-    def _parse_response(self, response: str) -> HumorReport:
+    def _parse_response(self, response: str, api_response: Optional[APIResponse] = None) -> HumorReport:
         """Parsuje odpowiedź JSON do HumorReport."""
         try:
-            json_match = re.search(r'```json\s*(.*?)\s*```', response, re.DOTALL)
-            if json_match:
-                json_str = json_match.group(1)
-            else:
-                json_start = re.search(r'```json\s*', response)
-                if json_start:
-                    json_str = response[json_start.end():]
-                    if '```' in json_str:
-                        json_str = json_str[:json_str.rfind('```')]
-                    logger.warning("Comedian: Używam fallback parsowania")
-                else:
-                    json_str = response
-
-            json_str = json_str.strip()
-            try:
-                data = json.loads(json_str)
-            except json.JSONDecodeError:
-                logger.warning("Comedian: Próba naprawy uciętego JSON...")
-                repaired = self._repair_truncated_json(json_str)
-                data = json.loads(repaired)
+            data = self._parse_json(response, api_response=api_response)
 
-            return HumorReport(
-                humor_potential=data.get("potencjal_humoru", 5),
-                recommended_dial=data.get("rekomendowany_dial", 3),
-                humor_opportunities=data.get("okazje_na_humor", []),
-                self_deprecation_moments=data.get("momenty_self_deprecation", []),
-                rewrite_options=data.get("wersje_wg_dial", {}),
-                humor_warnings=data.get("ostrzezenia", []),
-                techniques=data.get("techniki", []),
-            )
+            return self.report_from_data(data)
 
         except json.JSONDecodeError as e:
             logger.error(f"Comedian: JSON parse error: {e}")
@@ -213,18 +197,6 @@ Gdy analizujesz gotowy post - szukasz:
                 techniques=[],
             )
 
-    def _repair_truncated_json(self, json_str: str) -> str:
-        """Próbuje naprawić ucięty JSON."""
-        open_braces = json_str.count('{') - json_str.count('}')
-        open_brackets = json_str.count('[') - json_str.count(']')
-        last_complete = max(json_str.rfind('},'), json_str.rfind('],'), json_str.rfind('",'))
-        if last_complete > 0:
-            json_str = json_str[:last_complete + 1]
-            open_braces = json_str.count('{') - json_str.count('}')
-            open_brackets = json_str.count('[') - json_str.count(']')
-        json_str += ']' * open_brackets + '}' * open_braces
-        return json_str
-
     def analyze(
         self,
         content: str,
@@ -1,13 +1,12 @@
 """Antropolog Absurdu - finds deeper meaning through cultural lens and absurd observations."""
 
 import json
-import re
 import logging
 from dataclasses import dataclass
 from typing import Optional
 
 from .base import BaseAgent, AgentResult
-from core.openrouter import OpenRouterClient
+from core.openrouter import OpenRouterClient, APIResponse
 
 logger = logging.getLogger(__name__)
 
@@ -152,52 +151,37 @@ Obserwacja rytuału = INSIGHT.
             {"role": "user", "content": input_text},
         ]
 
-        response = self.client.chat(
+        response = self._chat(
             messages=messages,
-            model_key=self.model_key,
             temperature=0.7,
             max_tokens=3000,
+            response_schema=self.response_schema,
         )
 
-        return self._parse_response(response.content)
+        return self._parse_response(response.content, api_response=response)
+
+    def report_from_data(self, data: dict) -> DepthReport:
+        """Buduje DepthReport ze sparsowanego JSON (także z sekcji trybu fuzji)."""
+        return DepthReport(
+            verdict=data.get("werdykt", "POWIERZCHNIA"),
+            depth_level=data.get("poziom_glebi", 5),
+            has_second_layer=data.get("drugie_dno", False),
+            current_layer=data.get("obecna_warstwa", {}),
+            rituals_absurds=data.get("rytualy_absurdy", []),
+            cognitive_biases=data.get("bledy_poznawcze", []),
+            quotes_authorities=data.get("cytaty", []),
+            transformation=data.get("transformacja", {}),
+            observer_perspective=data.get("perspektywa_obserwatora", {}),
+            analogies=data.get("analogie", []),
+            depth_suggestions=data.get("propozycje_poglebiania", []),
+        )
 
-    def _parse_response(self, response: str) -> DepthReport:
+    def _parse_response(self, response: str, api_response: Optional[APIResponse] = None) -> DepthReport:
         """Parsuje odpowiedź JSON do DepthReport."""
         try:
-            json_match = re.search(r'```json\s*(.*?)\s*```', response, re.DOTALL)
-            if json_match:
-                json_str = json_match.group(1)
-            else:
-                json_start = re.search(r'```json\s*', response)
-                if json_start:
-                    json_str = response[json_start.end():]
-                    if '```' in json_str:
-                        json_str = json_str[:json_str.rfind('```')]
-                    logger.warning("ContextShifter: Używam fallback parsowania")
-                else:
-                    json_str = response
-
-            json_str = json_str.strip()
-            try:
-                data = json.loads(json_str)
-            except json.JSONDecodeError:
-                logger.warning("ContextShifter: Próba naprawy uciętego JSON...")
-                repaired = self._repair_truncated_json(json_str)
-                data = json.loads(repaired)
+            data = self._parse_json(response, api_response=api_response)
 
-            return DepthReport(
-                verdict=data.get("werdykt", "POWIERZCHNIA"),
-                depth_level=data.get("poziom_glebi", 5),
-                has_second_layer=data.get("drugie_dno", False),
-                current_layer=data.get("obecna_warstwa", {}),
-                rituals_absurds=data.get("rytualy_absurdy", []),
-                cognitive_biases=data.get("bledy_poznawcze", []),
-                quotes_authorities=data.get("cytaty", []),
-                transformation=data.get("transformacja", {}),
-                observer_perspective=data.get("perspektywa_obserwatora", {}),
-                analogies=data.get("analogie", []),
-                depth_suggestions=data.get("propozycje_poglebiania", []),
-            )
+            return self.report_from_data(data)
 
         except json.JSONDecodeError as e:
             logger.error(f"ContextShifter: JSON parse error: {e}")
@@ -231,18 +215,6 @@ Obserwacja rytuału = INSIGHT.
                 depth_suggestions=[],
             )
 
-    def _repair_truncated_json(self, json_str: str) -> str:
-        """Próbuje naprawić ucięty JSON."""
-        open_braces = json_str.count('{') - json_str.count('}')
-        open_brackets = json_str.count('[') - json_str.count(']')
-        last_complete = max(json_str.rfind('},'), json_str.rfind('],'), json_str.rfind('",'))
-        if last_complete > 0:
-            json_str = json_str[:last_complete + 1]
-            open_braces = json_str.count('{') - json_str.count('}')
-            open_brackets = json_str.count('[') - json_str.count(']')
-        json_str += ']' * open_brackets + '}' * open_braces
-        return json_str
-
     def analyze(
         self,
         content: str,
@@ -5,7 +5,7 @@ from dataclasses import dataclass
 from typing import Optional
 
 from .base import BaseAgent, AgentResult
-from core.openrouter import OpenRouterClient
+from core.openrouter import OpenRouterClient, APIResponse
 
 
 @dataclass
@@ -265,27 +265,19 @@ Elementy które lepiej zostawić:
             {"role": "user", "content": input_text},
         ]
 
-        response = self.client.chat(
+        response = self._chat(
             messages=messages,
-            model_key=self.model_key,
             temperature=0.7,
             max_tokens=4000,
+            response_schema=self.response_schema,
         )
 
-        return self._parse_response(response.content)
+        return self._parse_response(response.content, api_response=response)
 
-    def _parse_response(self, response: str) -> DevelopmentReport:
+    def _parse_response(self, response: str, api_response: Optional[APIResponse] = None) -> DevelopmentReport:
         """Parsuje odpowiedź do DevelopmentReport."""
-        import re
-
         try:
-            json_match = re.search(r'```json\s*(.*?)\s*```', response, re.DOTALL)
-            if json_match:
-                json_str = json_match.group(1)
-            else:
-                json_str = response
-
-            data = json.loads(json_str)
+            data = self._parse_json(response, api_response=api_response)
 
             return DevelopmentReport(
                 user_direction_assessment=data.get("ocena_kierunku", {}),
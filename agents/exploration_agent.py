@@ -5,7 +5,7 @@ from dataclasses import dataclass
 from typing import Optional
 
 from .base import BaseAgent, AgentResult
-from core.openrouter import OpenRouterClient
+from core.openrouter import OpenRouterClient, APIResponse
 
 
 @dataclass
@@ -232,27 +232,19 @@ Prowokacyjne, otwierające dyskusję pytania, które autor może zadać czytelni
             {"role": "user", "content": input_text},
         ]
 
-        response = self.client.chat(
+        response = self._chat(
             messages=messages,
-            model_key=self.model_key,
             temperature=0.8,  # Wyższa dla kreatywności
             max_tokens=4000,
+            response_schema=self.response_schema,
         )
 
-        return self._parse_response(response.content)
+        return self._parse_response(response.content, api_response=response)
 
-    def _parse_response(self, response: str) -> ExplorationReport:
+    def _parse_response(self, response: str, api_response: Optional[APIResponse] = None) -> ExplorationReport:
         """Parsuje odpowiedź do ExplorationReport."""
-        import re
-
         try:
-            json_match = re.search(r'```json\s*(.*?)\s*```', response, re.DOTALL)
-            if json_match:
-                json_str = json_match.group(1)
-            else:
-                json_str = response
-
-            data = json.loads(json_str)
+            data = self._parse_json(response, api_response=api_response)
 
             return ExplorationReport(
                 possible_angles=data.get("możliwe_kąty", []),
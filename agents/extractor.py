@@ -1,12 +1,11 @@
 """Agent 0: Ekstraktor inputu - rozdziela źródło od uwag usera."""
 
 import json
-import re
 from dataclasses import dataclass
 from typing import Optional
 
 from .base import BaseAgent, AgentResult
-from core.openrouter import OpenRouterClient
+from core.openrouter import OpenRouterClient, APIResponse
 
 
 @dataclass
@@ -201,46 +200,27 @@ OUTPUT:
             {"role": "user", "content": full_input},
         ]
 
-        response = self.client.chat(
+        response = self._chat(
             messages=messages,
-            model_key=self.model_key,
             temperature=0.3,  # Niska temperatura dla precyzyjnej ekstrakcji
             max_tokens=3000,
+            response_schema=self.response_schema,
         )
 
         # Parsuj JSON z odpowiedzi
-        extracted = self._parse_response(response.content, content)
+        extracted = self._parse_response(response.content, content, api_response=response)
 
         return extracted
 
-    def _parse_response(self, response: str, original_content: str) -> ExtractedInput:
+    def _parse_response(
+        self, response: str, original_content: str, api_response: Optional[APIResponse] = None
+    ) -> ExtractedInput:
         """Parsuje odpowiedź JSON do ExtractedInput."""
         import logging
         logger = logging.getLogger(__name__)
 
         try:
-            # 1. Spróbuj normalnego regex z zamykającym tagiem
-            json_match = re.search(r'```json\s*(.*?)\s*```', response, re.DOTALL)
-            if json_match:
-                json_str = json_match.group(1)
-            else:
-                # 2. Fallback: wyciągnij JSON po ```json
-                json_start = re.search(r'```json\s*', response)
-                if json_start:
-                    json_str = response[json_start.end():]
-                    if '```' in json_str:
-                        json_str = json_str[:json_str.rfind('```')]
-                    logger.warning("Extractor: Używam fallback parsowania")
-                else:
-                    json_str = response
-
-            json_str = json_str.strip()
-            try:
-                data = json.loads(json_str)
-            except json.JSONDecodeError:
-                logger.warning("Extractor: Próba naprawy uciętego JSON...")
-                repaired = self._repair_truncated_json(json_str)
-                data = json.loads(repaired)
+            data = self._parse_json(response, api_response=api_response)
 
             source = data.get("źródło", {})
             user = data.get("uwagi_usera", {})
@@ -282,18 +262,6 @@ OUTPUT:
                 source_type="unknown",
             )
 
-    def _repair_truncated_json(self, json_str: str) -> str:
-        """Próbuje naprawić ucięty JSON."""
-        open_braces = json_str.count('{') - json_str.count('}')
-        open_brackets = json_str.count('[') - json_str.count(']')
-        last_complete = max(json_str.rfind('},'), json_str.rfind('],'), json_str.rfind('",'))
-        if last_complete > 0:
-            json_str = json_str[:last_complete + 1]
-            open_braces = json_str.count('{') - json_str.count('}')
-            open_brackets = json_str.count('[') - json_str.count(']')
-        json_str += ']' * open_brackets + '}' * open_braces
-        return json_str
-
     def analyze(
         self,
         content: str,
@@ -302,9 +302,8 @@ Dodaj skrypt wideo 60s.
             {"role": "user", "content": input_text},
         ]
 
-        response = self.client.chat(
+        response = self._chat(
             messages=messages,
-            model_key=self.model_key,
             temperature=0.7,
             max_tokens=3000,
         )
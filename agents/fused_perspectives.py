@@ -0,0 +1,174 @@
+"""Fuzja perspektyw - jedno wywołanie modelu zamiast kilku agentów kreatywnych."""
+
+import json
+import logging
+from dataclasses import dataclass, field
+from typing import Optional, Dict, List, Any
+
+from .base import BaseAgent
+from core.openrouter import OpenRouterClient, APIResponse
+from core.response_schemas import combine_schemas
+from core.schema_validator import validate_report
+
+logger = logging.getLogger(__name__)
+
+
+# Agenci, których można połączyć - wszyscy dostają ten sam input (treść + extracted_data)
+FUSABLE_AGENTS = [
+    "story_excavator",
+    "tension_architect",
+    "context_shifter",
+    "comedian",
+    "engagement",
+]
+
+
+@dataclass
+class FusedResult:
+    """Wynik wywołania w trybie fuzji."""
+    reports: Dict[str, Any] = field(default_factory=dict)  # klucz agenta -> raport agenta
+    missing: List[str] = field(default_factory=list)  # agenci bez poprawnej sekcji w odpowiedzi
+    input_tokens: int = 0
+    output_tokens: int = 0
+    elapsed_seconds: float = 0.0
+    cost_usd: float = 0.0
+
+
+class FusedPerspectivesAgent(BaseAgent):
+    """
+    Łączy kilku agentów kreatywnych w jedno zapytanie.
+
+    Prompt systemowy składa się z instrukcji każdego agenta (sekcje), a model zwraca
+    jeden obiekt JSON z kluczem per agent. Sekcje są rozdzielane i parsowane przez
+    `report_from_data` właściwego agenta - wynik ma te same typy co tryb osobny.
+    """
+
+    name = "fused_perspectives"
+    name_pl = "Perspektywy (fuzja)"
+    description = "Agenci kreatywni w jednym wywołaniu modelu"
+
+    # Budżet tokenów wyjściowych na jedną sekcję i górny limit całości
+    MAX_TOKENS_PER_AGENT = 3000
+    MAX_TOKENS_TOTAL = 15000
+
+    def __init__(self, client: OpenRouterClient, model_key: str = "claude-opus-4.5"):
+        super().__init__(client, model_key)
+
+    def _get_default_prompt(self) -> str:
+        return """# FUZJA PERSPEKTYW
+
+Pracujesz jednocześnie jako kilku wyspecjalizowanych agentów. Każdy agent ma poniżej
+własną sekcję z instrukcjami i formatem odpowiedzi.
+
+## ZASADY
+- Każdą sekcję wykonaj TAK, JAKBY była jedynym zadaniem - bez skracania
+- Sekcje są niezależne - nie powtarzaj treści między nimi
+- Trzymaj się limitów zwięzłości z każdej sekcji
+"""
+
+    def build_messages(
+        self,
+        agents: Dict[str, BaseAgent],
+        content: str,
+        context: Optional[dict] = None,
+    ) -> list[dict]:
+        """Buduje wiadomości: wspólny input raz, instrukcje agentów jako sekcje."""
+        sections = [self.prompt_template]
+        for key, agent in agents.items():
+            sections.append(f"# SEKCJA \"{key}\" - {agent.name_pl}\n\n{agent.prompt_template}")
+
+        keys = ", ".join(f'"{key}"' for key in agents)
+        sections.append(f"""# FORMAT ODPOWIEDZI (NADRZĘDNY)
+
+Zwróć JEDEN blok ```json z obiektem o kluczach: {keys}.
+Wartość każdego klucza = obiekt JSON dokładnie w formacie z sekcji danego agenta.
+Format z sekcji dotyczy TYLKO zawartości klucza - nie zwracaj osobnych bloków.""")
+
+        input_text = f"## TREŚĆ DO ANALIZY\n\n{content}"
+        if context and context.get("extracted_data"):
+            input_text += f"\n\n## WYEKSTRAHOWANE DANE\n{json.dumps(context['extracted_data'], ensure_ascii=False, indent=2)}"
+
+        return [
+            {"role": "system", "content": "\n\n---\n\n".join(sections)},
+            {"role": "user", "content": input_text},
+        ]
+
+    def run(
+        self,
+        agents: Dict[str, BaseAgent],
+        content: str,
+        context: Optional[dict] = None,
+    ) -> FusedResult:
+        """
+        Uruchamia agentów w jednym wywołaniu.
+
+        Args:
+            agents: Klucz agenta -> instancja (z FUSABLE_AGENTS)
+            content: Treść do analizy
+            context: Kontekst ({"extracted_data": ...})
+
+        Returns:
+            FusedResult - agenci z `missing` powinni zostać uruchomieni osobno
+        """
+        messages = self.build_messages(agents, content, context)
+        max_tokens = min(self.MAX_TOKENS_PER_AGENT * len(agents), self.MAX_TOKENS_TOTAL)
+
+        member_schemas = {key: agent.response_schema for key, agent in agents.items()}
+        response_schema = (
+            combine_schemas(member_schemas) if all(member_schemas.values()) else None
+        )
+
+        response = self._chat(
+            messages=messages,
+            temperature=0.7,
+            max_tokens=max_tokens,
+            response_schema=response_schema,
+        )
+
+        # Parsowanie przed FusedResult - zużycie naprawy JSON jest doliczane do response
+        data = self._parse_response(response.content, api_response=response, response_schema=response_schema)
+        result = FusedResult(
+            input_tokens=response.input_tokens,
+            output_tokens=response.output_tokens,
+            elapsed_seconds=response.elapsed_seconds,
+            cost_usd=response.cost_usd,
+        )
+        for key, agent in agents.items():
+            section = data.get(key)
+            if not isinstance(section, dict) or not section:
+                result.missing.append(key)
+                continue
+
+            errors = validate_report(key, section)
+            if errors:
+                # Sekcja niezgodna ze schematem - agent zostanie uruchomiony osobno
+                logger.warning(f"FusedPerspectives: sekcja {key} niezgodna ze schematem: {'; '.join(errors[:3])}")
+                result.missing.append(key)
+                continue
+
+            result.reports[key] = agent.report_from_data(section)
+
+        if result.missing:
+            logger.warning(f"FusedPerspectives: brak sekcji dla {result.missing}")
+
+        return result
+
+    def _parse_response(
+        self,
+        response: str,
+        api_response: Optional[APIResponse] = None,
+        response_schema: Optional[dict] = None,
+    ) -> dict:
+        """
+        Parsuje odpowiedź do słownika sekcji (pusty przy błędzie).
+
+        response_schema (combine_schemas) idzie do naprawy JSON - pod nazwą
+        "fused_perspectives" nie ma schematu.
+        """
+        try:
+            return self._parse_json(response, api_response=api_response, response_schema=response_schema)
+
+        except json.JSONDecodeError as e:
+            logger.error(f"FusedPerspectives: JSON parse error: {e}")
+            logger.error(f"FusedPerspectives: Raw response (first 500 chars): {response[:500]}")
+            return {}
@@ -241,9 +241,8 @@ Pamiętaj o strukturze: Hook → Kontekst → Rozwinięcie → Refleksja → Pyt
             {"role": "user", "content": input_text},
         ]
 
-        response = self.client.chat(
+        response = self._chat(
             messages=messages,
-            model_key=self.model_key,
             temperature=0.7,
             max_tokens=2500,
         )
@@ -5,7 +5,7 @@ from dataclasses import dataclass
 from typing import Optional, Literal
 
 from .base import BaseAgent, AgentResult
-from core.openrouter import OpenRouterClient
+from core.openrouter import OpenRouterClient, APIResponse
 
 
 # Limity znaków dla platform
@@ -243,32 +243,25 @@ Wybierz najostrzejszy, najbardziej pasujący kąt.
             {"role": "user", "content": input_text},
         ]
 
-        response = self.client.chat(
+        response = self._chat(
             messages=messages,
-            model_key=self.model_key,
             temperature=0.8,
             max_tokens=2000,
+            response_schema=self.response_schema,
         )
 
-        return self._parse_response(response.content, platform, char_limit)
+        return self._parse_response(response.content, platform, char_limit, api_response=response)
 
     def _parse_response(
         self,
         response: str,
         platform: str,
-        char_limit: int
+        char_limit: int,
+        api_response: Optional[APIResponse] = None,
     ) -> MicroblogPost:
         """Parsuje odpowiedź do MicroblogPost."""
-        import re
-
         try:
-            json_match = re.search(r'```json\s*(.*?)\s*```', response, re.DOTALL)
-            if json_match:
-                json_str = json_match.group(1)
-            else:
-                json_str = response
-
-            data = json.loads(json_str)
+            data = self._parse_json(response, api_response=api_response)
 
             main_post = data.get("main_post", "")[:char_limit]
             thread = data.get("thread", [])
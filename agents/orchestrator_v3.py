@@ -1,15 +1,23 @@
 """Orchestrator v3 - obsługuje 3 tryby pracy: Eksploracja, Rozwinięcie, Szlif."""
 
+import functools
 import json
 import logging
 import traceback
+from concurrent.futures import Future
 from datetime import datetime
 from pathlib import Path
-from typing import Optional, Literal
+from typing import Optional, Literal, Dict, List, Tuple
 from dataclasses import dataclass, field
 
 from core.config import Config
+from core.agent_registry import resolve_agent_models
 from core.openrouter import OpenRouterClient
+from core.background_writer import get_writer
+from core.html_generator import open_report
+from core.result_store import AgentReport, ResultStore, get_store, write_result_folder
+from core.text_cleaner import CleanResult, clean_source_text
+from core.tracing import Trace, activate, span, start_trace
 
 # Agenci analityczni (PERSPEKTYWY)
 from .extractor import ExtractorAgent
@@ -47,19 +55,10 @@ from .engagement import EngagementAgent
 
 # Brief Synthesizer
 from .brief_synthesizer import BriefSynthesizerAgent
+from .fused_perspectives import FusedPerspectivesAgent, FUSABLE_AGENTS
 
 
-# Setup logging
-LOG_DIR = Path(__file__).parent.parent / "logs"
-LOG_DIR.mkdir(exist_ok=True)
-
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s [%(levelname)s] %(name)s: %(message)s',
-    handlers=[
-        logging.FileHandler(LOG_DIR / "orchestrator_v3.log", encoding="utf-8"),
-    ]
-)
+# Handlery (kolejka + pliki z rotacją) konfiguruje aplikacja: core/logging_setup.py
 logger = logging.getLogger("orchestrator_v3")
 
 
@@ -78,6 +77,8 @@ class WorkflowResult:
     draft: Optional[dict] = None  # Opcjonalny draft posta
     errors: list = field(default_factory=list)
     total_duration: float = 0.0
+    source_cleaning: Optional[CleanResult] = None  # tekst przed czyszczeniem: .raw_text (zapisywany w raporcie)
+    trace: Optional[Trace] = None  # spany przebiegu (config.tracing), eksport do logs/traces/
 
     def to_dict(self) -> dict:
         return {
@@ -90,6 +91,82 @@ class WorkflowResult:
         }
 
 
+@dataclass
+class SavedRun:
+    """Wynik zapisu w tle: nazwa w magazynie i raport HTML (gdy powstał folder)."""
+    run_key: Optional[str] = None  # None, gdy magazyn wyłączony
+    report_path: Optional[str] = None  # None, gdy bez folderu wyników
+
+
+@dataclass
+class SaveJob:
+    """
+    Zapis wyników zlecony w tle - ścieżka jest znana od razu, pliki po zakończeniu future.
+
+    path: plik bazy (magazyn wyników), a przy wyłączonym magazynie (RESULT_STORE=0) - folder wyników.
+    Future zwraca SavedRun. Wątek zapisu nic nie wypisuje i nie otwiera przeglądarki -
+    raport otwiera wywołujący (open_report) po zakończeniu zapisu.
+    """
+    path: str
+    future: Future
+
+    def wait(self, timeout: Optional[float] = None) -> str:
+        """Czeka na zapis (wyjątek zapisu jest rzucany tutaj)."""
+        self.future.result(timeout)
+        return self.path
+
+    @property
+    def run_key(self) -> Optional[str]:
+        """Nazwa przebiegu w magazynie (czeka na zapis)."""
+        return self.future.result().run_key
+
+    @property
+    def report_path(self) -> Optional[str]:
+        """Raport HTML w folderze wyników (czeka na zapis)."""
+        return self.future.result().report_path
+
+    def open_report(self) -> bool:
+        """Czeka na zapis i otwiera raport HTML w przeglądarce (w wątku wywołującego)."""
+        if not self.report_path:
+            return False
+        open_report(self.report_path)
+        return True
+
+
+def _traced_workflow(mode: str):
+    """
+    Śledzenie metody trybu (config.tracing): span główny przebiegu, Trace w result.trace,
+    eksport do logs/traces/. Draft i zapis dopisują swoje spany do tego samego Trace.
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs) -> WorkflowResult:
+            with start_trace(mode, enabled=self.config.tracing, model=self.model_key) as trace:
+                result = method(self, *args, **kwargs)
+                if trace is not None:
+                    trace.spans[0].set(success=result.success, errors=len(result.errors) or None)
+            if trace is not None:
+                result.trace = trace
+                trace.export()
+            return result
+        return wrapper
+    return decorator
+
+
+def _traced_stage(stage: str):
+    """Span etapu po zakończeniu trybu (draft) w śledzeniu workflow_result + ponowny eksport."""
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, workflow_result: WorkflowResult, *args, **kwargs):
+            with activate(workflow_result.trace), span(stage):
+                result = method(self, workflow_result, *args, **kwargs)
+            if workflow_result.trace is not None:
+                workflow_result.trace.export()
+            return result
+        return wrapper
+    return decorator
+
+
 class OrchestratorV3:
     """
     Orchestrator v3 - 3 tryby pracy.
@@ -107,54 +184,85 @@ class OrchestratorV3:
        → Ocena + poprawki
     """
 
-    def __init__(self, config: Optional[Config] = None, model_key: Optional[str] = None):
-        """Inicjalizacja orchestratora."""
+    def __init__(
+        self,
+        config: Optional[Config] = None,
+        model_key: Optional[str] = None,
+        tier_preset: Optional[str] = None,
+        agent_models: Optional[Dict[str, str]] = None,
+        fused_perspectives: Optional[bool] = None,
+    ):
+        """
+        Inicjalizacja orchestratora.
+
+        Args:
+            config: Konfiguracja (domyślnie z .env)
+            model_key: Główny model (poziom "main")
+            tier_preset: Profil modeli per agent (domyślnie config.tier_preset)
+            agent_models: Nadpisania modelu per agent (klucz modelu lub poziom)
+            fused_perspectives: Agenci kreatywni w jednym wywołaniu (domyślnie config)
+        """
         self.config = config or Config.from_env()
         self.model_key = model_key or self.config.default_model
         self.client = OpenRouterClient(self.config)
+        self.agent_models = resolve_agent_models(
+            self.model_key,
+            tier_preset or self.config.tier_preset,
+            agent_models,
+        )
+        self.fused_perspectives = (
+            self.config.fused_perspectives if fused_perspectives is None else fused_perspectives
+        )
 
         logger.info(f"Inicjalizacja OrchestratorV3 z modelem: {self.model_key}")
 
         # Agenci analityczni (wspólni dla eksploracji i rozwinięcia)
-        self.extractor = ExtractorAgent(self.client, self.model_key)
-        self.resonance_hunter = ResonanceHunterAgent(self.client, self.model_key)
-        self.anthropologist = AnthropologistAgent(self.client, self.model_key)
-        self.polish_contextualizer = PolishContextualizerAgent(self.client, self.model_key)
-        self.popculture_curator = PopcultureCuratorAgent(self.client, self.model_key)
+        self.extractor = ExtractorAgent(self.client, self._model_for("extractor"))
+        self.resonance_hunter = ResonanceHunterAgent(self.client, self._model_for("resonance_hunter"))
+        self.anthropologist = AnthropologistAgent(self.client, self._model_for("anthropologist"))
+        self.polish_contextualizer = PolishContextualizerAgent(self.client, self._model_for("polish_contextualizer"))
+        self.popculture_curator = PopcultureCuratorAgent(self.client, self._model_for("popculture_curator"))
 
         # Agenci kreatywni (PERSPEKTYWY - nowe)
-        self.story_excavator = StoryExcavatorAgent(self.client, self.model_key)
-        self.tension_architect = TensionArchitectAgent(self.client, self.model_key)
-        self.context_shifter = ContextShifterAgent(self.client, self.model_key)
+        self.story_excavator = StoryExcavatorAgent(self.client, self._model_for("story_excavator"))
+        self.tension_architect = TensionArchitectAgent(self.client, self._model_for("tension_architect"))
+        self.context_shifter = ContextShifterAgent(self.client, self._model_for("context_shifter"))
 
         # Analityk źródła (fundamentalny dla wszystkich trybów)
-        self.source_analyst = SourceAnalystAgent(self.client, self.model_key)
+        self.source_analyst = SourceAnalystAgent(self.client, self._model_for("source_analyst"))
 
         # Agenci trybu
-        self.exploration_agent = ExplorationAgent(self.client, self.model_key)
-        self.development_agent = DevelopmentAgent(self.client, self.model_key)
+        self.exploration_agent = ExplorationAgent(self.client, self._model_for("exploration_agent"))
+        self.development_agent = DevelopmentAgent(self.client, self._model_for("development_agent"))
 
         # Agenci platformowi (dla opcji draftu)
-        self.linkedin_agent = LinkedInAgent(self.client, self.model_key)
-        self.facebook_agent = FacebookAgent(self.client, self.model_key)
-        self.microblog_agent = MicroblogAgent(self.client, self.model_key)
-        self.video_agent = VideoAgent(self.client, self.model_key)
+        self.linkedin_agent = LinkedInAgent(self.client, self._model_for("linkedin_agent"))
+        self.facebook_agent = FacebookAgent(self.client, self._model_for("facebook_agent"))
+        self.microblog_agent = MicroblogAgent(self.client, self._model_for("microblog_agent"))
+        self.video_agent = VideoAgent(self.client, self._model_for("video_agent"))
 
         # Kontroler jakości (dla trybu szlif)
-        self.quality_controller = QualityControllerAgent(self.client, self.model_key)
+        self.quality_controller = QualityControllerAgent(self.client, self._model_for("quality_controller"))
 
         # Agenci recenzujący (KRYTYKA)
-        self.voice_guardian = VoiceGuardianAgent(self.client, self.model_key)
-        self.opening_sniper = OpeningSniperAgent(self.client, self.model_key)
-        self.vulnerability_scanner = VulnerabilityScannerAgent(self.client, self.model_key)
-        self.devils_advocate = DevilsAdvocateAgent(self.client, self.model_key)
+        self.voice_guardian = VoiceGuardianAgent(self.client, self._model_for("voice_guardian"))
+        self.opening_sniper = OpeningSniperAgent(self.client, self._model_for("opening_sniper"))
+        self.vulnerability_scanner = VulnerabilityScannerAgent(self.client, self._model_for("vulnerability_scanner"))
+        self.devils_advocate = DevilsAdvocateAgent(self.client, self._model_for("devils_advocate"))
 
         # Agenci ulepszający (ULEPSZENIA)
-        self.comedian = ComedianAgent(self.client, self.model_key)
-        self.engagement = EngagementAgent(self.client, self.model_key)
+        self.comedian = ComedianAgent(self.client, self._model_for("comedian"))
+        self.engagement = EngagementAgent(self.client, self._model_for("engagement"))
 
         # Brief Synthesizer (używa taniego modelu do ekstrakcji)
-        self.brief_synthesizer = BriefSynthesizerAgent(self.client, self.model_key)
+        self.brief_synthesizer = BriefSynthesizerAgent(
+            self.client,
+            self._model_for("brief_synthesizer"),
+            extraction_model=self._model_for("brief_extraction"),
+        )
+
+        # Fuzja perspektyw (opcjonalnie zamiast osobnych agentów kreatywnych)
+        self.fused_perspectives_agent = FusedPerspectivesAgent(self.client, self._model_for("fused_perspectives"))
 
         # Mapa wszystkich agentów do wyboru (GRUPY)
         self._perspective_agents_map = {
@@ -186,15 +294,118 @@ class OrchestratorV3:
             **self._enhancement_agents_map,
         }
 
+    # Agenci kreatywni: klucz -> (metoda agenta, komunikat postępu)
+    _CREATIVE_STEPS = {
+        "story_excavator": ("excavate", "📖 Wydobywam elementy narracyjne..."),
+        "tension_architect": ("architect", "⚡ Analizuję napięcie i paradoksy..."),
+        "context_shifter": ("shift", "🔬 Szukam głębi i drugiego dna..."),
+        "comedian": ("find_humor", "😄 Szukam okazji na humor..."),
+        "engagement": ("engineer", "💬 Analizuję potencjał zaangażowania..."),
+    }
+
+    @span("creative_agents")
+    def _run_creative_agents(
+        self,
+        content: str,
+        extracted_data: dict,
+        selected_agents: list,
+        verbose: bool = True,
+    ) -> Dict[str, dict]:
+        """
+        Uruchamia wybranych agentów kreatywnych i ulepszających.
+
+        W trybie fuzji (self.fused_perspectives) co najmniej dwóch agentów dostaje
+        jedno wspólne wywołanie modelu. Agenci, których sekcji zabrakło w odpowiedzi,
+        są uruchamiani osobno.
+
+        Returns:
+            Klucz agenta -> raport (to_dict)
+        """
+        context = {"extracted_data": extracted_data}
+        selected = [key for key in FUSABLE_AGENTS if key in selected_agents]
+        reports = {}
+
+        if self.fused_perspectives and len(selected) > 1:
+            if verbose:
+                print(f"🧩 Perspektywy w jednym wywołaniu ({len(selected)} agentów)...")
+            fused = self.fused_perspectives_agent.run(
+                {key: self._all_agents_map[key] for key in selected},
+                content,
+                context,
+            )
+            reports = {key: report.to_dict() for key, report in fused.reports.items()}
+
+        for key in selected:
+            if key in reports:
+                continue
+            method_name, message = self._CREATIVE_STEPS[key]
+            if verbose:
+                print(message)
+            agent = self._all_agents_map[key]
+            reports[key] = getattr(agent, method_name)(content, context).to_dict()
+
+        return reports
+
+    @staticmethod
+    def _source_before_cleaning(result: WorkflowResult) -> Optional[str]:
+        """Oryginał źródła do zapisu (magazyn / source_raw.txt) - tylko gdy czyszczenie coś zmieniło."""
+        cleaning = result.source_cleaning
+        if cleaning is None or cleaning.raw_text == cleaning.text:
+            return None
+        return cleaning.raw_text
+
+    @span("prepare_source")
+    def _prepare_source(
+        self,
+        content: str,
+        result: WorkflowResult,
+        verbose: bool,
+        pages: Optional[List[str]] = None,
+    ) -> str:
+        """
+        Czyści tekst źródłowy przed agentami (config.clean_source); oryginał zostaje w result.
+
+        pages: strony dokumentu (FileReader.read_pages) - granice stron dla reguły
+        nagłówków i stopek.
+        """
+        if not self.config.clean_source:
+            return content
+
+        cleaning = clean_source_text(content, pages)
+        result.source_cleaning = cleaning
+        if cleaning.removed_chars:
+            logger.info(f"Czyszczenie źródła: {cleaning.to_dict()}")
+            if verbose:
+                print(f"🧹 Usunięto ze źródła {cleaning.removed_chars} znaków "
+                      f"(~{cleaning.removed_tokens} tokenów na agenta)")
+        return cleaning.text
+
+    def _model_for(self, agent_key: str) -> str:
+        """
+        Zwraca model przypisany agentowi.
+
+        Jeśli dla modelu z profilu brakuje klucza API, agent używa głównego modelu.
+        """
+        model = self.agent_models.get(agent_key, self.model_key)
+        if model != self.model_key and not self.client.supports_model(model):
+            logger.warning(
+                f"Brak klucza API dla {model} ({agent_key}) - używam {self.model_key}"
+            )
+            model = self.model_key
+        self.agent_models[agent_key] = model
+        return model
+
     # ==========================================
     # TRYB 1: EKSPLORACJA
     # ==========================================
 
+    @_traced_workflow("exploration")
     def run_exploration(
         self,
         content: str,
         selected_agents: Optional[list] = None,
         verbose: bool = True,
+        source_pages: Optional[List[str]] = None,
     ) -> WorkflowResult:
         """
         Tryb EKSPLORACJA: Mam materiał, nie mam pomysłu.
@@ -203,6 +414,7 @@ class OrchestratorV3:
             content: Tekst źródłowy
             selected_agents: Lista kluczy wybranych agentów (None = wszystkie domyślne)
             verbose: Czy wyświetlać postęp
+            source_pages: Strony pliku źródłowego (FileReader.read_pages) do czyszczenia
 
         Returns:
             WorkflowResult z raportem eksploracyjnym
@@ -218,6 +430,8 @@ class OrchestratorV3:
         result = WorkflowResult(mode="exploration", success=True)
 
         try:
+            content = self._prepare_source(content, result, verbose, source_pages)
+
             # Etap 1: Ekstrakcja (zawsze)
             if verbose:
                 print("🔍 Ekstrakcja danych źródłowych...")
@@ -262,42 +476,13 @@ class OrchestratorV3:
                 popculture = self.popculture_curator.analyze_popculture(content, extracted_data)
                 popculture_data = popculture.to_dict()
 
-            # Etap 6: Nowe agenty kreatywne (jeśli wybrane)
-            story_data = {}
-            if "story_excavator" in selected_agents:
-                if verbose:
-                    print("📖 Wydobywam elementy narracyjne...")
-                story = self.story_excavator.excavate(content, {"extracted_data": extracted_data})
-                story_data = story.to_dict()
-
-            tension_data = {}
-            if "tension_architect" in selected_agents:
-                if verbose:
-                    print("⚡ Analizuję napięcie i paradoksy...")
-                tension = self.tension_architect.architect(content, {"extracted_data": extracted_data})
-                tension_data = tension.to_dict()
-
-            context_shift_data = {}
-            if "context_shifter" in selected_agents:
-                if verbose:
-                    print("🔬 Szukam głębi i drugiego dna...")
-                context_shift = self.context_shifter.shift(content, {"extracted_data": extracted_data})
-                context_shift_data = context_shift.to_dict()
-
-            # Etap 7: Agenty ulepszające (jeśli wybrane)
-            humor_data = {}
-            if "comedian" in selected_agents:
-                if verbose:
-                    print("😄 Szukam okazji na humor...")
-                humor = self.comedian.find_humor(content, {"extracted_data": extracted_data})
-                humor_data = humor.to_dict()
-
-            engagement_data = {}
-            if "engagement" in selected_agents:
-                if verbose:
-                    print("💬 Analizuję potencjał zaangażowania...")
-                engage = self.engagement.engineer(content, {"extracted_data": extracted_data})
-                engagement_data = engage.to_dict()
+            # Etap 6-7: Agenty kreatywne i ulepszające (jeśli wybrane)
+            creative = self._run_creative_agents(content, extracted_data, selected_agents, verbose)
+            story_data = creative.get("story_excavator", {})
+            tension_data = creative.get("tension_architect", {})
+            context_shift_data = creative.get("context_shifter", {})
+            humor_data = creative.get("comedian", {})
+            engagement_data = creative.get("engagement", {})
 
             # Etap 8: Agenty krytyczne (jeśli wybrane)
             critique_data = {}
@@ -366,6 +551,8 @@ class OrchestratorV3:
                 "engagement_data": engagement_data,
                 "critique_data": critique_data,
                 "raw_source_text": content,
+                "source_text_before_cleaning": self._source_before_cleaning(result),
+                "source_cleaning": result.source_cleaning.to_dict() if result.source_cleaning else None,
                 "selected_agents": selected_agents,
             }
 
@@ -382,12 +569,14 @@ class OrchestratorV3:
     # TRYB 2: ROZWINIĘCIE
     # ==========================================
 
+    @_traced_workflow("development")
     def run_development(
         self,
         content: str,
         user_direction: str,
         selected_agents: Optional[list] = None,
         verbose: bool = True,
+        source_pages: Optional[List[str]] = None,
     ) -> WorkflowResult:
         """
         Tryb ROZWINIĘCIE: Mam materiał + wstępny kierunek.
@@ -397,6 +586,7 @@ class OrchestratorV3:
             user_direction: Kierunek/pomysł użytkownika
             selected_agents: Lista kluczy wybranych agentów (None = wszystkie domyślne)
             verbose: Czy wyświetlać postęp
+            source_pages: Strony pliku źródłowego (FileReader.read_pages) do czyszczenia
 
         Returns:
             WorkflowResult z raportem rozwinięcia
@@ -412,6 +602,8 @@ class OrchestratorV3:
         result = WorkflowResult(mode="development", success=True)
 
         try:
+            content = self._prepare_source(content, result, verbose, source_pages)
+
             # Etap 1: Ekstrakcja (zawsze)
             if verbose:
                 print("🔍 Ekstrakcja danych źródłowych...")
@@ -456,42 +648,13 @@ class OrchestratorV3:
                 popculture = self.popculture_curator.analyze_popculture(content, extracted_data)
                 popculture_data = popculture.to_dict()
 
-            # Etap 6: Nowe agenty kreatywne (jeśli wybrane)
-            story_data = {}
-            if "story_excavator" in selected_agents:
-                if verbose:
-                    print("📖 Wydobywam elementy narracyjne...")
-                story = self.story_excavator.excavate(content, {"extracted_data": extracted_data})
-                story_data = story.to_dict()
-
-            tension_data = {}
-            if "tension_architect" in selected_agents:
-                if verbose:
-                    print("⚡ Analizuję napięcie i paradoksy...")
-                tension = self.tension_architect.architect(content, {"extracted_data": extracted_data})
-                tension_data = tension.to_dict()
-
-            context_shift_data = {}
-            if "context_shifter" in selected_agents:
-                if verbose:
-                    print("🔬 Szukam głębi i drugiego dna...")
-                context_shift = self.context_shifter.shift(content, {"extracted_data": extracted_data})
-                context_shift_data = context_shift.to_dict()
-
-            # Etap 7: Agenty ulepszające (jeśli wybrane)
-            humor_data = {}
-            if "comedian" in selected_agents:
-                if verbose:
-                    print("😄 Szukam okazji na humor...")
-                humor = self.comedian.find_humor(content, {"extracted_data": extracted_data})
-                humor_data = humor.to_dict()
-
-            engagement_data = {}
-            if "engagement" in selected_agents:
-                if verbose:
-                    print("💬 Analizuję potencjał zaangażowania...")
-                engage = self.engagement.engineer(content, {"extracted_data": extracted_data})
-                engagement_data = engage.to_dict()
+            # Etap 6-7: Agenty kreatywne i ulepszające (jeśli wybrane)
+            creative = self._run_creative_agents(content, extracted_data, selected_agents, verbose)
+            story_data = creative.get("story_excavator", {})
+            tension_data = creative.get("tension_architect", {})
+            context_shift_data = creative.get("context_shifter", {})
+            humor_data = creative.get("comedian", {})
+            engagement_data = creative.get("engagement", {})
 
             # Etap 8: Agenty krytyczne (jeśli wybrane)
             critique_data = {}
@@ -561,6 +724,8 @@ class OrchestratorV3:
                 "engagement_data": engagement_data,
                 "critique_data": critique_data,
                 "raw_source_text": content,
+                "source_text_before_cleaning": self._source_before_cleaning(result),
+                "source_cleaning": result.source_cleaning.to_dict() if result.source_cleaning else None,
                 "selected_agents": selected_agents,
             }
 
@@ -577,6 +742,7 @@ class OrchestratorV3:
     # TRYB 3: SZLIF
     # ==========================================
 
+    @_traced_workflow("polish")
     def run_polish(
         self,
         text: str,
@@ -625,6 +791,7 @@ class OrchestratorV3:
     # AGENCI ANALITYCZNI (dla trybu SZLIF)
     # ==========================================
 
+    @span("analytical_agents")
     def run_analytical_agents_for_polish(
         self,
         text: str,
@@ -732,6 +899,7 @@ class OrchestratorV3:
     # AGENCI RECENZUJĄCY (dla trybu SZLIF)
     # ==========================================
 
+    @span("review_agents")
     def run_review_agents(
         self,
         text: str,
@@ -805,6 +973,7 @@ class OrchestratorV3:
     # GENEROWANIE DRAFTU (opcjonalne)
     # ==========================================
 
+    @_traced_stage("draft")
     def generate_draft(
         self,
         workflow_result: WorkflowResult,
@@ -932,8 +1101,37 @@ class OrchestratorV3:
         result: WorkflowResult,
         output_dir: Optional[str] = None,
         topic_slug: Optional[str] = None,
+        wait: bool = False,
+        open_browser: bool = False,
     ) -> str:
-        """Zapisuje wyniki do plików."""
+        """
+        Zapisuje wyniki (w tle - zwraca ścieżkę bazy / folderu od razu).
+
+        Args:
+            wait: Czekaj na zakończenie zapisu (błędy zapisu rzucane od razu)
+            open_browser: Po zapisie otwórz raport HTML, jeśli powstał folder (wymaga wait)
+        """
+        job = self.save_results_async(result, output_dir, topic_slug)
+        if wait:
+            job.wait()
+            if open_browser:
+                job.open_report()
+        return job.path
+
+    def save_results_async(
+        self,
+        result: WorkflowResult,
+        output_dir: Optional[str] = None,
+        topic_slug: Optional[str] = None,
+    ) -> SaveJob:
+        """
+        Zleca zapis do magazynu wyników wątkowi w tle (bez magazynu - rezerwuje folder).
+
+        Folder przebiegu powstaje tylko przez eksport: export_run na żądanie albo
+        od razu po zapisie przy RESULT_FOLDERS=1.
+
+        Wyniku nie należy modyfikować, dopóki future nie jest zakończony.
+        """
         if output_dir is None:
             output_dir = Path(__file__).parent.parent / "output"
         else:
@@ -947,38 +1145,144 @@ class OrchestratorV3:
         else:
             base_folder_name = f"{date_str}-{time_str}-{result.mode}"
 
-        # Sprawdź czy folder istnieje - jeśli tak, dodaj numer
+        output_dir.mkdir(parents=True, exist_ok=True)
+        writer = get_writer(self.config.result_queue_size, self.config.result_fsync)
+
+        if self.config.result_store:
+            store = get_store(
+                output_dir / "results.db",
+                durable=self.config.result_fsync,
+                compression=self.config.result_compression,
+            )
+            logger.info(f"Zapisuję wyniki do: {store.path}")
+            export_dir = output_dir if self.config.result_folders else None
+            future = writer.submit(
+                self._write_results, None, result, store, base_folder_name, topic_slug, export_dir=export_dir
+            )
+            return SaveJob(path=str(store.path), future=future)
+
+        # Bez magazynu: folder per przebieg (mkdir bez exist_ok - odporne na równoległe zapisy)
         folder_name = base_folder_name
-        result_dir = output_dir / folder_name
         counter = 1
-
-        while result_dir.exists():
-            folder_name = f"{base_folder_name}-{counter}"
+        while True:
             result_dir = output_dir / folder_name
-            counter += 1
+            try:
+                result_dir.mkdir()
+                break
+            except FileExistsError:
+                folder_name = f"{base_folder_name}-{counter}"
+                counter += 1
+
+        logger.info(f"Zapisuję wyniki do: {result_dir}")
 
+        future = writer.submit(self._write_results, result_dir, result, sync_dir=result_dir)
+        return SaveJob(path=str(result_dir), future=future)
+
+    def _write_results(
+        self,
+        result_dir: Optional[Path],
+        result: WorkflowResult,
+        store: Optional[ResultStore] = None,
+        run_key: Optional[str] = None,
+        topic_slug: Optional[str] = None,
+        export_dir: Optional[Path] = None,
+    ) -> SavedRun:
+        """
+        Zapis do magazynu albo folderu (wykonywany w wątku zapisu).
+
+        export_dir (RESULT_FOLDERS=1): po zapisie do magazynu folder przebiegu
+        jest eksportowany z magazynu, jak w export_run.
+
+        Spany zapisu trafiają do śledzenia przebiegu (result.trace) - wątek zapisu
+        nie dziedziczy kontekstu, więc śledzenie jest aktywowane jawnie.
+        """
+        saved = SavedRun()
+        with activate(result.trace), span("save", "save"):
+            if store is not None:
+                source_text = (
+                    result.source_cleaning.raw_text if result.source_cleaning
+                    else (result.report or {}).get("raw_source_text")
+                )
+                with span("result_store", "save", compression=store.compression):
+                    saved.run_key = store.save_run(
+                        run_key or result.mode,
+                        result.to_dict(),
+                        self._agent_reports(result),
+                        model_key=self.model_key,
+                        source_text=source_text,
+                        topic_slug=topic_slug,
+                    )
+                logger.info(f"Wyniki zapisane w {store.path} jako {saved.run_key}")
+                if export_dir is not None:
+                    with span("result_files", "export"):
+                        _, saved.report_path = self._export_from_store(store, saved.run_key, export_dir)
+
+            if result_dir is not None:
+                with span("result_files", "save"):
+                    saved.report_path = self._write_result_files(result_dir, result)
+        if result.trace is not None:
+            result.trace.export()
+        return saved
+
+    def export_run(
+        self,
+        run_key: str,
+        output_dir: Optional[str] = None,
+        open_browser: bool = False,
+    ) -> str:
+        """
+        Odtwarza folder wyników (full_results.json, agents/, HTML, markdown) z magazynu.
+
+        Foldery przebiegów nie powstają przy zapisie (domyślnie RESULT_FOLDERS=0) -
+        tylko tutaj, na żądanie.
+
+        Args:
+            run_key: Nazwa przebiegu (ResultStore.find_runs)
+            output_dir: Folder nadrzędny (domyślnie output/)
+
+        Raises:
+            KeyError: Brak przebiegu w magazynie
+        """
+        output_dir = Path(output_dir) if output_dir else Path(__file__).parent.parent / "output"
+        result_dir, report_path = self._export_from_store(get_store(output_dir / "results.db"), run_key, output_dir)
+        if open_browser and report_path:
+            open_report(report_path)
+        return str(result_dir)
+
+    def _export_from_store(
+        self, store: ResultStore, run_key: str, output_dir: Path
+    ) -> Tuple[Path, Optional[str]]:
+        """Folder output_dir/run_key z przebiegu zapisanego w magazynie i ścieżka raportu HTML."""
+        data = store.load_run(run_key)
+        if data is None:
+            raise KeyError(f"Brak przebiegu w magazynie wyników: {run_key}")
+
+        result = WorkflowResult(**data)
+        result_dir = output_dir / run_key
         result_dir.mkdir(parents=True, exist_ok=True)
+        return result_dir, self._write_result_files(result_dir, result)
 
-        logger.info(f"Zapisuję wyniki do: {result_dir}")
+    def _write_result_files(self, result_dir: Path, result: WorkflowResult) -> Optional[str]:
+        """
+        Zapis wszystkich plików wyników do folderu. Zwraca ścieżkę raportu HTML (None = błąd HTML).
 
-        # Zapisz pełne wyniki JSON
+        Działa też w wątku zapisu - bez print i bez otwierania przeglądarki.
+        """
+        # JSON-y: dane agentów w agents/, źródło w source.txt, full_results.json z odwołaniami
         full_results = result.to_dict()
-        with open(result_dir / "full_results.json", "w", encoding="utf-8") as f:
-            json.dump(full_results, f, ensure_ascii=False, indent=2)
+        self._save_agent_reports(result_dir, result, full_results)
 
-        # Zapisz osobne pliki JSON per agent
-        self._save_agent_reports(result_dir, result)
-
-        # Generuj i otwórz HTML
+        # Generuj HTML (otwiera go wywołujący)
+        html_path = None
         try:
             from core.html_generator import generate_html_report
             html_path = generate_html_report(
                 full_report=full_results,
                 output_dir=str(result_dir),
                 mode=result.mode,
-                auto_open=True
+                auto_open=False
             )
-            print(f"📊 Raport HTML: {html_path}")
+            logger.info(f"Raport HTML: {html_path}")
         except Exception as e:
             logger.warning(f"Nie udało się wygenerować HTML: {e}")
 
@@ -990,8 +1294,8 @@ class OrchestratorV3:
         if result.draft:
             self._save_draft_markdown(result_dir, result.draft)
 
-        print(f"\n💾 Wyniki zapisane do: {result_dir}")
-        return str(result_dir)
+        logger.info(f"Wyniki zapisane do: {result_dir}")
+        return html_path
 
     def _save_report_markdown(self, result_dir: Path, result: WorkflowResult):
         """Zapisuje raport jako markdown."""
@@ -1140,92 +1444,79 @@ class OrchestratorV3:
         with open(result_dir / "report.md", "w", encoding="utf-8") as f:
             f.write("\n".join(lines))
 
-    def _save_agent_reports(self, result_dir: Path, result: WorkflowResult):
-        """Zapisuje osobne pliki JSON per agent."""
-        if not result.report:
-            return
+    def _save_agent_reports(self, result_dir: Path, result: WorkflowResult, full_results: Optional[dict] = None):
+        """Zapisuje pliki JSON per agent i full_results.json odwołujący się do nich."""
+        agent_reports = self._agent_reports(result)
+        write_result_folder(result_dir, full_results or result.to_dict(), agent_reports)
+        if agent_reports:
+            logger.info(f"Zapisano raporty agentów do: {result_dir / 'agents'}")
 
-        agents_dir = result_dir / "agents"
-        agents_dir.mkdir(exist_ok=True)
+    @staticmethod
+    def _agent_reports(result: WorkflowResult) -> Dict[str, AgentReport]:
+        """Raporty poszczególnych agentów z wyniku: klucz agenta -> raport (z położeniem danych)."""
+        if not result.report:
+            return {}
 
         report = result.report
         report_type = report.get("type", "unknown")
+        timestamp = datetime.now().isoformat()
+        agent_reports = {}
+
+        def add(agent_key: str, agent_name: str, data: dict, *path: str):
+            agent_reports[agent_key] = AgentReport(
+                agent_key=agent_key,
+                agent_name=agent_name,
+                mode=report_type,
+                data=data,
+                path=("report",) + path,
+                timestamp=timestamp,
+            )
 
-        # Mapowanie kluczy do nazw plików
+        # Mapowanie kluczy raportu do agentów
         agent_data_map = {
-            "extracted_data": ("extractor.json", "Ekstraktor"),
-            "source_analysis_data": ("source_analyst.json", "Analityk Źródła"),
-            "resonance_data": ("resonance_hunter.json", "Resonance Hunter"),
-            "depth_data": ("anthropologist.json", "Antropolog"),
-            "polish_context_data": ("polish_contextualizer.json", "Polski Kontekstualizator"),
-            "popculture_data": ("popculture_curator.json", "Kurator Popkultury"),
+            "extracted_data": ("extractor", "Ekstraktor"),
+            "source_analysis_data": ("source_analyst", "Analityk Źródła"),
+            "resonance_data": ("resonance_hunter", "Resonance Hunter"),
+            "depth_data": ("anthropologist", "Antropolog"),
+            "polish_context_data": ("polish_contextualizer", "Polski Kontekstualizator"),
+            "popculture_data": ("popculture_curator", "Kurator Popkultury"),
             # Nowe agenty kreatywne
-            "story_data": ("story_excavator.json", "Archeolog Historii"),
-            "tension_data": ("tension_architect.json", "Architekt Napięcia"),
-            "context_shift_data": ("context_shifter.json", "Antropolog Absurdu"),
+            "story_data": ("story_excavator", "Archeolog Historii"),
+            "tension_data": ("tension_architect", "Architekt Napięcia"),
+            "context_shift_data": ("context_shifter", "Antropolog Absurdu"),
             # Agenty ulepszające
-            "humor_data": ("comedian.json", "Komik"),
-            "engagement_data": ("engagement.json", "Inżynier Zaangażowania"),
+            "humor_data": ("comedian", "Komik"),
+            "engagement_data": ("engagement", "Inżynier Zaangażowania"),
             # Agent krytyczny
-            "critique_data": ("devils_advocate.json", "Adwokat Diabła"),
+            "critique_data": ("devils_advocate", "Adwokat Diabła"),
         }
 
-        # Zapisz dane każdego agenta
-        for key, (filename, agent_name) in agent_data_map.items():
+        for key, (agent_key, agent_name) in agent_data_map.items():
             data = report.get(key, {})
             if data:
-                agent_report = {
-                    "agent_name": agent_name,
-                    "mode": report_type,
-                    "data": data,
-                    "timestamp": datetime.now().isoformat(),
-                }
-                with open(agents_dir / filename, "w", encoding="utf-8") as f:
-                    json.dump(agent_report, f, ensure_ascii=False, indent=2)
+                add(agent_key, agent_name, data, key)
 
-        # Dla trybu exploration/development - zapisz też raport główny agenta
+        # Dla trybu exploration/development - także raport główny agenta
         if report_type == "exploration" and report.get("exploration_report"):
-            with open(agents_dir / "exploration_agent.json", "w", encoding="utf-8") as f:
-                json.dump({
-                    "agent_name": "Exploration Agent",
-                    "mode": report_type,
-                    "data": report["exploration_report"],
-                    "timestamp": datetime.now().isoformat(),
-                }, f, ensure_ascii=False, indent=2)
+            add("exploration_agent", "Exploration Agent", report["exploration_report"], "exploration_report")
 
         elif report_type == "development" and report.get("development_report"):
-            with open(agents_dir / "development_agent.json", "w", encoding="utf-8") as f:
-                json.dump({
-                    "agent_name": "Development Agent",
-                    "mode": report_type,
-                    "data": report["development_report"],
-                    "timestamp": datetime.now().isoformat(),
-                }, f, ensure_ascii=False, indent=2)
+            add("development_agent", "Development Agent", report["development_report"], "development_report")
 
         elif report_type == "polish" and report.get("quality_report"):
-            with open(agents_dir / "quality_controller.json", "w", encoding="utf-8") as f:
-                json.dump({
-                    "agent_name": "Quality Controller",
-                    "mode": report_type,
-                    "data": report["quality_report"],
-                    "timestamp": datetime.now().isoformat(),
-                }, f, ensure_ascii=False, indent=2)
+            add("quality_controller", "Quality Controller", report["quality_report"], "quality_report")
 
         # Dla trybu SZLIF z agentami analitycznymi
         analytical_results = report.get("analytical_results", {})
         if analytical_results:
             for agent_key, agent_data in analytical_results.items():
                 if agent_data.get("success") and agent_data.get("data"):
-                    filename = f"{agent_key}.json"
-                    with open(agents_dir / filename, "w", encoding="utf-8") as f:
-                        json.dump({
-                            "agent_name": agent_data.get("name_pl", agent_key),
-                            "mode": report_type,
-                            "data": agent_data["data"],
-                            "timestamp": datetime.now().isoformat(),
-                        }, f, ensure_ascii=False, indent=2)
-
-        logger.info(f"Zapisano raporty agentów do: {agents_dir}")
+                    add(
+                        agent_key, agent_data.get("name_pl", agent_key), agent_data["data"],
+                        "analytical_results", agent_key, "data",
+                    )
+
+        return agent_reports
 
     def _save_draft_markdown(self, result_dir: Path, draft: dict):
         """Zapisuje draft jako markdown."""
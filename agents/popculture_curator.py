@@ -1,12 +1,11 @@
 """Agent: Kurator Popkultury - znajduje analogie z filmów, seriali, sportu, codzienności."""
 
 import json
-import re
 from dataclasses import dataclass, field
 from typing import Optional, List
 
 from .base import BaseAgent, AgentResult
-from core.openrouter import OpenRouterClient
+from core.openrouter import OpenRouterClient, APIResponse
 
 
 @dataclass
@@ -298,43 +297,22 @@ PAMIĘTAJ:
             {"role": "user", "content": input_text},
         ]
 
-        response = self.client.chat(
+        response = self._chat(
             messages=messages,
-            model_key=self.model_key,
             temperature=0.8,  # Wyższa temperatura dla kreatywności
             max_tokens=4000,
+            response_schema=self.response_schema,
         )
 
-        return self._parse_response(response.content)
+        return self._parse_response(response.content, api_response=response)
 
-    def _parse_response(self, response: str) -> PopcultureReport:
+    def _parse_response(self, response: str, api_response: Optional[APIResponse] = None) -> PopcultureReport:
         """Parsuje odpowiedź JSON do PopcultureReport."""
         import logging
         logger = logging.getLogger(__name__)
 
         try:
-            # 1. Spróbuj normalnego regex z zamykającym tagiem
-            json_match = re.search(r'```json\s*(.*?)\s*```', response, re.DOTALL)
-            if json_match:
-                json_str = json_match.group(1)
-            else:
-                # 2. Fallback: wyciągnij JSON po ```json (nawet bez zamknięcia)
-                json_start = re.search(r'```json\s*', response)
-                if json_start:
-                    json_str = response[json_start.end():]
-                    if '```' in json_str:
-                        json_str = json_str[:json_str.rfind('```')]
-                    logger.warning("PopcultureCurator: Używam fallback parsowania")
-                else:
-                    json_str = response
-
-            json_str = json_str.strip()
-            try:
-                data = json.loads(json_str)
-            except json.JSONDecodeError:
-                logger.warning("PopcultureCurator: Próba naprawy uciętego JSON...")
-                repaired = self._repair_truncated_json(json_str)
-                data = json.loads(repaired)
+            data = self._parse_json(response, api_response=api_response)
 
             return PopcultureReport(
                 filmy_seriale=data.get("filmy_seriale", []),
@@ -356,18 +334,6 @@ PAMIĘTAJ:
             logger.error(f"PopcultureCurator: Unexpected error: {e}")
             return PopcultureReport()
 
-    def _repair_truncated_json(self, json_str: str) -> str:
-        """Próbuje naprawić ucięty JSON."""
-        open_braces = json_str.count('{') - json_str.count('}')
-        open_brackets = json_str.count('[') - json_str.count(']')
-        last_complete = max(json_str.rfind('},'), json_str.rfind('],'), json_str.rfind('",'))
-        if last_complete > 0:
-            json_str = json_str[:last_complete + 1]
-            open_braces = json_str.count('{') - json_str.count('}')
-            open_brackets = json_str.count('[') - json_str.count(']')
-        json_str += ']' * open_brackets + '}' * open_braces
-        return json_str
-
     def analyze(
         self,
         content: str,
@@ -5,7 +5,8 @@ from dataclasses import dataclass
 from typing import Optional
 
 from .base import BaseAgent, AgentResult
-from core.openrouter import OpenRouterClient
+from core.openrouter import OpenRouterClient, APIResponse
+from core.response_schemas import get_response_schema
 
 
 @dataclass
@@ -320,27 +321,18 @@ Bądź bezwzględny - lepiej znaleźć problem teraz.
             {"role": "user", "content": input_text},
         ]
 
-        response = self.client.chat(
+        response = self._chat(
             messages=messages,
-            model_key=self.model_key,
             temperature=0.3,  # Niska dla precyzyjnej oceny
             max_tokens=4000,
         )
 
-        return self._parse_response(response.content)
+        return self._parse_response(response.content, api_response=response)
 
-    def _parse_response(self, response: str) -> QualityReport:
+    def _parse_response(self, response: str, api_response: Optional[APIResponse] = None) -> QualityReport:
         """Parsuje odpowiedź do QualityReport."""
-        import re
-
         try:
-            json_match = re.search(r'```json\s*(.*?)\s*```', response, re.DOTALL)
-            if json_match:
-                json_str = json_match.group(1)
-            else:
-                json_str = response
-
-            data = json.loads(json_str)
+            data = self._parse_json(response, api_response=api_response)
 
             platform_results = {}
             for platform, result in data.get("platform_results", {}).items():
@@ -568,27 +560,21 @@ Oceń ten tekst i zaproponuj konkretne poprawki.
             {"role": "user", "content": input_text},
         ]
 
-        response = self.client.chat(
+        response = self._chat(
             messages=messages,
-            model_key=self.model_key,
             temperature=0.4,
             max_tokens=4000,
+            response_schema=get_response_schema("quality_polish"),
         )
 
-        return self._parse_polish_response(response.content, text)
+        return self._parse_polish_response(response.content, text, api_response=response)
 
-    def _parse_polish_response(self, response: str, original_text: str) -> PolishReport:
+    def _parse_polish_response(
+        self, response: str, original_text: str, api_response: Optional[APIResponse] = None
+    ) -> PolishReport:
         """Parsuje odpowiedź do PolishReport."""
-        import re
-
         try:
-            json_match = re.search(r'```json\s*(.*?)\s*```', response, re.DOTALL)
-            if json_match:
-                json_str = json_match.group(1)
-            else:
-                json_str = response
-
-            data = json.loads(json_str)
+            data = self._parse_json(response, "quality_polish", api_response=api_response)
 
             return PolishReport(
                 original_text=original_text,
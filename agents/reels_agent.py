@@ -5,7 +5,7 @@ from dataclasses import dataclass
 from typing import Optional
 
 from .base import BaseAgent, AgentResult
-from core.openrouter import OpenRouterClient
+from core.openrouter import OpenRouterClient, APIResponse
 
 
 @dataclass
@@ -249,27 +249,18 @@ Pamiętaj o strukturze timestampów i tekstach na ekranie.
             {"role": "user", "content": input_text},
         ]
 
-        response = self.client.chat(
+        response = self._chat(
             messages=messages,
-            model_key=self.model_key,
             temperature=0.7,
             max_tokens=3000,
         )
 
-        return self._parse_response(response.content)
+        return self._parse_response(response.content, api_response=response)
 
-    def _parse_response(self, response: str) -> ReelsScript:
+    def _parse_response(self, response: str, api_response: Optional[APIResponse] = None) -> ReelsScript:
         """Parsuje odpowiedź do ReelsScript."""
-        import re
-
         try:
-            json_match = re.search(r'```json\s*(.*?)\s*```', response, re.DOTALL)
-            if json_match:
-                json_str = json_match.group(1)
-            else:
-                json_str = response
-
-            data = json.loads(json_str)
+            data = self._parse_json(response, api_response=api_response)
 
             timestamps = data.get("timestamps", [])
 
@@ -5,7 +5,7 @@ from dataclasses import dataclass
 from typing import Optional
 
 from .base import BaseAgent, AgentResult
-from core.openrouter import OpenRouterClient
+from core.openrouter import OpenRouterClient, APIResponse
 from core.filters import (
     BASE_FEARS,
     BASE_OBJECTIONS,
@@ -217,44 +217,22 @@ Przeanalizuj wszystkie możliwe punkty rezonansu z odbiorcą.
             {"role": "user", "content": input_text},
         ]
 
-        response = self.client.chat(
+        response = self._chat(
             messages=messages,
-            model_key=self.model_key,
             temperature=0.7,
             max_tokens=3000,
+            response_schema=self.response_schema,
         )
 
-        return self._parse_response(response.content)
+        return self._parse_response(response.content, api_response=response)
 
-    def _parse_response(self, response: str) -> ResonanceReport:
+    def _parse_response(self, response: str, api_response: Optional[APIResponse] = None) -> ResonanceReport:
         """Parsuje odpowiedź do ResonanceReport."""
-        import re
         import logging
         logger = logging.getLogger(__name__)
 
         try:
-            # 1. Spróbuj normalnego regex z zamykającym tagiem
-            json_match = re.search(r'```json\s*(.*?)\s*```', response, re.DOTALL)
-            if json_match:
-                json_str = json_match.group(1)
-            else:
-                # 2. Fallback: wyciągnij JSON po ```json (nawet bez zamknięcia)
-                json_start = re.search(r'```json\s*', response)
-                if json_start:
-                    json_str = response[json_start.end():]
-                    if '```' in json_str:
-                        json_str = json_str[:json_str.rfind('```')]
-                    logger.warning("ResonanceHunter: Używam fallback parsowania")
-                else:
-                    json_str = response
-
-            json_str = json_str.strip()
-            try:
-                data = json.loads(json_str)
-            except json.JSONDecodeError:
-                logger.warning("ResonanceHunter: Próba naprawy uciętego JSON...")
-                repaired = self._repair_truncated_json(json_str)
-                data = json.loads(repaired)
+            data = self._parse_json(response, api_response=api_response)
 
             # Obsłuż oba warianty kluczy (top3 i rekomendacja_top3)
             top3 = data.get("top3", data.get("rekomendacja_top3", []))
@@ -287,18 +265,6 @@ Przeanalizuj wszystkie możliwe punkty rezonansu z odbiorcą.
                 top3_recommendations=[],
             )
 
-    def _repair_truncated_json(self, json_str: str) -> str:
-        """Próbuje naprawić ucięty JSON."""
-        open_braces = json_str.count('{') - json_str.count('}')
-        open_brackets = json_str.count('[') - json_str.count(']')
-        last_complete = max(json_str.rfind('},'), json_str.rfind('],'), json_str.rfind('",'))
-        if last_complete > 0:
-            json_str = json_str[:last_complete + 1]
-            open_braces = json_str.count('{') - json_str.count('}')
-            open_brackets = json_str.count('[') - json_str.count(']')
-        json_str += ']' * open_brackets + '}' * open_braces
-        return json_str
-
     def analyze(
         self,
         content: str,
@@ -0,0 +1,444 @@
+"""
+Planer przebiegu - szacuje tokeny, koszt i czas analizy PRZED jej uruchomieniem.
+
+Odtwarza kolejność etapów OrchestratorV3 dla danego trybu i wybranych agentów.
+Dla każdego etapu liczy:
+- tokeny wejściowe: prompt systemowy agenta + tekst źródłowy + outputy poprzednich etapów
+- tokeny wyjściowe: średnia z logs/usage.jsonl (jeśli są dane), inaczej wartość domyślna
+- koszt: ceny z ModelConfig
+- czas: średni czas z logu lub szacunek z prędkości generowania modelu
+"""
+
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Optional, List, Dict, Tuple
+
+from core.config import AVAILABLE_MODELS
+from core.agent_registry import PIPELINE_AGENTS, get_agent_by_key
+from core.text_cleaner import clean_source_text
+from core.usage_log import (
+    UsageRecord, UsageStats, cached_usage, summarize_usage, DEFAULT_CHARS_PER_TOKEN,
+)
+
+# Stały narzut na wywołanie (sieć, kolejka, time-to-first-token) w sekundach
+BASE_LATENCY_SECONDS = 2.0
+
+# Prędkość generowania (tokeny wyjściowe / s) gdy brak danych z logu
+DEFAULT_OUTPUT_TOKENS_PER_SECOND = {
+    "claude-opus-4.5": 45,
+    "gpt-5.1": 60,
+    "gemini-3-pro": 70,
+    "gemini-3-flash": 150,
+}
+
+# Typowa długość odpowiedzi agenta (tokeny) gdy brak danych z logu
+DEFAULT_OUTPUT_TOKENS = {
+    "extractor": 1200,
+    "source_analyst": 2000,
+    "resonance_hunter": 1500,
+    "anthropologist": 2200,
+    "polish_contextualizer": 2200,
+    "popculture_curator": 2000,
+    "story_excavator": 1500,
+    "tension_architect": 1500,
+    "context_shifter": 1500,
+    "comedian": 1500,
+    "engagement": 1500,
+    "devils_advocate": 1500,
+    "exploration_agent": 2500,
+    "development_agent": 2500,
+    "brief_extraction": 300,
+    "brief_synthesizer": 800,
+    "quality_controller": 2000,
+    "voice_guardian": 1500,
+    "opening_sniper": 1500,
+    "vulnerability_scanner": 1500,
+}
+
+# Etapy analityczne w kolejności OrchestratorV3: (klucz agenta, wejścia)
+# Wejście "source" = tekst źródłowy, inne = output wcześniejszego etapu
+_ANALYSIS_STAGES = [
+    ("source_analyst", ["source", "extractor"]),
+    ("resonance_hunter", ["extractor"]),
+    ("anthropologist", ["source", "extractor"]),
+    ("polish_contextualizer", ["source", "extractor"]),
+    ("popculture_curator", ["source", "extractor"]),
+    ("story_excavator", ["source", "extractor"]),
+    ("tension_architect", ["source", "extractor"]),
+    ("context_shifter", ["source", "extractor"]),
+    ("comedian", ["source", "extractor"]),
+    ("engagement", ["source", "extractor"]),
+    ("devils_advocate", ["source", "extractor"]),
+]
+
+# Etapy zawsze uruchamiane w eksploracji/rozwinięciu
+_ALWAYS_RUN = {"resonance_hunter"}
+
+# Agenci, których output trafia do Brief Synthesizera
+_BRIEF_SOURCES = {
+    "source_analyst", "anthropologist", "polish_contextualizer", "popculture_curator",
+    "story_excavator", "tension_architect", "context_shifter", "comedian",
+    "engagement", "devils_advocate", "exploration_agent", "development_agent",
+}
+
+# Brief Synthesizer przycina output agenta przed ekstrakcją
+_BRIEF_EXTRACTION_MAX_CHARS = 2500
+
+_POLISH_ANALYTICAL = ["anthropologist", "polish_contextualizer", "popculture_curator"]
+_POLISH_REVIEW = ["voice_guardian", "opening_sniper", "vulnerability_scanner"]
+
+
+@dataclass
+class StageEstimate:
+    """Szacunek dla jednego etapu (jednego agenta, może być wiele wywołań)."""
+    key: str
+    name_pl: str
+    model_key: str
+    calls: int
+    input_tokens: int
+    output_tokens: int
+    cost_usd: float
+    seconds: float
+    calibrated: bool  # czy tokeny wyjściowe pochodzą z historii użycia
+
+    def to_dict(self) -> dict:
+        return {
+            "etap": self.key,
+            "nazwa": self.name_pl,
+            "model": self.model_key,
+            "wywołania": self.calls,
+            "tokeny_wejściowe": self.input_tokens,
+            "tokeny_wyjściowe": self.output_tokens,
+            "koszt_usd": round(self.cost_usd, 4),
+            "czas_s": round(self.seconds, 1),
+            "skalibrowane": self.calibrated,
+        }
+
+
+@dataclass
+class RunEstimate:
+    """Szacunek całego przebiegu."""
+    mode: str
+    model_key: str
+    source_chars: int
+    stages: List[StageEstimate] = field(default_factory=list)
+
+    @property
+    def total_input_tokens(self) -> int:
+        return sum(s.input_tokens for s in self.stages)
+
+    @property
+    def total_output_tokens(self) -> int:
+        return sum(s.output_tokens for s in self.stages)
+
+    @property
+    def total_cost_usd(self) -> float:
+        return sum(s.cost_usd for s in self.stages)
+
+    @property
+    def total_seconds(self) -> float:
+        # Etapy wykonywane są sekwencyjnie
+        return sum(s.seconds for s in self.stages)
+
+    @property
+    def total_calls(self) -> int:
+        return sum(s.calls for s in self.stages)
+
+    def to_dict(self) -> dict:
+        return {
+            "tryb": self.mode,
+            "model": self.model_key,
+            "znaki_źródła": self.source_chars,
+            "etapy": [s.to_dict() for s in self.stages],
+            "suma_tokenów_wejściowych": self.total_input_tokens,
+            "suma_tokenów_wyjściowych": self.total_output_tokens,
+            "koszt_usd": round(self.total_cost_usd, 4),
+            "czas_s": round(self.total_seconds, 1),
+        }
+
+
+@lru_cache(maxsize=None)
+def _prompt_chars(stage_key: str) -> int:
+    """Długość promptu systemowego agenta (znaki). Agenci tworzeni bez klienta API."""
+    from .extractor import ExtractorAgent
+    from .source_analyst import SourceAnalystAgent
+    from .resonance_hunter import ResonanceHunterAgent
+    from .anthropologist import AnthropologistAgent
+    from .polish_contextualizer import PolishContextualizerAgent
+    from .popculture_curator import PopcultureCuratorAgent
+    from .story_excavator import StoryExcavatorAgent
+    from .tension_architect import TensionArchitectAgent
+    from .context_shifter import ContextShifterAgent
+    from .comedian import ComedianAgent
+    from .engagement import EngagementAgent
+    from .devils_advocate import DevilsAdvocateAgent
+    from .exploration_agent import ExplorationAgent
+    from .development_agent import DevelopmentAgent
+    from .brief_synthesizer import BriefSynthesizerAgent
+    from .quality_controller import QualityControllerAgent
+    from .voice_guardian import VoiceGuardianAgent
+    from .opening_sniper import OpeningSniperAgent
+    from .vulnerability_scanner import VulnerabilityScannerAgent
+    from .fused_perspectives import FusedPerspectivesAgent
+
+    agent_classes = {
+        "extractor": ExtractorAgent,
+        "source_analyst": SourceAnalystAgent,
+        "resonance_hunter": ResonanceHunterAgent,
+        "anthropologist": AnthropologistAgent,
+        "polish_contextualizer": PolishContextualizerAgent,
+        "popculture_curator": PopcultureCuratorAgent,
+        "story_excavator": StoryExcavatorAgent,
+        "tension_architect": TensionArchitectAgent,
+        "context_shifter": ContextShifterAgent,
+        "comedian": ComedianAgent,
+        "engagement": EngagementAgent,
+        "devils_advocate": DevilsAdvocateAgent,
+        "exploration_agent": ExplorationAgent,
+        "development_agent": DevelopmentAgent,
+        "brief_synthesizer": BriefSynthesizerAgent,
+        "quality_controller": QualityControllerAgent,
+        "voice_guardian": VoiceGuardianAgent,
+        "opening_sniper": OpeningSniperAgent,
+        "vulnerability_scanner": VulnerabilityScannerAgent,
+        "fused_perspectives": FusedPerspectivesAgent,
+    }
+
+    if stage_key == "brief_extraction":
+        return len(BriefSynthesizerAgent(None)._get_extraction_prompt())
+
+    agent_cls = agent_classes.get(stage_key)
+    if agent_cls is None:
+        return 0
+    return len(agent_cls(None).prompt_template)
+
+
+def _stage_name(key: str) -> str:
+    if key in PIPELINE_AGENTS:
+        return PIPELINE_AGENTS[key]
+    definition = get_agent_by_key(key)
+    return definition.name_pl if definition else key
+
+
+def plan_stages(
+    mode: str,
+    selected_agents: Optional[List[str]],
+    fused: bool = False,
+) -> List[Tuple[str, List[str]]]:
+    """
+    Zwraca listę etapów (klucz, wejścia) w kolejności wykonania przez OrchestratorV3.
+
+    Etap "brief_extraction" ma jako wejścia listę agentów, z których wyciąga elementy
+    (jedno wywołanie taniego modelu na każdego agenta). W trybie fuzji wybrani agenci
+    kreatywni (co najmniej dwóch) są zastępowani jednym etapem "fused_perspectives".
+    """
+    selected = set(selected_agents or [])
+    fused_members = _fused_members(selected) if fused else []
+
+    if mode == "polish":
+        stages = [("quality_controller", ["source"])]
+        analytical = [a for a in _POLISH_ANALYTICAL if a in selected]
+        if analytical:
+            stages.append(("extractor", ["source"]))
+            if "anthropologist" in analytical:
+                stages.append(("resonance_hunter", ["extractor"]))
+            stages.extend((a, ["source", "extractor"]) for a in analytical)
+        stages.extend((a, ["source"]) for a in _POLISH_REVIEW if a in selected)
+        return stages
+
+    stages = [("extractor", ["source"])]
+    for key, inputs in _ANALYSIS_STAGES:
+        if key in fused_members:
+            if key == fused_members[0]:
+                stages.append(("fused_perspectives", inputs))
+        elif key in _ALWAYS_RUN or key in selected:
+            stages.append((key, inputs))
+
+    ran = {key for key, _ in stages}
+    mode_agent = "development_agent" if mode == "development" else "exploration_agent"
+    mode_inputs = ["extractor", "resonance_hunter"] + [
+        k for k in ("anthropologist", "polish_contextualizer", "popculture_curator") if k in ran
+    ]
+    stages.append((mode_agent, mode_inputs))
+    ran.add(mode_agent)
+
+    brief_inputs = [key for key, _ in stages if key in _BRIEF_SOURCES] + fused_members
+    stages.append(("brief_extraction", brief_inputs))
+    stages.append(("brief_synthesizer", ["brief_extraction"]))
+    return stages
+
+
+def _fused_members(selected: set) -> List[str]:
+    """Agenci kreatywni połączeni w jedno wywołanie (pusta lista gdy mniej niż dwóch)."""
+    from .fused_perspectives import FUSABLE_AGENTS
+
+    members = [key for key in FUSABLE_AGENTS if key in selected]
+    return members if len(members) > 1 else []
+
+
+def estimate_run(
+    mode: str,
+    selected_agents: Optional[List[str]],
+    source_text: str,
+    model_key: str,
+    user_direction: Optional[str] = None,
+    usage_records: Optional[List[UsageRecord]] = None,
+    agent_models: Optional[Dict[str, str]] = None,
+    fused: bool = False,
+    clean_source: bool = False,
+    source_pages: Optional[List[str]] = None,
+) -> RunEstimate:
+    """
+    Szacuje tokeny, koszt i czas przebiegu.
+
+    Args:
+        mode: "exploration", "development" lub "polish"
+        selected_agents: Klucze wybranych agentów (jak w OrchestratorV3)
+        source_text: Tekst źródłowy
+        model_key: Główny model
+        user_direction: Kierunek użytkownika (tryb ROZWINIĘCIE)
+        usage_records: Historia zużycia (domyślnie: logs/usage.jsonl)
+        agent_models: Model per agent (z resolve_agent_models); brak = model_key
+        fused: Tryb fuzji agentów kreatywnych (OrchestratorV3.fused_perspectives)
+        clean_source: Szacuj z tekstu po czyszczeniu (config.clean_source) - jak
+            OrchestratorV3 w trybach EKSPLORACJA i ROZWINIĘCIE
+        source_pages: Strony dokumentu dla czyszczenia (FileReader.read_pages)
+
+    Returns:
+        RunEstimate z rozbiciem na etapy
+    """
+    from .brief_synthesizer import BriefSynthesizerAgent
+
+    if usage_records is None:
+        usage_records = cached_usage()
+    stats = summarize_usage(usage_records)
+
+    if clean_source and mode != "polish" and source_text:
+        source_text = clean_source_text(source_text, source_pages).text
+
+    source_chars = len(source_text or "") + len(user_direction or "")
+    estimate = RunEstimate(mode=mode, model_key=model_key, source_chars=source_chars)
+
+    # Rozmiar outputu każdego etapu w znakach - wejście dla kolejnych etapów
+    output_chars: Dict[str, int] = {}
+
+    fused_members = _fused_members(set(selected_agents or [])) if fused else []
+
+    for key, inputs in plan_stages(mode, selected_agents, fused=fused):
+        default_model = BriefSynthesizerAgent.EXTRACTION_MODEL if key == "brief_extraction" else model_key
+        stage_model = (agent_models or {}).get(key, default_model)
+        model = AVAILABLE_MODELS.get(stage_model) or AVAILABLE_MODELS[model_key]
+        chars_per_token = _chars_per_token(stats, stage_model)
+
+        if key == "fused_perspectives":
+            # Suma promptów i odpowiedzi połączonych agentów
+            prompt_chars = _prompt_chars(key) + sum(_prompt_chars(m) for m in fused_members)
+            member_outputs = [_output_tokens(stats, m, stage_model) for m in fused_members]
+            out_tokens = sum(tokens for tokens, _ in member_outputs)
+            calibrated = all(cal for _, cal in member_outputs)
+        else:
+            prompt_chars = _prompt_chars(key)
+            out_tokens, calibrated = _output_tokens(stats, key, stage_model)
+
+        if key == "brief_extraction":
+            calls = len(inputs)
+            in_chars = sum(
+                prompt_chars + min(output_chars.get(i, 0), _BRIEF_EXTRACTION_MAX_CHARS)
+                for i in inputs
+            )
+            out_tokens *= calls
+        else:
+            calls = 1
+            in_chars = prompt_chars + sum(
+                source_chars if i == "source" else output_chars.get(i, 0)
+                for i in inputs
+            )
+
+        in_tokens = int(in_chars / chars_per_token)
+        output_chars[key] = int(out_tokens * chars_per_token)
+        if key == "fused_perspectives":
+            for member, (tokens, _) in zip(fused_members, member_outputs):
+                output_chars[member] = int(tokens * chars_per_token)
+
+        cost = (
+            (in_tokens / 1000) * model.price_per_1k_input +
+            (out_tokens / 1000) * model.price_per_1k_output
+        )
+
+        estimate.stages.append(StageEstimate(
+            key=key,
+            name_pl=_stage_name(key),
+            model_key=stage_model,
+            calls=calls,
+            input_tokens=in_tokens,
+            output_tokens=out_tokens,
+            cost_usd=cost,
+            seconds=_stage_seconds(stats, key, stage_model, out_tokens, calls),
+            calibrated=calibrated,
+        ))
+
+    return estimate
+
+
+def _chars_per_token(stats: Dict[Tuple[str, str], UsageStats], model_key: str) -> float:
+    model_stats = stats.get(("*", model_key))
+    if model_stats and model_stats.chars_per_token:
+        return model_stats.chars_per_token
+    return DEFAULT_CHARS_PER_TOKEN
+
+
+def _output_tokens(stats: Dict[Tuple[str, str], UsageStats], key: str, model_key: str) -> Tuple[int, bool]:
+    """Tokeny wyjściowe na jedno wywołanie: historia (agent+model, potem agent) lub domyślne."""
+    for stats_key in ((key, model_key), (key, "*")):
+        agent_stats = stats.get(stats_key)
+        if agent_stats:
+            return int(agent_stats.mean_output_tokens), True
+    return DEFAULT_OUTPUT_TOKENS.get(key, 1500), False
+
+
+def _stage_seconds(
+    stats: Dict[Tuple[str, str], UsageStats],
+    key: str,
+    model_key: str,
+    out_tokens: int,
+    calls: int,
+) -> float:
+    agent_stats = stats.get((key, model_key))
+    if agent_stats:
+        return agent_stats.mean_elapsed_seconds * calls
+
+    model_stats = stats.get(("*", model_key))
+    if model_stats and model_stats.mean_elapsed_seconds > BASE_LATENCY_SECONDS:
+        tokens_per_second = model_stats.mean_output_tokens / (model_stats.mean_elapsed_seconds - BASE_LATENCY_SECONDS)
+    else:
+        tokens_per_second = DEFAULT_OUTPUT_TOKENS_PER_SECOND.get(model_key, 50)
+
+    return BASE_LATENCY_SECONDS * calls + out_tokens / max(tokens_per_second, 1)
+
+
+def format_estimate(estimate: RunEstimate) -> str:
+    """Formatuje szacunek jako tabelę tekstową (CLI)."""
+    lines = [f"  {'Etap':<26} {'Model':<16} {'We':>7} {'Wy':>6} {'Koszt':>8} {'Czas':>6}"]
+    for s in estimate.stages:
+        name = s.name_pl if s.calls == 1 else f"{s.name_pl} ×{s.calls}"
+        if len(name) > 26:
+            name = name[:23] + "..."
+        mark = "" if s.calibrated else "*"
+        lines.append(
+            f"  {name:<26} {s.model_key:<16} {s.input_tokens:>7} {s.output_tokens:>5}{mark:<1} "
+            f"${s.cost_usd:>7.3f} {s.seconds:>5.0f}s"
+        )
+    lines.append("  " + "─" * 72)
+    lines.append(
+        f"  {'RAZEM':<26} {'':<16} {estimate.total_input_tokens:>7} {estimate.total_output_tokens:>6} "
+        f"${estimate.total_cost_usd:>7.3f} {format_duration(estimate.total_seconds):>6}"
+    )
+    if any(not s.calibrated for s in estimate.stages):
+        lines.append("  * tokeny wyjściowe z wartości domyślnych (brak historii w logs/usage.jsonl)")
+    return "\n".join(lines)
+
+
+def format_duration(seconds: float) -> str:
+    if seconds < 90:
+        return f"{seconds:.0f}s"
+    return f"{seconds / 60:.1f}min"
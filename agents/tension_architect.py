@@ -1,13 +1,12 @@
 """Architekt Napięcia - creates surprise and paradox throughout the post."""
 
 import json
-import re
 import logging
 from dataclasses import dataclass
 from typing import Optional
 
 from .base import BaseAgent, AgentResult
-from core.openrouter import OpenRouterClient
+from core.openrouter import OpenRouterClient, APIResponse
 
 logger = logging.getLogger(__name__)
 
@@ -150,51 +149,36 @@ Budujesz napięcie przez zaskoczenie i paradoks. Liniowa narracja = SCROLL. Para
             {"role": "user", "content": input_text},
         ]
 
-        response = self.client.chat(
+        response = self._chat(
             messages=messages,
-            model_key=self.model_key,
             temperature=0.7,
             max_tokens=3000,
+            response_schema=self.response_schema,
         )
 
-        return self._parse_response(response.content)
+        return self._parse_response(response.content, api_response=response)
+
+    def report_from_data(self, data: dict) -> TensionReport:
+        """Buduje TensionReport ze sparsowanego JSON (także z sekcji trybu fuzji)."""
+        return TensionReport(
+            verdict=data.get("werdykt", "PRZEWIDYWALNE"),
+            surprise_level=data.get("poziom_zaskoczenia", 5),
+            paradox_level=data.get("poziom_paradoksu", 5),
+            total_tension=data.get("napiecie_lacznie", 5),
+            structure_diagnosis=data.get("diagnoza_struktury", {}),
+            cliches=data.get("klisze", []),
+            available_paradoxes=data.get("dostepne_paradoksy", []),
+            contrast_structures=data.get("struktury_kontrastu", []),
+            transformed_version=data.get("transformacja", {}),
+            paradox_endings=data.get("puenty_paradoks", []),
+        )
 
-    def _parse_response(self, response: str) -> TensionReport:
+    def _parse_response(self, response: str, api_response: Optional[APIResponse] = None) -> TensionReport:
         """Parsuje odpowiedź JSON do TensionReport."""
         try:
-            json_match = re.search(r'```json\s*(.*?)\s*```', response, re.DOTALL)
-            if json_match:
-                json_str = json_match.group(1)
-            else:
-                json_start = re.search(r'```json\s*', response)
-                if json_start:
-                    json_str = response[json_start.end():]
-                    if '```' in json_str:
-                        json_str = json_str[:json_str.rfind('```')]
-                    logger.warning("TensionArchitect: Używam fallback parsowania")
-                else:
-                    json_str = response
-
-            json_str = json_str.strip()
-            try:
-                data = json.loads(json_str)
-            except json.JSONDecodeError:
-                logger.warning("TensionArchitect: Próba naprawy uciętego JSON...")
-                repaired = self._repair_truncated_json(json_str)
-                data = json.loads(repaired)
+            data = self._parse_json(response, api_response=api_response)
 
-            return TensionReport(
-                verdict=data.get("werdykt", "PRZEWIDYWALNE"),
-                surprise_level=data.get("poziom_zaskoczenia", 5),
-                paradox_level=data.get("poziom_paradoksu", 5),
-                total_tension=data.get("napiecie_lacznie", 5),
-                structure_diagnosis=data.get("diagnoza_struktury", {}),
-                cliches=data.get("klisze", []),
-                available_paradoxes=data.get("dostepne_paradoksy", []),
-                contrast_structures=data.get("struktury_kontrastu", []),
-                transformed_version=data.get("transformacja", {}),
-                paradox_endings=data.get("puenty_paradoks", []),
-            )
+            return self.report_from_data(data)
 
         except json.JSONDecodeError as e:
             logger.error(f"TensionArchitect: JSON parse error: {e}")
@@ -226,18 +210,6 @@ Budujesz napięcie przez zaskoczenie i paradoks. Liniowa narracja = SCROLL. Para
                 paradox_endings=[],
             )
 
-    def _repair_truncated_json(self, json_str: str) -> str:
-        """Próbuje naprawić ucięty JSON."""
-        open_braces = json_str.count('{') - json_str.count('}')
-        open_brackets = json_str.count('[') - json_str.count(']')
-        last_complete = max(json_str.rfind('},'), json_str.rfind('],'), json_str.rfind('",'))
-        if last_complete > 0:
-            json_str = json_str[:last_complete + 1]
-            open_braces = json_str.count('{') - json_str.count('}')
-            open_brackets = json_str.count('[') - json_str.count(']')
-        json_str += ']' * open_brackets + '}' * open_braces
-        return json_str
-
     def analyze(
         self,
         content: str,
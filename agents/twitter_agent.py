@@ -223,9 +223,8 @@ Wybierz najostrzejszy, najbardziej "twitterowy" kąt.
             {"role": "user", "content": input_text},
         ]
 
-        response = self.client.chat(
+        response = self._chat(
             messages=messages,
-            model_key=self.model_key,
             temperature=0.8,  # Wyższa dla kreatywności
             max_tokens=1500,
         )
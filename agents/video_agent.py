@@ -5,7 +5,7 @@ from dataclasses import dataclass
 from typing import Optional, Literal
 
 from .base import BaseAgent, AgentResult
-from core.openrouter import OpenRouterClient
+from core.openrouter import OpenRouterClient, APIResponse
 
 
 PLATFORM_NAMES = {
@@ -213,27 +213,21 @@ Pamiętaj: to gadająca głowa - naturalny, mówiony tekst.
             {"role": "user", "content": input_text},
         ]
 
-        response = self.client.chat(
+        response = self._chat(
             messages=messages,
-            model_key=self.model_key,
             temperature=0.7,
             max_tokens=1500,
+            response_schema=self.response_schema,
         )
 
-        return self._parse_response(response.content, platform)
+        return self._parse_response(response.content, platform, api_response=response)
 
-    def _parse_response(self, response: str, platform: str) -> VideoScript:
+    def _parse_response(
+        self, response: str, platform: str, api_response: Optional[APIResponse] = None
+    ) -> VideoScript:
         """Parsuje odpowiedź do VideoScript."""
-        import re
-
         try:
-            json_match = re.search(r'```json\s*(.*?)\s*```', response, re.DOTALL)
-            if json_match:
-                json_str = json_match.group(1)
-            else:
-                json_str = response
-
-            data = json.loads(json_str)
+            data = self._parse_json(response, api_response=api_response)
 
             script = data.get("tekst_do_kamery", "")
             word_count = len(script.split())
@@ -4,14 +4,26 @@ Uruchomienie: streamlit run app.py
 """
 
 import streamlit as st
-from pathlib import Path
+import hashlib
 import json
 import os
 
 from core.config import Config, AVAILABLE_MODELS
-from core.file_reader import FileReader
-from core.agent_registry import get_agents_for_mode, get_default_agents_for_mode
+from core.file_reader import PAGE_SEPARATOR, FileReader
+from core.agent_registry import (
+    get_agents_for_mode, get_default_agents_for_mode,
+    TIER_PRESETS, DEFAULT_TIER_PRESET, PIPELINE_AGENTS, resolve_agent_models,
+)
 from agents.orchestrator_v3 import OrchestratorV3, WorkflowResult
+from agents.run_planner import estimate_run, format_duration
+from core.parse_stats import load_parse_records, summarize_parse_stats
+from core.logging_setup import setup_logging
+from core.retention import start_retention_task
+
+# Logi w tle (kolejka + rotacja); reruny Streamlit nie dodają handlerów ponownie
+setup_logging()
+# Okresowa retencja output/ i logs/ (RETENTION_INTERVAL_HOURS; raz na proces)
+start_retention_task()
 
 
 # Konfiguracja strony
@@ -23,6 +35,9 @@ st.set_page_config(
 )
 
 # Stałe
+# Ile plików z posts/ pokazać w liście wyboru (reszta przez wyszukiwanie)
+MAX_LISTED_FILES = 200
+
 MODE_CONFIG = {
     "exploration": {
         "icon": "🔭",
@@ -87,13 +102,66 @@ def render_sidebar():
             index=0,
         )
 
+        # Profil modeli per agent
+        preset_keys = list(TIER_PRESETS.keys())
+        default_preset = os.getenv("TIER_PRESET", DEFAULT_TIER_PRESET)
+        tier_preset = st.selectbox(
+            "Profil modeli",
+            options=preset_keys,
+            format_func=lambda x: TIER_PRESETS[x].name_pl,
+            index=preset_keys.index(default_preset) if default_preset in preset_keys else 0,
+            help="Które agenty używają wybranego modelu, a które szybkiego (Gemini Flash)",
+        )
+        st.caption(TIER_PRESETS[tier_preset].description)
+
+        overrides = {}
+        with st.expander("🔧 Model per agent"):
+            preset_models = resolve_agent_models(selected_model, tier_preset)
+            for agent_key, agent_name in PIPELINE_AGENTS.items():
+                choice = st.selectbox(
+                    agent_name,
+                    options=[""] + list(AVAILABLE_MODELS.keys()),
+                    format_func=lambda x, d=preset_models[agent_key]: (
+                        f"wg profilu ({AVAILABLE_MODELS[d].name})" if x == "" else model_options[x]
+                    ),
+                    key=f"agent_model_{agent_key}",
+                )
+                if choice:
+                    overrides[agent_key] = choice
+
+        agent_models = resolve_agent_models(selected_model, tier_preset, overrides)
+
+        fused = st.checkbox(
+            "🧩 Fuzja perspektyw",
+            value=os.getenv("FUSED_PERSPECTIVES", "0").lower() in ("1", "true", "tak"),
+            help="Agenci kreatywni (Archeolog, Architekt Napięcia, Poszerzacz, Komik, Inżynier) "
+                 "w jednym wywołaniu modelu - szybciej i taniej",
+        )
+
+        # Agenci, których odpowiedzi JSON wymagały naprawy (logs/parse_stats.jsonl)
+        problem_agents = [
+            (key, stats) for key, stats in summarize_parse_stats(load_parse_records()).items()
+            if stats.repair_rate > 0 or stats.invalid
+        ]
+        if problem_agents:
+            with st.expander("🩹 Naprawy JSON"):
+                for (agent_key, model_key), stats in problem_agents:
+                    st.caption(
+                        f"{PIPELINE_AGENTS.get(agent_key, agent_key)} · {model_key}: "
+                        f"naprawy {stats.repair_rate:.0%}, niezgodne ze schematem {stats.invalid_rate:.0%}, "
+                        f"puste raporty {stats.failure_rate:.0%} (n={stats.count})"
+                    )
+
         st.divider()
-        st.markdown("**Koszt (estymacja):**")
+        st.markdown("**Cennik modelu:**")
         model = AVAILABLE_MODELS[selected_model]
-        est_cost = (model.price_per_1k_input * 2 + model.price_per_1k_output * 3)
-        st.caption(f"~${est_cost:.3f} / analiza")
+        st.caption(
+            f"${model.price_per_1k_input * 1000:.2f} / 1M tokenów wejściowych, "
+            f"${model.price_per_1k_output * 1000:.2f} / 1M wyjściowych"
+        )
+        st.caption("Szacunek kosztu analizy pojawia się nad przyciskiem Analizuj.")
 
-        return selected_model
+        return selected_model, agent_models, fused
 
 
 def render_mode_tabs():
@@ -169,8 +237,24 @@ def render_agent_selection(mode: str) -> list:
     return selected
 
 
+@st.cache_data(show_spinner="Czytam plik...", max_entries=16)
+def parse_upload(content_hash: str, filename: str, _data: bytes) -> list:
+    """
+    Strony przesłanego pliku (FileReader.read_bytes_pages), parsowane w pamięci raz na treść.
+
+    Streamlit uruchamia skrypt od nowa przy każdej interakcji - cache po hashu
+    treści (bajty z "_" nie są hashowane drugi raz przez Streamlit).
+    """
+    return FileReader().read_bytes_pages(_data, filename)
+
+
 def render_input_section(mode: str):
-    """Sekcja wprowadzania tekstu."""
+    """
+    Sekcja wprowadzania tekstu.
+
+    Returns:
+        (tekst, kierunek użytkownika, strony pliku - FileReader.read_pages, None dla wklejki)
+    """
     config = MODE_CONFIG[mode]
 
     st.markdown(f"**{config['description']}** → dostajesz: {config['output']}")
@@ -185,6 +269,7 @@ def render_input_section(mode: str):
     )
 
     content = None
+    source_pages = None
 
     if input_method == "📝 Wklej tekst":
         content = st.text_area(
@@ -205,8 +290,12 @@ def render_input_section(mode: str):
         )
 
         if file_source == "📂 Folder posts/":
-            # Lista plików z folderu posts/
-            files = file_reader.list_files()
+            # Lista plików z folderu posts/ (z indeksu, najnowsze pierwsze)
+            search = st.text_input("🔍 Szukaj w nazwach plików", key=f"file_search_{mode}")
+            page = file_reader.query_files(search=search or None, limit=MAX_LISTED_FILES)
+            files = page.files
+            if page.total > len(files):
+                st.caption(f"Pokazano {len(files)} najnowszych z {page.total} - zawęź wyszukiwanie")
 
             if files:
                 # Pokaż jako lista z info o dacie i rozmiarze
@@ -221,7 +310,8 @@ def render_input_section(mode: str):
 
                 if selected_file and selected_file != "-- Wybierz plik --":
                     try:
-                        content = file_reader.read_file(file_options[selected_file])
+                        source_pages = file_reader.read_pages(file_options[selected_file])
+                        content = PAGE_SEPARATOR.join(source_pages)
                         st.success(f"✅ Wczytano: {len(content)} znaków")
                     except Exception as e:
                         st.error(f"Błąd wczytywania: {e}")
@@ -240,7 +330,8 @@ def render_input_section(mode: str):
                 file_info = file_reader.get_file_info(file_path)
                 if file_info:
                     try:
-                        content = file_reader.read_file(file_info.path)
+                        source_pages = file_reader.read_pages(file_info.path)
+                        content = PAGE_SEPARATOR.join(source_pages)
                         st.success(f"✅ Wczytano: {file_info.name} ({len(content)} znaków)")
                     except Exception as e:
                         st.error(f"Błąd wczytywania: {e}")
@@ -255,18 +346,9 @@ def render_input_section(mode: str):
             )
             if uploaded:
                 try:
-                    # Dla txt/md - dekoduj jako tekst
-                    if uploaded.name.endswith(('.txt', '.md')):
-                        content = uploaded.read().decode("utf-8")
-                    # Dla pdf/docx - zapisz tymczasowo i użyj FileReader
-                    else:
-                        import tempfile
-                        with tempfile.NamedTemporaryFile(delete=False, suffix=Path(uploaded.name).suffix) as tmp:
-                            tmp.write(uploaded.read())
-                            tmp_path = tmp.name
-                        content = file_reader.read_file(tmp_path)
-                        os.unlink(tmp_path)
-
+                    data = uploaded.getvalue()
+                    source_pages = parse_upload(hashlib.sha256(data).hexdigest(), uploaded.name, data)
+                    content = PAGE_SEPARATOR.join(source_pages)
                     st.success(f"✅ Wczytano: {uploaded.name} ({len(content)} znaków)")
                 except Exception as e:
                     st.error(f"Błąd wczytywania: {e}")
@@ -281,7 +363,63 @@ def render_input_section(mode: str):
             key=f"direction_{mode}",
         )
 
-    return content, user_direction
+    return content, user_direction, source_pages
+
+
+def _clean_source_enabled() -> bool:
+    """CLEAN_SOURCE z konfiguracji; bez klucza API (błąd Config) - wartość domyślna."""
+    try:
+        return Config.from_env().clean_source
+    except ValueError:
+        return Config.clean_source
+
+
+def render_estimate(
+    mode: str,
+    selected_agents: list,
+    content: str,
+    model_key: str,
+    user_direction: str = None,
+    agent_models: dict = None,
+    fused: bool = False,
+    source_pages: list = None,
+):
+    """Szacunek tokenów, kosztu i czasu przed uruchomieniem analizy (z tekstu po czyszczeniu)."""
+    # Tryb SZLIF w GUI uruchamia tylko Kontroler Jakości
+    agents_for_estimate = selected_agents if mode != "polish" else []
+    estimate = estimate_run(
+        mode, agents_for_estimate, content, model_key,
+        user_direction=user_direction, agent_models=agent_models, fused=fused,
+        clean_source=_clean_source_enabled(), source_pages=source_pages,
+    )
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Szacowany koszt", f"${estimate.total_cost_usd:.3f}")
+    with col2:
+        st.metric("Tokeny (we / wy)", f"{estimate.total_input_tokens:,} / {estimate.total_output_tokens:,}".replace(",", " "))
+    with col3:
+        st.metric("Szacowany czas", format_duration(estimate.total_seconds))
+
+    with st.expander(f"💰 Szczegóły szacunku ({estimate.total_calls} wywołań modeli)"):
+        st.dataframe(
+            [
+                {
+                    "Etap": stage.name_pl,
+                    "Model": stage.model_key,
+                    "Wywołania": stage.calls,
+                    "Tokeny we": stage.input_tokens,
+                    "Tokeny wy": stage.output_tokens,
+                    "Koszt ($)": round(stage.cost_usd, 4),
+                    "Czas (s)": round(stage.seconds),
+                }
+                for stage in estimate.stages
+            ],
+            use_container_width=True,
+            hide_index=True,
+        )
+        if any(not stage.calibrated for stage in estimate.stages):
+            st.caption("Część tokenów wyjściowych to wartości domyślne - szacunek poprawi się po kilku analizach (logs/usage.jsonl).")
 
 
 def render_results(result: WorkflowResult):
@@ -674,7 +812,7 @@ def main():
     render_header()
 
     # Sidebar
-    selected_model = render_sidebar()
+    selected_model, agent_models, fused = render_sidebar()
 
     # Zakładki trybów
     tabs, modes = render_mode_tabs()
@@ -688,10 +826,14 @@ def main():
                 selected_agents = render_agent_selection(mode)
 
             # Input
-            content, user_direction = render_input_section(mode)
+            content, user_direction, source_pages = render_input_section(mode)
 
             # Przycisk analizy
             if content:
+                render_estimate(
+                    mode, selected_agents, content, selected_model, user_direction, agent_models, fused, source_pages,
+                )
+
                 if st.button(
                     f"🚀 Analizuj ({MODE_CONFIG[mode]['name']})",
                     type="primary",
@@ -701,13 +843,16 @@ def main():
                     with st.spinner(f"Analizuję... ({len(selected_agents)} agentów)"):
                         try:
                             config = Config.from_env()
-                            orchestrator = OrchestratorV3(config, selected_model)
+                            orchestrator = OrchestratorV3(
+                                config, selected_model, agent_models=agent_models, fused_perspectives=fused,
+                            )
 
                             if mode == "exploration":
                                 result = orchestrator.run_exploration(
                                     content,
                                     selected_agents=selected_agents,
                                     verbose=False,
+                                    source_pages=source_pages,
                                 )
                             elif mode == "development":
                                 result = orchestrator.run_development(
@@ -715,6 +860,7 @@ def main():
                                     user_direction=user_direction or "",
                                     selected_agents=selected_agents,
                                     verbose=False,
+                                    source_pages=source_pages,
                                 )
                             elif mode == "polish":
                                 result = orchestrator.run_polish(
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Benchmark: fuzja perspektyw vs osobni agenci kreatywni.
+
+Ten sam materiał przechodzi przez oba tryby. Porównywane są:
+- czas (wall clock), tokeny wejściowe/wyjściowe, koszt, liczba wywołań
+- jakość: kompletność pól raportów, puste/nieudane sekcje, długość odpowiedzi
+
+Pełne raporty z obu trybów trafiają do output/benchmarks/ - do ręcznej oceny treści.
+
+Użycie:
+    python benchmarks/fused_vs_separate.py posts/artykul.md
+    python benchmarks/fused_vs_separate.py posts/artykul.md --model gemini-3-flash --repeats 3
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core.config import Config, AVAILABLE_MODELS
+from core.file_reader import FileReader
+from agents.orchestrator_v3 import OrchestratorV3
+from agents.fused_perspectives import FUSABLE_AGENTS
+
+OUTPUT_DIR = Path(__file__).resolve().parent.parent / "output" / "benchmarks"
+
+
+class CallCounter:
+    """Zlicza wywołania, tokeny i koszt klienta API (delegacja do oryginału)."""
+
+    def __init__(self, client):
+        self._client = client
+        self.reset()
+
+    def reset(self):
+        self.calls = 0
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.cost_usd = 0.0
+
+    def chat(self, *args, **kwargs):
+        response = self._client.chat(*args, **kwargs)
+        self.calls += 1
+        self.input_tokens += response.input_tokens
+        self.output_tokens += response.output_tokens
+        self.cost_usd += response.cost_usd
+        return response
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
+
+
+def field_completeness(report: dict) -> float:
+    """Odsetek niepustych pól raportu (0-1)."""
+    if not report:
+        return 0.0
+    filled = sum(1 for value in report.values() if value not in (None, "", [], {}, 0))
+    return filled / len(report)
+
+
+def run_mode(orchestrator: OrchestratorV3, counter: CallCounter, fused: bool,
+             content: str, extracted_data: dict, agents: list) -> dict:
+    orchestrator.fused_perspectives = fused
+    counter.reset()
+    start = time.time()
+    reports = orchestrator._run_creative_agents(content, extracted_data, agents, verbose=False)
+    elapsed = time.time() - start
+
+    completeness = {key: field_completeness(reports.get(key, {})) for key in agents}
+    return {
+        "seconds": elapsed,
+        "calls": counter.calls,
+        "input_tokens": counter.input_tokens,
+        "output_tokens": counter.output_tokens,
+        "cost_usd": counter.cost_usd,
+        "completeness": completeness,
+        "empty_sections": [key for key, value in completeness.items() if value < 0.3],
+        "output_chars": {key: len(json.dumps(reports.get(key, {}), ensure_ascii=False)) for key in agents},
+        "reports": reports,
+    }
+
+
+def summarize(runs: list) -> dict:
+    def mean(key):
+        return statistics.mean(run[key] for run in runs)
+
+    return {
+        "seconds": mean("seconds"),
+        "calls": mean("calls"),
+        "input_tokens": mean("input_tokens"),
+        "output_tokens": mean("output_tokens"),
+        "cost_usd": mean("cost_usd"),
+        "completeness": statistics.mean(
+            statistics.mean(run["completeness"].values()) for run in runs
+        ),
+        "empty_sections": sum(len(run["empty_sections"]) for run in runs),
+        "output_chars": statistics.mean(sum(run["output_chars"].values()) for run in runs),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fuzja perspektyw vs osobni agenci")
+    parser.add_argument("file", help="Plik źródłowy (txt/md/docx/pdf)")
+    parser.add_argument("--model", default=None, help=f"Model ({', '.join(AVAILABLE_MODELS)})")
+    parser.add_argument("--agents", default=",".join(FUSABLE_AGENTS),
+                        help="Agenci oddzieleni przecinkami (domyślnie wszyscy z fuzji)")
+    parser.add_argument("--repeats", type=int, default=1, help="Liczba powtórzeń każdego trybu")
+    args = parser.parse_args()
+
+    agents = [a.strip() for a in args.agents.split(",") if a.strip() in FUSABLE_AGENTS]
+    if len(agents) < 2:
+        parser.error(f"Podaj co najmniej dwóch agentów z: {', '.join(FUSABLE_AGENTS)}")
+
+    config = Config.from_env()
+    model_key = args.model or config.default_model
+    # Wszyscy agenci na jednym modelu - porównujemy tylko tryb wywołań
+    orchestrator = OrchestratorV3(config, model_key, tier_preset="quality")
+    counter = CallCounter(orchestrator.client)
+    for agent in [orchestrator.fused_perspectives_agent, *(orchestrator._all_agents_map[a] for a in agents)]:
+        agent.client = counter
+
+    content = FileReader().read_file(Path(args.file))
+    print(f"📄 {args.file} ({len(content)} znaków), model: {model_key}, agenci: {', '.join(agents)}")
+
+    print("🔍 Ekstrakcja (wspólna dla obu trybów)...")
+    extracted_data = orchestrator.extractor.extract(content, None).to_dict()
+
+    results = {"separate": [], "fused": []}
+    for i in range(args.repeats):
+        # Naprzemiennie - żeby chwilowe obciążenie API nie faworyzowało jednego trybu
+        order = ("separate", "fused") if i % 2 == 0 else ("fused", "separate")
+        for mode in order:
+            print(f"  [{i + 1}/{args.repeats}] {mode}...")
+            results[mode].append(run_mode(orchestrator, counter, mode == "fused", content, extracted_data, agents))
+
+    summary = {mode: summarize(runs) for mode, runs in results.items()}
+
+    print()
+    print(f"  {'':<22} {'osobno':>12} {'fuzja':>12} {'zmiana':>9}")
+    print("  " + "─" * 57)
+    rows = [
+        ("Czas (s)", "seconds", "{:.1f}"),
+        ("Wywołania", "calls", "{:.0f}"),
+        ("Tokeny we", "input_tokens", "{:.0f}"),
+        ("Tokeny wy", "output_tokens", "{:.0f}"),
+        ("Koszt ($)", "cost_usd", "{:.4f}"),
+        ("Kompletność pól", "completeness", "{:.0%}"),
+        ("Puste sekcje (suma)", "empty_sections", "{:.0f}"),
+        ("Znaki raportów", "output_chars", "{:.0f}"),
+    ]
+    for label, key, fmt in rows:
+        sep, fus = summary["separate"][key], summary["fused"][key]
+        change = f"{(fus - sep) / sep:+.0%}" if sep else "-"
+        print(f"  {label:<22} {fmt.format(sep):>12} {fmt.format(fus):>12} {change:>9}")
+
+    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+    out_path = OUTPUT_DIR / f"fused_vs_separate_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump({
+            "file": args.file,
+            "model": model_key,
+            "agents": agents,
+            "summary": summary,
+            "runs": results,
+        }, f, ensure_ascii=False, indent=2)
+    print(f"\n💾 Raporty do porównania: {out_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Benchmark: generowanie raportów HTML dla archiwum przebiegów.
+
+Porównuje składanie całej strony w pamięci (_build_html + jeden zapis) ze
+strumieniowym zapisem sekcji do pliku (write_html / generate_html_report):
+łączny czas dla N raportów i szczytowe zużycie pamięci dla jednego raportu.
+
+Raporty są syntetyczne (tryb SZLIF z agentami analitycznymi) albo - z --store -
+wczytane z magazynu wyników (output/results.db).
+
+Użycie:
+    python benchmarks/html_rendering.py
+    python benchmarks/html_rendering.py --reports 1000 --scale 5
+    python benchmarks/html_rendering.py --store output/results.db
+"""
+
+import argparse
+import json
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core.html_generator import _build_html, generate_html_report
+
+OUTPUT_DIR = Path(__file__).resolve().parent.parent / "output" / "benchmarks"
+
+WORDS = (
+    "rynek badanie wzrost klienci dane trend ankieta raport zespół model wynik koszt "
+    "„cytat” praca pokolenie R&D <3"
+).split()
+
+
+def make_report(rng: random.Random, scale: int = 1) -> dict:
+    """Syntetyczny WorkflowResult.to_dict() w trybie SZLIF (scale mnoży listy)."""
+    def text(n: int = 14) -> str:
+        return " ".join(rng.choice(WORDS) for _ in range(n))
+
+    def items(n: int, **fields) -> list:
+        return [{key: text(size) for key, size in fields.items()} for _ in range(n * scale)]
+
+    report = {
+        "type": "polish",
+        "raw_source_text": text(5000),
+        "brief": {
+            "najlepsze_hooki": [text(12) for _ in range(3)],
+            "kluczowe_insighty": [text(20) for _ in range(3)],
+            "ostrzezenia": [text(10) for _ in range(2)],
+        },
+        "quality_report": {
+            "ocena": 7,
+            "status": "OK",
+            "mocne_strony": [text(15) for _ in range(4 * scale)],
+            "problemy": items(4, problem=10, gdzie=6, wpływ=12),
+            "poprawki_inline": items(4, oryginał=20, poprawka=20, powód=10),
+            "wersja_po_poprawkach": text(400 * scale),
+            "alternatywne_hooki": [text(12) for _ in range(5 * scale)],
+        },
+        "source_analysis_data": {
+            "werdykt_zaufania": "MOCNE",
+            "poziom_zaufania": 8,
+            "tlumaczenie_dla_laika": text(60),
+            "ograniczenia": [dict(item, wplyw="ISTOTNE") for item in items(3, ograniczenie=12, co_to_znaczy=20)],
+            "bezpieczne_twierdzenia": [text(15) for _ in range(3)],
+        },
+        "depth_data": {"etnografia": items(3, scena=30, cytat=15), "psychologia": items(3, emocja=20)},
+        "polish_context_data": {"top3": items(3, hook_pl=12), "polskie_tematy": items(2, temat=10, jak_podpiac=20)},
+        "story_data": {"post_narracyjny": text(150 * scale), "alternatywne_katy": items(3, perspektywa=3, hook=14)},
+        "tension_data": {"werdykt": "NAPIĘCIE", "napiecie_lacznie": 8, "puenty_paradoks": items(3, puenta=14)},
+        "humor_data": {"potencjal_humoru": 6, "wersje_wg_dial": {f"dial_{i}": text(60) for i in range(3)}},
+        "engagement_data": {"opcje_cta": {"pytanie": text(12), "ankieta": text(12)}, "cta_platformy": {"linkedin": text(10)}},
+        "critique_data": {"werdykt": "WYMAGA_POPRAWEK", "niewygodne_pytania": [text(15) for _ in range(3)]},
+    }
+    return {"mode": "polish", "success": True, "report": report, "draft": None, "errors": [], "total_duration": 42.0}
+
+
+def load_archived(store_path: Path, count: int) -> list:
+    from core.result_store import ResultStore
+
+    store = ResultStore(store_path)
+    runs = store.find_runs(limit=count)
+    return [(run.mode, store.load_run(run.run_key)) for run in runs]
+
+
+def render_in_memory(output_dir: str, report: dict, mode: str) -> None:
+    """Cała strona w pamięci, potem jeden zapis (jak przed zmianą)."""
+    with open(Path(output_dir) / "report.html", "w", encoding="utf-8") as f:
+        f.write(_build_html(report, mode))
+
+
+def render_streaming(output_dir: str, report: dict, mode: str) -> None:
+    generate_html_report(report, output_dir, mode=mode, auto_open=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Raporty HTML: w pamięci vs strumieniowo")
+    parser.add_argument("--reports", type=int, default=1000, help="Liczba raportów")
+    parser.add_argument("--scale", type=int, default=1, help="Mnożnik długości list w raporcie")
+    parser.add_argument("--store", type=Path, default=None, help="Magazyn wyników (zamiast syntetycznych)")
+    args = parser.parse_args()
+
+    if args.store:
+        reports = load_archived(args.store, args.reports)
+        if not reports:
+            print(f"❌ Brak przebiegów w {args.store}")
+            sys.exit(1)
+    else:
+        rng = random.Random(7)
+        # Mniej unikalnych raportów niż renderów - generowanie danych nie wlicza się do pomiaru
+        unique = [make_report(rng, args.scale) for _ in range(min(args.reports, 50))]
+        reports = [("polish", unique[i % len(unique)]) for i in range(args.reports)]
+
+    rows = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, render in (("in_memory", render_in_memory), ("streaming", render_streaming)):
+            start = time.perf_counter()
+            for mode, report in reports:
+                render(tmp, report, mode)
+            seconds = time.perf_counter() - start
+
+            largest = max((report for _, report in reports), key=lambda r: len(json.dumps(r, ensure_ascii=False)))
+            tracemalloc.start()
+            render(tmp, largest, reports[0][0])
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+            rows[name] = {
+                "seconds": seconds,
+                "ms_per_report": seconds / len(reports) * 1000,
+                "peak_kb": peak / 1024,
+                "html_kb": (Path(tmp) / "report.html").stat().st_size / 1024,
+            }
+
+    print(f"📄 {len(reports)} raportów ({'magazyn' if args.store else f'syntetyczne, scale={args.scale}'})\n")
+    print(f"  {'wariant':<11} {'czas':>8} {'na raport':>10} {'szczyt pamięci':>15} {'HTML':>8}")
+    print("  " + "─" * 56)
+    for name, row in rows.items():
+        print(f"  {name:<11} {row['seconds']:>7.2f}s {row['ms_per_report']:>8.2f}ms "
+              f"{row['peak_kb']:>13.0f}KB {row['html_kb']:>6.0f}KB")
+
+    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+    out_path = OUTPUT_DIR / f"html_rendering_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump({"reports": len(reports), "scale": args.scale, "variants": rows}, f, ensure_ascii=False, indent=2)
+    print(f"\n💾 Wyniki: {out_path}")
+
+
+if __name__ == "__main__":
+    main()
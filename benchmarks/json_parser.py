@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+Benchmark: parser JSON odpowiedzi (core/json_parser) vs dawny regex + rfind.
+
+Korpus:
+- nagrane odpowiedzi agentów (RECORD_RESPONSES=1 -> logs/responses/, opcja --corpus)
+- albo odpowiedzi syntetyczne generowane ze schematów agentów (core/response_schemas)
+
+Każda odpowiedź trafia w kilku wariantach: czysty JSON, blok ```json, JSON otoczony
+tekstem, nawiasy w prozie przed JSON ("Źródło [1]", "Zakres [1, 2]") oraz ucięcia
+w wielu miejscach (jak przy wyczerpaniu max_tokens).
+Porównywane są: odsetek udanych parsowań, odzyskane wartości (liście JSON)
+względem pełnej odpowiedzi i czas parsowania.
+
+Użycie:
+    python benchmarks/json_parser.py
+    python benchmarks/json_parser.py --corpus logs/responses --cuts 20
+"""
+
+import argparse
+import json
+import random
+import re
+import statistics
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core.json_parser import parse_json_response
+from core.response_schemas import RESPONSE_SCHEMAS
+
+OUTPUT_DIR = Path(__file__).resolve().parent.parent / "output" / "benchmarks"
+
+# Fragmenty do syntetycznych stringów - polskie znaki, cudzysłowy i nawiasy w treści
+WORDS = [
+    "zaufanie", "społeczność", "„cytat”", "pytanie?", "50%", "{nawias}", "[lista]",
+    "przecinek,", "ukośnik\\", "\"cudzysłów\"", "emoji 🎯", "łódź", "źdźbło", "koniec.",
+]
+
+
+# ==========================================
+# DAWNE PODEJŚCIE (kopia z agentów sprzed core/json_parser)
+# ==========================================
+
+def legacy_repair(json_str: str) -> str:
+    open_braces = json_str.count('{') - json_str.count('}')
+    open_brackets = json_str.count('[') - json_str.count(']')
+    last_complete = max(json_str.rfind('},'), json_str.rfind('],'), json_str.rfind('",'))
+    if last_complete > 0:
+        json_str = json_str[:last_complete + 1]
+        open_braces = json_str.count('{') - json_str.count('}')
+        open_brackets = json_str.count('[') - json_str.count(']')
+    json_str += ']' * open_brackets + '}' * open_braces
+    return json_str
+
+
+def legacy_parse(response: str):
+    try:
+        json_match = re.search(r'```json\s*(.*?)\s*```', response, re.DOTALL)
+        if json_match:
+            json_str = json_match.group(1)
+        else:
+            json_start = re.search(r'```json\s*', response)
+            if json_start:
+                json_str = response[json_start.end():]
+                if '```' in json_str:
+                    json_str = json_str[:json_str.rfind('```')]
+            else:
+                json_str = response
+        json_str = json_str.strip()
+        try:
+            return json.loads(json_str)
+        except json.JSONDecodeError:
+            return json.loads(legacy_repair(json_str))
+    except json.JSONDecodeError:
+        return None
+
+
+def new_parse(response: str):
+    result = parse_json_response(response)
+    return result.data if result.ok else None
+
+
+# ==========================================
+# KORPUS
+# ==========================================
+
+def sample_from_schema(schema: dict, rng: random.Random, depth: int = 0):
+    """Przykładowe dane zgodne ze schematem agenta."""
+    kind = schema.get("type")
+    if kind == "object":
+        return {key: sample_from_schema(sub, rng, depth + 1) for key, sub in schema.get("properties", {}).items()}
+    if kind == "array":
+        return [sample_from_schema(schema.get("items", {"type": "string"}), rng, depth + 1)
+                for _ in range(rng.randint(2, 5))]
+    if kind == "integer":
+        return rng.randint(0, 10)
+    if kind == "number":
+        return round(rng.uniform(0, 10), 2)
+    if kind == "boolean":
+        return rng.random() < 0.5
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(3, 14)))
+
+
+def synthetic_corpus(rng: random.Random) -> list:
+    return [
+        (name, json.dumps(sample_from_schema(schema, rng), ensure_ascii=False, indent=2))
+        for name, schema in sorted(RESPONSE_SCHEMAS.items())
+    ]
+
+
+def recorded_corpus(directory: Path) -> list:
+    """Nagrane odpowiedzi; JSON referencyjny = pełny wynik nowego parsera."""
+    corpus = []
+    for path in sorted(directory.glob("*.txt")):
+        text = path.read_text(encoding="utf-8")
+        result = parse_json_response(text)
+        if result.ok and result.diagnostics.complete and isinstance(result.data, dict):
+            corpus.append((path.name.split("__")[0], json.dumps(result.data, ensure_ascii=False, indent=2)))
+    return corpus
+
+
+def variants(payload: str, cuts: int, rng: random.Random) -> list:
+    """(nazwa wariantu, odpowiedź) - formy spotykane u modeli + ucięcia."""
+    fenced = f"Oto analiza:\n\n```json\n{payload}\n```\n\nDaj znać, jeśli coś doprecyzować."
+    out = [
+        ("raw", payload),
+        ("fence", fenced),
+        ("prose", f"Poniżej wynik {{w formacie JSON}}:\n{payload}\nTo wszystko."),
+        ("prose_fence", f"Źródło [1] mówi:\n```json\n{payload}\n```"),
+        ("prose_list", f"Zakres [1, 2] i wynik: {payload}"),
+    ]
+    fence_start = fenced.index("{")
+    body_len = len(payload)
+    for i in range(cuts):
+        # Ucięcia równomiernie + losowy rozrzut, zawsze w środku JSON
+        point = int(body_len * (i + rng.random()) / cuts)
+        out.append(("truncated", fenced[:fence_start + max(point, 2)]))
+    return out
+
+
+# ==========================================
+# POMIAR
+# ==========================================
+
+def leaves(value) -> int:
+    """Liczba wartości skalarnych (liści) w strukturze JSON."""
+    if isinstance(value, dict):
+        return sum(leaves(v) for v in value.values())
+    if isinstance(value, list):
+        return sum(leaves(v) for v in value)
+    return 1
+
+
+def measure(parse, responses: list, reference_leaves: list, repeats: int) -> dict:
+    results = []
+    start = time.perf_counter()
+    for _ in range(repeats):
+        results = [parse(text) for _, text in responses]
+    elapsed = (time.perf_counter() - start) / repeats
+
+    by_variant = {}
+    for (variant, _), data, ref in zip(responses, results, reference_leaves):
+        stats = by_variant.setdefault(variant, {"n": 0, "ok": 0, "recovered": []})
+        stats["n"] += 1
+        ok = isinstance(data, dict)
+        stats["ok"] += ok
+        stats["recovered"].append(min(leaves(data) / ref, 1.0) if ok and ref else 0.0)
+
+    return {
+        "ms_total": elapsed * 1000,
+        "us_per_response": elapsed / len(responses) * 1e6,
+        "variants": {
+            name: {
+                "n": s["n"],
+                "success_rate": s["ok"] / s["n"],
+                "recovered": statistics.mean(s["recovered"]),
+            }
+            for name, s in by_variant.items()
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parser JSON odpowiedzi: nowy vs dawny")
+    parser.add_argument("--corpus", default=None, help="Katalog z nagranymi odpowiedziami (*.txt)")
+    parser.add_argument("--cuts", type=int, default=12, help="Liczba ucięć na odpowiedź")
+    parser.add_argument("--repeats", type=int, default=20, help="Powtórzenia pomiaru czasu")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    if args.corpus:
+        corpus = recorded_corpus(Path(args.corpus))
+        if not corpus:
+            parser.error(f"Brak odpowiedzi z poprawnym JSON w {args.corpus}")
+        source = args.corpus
+    else:
+        corpus = synthetic_corpus(rng)
+        source = "syntetyczny (schematy agentów)"
+
+    responses, reference = [], []
+    for _, payload in corpus:
+        full = leaves(json.loads(payload))
+        for variant in variants(payload, args.cuts, rng):
+            responses.append(variant)
+            reference.append(full)
+
+    print(f"📚 Korpus: {source} - {len(corpus)} odpowiedzi, {len(responses)} wariantów")
+
+    summary = {
+        "legacy": measure(legacy_parse, responses, reference, args.repeats),
+        "json_parser": measure(new_parse, responses, reference, args.repeats),
+    }
+
+    print()
+    print(f"  {'wariant':<12} {'':>4} {'sukces (stary)':>15} {'sukces (nowy)':>14} {'odzysk (stary)':>15} {'odzysk (nowy)':>14}")
+    print("  " + "─" * 78)
+    for variant in summary["legacy"]["variants"]:
+        old, new = summary["legacy"]["variants"][variant], summary["json_parser"]["variants"][variant]
+        print(f"  {variant:<12} {old['n']:>4} {old['success_rate']:>15.0%} {new['success_rate']:>14.0%} "
+              f"{old['recovered']:>15.0%} {new['recovered']:>14.0%}")
+    print()
+    for name, label in (("legacy", "stary"), ("json_parser", "nowy")):
+        print(f"  Czas ({label}): {summary[name]['us_per_response']:.1f} µs / odpowiedź")
+
+    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+    out_path = OUTPUT_DIR / f"json_parser_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump({"corpus": source, "cuts": args.cuts, "summary": summary}, f, ensure_ascii=False, indent=2)
+    print(f"\n💾 Wyniki: {out_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Benchmark: ekstrakcja tekstu z dużego PDF - sekwencyjnie vs pula procesów.
+
+PDF jest generowany bez dodatkowych zależności (surowa składnia PDF, czcionka
+Helvetica, gęsty tekst na każdej stronie - podobnie do raportów badawczych).
+Odczyt wymaga PyPDF2 lub pdfplumber, jak FileReader.
+
+Użycie:
+    python benchmarks/pdf_reading.py
+    python benchmarks/pdf_reading.py --pages 400 --workers 1 2 4 8
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core.file_reader import FileReader
+
+OUTPUT_DIR = Path(__file__).resolve().parent.parent / "output" / "benchmarks"
+
+WORDS = (
+    "market analysis growth revenue customers segment strategy product pricing "
+    "competition channel adoption retention survey respondents share forecast "
+    "model research evidence trend demand supply region quarter report data"
+).split()
+
+
+def generate_pdf(path: Path, pages: int, lines_per_page: int = 55, seed: int = 7) -> None:
+    """Zapisuje PDF o `pages` stronach gęstego tekstu (ASCII, Helvetica 9pt)."""
+    rng = random.Random(seed)
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,  # drzewo stron - uzupełniane po wygenerowaniu stron
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    page_ids = []
+    for number in range(pages):
+        lines = [f"Page {number + 1}"] + [
+            " ".join(rng.choice(WORDS) for _ in range(14)) for _ in range(lines_per_page)
+        ]
+        ops = ["BT", "/F1 9 Tf", "11 TL", "50 800 Td"]
+        ops += [f"({line}) Tj T*" for line in lines]
+        ops.append("ET")
+        stream = "\n".join(ops).encode("ascii")
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        content_id = len(objects)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_id
+        )
+        page_ids.append(len(objects))
+    kids = b" ".join(b"%d 0 R" % pid for pid in page_ids)
+    objects[1] = b"<< /Type /Pages /Kids [" + kids + b"] /Count %d >>" % pages
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for index, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % index + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    path.write_bytes(bytes(out))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ekstrakcja PDF: sekwencyjnie vs równolegle")
+    parser.add_argument("--pages", type=int, default=200, help="Liczba stron wygenerowanego PDF")
+    parser.add_argument("--workers", type=int, nargs="+", default=None,
+                        help="Liczby procesów do porównania (domyślnie 1 i liczba rdzeni)")
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    workers_list = args.workers or sorted({1, min(os.cpu_count() or 1, 8)})
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pdf_path = Path(tmp) / "report.pdf"
+        generate_pdf(pdf_path, args.pages)
+        size_kb = pdf_path.stat().st_size // 1024
+        print(f"📄 PDF: {args.pages} stron, {size_kb} KB, rdzenie: {os.cpu_count()}\n")
+
+        rows = {}
+        baseline_text = None
+        for workers in workers_list:
+            reader = FileReader(default_folder=Path(tmp), pdf_workers=workers, use_cache=False)
+            timings = []
+            for _ in range(args.repeats):
+                start = time.perf_counter()
+                text = reader.read_file(pdf_path)
+                timings.append(time.perf_counter() - start)
+            if baseline_text is None:
+                baseline_text = text
+            rows[workers] = {
+                "seconds": min(timings),
+                "chars": len(text),
+                "same_text": text == baseline_text,
+            }
+
+    base = rows[workers_list[0]]["seconds"]
+    print(f"  {'procesy':>8} {'czas':>9} {'przyspieszenie':>15} {'tekst zgodny':>13}")
+    print("  " + "─" * 48)
+    for workers, row in rows.items():
+        print(f"  {workers:>8} {row['seconds']:>8.2f}s {base / row['seconds']:>14.2f}x "
+              f"{'tak' if row['same_text'] else 'NIE':>13}")
+
+    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+    out_path = OUTPUT_DIR / f"pdf_reading_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump({"pages": args.pages, "workers": rows}, f, ensure_ascii=False, indent=2)
+    print(f"\n💾 Wyniki: {out_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Benchmark: zapis wyników przebiegu - dotychczasowy układ vs bez powtórzeń.
+
+Dotychczas full_results.json zawierał dane wszystkich agentów i tekst źródłowy,
+a agents/*.json powtarzały te same dane. Teraz dane agentów i źródło zapisywane
+są raz (folder: odwołania $ref, magazyn: bloby adresowane treścią).
+
+Magazyn porównywany jest też z kompresją blobów (gzip, zstd ze słownikiem -
+gdy zainstalowany zstandard) wraz z czasem odczytu całego przebiegu vs jednego
+raportu agenta.
+
+Wiersze default_* mierzą zapis przebiegu w konfiguracji domyślnej (Config:
+result_store, result_folders, result_compression) wobec dotychczasowej domyślnej
+(magazyn + folder per przebieg).
+
+Wynik przebiegu jest syntetyczny (wielkości zbliżone do trybu SZLIF); kolejne
+przebiegi dotyczą tego samego źródła, jak przy iteracjach nad jednym tekstem.
+
+Użycie:
+    python benchmarks/result_persistence.py
+    python benchmarks/result_persistence.py --runs 20 --source-kb 300 --compression none gzip
+"""
+
+import argparse
+import dataclasses
+import json
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core.config import Config
+from core.result_store import MIN_DICT_SAMPLES, AgentReport, ResultStore, write_result_folder
+
+OUTPUT_DIR = Path(__file__).resolve().parent.parent / "output" / "benchmarks"
+
+AGENTS = {
+    "extracted_data": ("extractor", "Ekstraktor"),
+    "source_analysis_data": ("source_analyst", "Analityk Źródła"),
+    "resonance_data": ("resonance_hunter", "Resonance Hunter"),
+    "depth_data": ("anthropologist", "Antropolog"),
+    "polish_context_data": ("polish_contextualizer", "Polski Kontekstualizator"),
+    "popculture_data": ("popculture_curator", "Kurator Popkultury"),
+    "story_data": ("story_excavator", "Archeolog Historii"),
+    "critique_data": ("devils_advocate", "Adwokat Diabła"),
+}
+
+WORDS = "rynek badanie wzrost klienci dane trend ankieta raport zespół model wynik koszt".split()
+
+
+def make_result(rng: random.Random, source: str) -> tuple:
+    """Syntetyczny WorkflowResult.to_dict() i raporty agentów."""
+    def sentence(n: int = 14) -> str:
+        return " ".join(rng.choice(WORDS) for _ in range(n))
+
+    report = {"type": "polish", "raw_source_text": source}
+    for key in AGENTS:
+        report[key] = {
+            "punkty": [{"tytuł": sentence(5), "opis": sentence(40), "siła": rng.randint(1, 10)} for _ in range(12)],
+            "podsumowanie": sentence(80),
+        }
+    report["quality_report"] = {"ocena": 7, "wersja_po_poprawkach": sentence(300)}
+    result = {"mode": "polish", "success": True, "report": report, "draft": None, "errors": [], "total_duration": 42.0}
+
+    timestamp = datetime.now().isoformat()
+    agents = {
+        agent_key: AgentReport(agent_key, name, "polish", report[key], ("report", key), timestamp)
+        for key, (agent_key, name) in AGENTS.items()
+    }
+    agents["quality_controller"] = AgentReport(
+        "quality_controller", "Quality Controller", "polish", report["quality_report"],
+        ("report", "quality_report"), timestamp,
+    )
+    return result, agents
+
+
+def write_legacy(result_dir: Path, result: dict, agents: dict) -> None:
+    """Układ sprzed zmiany: pełny full_results.json + kopie danych w agents/."""
+    with open(result_dir / "full_results.json", "w", encoding="utf-8") as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+    agents_dir = result_dir / "agents"
+    agents_dir.mkdir(exist_ok=True)
+    for agent_key, report in agents.items():
+        with open(agents_dir / f"{agent_key}.json", "w", encoding="utf-8") as f:
+            json.dump(report.to_dict(), f, ensure_ascii=False, indent=2)
+
+
+def dir_size(path: Path) -> int:
+    return sum(p.stat().st_size for p in path.rglob("*") if p.is_file())
+
+
+def store_size(path: Path) -> int:
+    return sum(p.stat().st_size for p in path.parent.glob(path.name + "*"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Zapis wyników: z powtórzeniami vs bez")
+    parser.add_argument("--runs", type=int, default=10, help="Liczba przebiegów na tym samym źródle")
+    parser.add_argument("--source-kb", type=int, default=150, help="Rozmiar tekstu źródłowego (KB)")
+    parser.add_argument("--compression", nargs="+", default=None,
+                        help="Kompresje magazynu do porównania (domyślnie none, gzip i zstd, jeśli dostępny)")
+    args = parser.parse_args()
+
+    compressions = args.compression
+    if compressions is None:
+        compressions = ["none", "gzip"]
+        try:
+            import zstandard  # noqa: F401
+            compressions.append("zstd")
+        except ImportError:
+            print("ℹ️  Bez zstandard - pomijam wariant zstd\n")
+
+    rng = random.Random(7)
+    source = ""
+    while len(source) < args.source_kb * 1024:
+        source += " ".join(rng.choice(WORDS) for _ in range(16)) + "\n"
+    results = [make_result(rng, source) for _ in range(args.runs)]
+
+    rows = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        for name, write in (("legacy", write_legacy), ("dedup", write_result_folder)):
+            root = tmp / name
+            root.mkdir()
+            start = time.perf_counter()
+            for index, (result, agents) in enumerate(results):
+                result_dir = root / f"run-{index}"
+                result_dir.mkdir()
+                write(result_dir, result, agents)
+            seconds = time.perf_counter() - start
+            rows[f"folder_{name}"] = {"bytes": dir_size(root), "seconds": seconds}
+
+        # Zapis jak w OrchestratorV3._write_results: magazyn, folder tylko przy result_folders
+        defaults = {f.name: f.default for f in dataclasses.fields(Config)}
+        for name, store_on, folders, compression in (
+            ("default_before", True, True, "none"),
+            ("default", defaults["result_store"], defaults["result_folders"], defaults["result_compression"]),
+        ):
+            root = tmp / name
+            root.mkdir()
+            store = ResultStore(root / "results.db", compression=compression) if store_on else None
+            start = time.perf_counter()
+            for index, (result, agents) in enumerate(results):
+                if store is not None:
+                    store.save_run(f"run-{index}", result, agents, source_text=source)
+                if folders or store is None:
+                    result_dir = root / f"run-{index}"
+                    result_dir.mkdir()
+                    write_result_folder(result_dir, result, agents)
+            seconds = time.perf_counter() - start
+            rows[name] = {"bytes": dir_size(root), "seconds": seconds}
+
+        for name, legacy in (("legacy", True), ("dedup", False)):
+            db_path = tmp / f"{name}.db"
+            store = ResultStore(db_path)
+            start = time.perf_counter()
+            for index, (result, agents) in enumerate(results):
+                if legacy:
+                    # Dawny zapis: pełny wynik + pełne raporty agentów w osobnych wierszach
+                    conn = store._connect()
+                    with conn:
+                        cursor = conn.execute(
+                            "INSERT INTO runs (run_key, mode, success, created_at, result_json) VALUES (?, ?, ?, ?, ?)",
+                            (f"run-{index}", "polish", 1, datetime.now().isoformat(), json.dumps(result, ensure_ascii=False)),
+                        )
+                        conn.executemany(
+                            "INSERT INTO agent_reports (run_id, agent_key, report_json) VALUES (?, ?, ?)",
+                            [(cursor.lastrowid, key, json.dumps(r.to_dict(), ensure_ascii=False)) for key, r in agents.items()],
+                        )
+                else:
+                    store.save_run(f"run-{index}", result, agents, source_text=source)
+            seconds = time.perf_counter() - start
+            rows[f"store_{name}"] = {"bytes": store_size(db_path), "seconds": seconds}
+
+        for compression in compressions:
+            db_path = tmp / f"{compression}.db"
+            store = ResultStore(db_path, compression=compression)
+            if compression == "zstd":
+                # Słownik trenowany na wcześniejszych raportach (osobny przebieg "historyczny")
+                for index in range(max(1, MIN_DICT_SAMPLES // len(results[0][1]) + 1)):
+                    history, history_agents = make_result(rng, source)
+                    store.save_run(f"history-{index}", history, history_agents)
+                store.train_dictionary()
+                store.recompress()
+            size_before = store_size(db_path)
+            start = time.perf_counter()
+            for index, (result, agents) in enumerate(results):
+                store.save_run(f"run-{index}", result, agents, source_text=source)
+            seconds = time.perf_counter() - start
+
+            start = time.perf_counter()
+            for index in range(len(results)):
+                store.load_run(f"run-{index}")
+            load_run = (time.perf_counter() - start) / len(results)
+            start = time.perf_counter()
+            for index in range(len(results)):
+                store.load_agent_report(f"run-{index}", "extractor")
+            load_agent = (time.perf_counter() - start) / len(results)
+
+            rows[f"store_{compression}"] = {
+                "bytes": store_size(db_path) - size_before,
+                "seconds": seconds,
+                "load_run_ms": load_run * 1000,
+                "load_agent_report_ms": load_agent * 1000,
+            }
+
+    print(f"📦 {args.runs} przebiegów, źródło {args.source_kb} KB\n")
+    print(f"  {'wariant':<14} {'dysk':>10} {'czas':>9} {'na przebieg':>12}")
+    print("  " + "─" * 48)
+    for name, row in rows.items():
+        print(f"  {name:<14} {row['bytes'] / 1024:>8.0f}KB {row['seconds']:>8.3f}s "
+              f"{row['seconds'] / args.runs * 1000:>10.1f}ms")
+
+    print(f"\n  {'odczyt':<14} {'przebieg':>10} {'1 agent':>10}")
+    print("  " + "─" * 36)
+    for name, row in rows.items():
+        if "load_run_ms" in row:
+            print(f"  {name:<14} {row['load_run_ms']:>8.2f}ms {row['load_agent_report_ms']:>8.2f}ms")
+
+    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+    out_path = OUTPUT_DIR / f"result_persistence_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump({"runs": args.runs, "source_kb": args.source_kb, "variants": rows}, f, ensure_ascii=False, indent=2)
+    print(f"\n💾 Wyniki: {out_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Benchmark: koszt walidacji odpowiedzi agentów (core/schema_validator).
+
+Dla każdego schematu z core/response_schemas generowane są raporty poprawne
+i uszkodzone (lista zamiast obiektu, tekst zamiast listy...). Mierzony jest czas
+kompilacji schematu i walidacji jednego raportu, a wynik porównany ze średnim
+czasem wywołania modelu z logs/usage.jsonl - walidacja ma być pomijalna.
+Jeśli zainstalowany jest pakiet jsonschema, jest mierzony dla porównania.
+
+Użycie:
+    python benchmarks/schema_validation.py
+    python benchmarks/schema_validation.py --reports 200 --repeats 50
+"""
+
+import argparse
+import json
+import random
+import statistics
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core.response_schemas import RESPONSE_SCHEMAS
+from core.schema_validator import compile_schema, validate_report
+from core.usage_log import load_usage, summarize_usage
+from benchmarks.json_parser import sample_from_schema
+
+OUTPUT_DIR = Path(__file__).resolve().parent.parent / "output" / "benchmarks"
+
+# Gdy brak historii wywołań
+DEFAULT_MODEL_SECONDS = 20.0
+
+
+def corrupt(data, rng: random.Random):
+    """Psuje losowy kontener w raporcie (typowe błędy modeli)."""
+    containers = []
+
+    def walk(value):
+        if isinstance(value, dict):
+            for key, item in value.items():
+                if isinstance(item, (dict, list)):
+                    containers.append((value, key))
+                walk(item)
+        elif isinstance(value, list):
+            for i, item in enumerate(value):
+                if isinstance(item, (dict, list)):
+                    containers.append((value, i))
+                walk(item)
+
+    walk(data)
+    for parent, key in rng.sample(containers, min(3, len(containers))):
+        parent[key] = "tekst zamiast struktury" if isinstance(parent[key], (dict, list)) else [parent[key]]
+    return data
+
+
+def time_per_call(func, items: list, repeats: int) -> float:
+    """Średni czas jednego wywołania w mikrosekundach."""
+    start = time.perf_counter()
+    for _ in range(repeats):
+        for item in items:
+            func(item)
+    return (time.perf_counter() - start) / (repeats * len(items)) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Koszt walidacji odpowiedzi agentów")
+    parser.add_argument("--reports", type=int, default=50, help="Raporty na schemat (poprawne + uszkodzone)")
+    parser.add_argument("--repeats", type=int, default=20, help="Powtórzenia pomiaru")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    try:
+        import jsonschema
+    except ImportError:
+        jsonschema = None
+
+    stats = summarize_usage(load_usage())
+    rows = {}
+    for name, schema in sorted(RESPONSE_SCHEMAS.items()):
+        valid = [sample_from_schema(schema, rng) for _ in range(args.reports)]
+        broken = [corrupt(json.loads(json.dumps(report)), rng) for report in valid]
+
+        compile_us = time_per_call(compile_schema, [schema], args.repeats)
+        valid_us = time_per_call(lambda data: validate_report(name, data), valid, args.repeats)
+        broken_us = time_per_call(lambda data: validate_report(name, data), broken, args.repeats)
+        detected = sum(1 for report in broken if validate_report(name, report)) / len(broken)
+
+        agent_stats = stats.get((name, "*"))
+        model_seconds = agent_stats.mean_elapsed_seconds if agent_stats else DEFAULT_MODEL_SECONDS
+
+        row = {
+            "compile_us": compile_us,
+            "valid_us": valid_us,
+            "broken_us": broken_us,
+            "detected": detected,
+            "model_seconds": model_seconds,
+            "share_of_call": max(valid_us, broken_us) / (model_seconds * 1e6),
+        }
+        if jsonschema:
+            validator = jsonschema.Draft7Validator(schema)
+            row["jsonschema_us"] = time_per_call(lambda data: list(validator.iter_errors(data)), valid, args.repeats)
+        rows[name] = row
+
+    print(f"  {'schemat':<24} {'kompilacja':>11} {'poprawny':>10} {'uszkodz.':>10} {'wykryte':>8} {'udział w wywołaniu':>19}")
+    print("  " + "─" * 86)
+    for name, row in rows.items():
+        print(f"  {name:<24} {row['compile_us']:>9.1f}µs {row['valid_us']:>8.1f}µs {row['broken_us']:>8.1f}µs "
+              f"{row['detected']:>8.0%} {row['share_of_call']:>19.6%}")
+
+    mean_valid = statistics.mean(row["valid_us"] for row in rows.values())
+    print(f"\n  Średnio: {mean_valid:.1f} µs / raport")
+    if jsonschema:
+        print(f"  jsonschema (Draft7): {statistics.mean(row['jsonschema_us'] for row in rows.values()):.1f} µs / raport")
+
+    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+    out_path = OUTPUT_DIR / f"schema_validation_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump({"reports": args.reports, "schemas": rows}, f, ensure_ascii=False, indent=2)
+    print(f"\n💾 Wyniki: {out_path}")
+
+
+if __name__ == "__main__":
+    main()
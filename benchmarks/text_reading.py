@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Benchmark: czytanie dużych plików tekstowych - próby kolejnych kodowań vs
+wykrywanie z próbki i jeden przebieg (FileReader._read_text).
+
+Generowany jest polski tekst (z diakrytykami) w utf-8, cp1250 i iso-8859-2.
+Dla każdego pliku mierzony jest czas, liczba pełnych przebiegów dekodowania
+starej metody i zgodność wyniku z tekstem źródłowym.
+
+Użycie:
+    python benchmarks/text_reading.py
+    python benchmarks/text_reading.py --megabytes 20 --repeats 5
+"""
+
+import argparse
+import json
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core.file_reader import FileReader
+
+OUTPUT_DIR = Path(__file__).resolve().parent.parent / "output" / "benchmarks"
+
+WORDS = (
+    "zażółć gęślą jaźń rynek klientów źródło świadomość więcej analiza sprzedaż "
+    "Łódź Śląsk Żywiec ocena wzrost pieniądze ścieżka decyzja próba źle ćwiczenie "
+    "dane raport strategia produkt cena konkurencja kanał"
+).split()
+
+LEGACY_ENCODINGS = ['utf-8', 'cp1250', 'iso-8859-2', 'latin-1']
+
+
+def legacy_read_text(path: Path):
+    """Dawny _read_text: pełne otwarcie i dekodowanie dla każdego kodowania po kolei."""
+    passes = 0
+    for encoding in LEGACY_ENCODINGS:
+        passes += 1
+        try:
+            with open(path, 'r', encoding=encoding) as f:
+                return f.read(), passes
+        except UnicodeDecodeError:
+            continue
+    with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+        return f.read(), passes + 1
+
+
+def generate_text(megabytes: float, seed: int = 7) -> str:
+    rng = random.Random(seed)
+    paragraphs = []
+    size = 0
+    while size < megabytes * 1024 * 1024:
+        paragraph = " ".join(rng.choice(WORDS) for _ in range(rng.randint(40, 120)))
+        paragraphs.append(paragraph)
+        size += len(paragraph) + 2
+    return "\n\n".join(paragraphs)
+
+
+def best_time(func, repeats: int) -> float:
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Czytanie dużych plików tekstowych")
+    parser.add_argument("--megabytes", type=float, default=8, help="Rozmiar tekstu (MB znaków)")
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    text = generate_text(args.megabytes)
+    rows = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        reader = FileReader(default_folder=Path(tmp))
+        for encoding in ("utf-8", "cp1250", "iso-8859-2"):
+            path = Path(tmp) / f"source_{encoding}.txt"
+            path.write_bytes(text.encode(encoding))
+
+            legacy_text, passes = legacy_read_text(path)
+            new_text = reader.read_file(path)
+            rows[encoding] = {
+                "megabytes": path.stat().st_size / 1024 / 1024,
+                "legacy_seconds": best_time(lambda: legacy_read_text(path), args.repeats),
+                "new_seconds": best_time(lambda: reader.read_file(path), args.repeats),
+                "legacy_passes": passes,
+                "new_passes": 1,
+                "legacy_correct": legacy_text == text,
+                "new_correct": new_text == text,
+            }
+
+    print(f"  {'kodowanie':<12} {'MB':>6} {'stara':>8} {'przebiegi':>10} {'nowa':>8} {'przysp.':>8} "
+          f"{'stara ok':>9} {'nowa ok':>8}")
+    print("  " + "─" * 76)
+    for encoding, row in rows.items():
+        print(f"  {encoding:<12} {row['megabytes']:>6.1f} {row['legacy_seconds']:>7.3f}s {row['legacy_passes']:>10} "
+              f"{row['new_seconds']:>7.3f}s {row['legacy_seconds'] / row['new_seconds']:>7.2f}x "
+              f"{'tak' if row['legacy_correct'] else 'NIE':>9} {'tak' if row['new_correct'] else 'NIE':>8}")
+
+    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+    out_path = OUTPUT_DIR / f"text_reading_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump({"megabytes": args.megabytes, "encodings": rows}, f, ensure_ascii=False, indent=2)
+    print(f"\n💾 Wyniki: {out_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -10,11 +10,19 @@ Tryby:
 
 import sys
 from pathlib import Path
+from typing import List, Optional, Tuple
 
 from core.config import Config, AVAILABLE_MODELS
-from core.file_reader import FileReader, format_file_list
-from core.agent_registry import get_agents_for_mode, get_default_agents_for_mode
+from core.file_reader import PAGE_SEPARATOR, FileReader, format_file_list
+from core.logging_setup import setup_logging
+from core.tracing import start_trace
+from core.agent_registry import (
+    get_agents_for_mode, get_default_agents_for_mode,
+    TIER_PRESETS, MODEL_TIERS, PIPELINE_AGENTS,
+)
 from agents.orchestrator_v3 import OrchestratorV3
+from agents.run_planner import estimate_run, format_estimate
+from agents.fused_perspectives import FUSABLE_AGENTS
 
 
 def print_banner():
@@ -52,6 +60,71 @@ def select_model() -> str:
         print(f"  ❌ Wpisz liczbę 1-{len(models_list)}")
 
 
+def select_tier_preset(default_preset: str) -> str:
+    """Wybór profilu modeli per agent."""
+    print("\n💸 PROFIL MODELI (koszt vs jakość):")
+    print("─" * 60)
+
+    presets = list(TIER_PRESETS.values())
+    default_idx = next(
+        (i for i, p in enumerate(presets, 1) if p.key == default_preset), 1
+    )
+
+    for i, preset in enumerate(presets, 1):
+        print(f"  [{i}] {preset.name_pl:<14} - {preset.description}")
+
+    print("─" * 60)
+
+    while True:
+        choice = input(f"Wybierz (1-{len(presets)}) [Enter = {default_idx}]: ").strip()
+        if choice == "":
+            return presets[default_idx - 1].key
+        try:
+            idx = int(choice) - 1
+            if 0 <= idx < len(presets):
+                return presets[idx].key
+        except ValueError:
+            pass
+        print(f"  ❌ Wpisz liczbę 1-{len(presets)}")
+
+
+def select_agent_model_overrides() -> dict:
+    """
+    Opcjonalne nadpisanie modelu dla wybranych agentów.
+
+    Format: agent=model, np. "comedian=gpt-5.1, extractor=main"
+
+    Returns:
+        Słownik klucz agenta -> model lub poziom
+    """
+    if not ask_yes_no("Zmienić model dla wybranych agentów?", default=False):
+        return {}
+
+    print("\n  Agenci:  " + ", ".join(PIPELINE_AGENTS))
+    print("  Modele:  " + ", ".join(list(AVAILABLE_MODELS) + list(MODEL_TIERS)))
+
+    while True:
+        raw = input("\nPodaj agent=model (oddzielone przecinkami): ").strip()
+        if not raw:
+            return {}
+
+        overrides = {}
+        errors = []
+        for part in raw.split(","):
+            agent, _, model = part.partition("=")
+            agent, model = agent.strip(), model.strip()
+            if agent not in PIPELINE_AGENTS:
+                errors.append(f"nieznany agent: {agent}")
+            elif model not in AVAILABLE_MODELS and model not in MODEL_TIERS:
+                errors.append(f"nieznany model: {model}")
+            else:
+                overrides[agent] = model
+
+        if not errors:
+            return overrides
+        print("  ❌ " + "; ".join(errors))
+
+
 def select_mode() -> str:
     """Interactive mode selection."""
     print("\n📋 NA JAKIM ETAPIE JESTEŚ?")
@@ -99,12 +172,13 @@ def get_multiline_input(prompt: str) -> str:
     return "\n".join(lines)
 
 
-def select_source_file(file_reader: FileReader) -> str:
+def select_source_file(file_reader: FileReader) -> Tuple[Optional[str], Optional[List[str]]]:
     """
     Interaktywny wybór pliku źródłowego.
 
     Returns:
-        Zawartość wybranego pliku
+        Zawartość wybranego pliku i jego strony (FileReader.read_pages - dla
+        czyszczenia źródła); (None, None) = anulowano
     """
     files = file_reader.list_files()
 
@@ -129,7 +203,7 @@ def select_source_file(file_reader: FileReader) -> str:
 
         # Anuluj
         if choice == "0":
-            return None
+            return None, None
 
         # Podaj ścieżkę
         if choice.upper() == "P":
@@ -152,9 +226,10 @@ def select_source_file(file_reader: FileReader) -> str:
                 continue
 
             try:
-                content = file_reader.read_file(path)
+                pages = file_reader.read_pages(path)
+                content = PAGE_SEPARATOR.join(pages)
                 print(f"  ✅ Wczytano: {path.name} ({len(content)} znaków)")
-                return content
+                return content, pages
             except Exception as e:
                 print(f"  ❌ Błąd czytania pliku: {e}")
                 continue
@@ -165,9 +240,10 @@ def select_source_file(file_reader: FileReader) -> str:
             if 0 <= idx < len(files):
                 selected_file = files[idx]
                 try:
-                    content = file_reader.read_file(selected_file.path)
+                    pages = file_reader.read_pages(selected_file.path)
+                    content = PAGE_SEPARATOR.join(pages)
                     print(f"  ✅ Wczytano: {selected_file.name} ({len(content)} znaków)")
-                    return content
+                    return content, pages
                 except Exception as e:
                     print(f"  ❌ Błąd czytania pliku: {e}")
                     continue
@@ -279,6 +355,43 @@ def select_agents(mode: str) -> list[str]:
         print(f"  ❌ Wpisz numery oddzielone przecinkami (1-{current_num - 1}), A, D lub 0")
 
 
+def select_fused_mode(selected_agents: list, default: bool = False) -> bool:
+    """Pytanie o fuzję agentów kreatywnych (gdy wybrano co najmniej dwóch)."""
+    fusable = [a for a in selected_agents if a in FUSABLE_AGENTS]
+    if len(fusable) < 2:
+        return default
+    return ask_yes_no(
+        f"Połączyć {len(fusable)} agentów kreatywnych w jedno wywołanie (szybciej, taniej)?",
+        default=default,
+    )
+
+
+def confirm_estimate(
+    mode: str,
+    selected_agents: list,
+    content: str,
+    model_key: str,
+    user_direction: str = None,
+    agent_models: dict = None,
+    fused: bool = False,
+    clean_source: bool = False,
+    source_pages: list = None,
+) -> bool:
+    """Show token/cost/time estimate (from the cleaned source) and ask for confirmation."""
+    estimate = estimate_run(
+        mode, selected_agents, content, model_key,
+        user_direction=user_direction, agent_models=agent_models, fused=fused,
+        clean_source=clean_source, source_pages=source_pages,
+    )
+
+    print("\n💰 SZACUNEK KOSZTU I CZASU:")
+    print("─" * 76)
+    print(format_estimate(estimate))
+    print("─" * 76)
+
+    return ask_yes_no("Uruchomić analizę?", default=True)
+
+
 def select_platform_group() -> str:
     """Select platform group for draft."""
     print("\n📱 GDZIE PUBLIKUJESZ?")
@@ -760,17 +873,23 @@ def run_interactive():
     model_key = select_model()
     print(f"\n✅ Model: {AVAILABLE_MODELS[model_key].name}")
 
+    # Select model tiers per agent
+    tier_preset = select_tier_preset(config.tier_preset)
+    model_overrides = select_agent_model_overrides()
+    print(f"\n✅ Profil: {TIER_PRESETS[tier_preset].name_pl}")
+
     # Select mode
     mode = select_mode()
 
     # Initialize orchestrator and file reader
-    orchestrator = OrchestratorV3(config, model_key)
+    orchestrator = OrchestratorV3(config, model_key, tier_preset=tier_preset, agent_models=model_overrides)
+    agent_models = orchestrator.agent_models
     file_reader = FileReader()
 
     # Run based on mode
     if mode == "exploration":
         # Get source content from file
-        content = select_source_file(file_reader)
+        content, source_pages = select_source_file(file_reader)
 
         if not content:
             print("❌ Anulowano.")
@@ -778,9 +897,18 @@ def run_interactive():
 
         # Select agents
         selected_agents = select_agents(mode)
+        orchestrator.fused_perspectives = select_fused_mode(selected_agents, orchestrator.fused_perspectives)
+
+        if not confirm_estimate(mode, selected_agents, content, model_key, agent_models=agent_models,
+                                fused=orchestrator.fused_perspectives,
+                                clean_source=config.clean_source, source_pages=source_pages):
+            print("❌ Anulowano.")
+            sys.exit(0)
 
         print("\n🔄 Analizuję...")
-        result = orchestrator.run_exploration(content, selected_agents=selected_agents, verbose=True)
+        result = orchestrator.run_exploration(
+            content, selected_agents=selected_agents, verbose=True, source_pages=source_pages,
+        )
 
         if result.success and result.report:
             display_exploration_report(result.report)
@@ -814,7 +942,7 @@ def run_interactive():
 
     elif mode == "development":
         # Get source content from file
-        content = select_source_file(file_reader)
+        content, source_pages = select_source_file(file_reader)
 
         if not content:
             print("❌ Anulowano.")
@@ -830,9 +958,18 @@ def run_interactive():
 
         # Select agents
         selected_agents = select_agents(mode)
+        orchestrator.fused_perspectives = select_fused_mode(selected_agents, orchestrator.fused_perspectives)
+
+        if not confirm_estimate(mode, selected_agents, content, model_key, user_direction, agent_models,
+                                fused=orchestrator.fused_perspectives,
+                                clean_source=config.clean_source, source_pages=source_pages):
+            print("❌ Anulowano.")
+            sys.exit(0)
 
         print("\n🔄 Analizuję i rozwijam...")
-        result = orchestrator.run_development(content, user_direction, selected_agents=selected_agents, verbose=True)
+        result = orchestrator.run_development(
+            content, user_direction, selected_agents=selected_agents, verbose=True, source_pages=source_pages,
+        )
 
         if result.success and result.report:
             display_development_report(result.report)
@@ -875,7 +1012,7 @@ def run_interactive():
         polish_choice = input("\nWybierz (1/2): ").strip()
 
         if polish_choice == "1":
-            text = select_source_file(file_reader)
+            text, _ = select_source_file(file_reader)
             if not text:
                 print("❌ Anulowano.")
                 sys.exit(0)
@@ -898,22 +1035,30 @@ def run_interactive():
         selected_analytical = [a for a in selected_agents if a in analytical_keys]
         selected_review = [a for a in selected_agents if a in review_keys]
 
+        if not confirm_estimate(mode, selected_analytical + selected_review, text, model_key, agent_models=agent_models):
+            print("❌ Anulowano.")
+            sys.exit(0)
+
         print("\n🔄 Analizuję tekst...")
 
-        # Use polish method directly
-        polish_report = orchestrator.quality_controller.polish(text, platform)
+        # Agenci wołani bezpośrednio (bez run_polish) - śledzenie przebiegu tutaj
+        with start_trace("polish", enabled=orchestrator.config.tracing, model=model_key) as trace:
+            # Use polish method directly
+            polish_report = orchestrator.quality_controller.polish(text, platform)
 
-        # Run analytical agents if selected
-        analytical_results = {}
-        if selected_analytical:
-            analytical_results = orchestrator.run_analytical_agents_for_polish(
-                text, selected_analytical, verbose=True
-            )
+            # Run analytical agents if selected
+            analytical_results = {}
+            if selected_analytical:
+                analytical_results = orchestrator.run_analytical_agents_for_polish(
+                    text, selected_analytical, verbose=True
+                )
 
-        # Run review agents if selected
-        additional_reviews = {}
-        if selected_review:
-            additional_reviews = orchestrator.run_review_agents(text, selected_review, verbose=True)
+            # Run review agents if selected
+            additional_reviews = {}
+            if selected_review:
+                additional_reviews = orchestrator.run_review_agents(text, selected_review, verbose=True)
+        if trace is not None:
+            trace.export()
 
         # Wrap in WorkflowResult format for display
         result = type('Result', (), {
@@ -933,7 +1078,7 @@ def run_interactive():
         if ask_yes_no("\n💾 Zapisać wyniki do pliku?"):
             if hasattr(result, 'to_dict'):
                 # It's a WorkflowResult
-                output_path = orchestrator.save_results(result)
+                save_result = result
             else:
                 # Create a minimal result for saving
                 from agents.orchestrator_v3 import WorkflowResult
@@ -942,14 +1087,29 @@ def run_interactive():
                     success=True,
                     report=result.report if hasattr(result, 'report') else None,
                 )
-                output_path = orchestrator.save_results(save_result)
-            print(f"✅ Zapisano: {output_path}")
+            # Zapis idzie w tle - czekamy na jego koniec, zanim potwierdzimy
+            try:
+                job = orchestrator.save_results_async(save_result)
+                output_path = job.wait()
+                print(f"✅ Zapisano: {output_path}")
+            except Exception as e:
+                print(f"❌ Błąd zapisu wyników: {e}")
+            else:
+                if job.report_path:
+                    # Folder powstał przy zapisie - raport otwieramy tutaj, nie w wątku zapisu
+                    print(f"📊 Raport HTML: {job.report_path}")
+                    job.open_report()
+                # Folder z raportem HTML tylko na żądanie - wyniki są w magazynie
+                elif job.run_key and not orchestrator.config.result_folders:
+                    if ask_yes_no("📂 Wyeksportować folder z raportem HTML?"):
+                        print(f"✅ Folder: {orchestrator.export_run(job.run_key, open_browser=True)}")
 
     print("\n👋 Do zobaczenia!")
 
 
 def main():
     """Main entry point."""
+    setup_logging()
     run_interactive()
 
 
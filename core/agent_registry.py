@@ -161,3 +161,125 @@ def get_agent_by_key(key: str) -> Optional[AgentDefinition]:
         if agent.key == key:
             return agent
     return None
+
+
+# ==========================================
+# MODELE PER AGENT (poziomy kosztowe)
+# ==========================================
+
+# Wszystkie etapy pipeline'u (także agenci niewybieralni) - klucz -> polska nazwa
+PIPELINE_AGENTS = {
+    "extractor": "Ekstraktor Inputu",
+    "source_analyst": "Analityk Źródła",
+    "resonance_hunter": "Łowca Rezonansu",
+    "anthropologist": "Antropolog",
+    "polish_contextualizer": "Polski Kontekstualizator",
+    "popculture_curator": "Kurator Popkultury",
+    "story_excavator": "Archeolog Historii",
+    "tension_architect": "Architekt Napięcia",
+    "context_shifter": "Poszerzacz Kontekstu",
+    "comedian": "Komik",
+    "engagement": "Inżynier Zaangażowania",
+    "fused_perspectives": "Perspektywy (fuzja)",
+    "devils_advocate": "Adwokat Diabła",
+    "voice_guardian": "Strażnik Głosu",
+    "opening_sniper": "Snajper Otwarcia",
+    "vulnerability_scanner": "Wykrywacz Skazy",
+    "exploration_agent": "Agent Eksploracji",
+    "development_agent": "Agent Rozwinięcia",
+    "quality_controller": "Kontroler Jakości",
+    "brief_extraction": "Brief - ekstrakcja",
+    "brief_synthesizer": "Brief - synteza",
+    "linkedin_agent": "Draft LinkedIn",
+    "facebook_agent": "Draft Facebook",
+    "microblog_agent": "Draft X / Bluesky / Threads",
+    "video_agent": "Draft wideo",
+}
+
+# Poziomy modeli: "main" = model wybrany przez użytkownika, pozostałe = stały model
+MODEL_TIERS = {
+    "main": None,
+    "fast": "gemini-3-flash",
+}
+
+
+@dataclass
+class TierPreset:
+    """Profil kosztowy - przypisanie agentów do poziomów modeli."""
+    key: str
+    name_pl: str
+    description: str
+    tiers: dict = field(default_factory=dict)  # klucz agenta -> poziom (brak = "main")
+
+
+# Ekstrakcja, scoring i recenzje - wystarczy szybki model
+_FAST_IN_BALANCED = [
+    "extractor", "source_analyst", "resonance_hunter", "brief_extraction",
+    "voice_guardian", "opening_sniper", "vulnerability_scanner", "devils_advocate",
+]
+
+# Wszystko poza eksploracją/rozwinięciem i draftami
+_FAST_IN_ECONOMY = _FAST_IN_BALANCED + [
+    "anthropologist", "polish_contextualizer", "popculture_curator",
+    "story_excavator", "tension_architect", "context_shifter",
+    "comedian", "engagement", "fused_perspectives", "quality_controller", "brief_synthesizer",
+]
+
+TIER_PRESETS = {
+    "quality": TierPreset(
+        key="quality",
+        name_pl="Jakość",
+        description="Wszyscy agenci na wybranym modelu (poza ekstrakcją briefu)",
+        tiers={"brief_extraction": "fast"},
+    ),
+    "balanced": TierPreset(
+        key="balanced",
+        name_pl="Zbalansowany",
+        description="Ekstrakcja, scoring i recenzje na szybkim modelu, perspektywy i drafty na wybranym",
+        tiers={key: "fast" for key in _FAST_IN_BALANCED},
+    ),
+    "economy": TierPreset(
+        key="economy",
+        name_pl="Oszczędny",
+        description="Tylko eksploracja/rozwinięcie i drafty na wybranym modelu, reszta na szybkim",
+        tiers={key: "fast" for key in _FAST_IN_ECONOMY},
+    ),
+}
+
+DEFAULT_TIER_PRESET = "balanced"
+
+
+def resolve_agent_models(
+    main_model: str,
+    preset: Optional[str] = None,
+    overrides: Optional[dict] = None,
+) -> dict:
+    """
+    Zwraca mapę klucz agenta -> klucz modelu.
+
+    Args:
+        main_model: Model wybrany przez użytkownika (poziom "main")
+        preset: Klucz profilu z TIER_PRESETS (domyślnie: DEFAULT_TIER_PRESET)
+        overrides: Nadpisania per agent - wartość to klucz modelu lub nazwa poziomu
+
+    Raises:
+        ValueError: Jeśli profil nie istnieje
+    """
+    preset_key = preset or DEFAULT_TIER_PRESET
+    if preset_key not in TIER_PRESETS:
+        raise ValueError(f"Nieznany profil modeli: {preset_key}")
+    tiers = TIER_PRESETS[preset_key].tiers
+
+    models = {}
+    for key in PIPELINE_AGENTS:
+        models[key] = _tier_to_model(tiers.get(key, "main"), main_model)
+
+    for key, value in (overrides or {}).items():
+        if value:
+            models[key] = _tier_to_model(value, main_model) if value in MODEL_TIERS else value
+
+    return models
+
+
+def _tier_to_model(tier: str, main_model: str) -> str:
+    return MODEL_TIERS.get(tier) or main_model
@@ -1,25 +1,22 @@
 """Unified API client - obsługuje OpenRouter, OpenAI, Anthropic, Google."""
 
+import json
 import time
 import logging
 import os
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Optional, Callable
-from pathlib import Path
 
 from .config import Config, ModelConfig, AVAILABLE_MODELS
-
-# Setup logging
-LOG_DIR = Path(__file__).parent.parent / "logs"
-LOG_DIR.mkdir(exist_ok=True)
-
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(LOG_DIR / "api.log", encoding="utf-8"),
-    ]
+from .response_schemas import to_gemini_schema
+from .json_parser import IncrementalJSONParser
+from .tracing import span, start_span
+from .usage_log import (
+    UsageRecord, record_usage, record_response, suggest_max_tokens, is_truncated, LIMIT_PERCENTILE,
+    estimate_tokens, estimate_json_tail_tokens,
 )
+
+# Handlery (kolejka + pliki z rotacją) konfiguruje aplikacja: core/logging_setup.py
 logger = logging.getLogger(__name__)
 
 
@@ -35,6 +32,156 @@ class APIResponse:
     provider: str = "unknown"
     retries: int = 0
     error_message: Optional[str] = None
+    structured: bool = False  # content to czysty JSON ze structured output dostawcy
+    finish_reason: Optional[str] = None  # "stop", "length" (limit max_tokens), "tool_use"... None = nieznany
+    continuations: int = 0  # dodatkowe zapytania doklejone do uciętej odpowiedzi
+    stopped_early: bool = False  # strumień przerwany po zamknięciu obiektu JSON
+    saved_output_tokens: int = 0  # szacunek tokenów, których model nie musiał wygenerować
+    request: Optional[dict] = field(default=None, repr=False)  # parametry zapytania agenta (BaseAgent._chat)
+
+    @property
+    def truncated(self) -> bool:
+        """Czy model przerwał na limicie max_tokens."""
+        return self.finish_reason == "length"
+
+    def add_usage(self, other: "APIResponse") -> None:
+        """Dolicza zużycie dodatkowego wywołania (naprawa, ponowne pytanie) do tej odpowiedzi."""
+        self.input_tokens += other.input_tokens
+        self.output_tokens += other.output_tokens
+        self.elapsed_seconds += other.elapsed_seconds
+        self.cost_usd += other.cost_usd
+        self.retries += other.retries
+
+
+# Surowe powody zakończenia dostawców -> wspólne wartości
+_FINISH_REASONS = {
+    "length": "length",  # OpenAI / OpenRouter
+    "max_tokens": "length",  # Anthropic
+    "MAX_TOKENS": "length",  # Google
+    "stop": "stop",
+    "end_turn": "stop",
+    "stop_sequence": "stop",
+    "STOP": "stop",
+    "tool_use": "tool_use",
+    "tool_calls": "tool_use",
+}
+
+CONTINUATION_PROMPT = (
+    "Twoja odpowiedź została ucięta przez limit długości. Kontynuuj DOKŁADNIE od miejsca "
+    "przerwania - bez powtarzania, bez wstępu i bez otwierania nowego bloku ```json."
+)
+
+# Najdłuższy fragment sprawdzany przy usuwaniu powtórzeń na styku kontynuacji
+_MAX_OVERLAP_CHARS = 300
+_MIN_OVERLAP_CHARS = 12
+
+
+def normalize_finish_reason(raw) -> Optional[str]:
+    """Powód zakończenia dostawcy (str lub enum) -> "stop" / "length" / ..."""
+    if raw is None:
+        return None
+    name = getattr(raw, "name", None) or str(raw)
+    return _FINISH_REASONS.get(name, _FINISH_REASONS.get(name.lower(), name.lower()))
+
+
+def _split_system_message(messages: list[dict]) -> tuple[Optional[str], list[dict]]:
+    """Format Anthropic: prompt systemowy osobno, reszta wiadomości bez zmian."""
+    system_msg = None
+    chat_messages = []
+    for msg in messages:
+        if msg["role"] == "system":
+            system_msg = msg["content"]
+        else:
+            chat_messages.append(msg)
+    return system_msg, chat_messages
+
+
+def _to_google_history(messages: list[dict]) -> tuple[Optional[str], list[dict], Optional[str]]:
+    """Format Google: (instrukcja systemowa, historia czatu, bieżąca wiadomość)."""
+    system_instruction = None
+    history = []
+    current_content = None
+
+    for msg in messages:
+        if msg["role"] == "system":
+            system_instruction = msg["content"]
+        elif msg["role"] == "user":
+            current_content = msg["content"]
+        elif msg["role"] == "assistant":
+            if current_content:
+                history.append({"role": "user", "parts": [current_content]})
+            history.append({"role": "model", "parts": [msg["content"]]})
+            current_content = None
+    return system_instruction, history, current_content
+
+
+def _is_json_object(segment: str) -> bool:
+    """Czy zamknięty fragment strumienia to poprawny obiekt JSON (warunek przerwania)."""
+    try:
+        return isinstance(json.loads(segment), dict)
+    except ValueError:
+        return False
+
+
+# Fragmenty komunikatu / treści błędu, po których odrzucenie dotyczy formatu odpowiedzi
+_SCHEMA_ERROR_HINTS = (
+    "schema", "response_format", "tool_choice", "response_mime_type", "structured output", "json mode",
+)
+# Statusy 4xx, które warto ponowić (timeout żądania, konflikt, limit zapytań)
+_RETRYABLE_CLIENT_STATUSES = (408, 409, 429)
+
+
+def _error_status(error: Exception) -> Optional[int]:
+    """Status HTTP błędu SDK (openai/anthropic: status_code, google.api_core: code)."""
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(error, "code", None)
+    try:
+        return int(status) if status is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _schema_rejected(error: Exception) -> bool:
+    """
+    Czy dostawca odrzucił żądanie przez structured output (schemat / tryb JSON).
+
+    Rozstrzyga treść błędu (komunikat i body odpowiedzi), nie sam status -
+    400 bywa też przekroczeniem kontekstu, złą nazwą modelu czy błędną wiadomością.
+    """
+    text = f"{error} {getattr(error, 'body', '') or ''}".lower()
+    return any(hint in text for hint in _SCHEMA_ERROR_HINTS)
+
+
+def _client_error(error: Exception) -> bool:
+    """Błąd żądania (4xx poza 408/409/429) - ponowienie tego samego żądania nic nie zmieni."""
+    status = _error_status(error)
+    return status is not None and 400 <= status < 500 and status not in _RETRYABLE_CLIENT_STATUSES
+
+
+def _json_tail_tokens(content: str) -> Optional[int]:
+    """Tokeny tekstu po zamknięciu obiektu JSON (bez zamykającego ```); None = brak obiektu."""
+    parser = IncrementalJSONParser(objects_only=True)
+    parser.feed(content)
+    if not parser.complete:
+        return None
+    tail = content[parser.end_offset:].strip()
+    if tail.startswith("```"):
+        tail = tail[3:].strip()
+    return estimate_tokens(len(tail))
+
+
+def stitch_continuation(partial: str, addition: str) -> str:
+    """Dokleja kontynuację, usuwając powtórzony blok ```json i zdublowany styk."""
+    stripped = addition.lstrip()
+    if "```json" in partial and stripped.startswith("```"):
+        stripped = stripped.split("\n", 1)[1] if "\n" in stripped else ""
+        addition = stripped
+
+    for size in range(min(_MAX_OVERLAP_CHARS, len(partial), len(addition)), _MIN_OVERLAP_CHARS - 1, -1):
+        if partial.endswith(addition[:size]):
+            return partial + addition[size:]
+    return partial + addition
 
 
 class UnifiedAPIClient:
@@ -142,6 +289,14 @@ class UnifiedAPIClient:
             f"Ustaw OPENROUTER_API_KEY lub natywny klucz dla tego modelu."
         )
 
+    def supports_model(self, model_key: str) -> bool:
+        """Czy dla modelu jest dostępny klucz API (natywny lub OpenRouter)."""
+        try:
+            self._get_provider_for_model(model_key)
+            return True
+        except ValueError:
+            return False
+
     def chat(
         self,
         messages: list[dict],
@@ -149,24 +304,430 @@ class UnifiedAPIClient:
         temperature: float = 0.7,
         max_tokens: Optional[int] = 4096,
         on_retry: Optional[Callable[[int, str], None]] = None,
+        agent_name: Optional[str] = None,
+        response_schema: Optional[dict] = None,
+        stop_on_json: bool = False,
     ) -> APIResponse:
         """
         Send a chat completion request with retry logic.
         Routes to the best available provider.
+
+        If agent_name is given, token usage is recorded in logs/usage.jsonl
+        (used to calibrate cost estimates) and max_tokens is adapted to the
+        agent's historical output size (see suggest_max_tokens).
+
+        If the model stops on the max_tokens limit, up to config.max_continuations
+        follow-up requests ask it to continue; the parts are joined into one
+        response (see APIResponse.continuations).
+
+        If response_schema (JSON Schema) is given and config.structured_output
+        is on, the provider's structured output is used and the content is
+        plain JSON (no ```json fence). If the provider rejects the schema,
+        the next attempt is sent without it.
+
+        With stop_on_json (the caller's output contract is a single JSON object)
+        and config.early_stop_json, a response without structured output is
+        streamed and the stream is cancelled as soon as the top-level object
+        closes - prose after the JSON is neither paid for nor waited on.
+        Agents always pass response_schema, so with the defaults
+        (STRUCTURED_OUTPUT=1) structured output is used and streaming never
+        happens; it applies with STRUCTURED_OUTPUT=0 or schema-less calls.
+        The tokens saved by cancelling (saved_output_tokens) are estimated
+        from the agent's history, not measured.
         """
         provider, model_id = self._get_provider_for_model(model_key)
         model_config = AVAILABLE_MODELS[model_key]
 
         logger.info(f"Using {provider} for {model_key} (model_id: {model_id})")
 
+        structured = {}
+        if response_schema and self.config.structured_output:
+            structured = {"response_schema": response_schema, "schema_name": agent_name or "raport"}
+        # Structured output nie dopisuje tekstu po JSON - strumień niepotrzebny
+        stream_json = stop_on_json and self.config.early_stop_json and not structured
+
+        # Adaptacyjny limit wyjścia - percentyl z historii agenta zamiast stałej z kodu
+        requested_max_tokens = max_tokens
+        if agent_name and max_tokens and self.config.adaptive_max_tokens:
+            limit = suggest_max_tokens(agent_name, model_key, max_tokens)
+            if limit.adaptive:
+                logger.info(
+                    f"[{agent_name}] max_tokens {max_tokens} -> {limit.max_tokens} "
+                    f"(p{LIMIT_PERCENTILE}={limit.percentile_tokens}, n={limit.samples}, "
+                    f"ucięte={limit.truncation_rate:.0%})"
+                )
+                max_tokens = limit.max_tokens
+
+        response = self._dispatch(
+            provider, messages, model_id, model_config, temperature, max_tokens, on_retry,
+            stream_json=stream_json, **structured,
+        )
+        response = self._continue_truncated(
+            response, provider, messages, model_id, model_config, temperature, max_tokens, on_retry
+        )
+        self._record_usage(agent_name, model_key, messages, max_tokens, response, stop_on_json)
+
+        # Obcięty limit okazał się za mały - jedno ponowienie z limitem z kodu agenta
+        cut = response.truncated if response.finish_reason else is_truncated(response.output_tokens, max_tokens)
+        if (
+            requested_max_tokens
+            and max_tokens < requested_max_tokens
+            and not response.error_message
+            and cut
+        ):
+            logger.warning(
+                f"[{agent_name}] Odpowiedź ucięta na {max_tokens} tokenach - "
+                f"ponawiam z max_tokens={requested_max_tokens}"
+            )
+            truncated = response
+            response = self._dispatch(
+                provider, messages, model_id, model_config, temperature, requested_max_tokens, on_retry,
+                stream_json=stream_json, **structured,
+            )
+            response = self._continue_truncated(
+                response, provider, messages, model_id, model_config, temperature, requested_max_tokens, on_retry
+            )
+            self._record_usage(agent_name, model_key, messages, requested_max_tokens, response, stop_on_json)
+            # Ucięta próba też była płatna - suma obu, jak w logs/usage.jsonl
+            response.add_usage(truncated)
+
+        return response
+
+    def _continue_truncated(
+        self,
+        response: APIResponse,
+        provider: str,
+        messages: list[dict],
+        model_id: str,
+        model_config: ModelConfig,
+        temperature: float,
+        max_tokens: Optional[int],
+        on_retry: Optional[Callable],
+    ) -> APIResponse:
+        """
+        Dopytuje o dalszy ciąg odpowiedzi uciętej na max_tokens (do config.max_continuations).
+
+        Kolejne części są doklejane do treści, a tokeny, czas i koszt sumowane.
+        Odpowiedzi ze structured output nie są kontynuowane - tryb JSON dostawcy
+        zacząłby nowy obiekt zamiast dokończyć stary.
+        """
+        while (
+            response.truncated
+            and not response.structured
+            and not response.error_message
+            and response.continuations < self.config.max_continuations
+        ):
+            logger.warning(
+                f"[{response.provider}] Odpowiedź ucięta na limicie ({response.output_tokens} tokenów) - "
+                f"kontynuacja {response.continuations + 1}/{self.config.max_continuations}"
+            )
+            follow_up = messages + [
+                {"role": "assistant", "content": response.content},
+                {"role": "user", "content": CONTINUATION_PROMPT},
+            ]
+            part = self._dispatch(
+                provider, follow_up, model_id, model_config, temperature, max_tokens, on_retry
+            )
+            if part.error_message or not part.content:
+                logger.warning(f"[{response.provider}] Kontynuacja nieudana - zostaje ucięta odpowiedź")
+                break
+
+            response.content = stitch_continuation(response.content, part.content)
+            response.input_tokens += part.input_tokens
+            response.output_tokens += part.output_tokens
+            response.elapsed_seconds += part.elapsed_seconds
+            response.cost_usd += part.cost_usd
+            response.retries += part.retries
+            response.finish_reason = part.finish_reason
+            response.continuations += 1
+
+        return response
+
+    def _dispatch(
+        self,
+        provider: str,
+        messages: list[dict],
+        model_id: str,
+        model_config: ModelConfig,
+        temperature: float,
+        max_tokens: Optional[int],
+        on_retry: Optional[Callable],
+        stream_json: bool = False,
+        **structured,
+    ) -> APIResponse:
+        """Wywołanie u wybranego dostawcy (structured = response_schema, schema_name)."""
+        if stream_json:
+            return self._chat_streaming(provider, messages, model_id, model_config, temperature, max_tokens, on_retry)
         if provider == "anthropic":
-            return self._chat_anthropic(messages, model_id, model_config, temperature, max_tokens, on_retry)
+            return self._chat_anthropic(messages, model_id, model_config, temperature, max_tokens, on_retry, **structured)
         elif provider == "openai":
-            return self._chat_openai(messages, model_id, model_config, temperature, max_tokens, on_retry, native=True)
+            return self._chat_openai(messages, model_id, model_config, temperature, max_tokens, on_retry, native=True, **structured)
         elif provider == "google":
-            return self._chat_google(messages, model_id, model_config, temperature, max_tokens, on_retry)
+            return self._chat_google(messages, model_id, model_config, temperature, max_tokens, on_retry, **structured)
         else:  # openrouter
-            return self._chat_openai(messages, model_id, model_config, temperature, max_tokens, on_retry, native=False)
+            return self._chat_openai(messages, model_id, model_config, temperature, max_tokens, on_retry, native=False, **structured)
+
+    def _backoff(self, attempt: int) -> None:
+        """Przerwa przed kolejną próbą (2^attempt s) - osobny span w śledzeniu."""
+        delay = 2 ** attempt
+        with span("retry_sleep", "retry", attempt=attempt, seconds=delay):
+            time.sleep(delay)
+
+    def _record_usage(
+        self,
+        agent_name: Optional[str],
+        model_key: str,
+        messages: list[dict],
+        max_tokens: Optional[int],
+        response: APIResponse,
+        json_contract: bool = False,
+    ) -> None:
+        """
+        Zapisuje zużycie tokenów agenta (logs/usage.jsonl) i opcjonalnie surową odpowiedź.
+
+        Dla agentów zwracających JSON zapisuje też, ile tokenów model wygenerował po
+        zamknięciu obiektu (pełne odpowiedzi) albo ile oszczędziło przerwanie strumienia.
+        """
+        if not agent_name or response.error_message:
+            return
+        if self.config.record_responses:
+            record_response(agent_name, model_key, response.content)
+
+        json_tail_tokens = None
+        if response.stopped_early:
+            response.saved_output_tokens = estimate_json_tail_tokens(agent_name, model_key)
+            logger.info(
+                f"[{agent_name}] Strumień przerwany po zamknięciu JSON "
+                f"(~{response.saved_output_tokens} tokenów oszczędzone)"
+            )
+        elif json_contract and not response.structured and not response.truncated:
+            json_tail_tokens = _json_tail_tokens(response.content)
+        record_usage(UsageRecord(
+            agent=agent_name,
+            model_key=model_key,
+            provider=response.provider,
+            input_tokens=response.input_tokens,
+            output_tokens=response.output_tokens,
+            elapsed_seconds=response.elapsed_seconds,
+            cost_usd=response.cost_usd,
+            input_chars=sum(len(m.get("content") or "") for m in messages),
+            max_tokens=max_tokens,
+            json_tail_tokens=json_tail_tokens,
+            stopped_early=response.stopped_early,
+            saved_output_tokens=response.saved_output_tokens,
+        ))
+
+    def _chat_streaming(
+        self,
+        provider: str,
+        messages: list[dict],
+        model_id: str,
+        model_config: ModelConfig,
+        temperature: float,
+        max_tokens: Optional[int],
+        on_retry: Optional[Callable],
+    ) -> APIResponse:
+        """
+        Streaming z wczesnym zatrzymaniem: delty trafiają do IncrementalJSONParser
+        (objects_only - "{" na początku linii albo w bloku ```json), a po zamknięciu
+        obiektu, który przechodzi json.loads, strumień jest zamykany (dostawca
+        przerywa generowanie). Zamknięty fragment, który nie jest poprawnym
+        obiektem, wyłącza wczesne zatrzymanie - odpowiedź jest czytana do końca.
+
+        Przy przerwaniu dostawcy nie zwracają zużycia - brakujące liczby tokenów
+        są szacowane z długości tekstu.
+        """
+        provider_name = {
+            "anthropic": "Anthropic", "openai": "OpenAI", "google": "Google",
+        }.get(provider, "OpenRouter")
+
+        last_error = None
+        retries = 0
+
+        for attempt in range(1, self.config.max_retries + 1):
+            start_time = time.time()
+            parser = IncrementalJSONParser(objects_only=True)
+            parts = []
+            input_tokens = output_tokens = None
+            finish_reason = None
+            stopped_early = False
+
+            attempt_span = start_span(model_id, "api", provider=provider_name, attempt=attempt)
+            try:
+                logger.info(f"[{provider_name}] Attempt {attempt}/{self.config.max_retries} to {model_id} (stream)")
+
+                if provider == "anthropic":
+                    events = self._stream_anthropic(messages, model_id, temperature, max_tokens)
+                elif provider == "google":
+                    events = self._stream_google(messages, model_id, temperature, max_tokens)
+                else:
+                    events = self._stream_openai(messages, model_id, temperature, max_tokens, native=provider == "openai")
+
+                try:
+                    for kind, value in events:
+                        if kind == "text":
+                            parts.append(value)
+                            if parser is None:
+                                continue
+                            parser.feed(value)
+                            if parser.complete:
+                                if _is_json_object("".join(parts)[parser.start_offset:parser.end_offset]):
+                                    stopped_early = True
+                                    break
+                                parser = None
+                        elif kind == "input_tokens":
+                            input_tokens = value
+                        elif kind == "output_tokens":
+                            output_tokens = value
+                        elif kind == "finish":
+                            finish_reason = normalize_finish_reason(value)
+                finally:
+                    # Zamknięcie generatora zamyka połączenie - dostawca kończy generowanie
+                    events.close()
+
+                elapsed = time.time() - start_time
+                content = "".join(parts)
+                if stopped_early:
+                    content = content[:parser.end_offset] + ("\n```" if parser.fenced else "")
+                    finish_reason = "stop"
+                    output_tokens = None  # zużycie z przerwanego strumienia jest niepełne
+
+                if input_tokens is None:
+                    input_tokens = estimate_tokens(sum(len(m.get("content") or "") for m in messages))
+                if output_tokens is None:
+                    output_tokens = estimate_tokens(len(content))
+
+                cost = (
+                    (input_tokens / 1000) * model_config.price_per_1k_input +
+                    (output_tokens / 1000) * model_config.price_per_1k_output
+                )
+
+                logger.info(
+                    f"[{provider_name}] Success: {input_tokens} in, {output_tokens} out, ${cost:.4f}"
+                    + (" (przerwano po JSON)" if stopped_early else "")
+                )
+
+                attempt_span.set(input_tokens=input_tokens, output_tokens=output_tokens,
+                                 cost_usd=round(cost, 6), stopped_early=stopped_early)
+                attempt_span.finish()
+
+                return APIResponse(
+                    content=content,
+                    model=model_config.name,
+                    input_tokens=input_tokens,
+                    output_tokens=output_tokens,
+                    elapsed_seconds=elapsed,
+                    cost_usd=cost,
+                    provider=provider_name,
+                    retries=retries,
+                    finish_reason=finish_reason,
+                    stopped_early=stopped_early,
+                )
+
+            except Exception as e:
+                last_error = f"{type(e).__name__}: {str(e)}"
+                logger.warning(f"[{provider_name}] Attempt {attempt} failed: {last_error}")
+                retries += 1
+                attempt_span.finish(error=last_error)
+
+                if on_retry and attempt < self.config.max_retries:
+                    on_retry(attempt, last_error)
+
+                if attempt < self.config.max_retries:
+                    self._backoff(attempt)
+
+        logger.error(f"[{provider_name}] All {self.config.max_retries} attempts failed")
+        return APIResponse(
+            content=f"[BŁĄD API po {retries} próbach: {last_error}]",
+            model=model_config.name,
+            input_tokens=0,
+            output_tokens=0,
+            elapsed_seconds=0,
+            cost_usd=0,
+            provider=provider_name,
+            retries=retries,
+            error_message=last_error,
+        )
+
+    def _stream_openai(self, messages: list[dict], model_id: str, temperature: float,
+                       max_tokens: Optional[int], native: bool):
+        """Zdarzenia strumienia OpenAI / OpenRouter: ("text" | "input_tokens" | "output_tokens" | "finish", wartość)."""
+        client = self._clients["openai" if native else "openrouter"]
+        stream = client.chat.completions.create(
+            model=model_id,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            stream=True,
+            stream_options={"include_usage": True},
+        )
+        with stream:
+            for chunk in stream:
+                if chunk.usage:
+                    yield "input_tokens", chunk.usage.prompt_tokens
+                    yield "output_tokens", chunk.usage.completion_tokens
+                if not chunk.choices:
+                    continue
+                choice = chunk.choices[0]
+                if choice.delta and choice.delta.content:
+                    yield "text", choice.delta.content
+                if choice.finish_reason:
+                    yield "finish", choice.finish_reason
+
+    def _stream_anthropic(self, messages: list[dict], model_id: str, temperature: float,
+                          max_tokens: Optional[int]):
+        """Zdarzenia strumienia Anthropic (jak _stream_openai)."""
+        client = self._clients["anthropic"]
+        system_msg, chat_messages = _split_system_message(messages)
+
+        kwargs = {
+            "model": model_id,
+            "messages": chat_messages,
+            "temperature": temperature,
+            "max_tokens": max_tokens or 4096,
+        }
+        if system_msg:
+            kwargs["system"] = system_msg
+
+        with client.messages.stream(**kwargs) as stream:
+            for event in stream:
+                if event.type == "message_start":
+                    yield "input_tokens", event.message.usage.input_tokens
+                elif event.type == "content_block_delta" and getattr(event.delta, "type", "") == "text_delta":
+                    yield "text", event.delta.text
+                elif event.type == "message_delta":
+                    yield "output_tokens", event.usage.output_tokens
+                    if event.delta.stop_reason:
+                        yield "finish", event.delta.stop_reason
+
+    def _stream_google(self, messages: list[dict], model_id: str, temperature: float,
+                       max_tokens: Optional[int]):
+        """Zdarzenia strumienia Google (jak _stream_openai)."""
+        genai = self._clients["google"]
+        system_instruction, history, current_content = _to_google_history(messages)
+
+        model = genai.GenerativeModel(
+            model_name=model_id,
+            system_instruction=system_instruction,
+            generation_config={"temperature": temperature, "max_output_tokens": max_tokens},
+        )
+        chat = model.start_chat(history=history)
+        for chunk in chat.send_message(current_content, stream=True):
+            usage = getattr(chunk, "usage_metadata", None)
+            if usage is not None:
+                if getattr(usage, "prompt_token_count", 0):
+                    yield "input_tokens", usage.prompt_token_count
+                if getattr(usage, "candidates_token_count", 0):
+                    yield "output_tokens", usage.candidates_token_count
+            candidates = getattr(chunk, "candidates", None)
+            if not candidates:
+                continue
+            parts = getattr(getattr(candidates[0], "content", None), "parts", None) or []
+            text = "".join(getattr(part, "text", "") for part in parts)
+            if text:
+                yield "text", text
+            if getattr(candidates[0], "finish_reason", None):
+                yield "finish", candidates[0].finish_reason
 
     def _chat_openai(
         self,
@@ -177,6 +738,8 @@ class UnifiedAPIClient:
         max_tokens: Optional[int],
         on_retry: Optional[Callable],
         native: bool = False,
+        response_schema: Optional[dict] = None,
+        schema_name: str = "raport",
     ) -> APIResponse:
         """Chat via OpenAI SDK (works for OpenAI native and OpenRouter)."""
         client = self._clients["openai" if native else "openrouter"]
@@ -184,19 +747,28 @@ class UnifiedAPIClient:
 
         last_error = None
         retries = 0
+        structured = response_schema is not None
 
         for attempt in range(1, self.config.max_retries + 1):
             start_time = time.time()
 
+            attempt_span = start_span(model_id, "api", provider=provider_name, attempt=attempt)
             try:
                 logger.info(f"[{provider_name}] Attempt {attempt}/{self.config.max_retries} to {model_id}")
 
-                response = client.chat.completions.create(
-                    model=model_id,
-                    messages=messages,
-                    temperature=temperature,
-                    max_tokens=max_tokens,
-                )
+                kwargs = {
+                    "model": model_id,
+                    "messages": messages,
+                    "temperature": temperature,
+                    "max_tokens": max_tokens,
+                }
+                if structured:
+                    kwargs["response_format"] = {
+                        "type": "json_schema",
+                        "json_schema": {"name": schema_name, "schema": response_schema, "strict": False},
+                    }
+
+                response = client.chat.completions.create(**kwargs)
 
                 elapsed = time.time() - start_time
                 input_tokens = response.usage.prompt_tokens if response.usage else 0
@@ -208,9 +780,14 @@ class UnifiedAPIClient:
                 )
 
                 content = response.choices[0].message.content or ""
+                finish_reason = normalize_finish_reason(response.choices[0].finish_reason)
 
                 logger.info(f"[{provider_name}] Success: {input_tokens} in, {output_tokens} out, ${cost:.4f}")
 
+                attempt_span.set(input_tokens=input_tokens, output_tokens=output_tokens,
+                                 cost_usd=round(cost, 6), structured=structured)
+                attempt_span.finish()
+
                 return APIResponse(
                     content=content,
                     model=model_config.name,
@@ -220,20 +797,28 @@ class UnifiedAPIClient:
                     cost_usd=cost,
                     provider=provider_name,
                     retries=retries,
+                    structured=structured,
+                    finish_reason=finish_reason,
                 )
 
             except Exception as e:
                 last_error = f"{type(e).__name__}: {str(e)}"
                 logger.warning(f"[{provider_name}] Attempt {attempt} failed: {last_error}")
                 retries += 1
+                attempt_span.finish(error=last_error)
+                if structured and _schema_rejected(e):
+                    structured = False
+                    logger.warning(f"[{provider_name}] Dostawca odrzucił schemat - ponawiam bez structured output")
+                elif _client_error(e):
+                    break  # błąd zwracany bez zmian, bez ponawiania
 
                 if on_retry and attempt < self.config.max_retries:
                     on_retry(attempt, last_error)
 
                 if attempt < self.config.max_retries:
-                    time.sleep(2 ** attempt)
+                    self._backoff(attempt)
 
-        logger.error(f"[{provider_name}] All {self.config.max_retries} attempts failed")
+        logger.error(f"[{provider_name}] Failed after {retries} attempt(s)")
         return APIResponse(
             content=f"[BŁĄD API po {retries} próbach: {last_error}]",
             model=model_config.name,
@@ -254,25 +839,28 @@ class UnifiedAPIClient:
         temperature: float,
         max_tokens: Optional[int],
         on_retry: Optional[Callable],
+        response_schema: Optional[dict] = None,
+        schema_name: str = "raport",
     ) -> APIResponse:
-        """Chat via Anthropic native SDK."""
+        """
+        Chat via Anthropic native SDK.
+
+        Structured output: wymuszone wywołanie narzędzia z input_schema = schemat,
+        treścią odpowiedzi jest JSON z argumentów narzędzia.
+        """
         client = self._clients["anthropic"]
 
         # Convert messages format (Anthropic uses different format)
-        system_msg = None
-        chat_messages = []
-        for msg in messages:
-            if msg["role"] == "system":
-                system_msg = msg["content"]
-            else:
-                chat_messages.append(msg)
+        system_msg, chat_messages = _split_system_message(messages)
 
         last_error = None
         retries = 0
+        structured = response_schema is not None
 
         for attempt in range(1, self.config.max_retries + 1):
             start_time = time.time()
 
+            attempt_span = start_span(model_id, "api", provider="Anthropic", attempt=attempt)
             try:
                 logger.info(f"[Anthropic] Attempt {attempt}/{self.config.max_retries} to {model_id}")
 
@@ -284,6 +872,13 @@ class UnifiedAPIClient:
                 }
                 if system_msg:
                     kwargs["system"] = system_msg
+                if structured:
+                    kwargs["tools"] = [{
+                        "name": schema_name,
+                        "description": "Zapisz odpowiedź w wymaganym formacie JSON",
+                        "input_schema": response_schema,
+                    }]
+                    kwargs["tool_choice"] = {"type": "tool", "name": schema_name}
 
                 response = client.messages.create(**kwargs)
 
@@ -296,10 +891,24 @@ class UnifiedAPIClient:
                     (output_tokens / 1000) * model_config.price_per_1k_output
                 )
 
-                content = response.content[0].text if response.content else ""
+                tool_input = next(
+                    (block.input for block in response.content if getattr(block, "type", "") == "tool_use"),
+                    None,
+                ) if structured else None
+                if tool_input is not None:
+                    content = json.dumps(tool_input, ensure_ascii=False)
+                else:
+                    content = next(
+                        (block.text for block in response.content if getattr(block, "type", "") == "text"),
+                        "",
+                    )
 
                 logger.info(f"[Anthropic] Success: {input_tokens} in, {output_tokens} out, ${cost:.4f}")
 
+                attempt_span.set(input_tokens=input_tokens, output_tokens=output_tokens,
+                                 cost_usd=round(cost, 6), structured=tool_input is not None)
+                attempt_span.finish()
+
                 return APIResponse(
                     content=content,
                     model=model_config.name,
@@ -309,20 +918,28 @@ class UnifiedAPIClient:
                     cost_usd=cost,
                     provider="Anthropic",
                     retries=retries,
+                    structured=tool_input is not None,
+                    finish_reason=normalize_finish_reason(response.stop_reason),
                 )
 
             except Exception as e:
                 last_error = f"{type(e).__name__}: {str(e)}"
                 logger.warning(f"[Anthropic] Attempt {attempt} failed: {last_error}")
                 retries += 1
+                attempt_span.finish(error=last_error)
+                if structured and _schema_rejected(e):
+                    structured = False
+                    logger.warning("[Anthropic] Dostawca odrzucił schemat - ponawiam bez structured output")
+                elif _client_error(e):
+                    break  # błąd zwracany bez zmian, bez ponawiania
 
                 if on_retry and attempt < self.config.max_retries:
                     on_retry(attempt, last_error)
 
                 if attempt < self.config.max_retries:
-                    time.sleep(2 ** attempt)
+                    self._backoff(attempt)
 
-        logger.error(f"[Anthropic] All {self.config.max_retries} attempts failed")
+        logger.error(f"[Anthropic] Failed after {retries} attempt(s)")
         return APIResponse(
             content=f"[BŁĄD API po {retries} próbach: {last_error}]",
             model=model_config.name,
@@ -343,42 +960,40 @@ class UnifiedAPIClient:
         temperature: float,
         max_tokens: Optional[int],
         on_retry: Optional[Callable],
+        response_schema: Optional[dict] = None,
+        schema_name: str = "raport",
     ) -> APIResponse:
-        """Chat via Google AI native SDK."""
+        """Chat via Google AI native SDK (structured output: JSON mode + response_schema)."""
         genai = self._clients["google"]
 
         # Convert messages to Google format
-        system_instruction = None
-        history = []
-        current_content = None
-
-        for msg in messages:
-            if msg["role"] == "system":
-                system_instruction = msg["content"]
-            elif msg["role"] == "user":
-                current_content = msg["content"]
-            elif msg["role"] == "assistant":
-                if current_content:
-                    history.append({"role": "user", "parts": [current_content]})
-                history.append({"role": "model", "parts": [msg["content"]]})
-                current_content = None
+        system_instruction, history, current_content = _to_google_history(messages)
 
         last_error = None
         retries = 0
+        structured = response_schema is not None
 
         for attempt in range(1, self.config.max_retries + 1):
             start_time = time.time()
 
+            attempt_span = start_span(model_id, "api", provider="Google", attempt=attempt)
             try:
                 logger.info(f"[Google] Attempt {attempt}/{self.config.max_retries} to {model_id}")
 
+                generation_config = {
+                    "temperature": temperature,
+                    "max_output_tokens": max_tokens,
+                }
+                if structured:
+                    generation_config["response_mime_type"] = "application/json"
+                    gemini_schema = to_gemini_schema(response_schema)
+                    if gemini_schema:
+                        generation_config["response_schema"] = gemini_schema
+
                 model = genai.GenerativeModel(
                     model_name=model_id,
                     system_instruction=system_instruction,
-                    generation_config={
-                        "temperature": temperature,
-                        "max_output_tokens": max_tokens,
-                    }
+                    generation_config=generation_config,
                 )
 
                 chat = model.start_chat(history=history)
@@ -396,9 +1011,15 @@ class UnifiedAPIClient:
                 )
 
                 content = response.text
+                candidates = getattr(response, "candidates", None)
+                finish_reason = normalize_finish_reason(candidates[0].finish_reason) if candidates else None
 
                 logger.info(f"[Google] Success: {input_tokens} in, {output_tokens} out, ${cost:.4f}")
 
+                attempt_span.set(input_tokens=input_tokens, output_tokens=output_tokens,
+                                 cost_usd=round(cost, 6), structured=structured)
+                attempt_span.finish()
+
                 return APIResponse(
                     content=content,
                     model=model_config.name,
@@ -408,20 +1029,28 @@ class UnifiedAPIClient:
                     cost_usd=cost,
                     provider="Google",
                     retries=retries,
+                    structured=structured,
+                    finish_reason=finish_reason,
                 )
 
             except Exception as e:
                 last_error = f"{type(e).__name__}: {str(e)}"
                 logger.warning(f"[Google] Attempt {attempt} failed: {last_error}")
                 retries += 1
+                attempt_span.finish(error=last_error)
+                if structured and _schema_rejected(e):
+                    structured = False
+                    logger.warning("[Google] Dostawca odrzucił schemat - ponawiam bez structured output")
+                elif _client_error(e):
+                    break  # błąd zwracany bez zmian, bez ponawiania
 
                 if on_retry and attempt < self.config.max_retries:
                     on_retry(attempt, last_error)
 
                 if attempt < self.config.max_retries:
-                    time.sleep(2 ** attempt)
+                    self._backoff(attempt)
 
-        logger.error(f"[Google] All {self.config.max_retries} attempts failed")
+        logger.error(f"[Google] Failed after {retries} attempt(s)")
         return APIResponse(
             content=f"[BŁĄD API po {retries} próbach: {last_error}]",
             model=model_config.name,
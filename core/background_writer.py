@@ -0,0 +1,128 @@
+"""
+Zapis wyników w tle - zapis raportów (JSON, HTML, markdown) nie blokuje
+wątku, który uruchamia kolejne zadanie.
+
+Jeden wątek roboczy i ograniczona kolejka: przy zapchanej kolejce submit()
+czeka (backpressure zamiast nieograniczonego bufora w pamięci). Przy wyjściu
+z procesu kolejka jest opróżniana (atexit), więc zlecone zapisy nie giną.
+"""
+
+import atexit
+import logging
+import os
+import queue
+import threading
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_QUEUE_SIZE = 8
+# Ile czekać przy wyjściu na dokończenie zapisów
+EXIT_FLUSH_TIMEOUT = 120.0
+
+_writer: Optional["BackgroundWriter"] = None
+_writer_lock = threading.Lock()
+
+
+def fsync_tree(directory: Path) -> None:
+    """Wymusza zapis na dysk wszystkich plików w katalogu (i samych katalogów)."""
+    for root, _, files in os.walk(directory):
+        for name in files:
+            fd = os.open(os.path.join(root, name), os.O_RDONLY)
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+        try:
+            fd = os.open(root, os.O_RDONLY)
+        except OSError:
+            continue  # katalogów nie da się otworzyć np. na Windows
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+
+class BackgroundWriter:
+    """Kolejka zadań zapisu wykonywanych po kolei w wątku roboczym."""
+
+    def __init__(self, queue_size: int = DEFAULT_QUEUE_SIZE, fsync: bool = False):
+        """
+        Args:
+            queue_size: Maksymalna liczba oczekujących zadań
+            fsync: Po zadaniu z `sync_dir` wymuś zapis plików na dysk
+        """
+        self.fsync = fsync
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max(1, queue_size))
+        self._thread = threading.Thread(target=self._run, name="result-writer", daemon=True)
+        self._thread.start()
+
+    def submit(
+        self,
+        func: Callable[..., Any],
+        *args,
+        sync_dir: Optional[Path] = None,
+        **kwargs,
+    ) -> Future:
+        """
+        Zleca zapis. Blokuje tylko, gdy kolejka jest pełna.
+
+        Args:
+            func: Funkcja zapisu
+            sync_dir: Katalog do fsync po zakończeniu (gdy włączone fsync)
+
+        Returns:
+            Future z wynikiem func (wyjątek zapisu trafia do future i logu)
+        """
+        future: Future = Future()
+        self._queue.put((future, func, args, kwargs, sync_dir))
+        return future
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Czeka na wykonanie wszystkich zleconych zapisów. False = minął timeout."""
+        done = threading.Event()
+        try:
+            self._queue.put((None, done.set, (), {}, None), timeout=timeout)
+        except queue.Full:
+            return False
+        return done.wait(timeout)
+
+    @property
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    def _run(self) -> None:
+        while True:
+            future, func, args, kwargs, sync_dir = self._queue.get()
+            if future is not None and not future.set_running_or_notify_cancel():
+                continue
+            try:
+                value = func(*args, **kwargs)
+                if sync_dir is not None and self.fsync:
+                    fsync_tree(Path(sync_dir))
+            except BaseException as e:
+                logger.error(f"Zapis w tle nieudany ({getattr(func, '__name__', func)}): {e}")
+                if future is not None:
+                    future.set_exception(e)
+            else:
+                if future is not None:
+                    future.set_result(value)
+
+
+def get_writer(queue_size: int = DEFAULT_QUEUE_SIZE, fsync: bool = False) -> BackgroundWriter:
+    """Wspólny writer procesu (parametry brane przy pierwszym wywołaniu)."""
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = BackgroundWriter(queue_size=queue_size, fsync=fsync)
+            atexit.register(_flush_on_exit)
+        return _writer
+
+
+def _flush_on_exit() -> None:
+    if _writer is not None and _writer.pending:
+        logger.info("Czekam na dokończenie zapisu wyników...")
+    if _writer is not None and not _writer.flush(EXIT_FLUSH_TIMEOUT):
+        logger.warning("Zapis wyników nie zakończył się przed wyjściem")
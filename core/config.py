@@ -219,6 +219,22 @@ class Config:
     openai_api_key: Optional[str] = None
     google_api_key: Optional[str] = None
     default_model: str = "claude-opus-4.5"
+    tier_preset: str = "balanced"  # profil modeli per agent (patrz core/agent_registry.py)
+    adaptive_max_tokens: bool = True  # max_tokens z historii zużycia agenta
+    fused_perspectives: bool = False  # agenci kreatywni w jednym wywołaniu modelu
+    structured_output: bool = True  # JSON Schema przez API dostawcy (core/response_schemas.py)
+    early_stop_json: bool = True  # strumień przerywany po zamknięciu obiektu JSON (bez structured output)
+    validation_reask: bool = True  # odpowiedź niezgodna ze schematem -> jedno ponowne pytanie agenta
+    clean_source: bool = True  # usuwanie nagłówków, stopek, duplikatów i bibliografii ze źródła
+    json_repair: bool = True  # nieczytelny JSON -> naprawa szybkim modelem zamiast pustego raportu
+    max_continuations: int = 2  # dopytania o dalszy ciąg odpowiedzi uciętej na max_tokens (0 = wyłączone)
+    record_responses: bool = False  # surowe odpowiedzi agentów do logs/responses/ (korpus benchmarków)
+    result_queue_size: int = 8  # zapisy wyników oczekujące w tle (pełna kolejka = czekanie)
+    result_fsync: bool = False  # fsync plików wyników po zapisie
+    result_store: bool = True  # wyniki w output/results.db (SQLite, indeksy po dacie/trybie/źródle/modelu)
+    result_folders: bool = False  # eksport folderu przebiegu (JSON, HTML, markdown) od razu po zapisie
+    result_compression: str = "none"  # kompresja danych w magazynie: none, gzip, zstd
+    tracing: bool = False  # spany etapów, agentów i wywołań API do logs/traces/ (JSONL + Chrome trace)
     timeout: int = 120  # seconds - long timeout for complex analysis
     max_retries: int = 3
 
@@ -247,6 +263,22 @@ class Config:
             )
 
         default_model = os.getenv("DEFAULT_MODEL", "claude-opus-4.5")
+        tier_preset = os.getenv("TIER_PRESET", "balanced")
+        adaptive_max_tokens = os.getenv("ADAPTIVE_MAX_TOKENS", "1").lower() not in ("0", "false", "nie")
+        fused_perspectives = os.getenv("FUSED_PERSPECTIVES", "0").lower() in ("1", "true", "tak")
+        structured_output = os.getenv("STRUCTURED_OUTPUT", "1").lower() not in ("0", "false", "nie")
+        early_stop_json = os.getenv("EARLY_STOP_JSON", "1").lower() not in ("0", "false", "nie")
+        validation_reask = os.getenv("VALIDATION_REASK", "1").lower() not in ("0", "false", "nie")
+        clean_source = os.getenv("CLEAN_SOURCE", "1").lower() not in ("0", "false", "nie")
+        json_repair = os.getenv("JSON_REPAIR", "1").lower() not in ("0", "false", "nie")
+        max_continuations = int(os.getenv("MAX_CONTINUATIONS", "2"))
+        record_responses = os.getenv("RECORD_RESPONSES", "0").lower() in ("1", "true", "tak")
+        result_queue_size = int(os.getenv("RESULT_QUEUE_SIZE", "8"))
+        result_fsync = os.getenv("RESULT_FSYNC", "0").lower() in ("1", "true", "tak")
+        result_store = os.getenv("RESULT_STORE", "1").lower() not in ("0", "false", "nie")
+        result_folders = os.getenv("RESULT_FOLDERS", "0").lower() in ("1", "true", "tak")
+        result_compression = os.getenv("RESULT_COMPRESSION", "none").lower()
+        tracing = os.getenv("TRACING", "0").lower() in ("1", "true", "tak")
 
         return cls(
             openrouter_api_key=openrouter_key,
@@ -254,6 +286,22 @@ class Config:
             openai_api_key=openai_key,
             google_api_key=google_key,
             default_model=default_model,
+            tier_preset=tier_preset,
+            adaptive_max_tokens=adaptive_max_tokens,
+            fused_perspectives=fused_perspectives,
+            structured_output=structured_output,
+            early_stop_json=early_stop_json,
+            validation_reask=validation_reask,
+            clean_source=clean_source,
+            json_repair=json_repair,
+            max_continuations=max_continuations,
+            record_responses=record_responses,
+            result_queue_size=result_queue_size,
+            result_fsync=result_fsync,
+            result_store=result_store,
+            result_folders=result_folders,
+            result_compression=result_compression,
+            tracing=tracing,
         )
 
     def get_model(self, model_key: str) -> ModelConfig:
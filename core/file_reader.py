@@ -1,10 +1,59 @@
 """Moduł do czytania plików źródłowych (txt, md, docx, pdf)."""
 
+import io
 import os
+import codecs
+import logging
 from pathlib import Path
 from datetime import datetime
 from dataclasses import dataclass
-from typing import List, Optional
+from typing import BinaryIO, Iterable, Iterator, List, Optional, Union
+
+from .parse_cache import ParseCache
+from .posts_index import IndexPage, get_index
+from .text_cleaner import PAGE_BREAK
+
+logger = logging.getLogger(__name__)
+
+# Zmiana ekstrakcji tekstu (PDF/DOCX) = nowa wersja - unieważnia cache parsowania
+READER_VERSION = 2
+# Strony PDF w tekście z read_file / read_bytes rozdzielone pustą linią; granice stron
+# (nagłówki i stopki powtarzane na stronach - core/text_cleaner) daje read_pages.
+# W cache parsowania strony są rozdzielone PAGE_BREAK
+PAGE_SEPARATOR = "\n\n"
+# Formaty, których parsowanie jest na tyle drogie, że tekst trafia do cache
+CACHED_EXTENSIONS = {'.pdf', '.docx'}
+
+# Równoległa ekstrakcja PDF dopiero od tylu stron (start procesów kosztuje ~0.1-0.3 s)
+PARALLEL_PDF_MIN_PAGES = 24
+# Górny limit procesów przy PDF_WORKERS=0 (auto)
+MAX_AUTO_PDF_WORKERS = 8
+# Zakresy stron na proces - kilka mniejszych wyrównuje nierówne strony
+PDF_RANGES_PER_WORKER = 3
+
+# Źródło PDF: ścieżka, bajty, None = bajty z _init_pdf_worker (proces roboczy)
+PdfSource = Union[str, bytes, None]
+_worker_pdf_bytes: Optional[bytes] = None
+
+# Próbka do wykrywania kodowania (początek pliku)
+ENCODING_SAMPLE_BYTES = 64 * 1024
+# Od tego rozmiaru plik tekstowy jest mapowany (mmap) zamiast kopiowany read()
+MMAP_MIN_BYTES = 4 * 1024 * 1024
+# Porcja dekodowania przyrostowego (ponowna próba po błędzie) - bez kopii całego pliku
+DECODE_CHUNK_BYTES = 1024 * 1024
+
+_BOMS = [
+    (b'\xef\xbb\xbf', 'utf-8-sig'),
+    (b'\xff\xfe', 'utf-16'),
+    (b'\xfe\xff', 'utf-16'),
+]
+
+# Polskie litery zakodowane inaczej w cp1250 i iso-8859-2 (ą ś ź Ą Ś Ź);
+# ę ć ł ń ó ż mają w obu ten sam bajt
+_CP1250_ONLY = frozenset(b'\xb9\x9c\x9f\xa5\x8c\x8f')
+_ISO_8859_2_ONLY = frozenset(b'\xb1\xb6\xbc\xa1\xa6\xac')
+# Bajty niezdefiniowane w cp1250
+_CP1250_UNDEFINED = frozenset(b'\x81\x83\x88\x90\x98')
 
 
 @dataclass
@@ -37,13 +86,26 @@ class FileReader:
 
     SUPPORTED_EXTENSIONS = {'.txt', '.md', '.docx', '.pdf'}
 
-    def __init__(self, default_folder: Optional[Path] = None):
+    def __init__(
+        self,
+        default_folder: Optional[Path] = None,
+        pdf_workers: Optional[int] = None,
+        use_cache: bool = True,
+    ):
         """
         Inicjalizacja czytnika.
 
         Args:
             default_folder: Domyślny folder z plikami (domyślnie: posts/)
+            pdf_workers: Procesy do ekstrakcji PDF (0 = auto, 1 = bez równoległości;
+                domyślnie zmienna PDF_WORKERS)
+            use_cache: Cache tekstu PDF/DOCX na dysku (PARSE_CACHE, logs/parse_cache/)
         """
+        self.parse_cache = ParseCache.from_env() if use_cache else None
+        if pdf_workers is None:
+            pdf_workers = int(os.getenv("PDF_WORKERS", "0"))
+        self.pdf_workers = pdf_workers or min(os.cpu_count() or 1, MAX_AUTO_PDF_WORKERS)
+
         if default_folder is None:
             self.default_folder = Path(__file__).parent.parent / "posts"
         else:
@@ -52,36 +114,47 @@ class FileReader:
         # Upewnij się że folder istnieje
         self.default_folder.mkdir(parents=True, exist_ok=True)
 
-    def list_files(self, folder: Optional[Path] = None) -> List[SourceFile]:
+    def list_files(
+        self,
+        folder: Optional[Path] = None,
+        extensions: Optional[Iterable[str]] = None,
+        since: Optional[datetime] = None,
+        search: Optional[str] = None,
+        offset: int = 0,
+        limit: Optional[int] = None,
+    ) -> List[SourceFile]:
         """
-        Listuje pliki źródłowe w folderze.
+        Listuje pliki źródłowe w folderze (z przyrostowego indeksu, core/posts_index).
 
         Args:
             folder: Folder do przeszukania (domyślnie: default_folder)
+            extensions: Tylko te rozszerzenia (np. {".pdf"})
+            since: Tylko pliki zmodyfikowane od tej daty
+            search: Fragment nazwy pliku
+            offset / limit: Stronicowanie
 
         Returns:
             Lista plików posortowana po dacie modyfikacji (najnowsze pierwsze)
         """
+        return self.query_files(folder, extensions, since, search, offset, limit).files
+
+    def query_files(
+        self,
+        folder: Optional[Path] = None,
+        extensions: Optional[Iterable[str]] = None,
+        since: Optional[datetime] = None,
+        search: Optional[str] = None,
+        offset: int = 0,
+        limit: Optional[int] = None,
+    ) -> IndexPage:
+        """Jak list_files, ale z łączną liczbą pasujących plików (do stronicowania)."""
         target_folder = folder or self.default_folder
 
         if not target_folder.exists():
-            return []
-
-        files = []
-        for item in target_folder.iterdir():
-            if item.is_file() and item.suffix.lower() in self.SUPPORTED_EXTENSIONS:
-                stat = item.stat()
-                files.append(SourceFile(
-                    path=item,
-                    name=item.name,
-                    extension=item.suffix.lower(),
-                    size_bytes=stat.st_size,
-                    modified_time=datetime.fromtimestamp(stat.st_mtime),
-                ))
-
-        # Sortuj po dacie modyfikacji (najnowsze pierwsze)
-        files.sort(key=lambda f: f.modified_time, reverse=True)
-        return files
+            return IndexPage(files=[], total=0)
+
+        index = get_index(target_folder, self.SUPPORTED_EXTENSIONS)
+        return index.query(extensions=extensions, since=since, search=search, offset=offset, limit=limit)
 
     def read_file(self, file_path: Path) -> str:
         """
@@ -93,6 +166,19 @@ class FileReader:
         Returns:
             Zawartość pliku jako string
 
+        Raises:
+            FileNotFoundError: Jeśli plik nie istnieje
+            ValueError: Jeśli format nie jest obsługiwany
+        """
+        return PAGE_SEPARATOR.join(self.read_pages(file_path))
+
+    def read_pages(self, file_path: Path) -> List[str]:
+        """
+        Czyta plik jako listę stron (PDF); inne formaty - jedna strona z całym tekstem.
+
+        Strony złączone PAGE_SEPARATOR to tekst z read_file; osobno trafiają do
+        clean_source_text (pages=...), żeby rozpoznać nagłówki i stopki stron.
+
         Raises:
             FileNotFoundError: Jeśli plik nie istnieje
             ValueError: Jeśli format nie jest obsługiwany
@@ -111,31 +197,127 @@ class FileReader:
             )
 
         if extension in {'.txt', '.md'}:
-            return self._read_text(path)
+            return [self._read_text(path)]
+
+        cache = self.parse_cache if extension in CACHED_EXTENSIONS else None
+        if cache:
+            cached = cache.get(path, READER_VERSION)
+            if cached is not None:
+                return cached.split(PAGE_BREAK) if extension == '.pdf' else [cached]
+
+        if extension == '.docx':
+            pages = [self._read_docx(path)]
+        elif extension == '.pdf':
+            pages = self._read_pdf(path)
+        else:
+            raise ValueError(f"Nieobsługiwany format: {extension}")
+
+        if cache:
+            cache.put(path, READER_VERSION, PAGE_BREAK.join(pages))
+        return pages
+
+    def read_bytes(self, data: bytes, filename: str) -> str:
+        """
+        Czyta plik z pamięci (np. upload w Streamlit) - bez pliku tymczasowego.
+
+        Args:
+            data: Zawartość pliku
+            filename: Nazwa pliku (rozstrzyga format po rozszerzeniu)
+
+        Raises:
+            ValueError: Jeśli format nie jest obsługiwany
+        """
+        return PAGE_SEPARATOR.join(self.read_bytes_pages(data, filename))
+
+    def read_bytes_pages(self, data: bytes, filename: str) -> List[str]:
+        """Jak read_bytes, ale jako lista stron (jak read_pages)."""
+        extension = Path(filename).suffix.lower()
+
+        if extension in {'.txt', '.md'}:
+            return [decode_text(data)]
         elif extension == '.docx':
-            return self._read_docx(path)
+            return [self._read_docx(io.BytesIO(data))]
         elif extension == '.pdf':
-            return self._read_pdf(path)
+            return self._read_pdf(data)
 
-        raise ValueError(f"Nieobsługiwany format: {extension}")
+        raise ValueError(
+            f"Nieobsługiwany format: {extension}. "
+            f"Obsługiwane: {', '.join(self.SUPPORTED_EXTENSIONS)}"
+        )
 
-    def _read_text(self, path: Path) -> str:
-        """Czyta plik tekstowy (txt, md)."""
-        encodings = ['utf-8', 'cp1250', 'iso-8859-2', 'latin-1']
+    def iter_chunks(
+        self,
+        file_path: Path,
+        max_pages: Optional[int] = None,
+        max_chars: Optional[int] = None,
+    ) -> Iterator[str]:
+        """
+        Leniwie zwraca kolejne fragmenty pliku: strony PDF, akapity docx/txt/md.
 
-        for encoding in encodings:
-            try:
-                with open(path, 'r', encoding=encoding) as f:
-                    return f.read()
-            except UnicodeDecodeError:
-                continue
+        Pamięć jest ograniczona do bieżącego fragmentu (poza docx - python-docx
+        parsuje cały dokument), więc dalsze etapy mogą ruszyć przed końcem pliku,
+        a przy limitach reszta pliku w ogóle nie jest parsowana.
+
+        Args:
+            file_path: Ścieżka do pliku
+            max_pages: Maksymalna liczba fragmentów (stron PDF / akapitów)
+            max_chars: Maksymalna łączna liczba znaków (ostatni fragment przycinany)
+
+        Raises:
+            FileNotFoundError: Jeśli plik nie istnieje
+            ValueError: Jeśli format nie jest obsługiwany
+        """
+        path = Path(file_path)
+
+        if not path.exists():
+            raise FileNotFoundError(f"Plik nie istnieje: {path}")
 
-        # Fallback - czytaj z ignorowaniem błędów
-        with open(path, 'r', encoding='utf-8', errors='ignore') as f:
-            return f.read()
+        extension = path.suffix.lower()
 
-    def _read_docx(self, path: Path) -> str:
-        """Czyta plik Word (.docx)."""
+        if extension in {'.txt', '.md'}:
+            chunks = self._iter_text(path)
+        elif extension == '.docx':
+            chunks = self._iter_docx(path)
+        elif extension == '.pdf':
+            chunks = _iter_pdf_pages(str(path), _pdf_backend(), 0, max_pages)
+        else:
+            raise ValueError(
+                f"Nieobsługiwany format: {extension}. "
+                f"Obsługiwane: {', '.join(self.SUPPORTED_EXTENSIONS)}"
+            )
+
+        pages = 0
+        chars = 0
+        for chunk in chunks:
+            if not chunk or not chunk.strip():
+                continue
+            if max_chars is not None and chars + len(chunk) >= max_chars:
+                if max_chars > chars:
+                    yield chunk[:max_chars - chars]
+                return
+            yield chunk
+            pages += 1
+            chars += len(chunk)
+            if max_pages is not None and pages >= max_pages:
+                return
+
+    def _iter_text(self, path: Path) -> Iterator[str]:
+        """Akapity pliku tekstowego (rozdzielone pustą linią), czytane liniami."""
+        with open(path, 'rb') as f:
+            encoding = detect_encoding(f.read(ENCODING_SAMPLE_BYTES))
+        paragraph: List[str] = []
+        with open(path, 'r', encoding=encoding, errors='ignore') as f:
+            for line in f:
+                if line.strip():
+                    paragraph.append(line)
+                elif paragraph:
+                    yield ''.join(paragraph).strip('\n')
+                    paragraph = []
+        if paragraph:
+            yield ''.join(paragraph).strip('\n')
+
+    def _iter_docx(self, path: Path) -> Iterator[str]:
+        """Akapity pliku Word (.docx)."""
         try:
             from docx import Document
         except ImportError:
@@ -143,41 +325,75 @@ class FileReader:
                 "Brak biblioteki python-docx. Zainstaluj: pip install python-docx"
             )
 
-        doc = Document(path)
-        paragraphs = [para.text for para in doc.paragraphs if para.text.strip()]
-        return '\n\n'.join(paragraphs)
+        for para in Document(path).paragraphs:
+            yield para.text
 
-    def _read_pdf(self, path: Path) -> str:
-        """Czyta plik PDF."""
-        # Próbuj PyPDF2 najpierw
-        try:
-            from PyPDF2 import PdfReader
-            reader = PdfReader(path)
-            text_parts = []
-            for page in reader.pages:
-                text = page.extract_text()
-                if text:
-                    text_parts.append(text)
-            return '\n\n'.join(text_parts)
-        except ImportError:
-            pass
+    def _read_text(self, path: Path) -> str:
+        """
+        Czyta plik tekstowy (txt, md) jednym przebiegiem.
 
-        # Próbuj pdfplumber jako fallback
+        Kodowanie jest wykrywane z próbki, duże pliki dekodowane prosto z mmap
+        (bez kopii bajtów w pamięci procesu).
+        """
+        size = path.stat().st_size
+        if size < MMAP_MIN_BYTES:
+            with open(path, 'rb') as f:
+                return decode_text(f.read())
+
+        import mmap
+        with open(path, 'rb') as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                return decode_text(data)
+
+    def _read_docx(self, source: Union[Path, BinaryIO]) -> str:
+        """Czyta plik Word (.docx) ze ścieżki lub strumienia."""
         try:
-            import pdfplumber
-            text_parts = []
-            with pdfplumber.open(path) as pdf:
-                for page in pdf.pages:
-                    text = page.extract_text()
-                    if text:
-                        text_parts.append(text)
-            return '\n\n'.join(text_parts)
+            from docx import Document
         except ImportError:
-            pass
+            raise ImportError(
+                "Brak biblioteki python-docx. Zainstaluj: pip install python-docx"
+            )
 
-        raise ImportError(
-            "Brak biblioteki do PDF. Zainstaluj: pip install PyPDF2 lub pip install pdfplumber"
-        )
+        doc = Document(source)
+        paragraphs = [para.text for para in doc.paragraphs if para.text.strip()]
+        return '\n\n'.join(paragraphs)
+
+    def _read_pdf(self, source: Union[Path, bytes]) -> List[str]:
+        """
+        Czyta strony pliku PDF ze ścieżki lub bajtów (PyPDF2, fallback: pdfplumber).
+
+        Długie dokumenty są dzielone na zakresy stron ekstrahowane w osobnych
+        procesach (extract_text jest CPU-bound i trzyma GIL) i składane w kolejności.
+        Bajty trafiają do każdego procesu raz (initializer), nie z każdym zakresem.
+        """
+        backend = _pdf_backend()
+        source = source if isinstance(source, bytes) else str(source)
+        page_count = _pdf_page_count(source, backend)
+        workers = min(self.pdf_workers, page_count)
+
+        if workers > 1 and page_count >= PARALLEL_PDF_MIN_PAGES:
+            ranges = _split_pages(page_count, workers * PDF_RANGES_PER_WORKER)
+            in_memory = isinstance(source, bytes)
+            try:
+                from concurrent.futures import ProcessPoolExecutor
+                with ProcessPoolExecutor(
+                    max_workers=workers,
+                    initializer=_init_pdf_worker if in_memory else None,
+                    initargs=(source,) if in_memory else (),
+                ) as pool:
+                    parts = pool.map(
+                        _extract_pdf_range,
+                        [None if in_memory else source] * len(ranges),
+                        [start for start, _ in ranges],
+                        [end for _, end in ranges],
+                        [backend] * len(ranges),
+                    )
+                    return [text for part in parts for text in part]
+            except (OSError, RuntimeError) as e:
+                # Np. brak możliwości startu procesów w środowisku - czytaj sekwencyjnie
+                logger.warning(f"Równoległa ekstrakcja PDF nieudana ({e}) - czytam sekwencyjnie")
+
+        return _extract_pdf_range(source, 0, page_count, backend)
 
     def is_valid_path(self, path_str: str) -> bool:
         """Sprawdza czy ścieżka jest prawidłowa i plik istnieje."""
@@ -209,6 +425,154 @@ class FileReader:
             return None
 
 
+def _pdf_backend() -> str:
+    """Dostępna biblioteka PDF: "pypdf2" lub "pdfplumber"."""
+    try:
+        import PyPDF2  # noqa: F401
+        return "pypdf2"
+    except ImportError:
+        pass
+    try:
+        import pdfplumber  # noqa: F401
+        return "pdfplumber"
+    except ImportError:
+        pass
+    raise ImportError(
+        "Brak biblioteki do PDF. Zainstaluj: pip install PyPDF2 lub pip install pdfplumber"
+    )
+
+
+def _open_pdf_source(source: PdfSource):
+    """Ścieżka bez zmian, bajty jako strumień; None = bajty przekazane procesowi roboczemu."""
+    if source is None:
+        source = _worker_pdf_bytes
+    return io.BytesIO(source) if isinstance(source, bytes) else source
+
+
+def _init_pdf_worker(data: bytes) -> None:
+    global _worker_pdf_bytes
+    _worker_pdf_bytes = data
+
+
+def _pdf_page_count(source: PdfSource, backend: str) -> int:
+    if backend == "pypdf2":
+        from PyPDF2 import PdfReader
+        return len(PdfReader(_open_pdf_source(source)).pages)
+    import pdfplumber
+    with pdfplumber.open(_open_pdf_source(source)) as pdf:
+        return len(pdf.pages)
+
+
+def _split_pages(page_count: int, parts: int) -> List[tuple]:
+    """Dzieli strony [0, page_count) na `parts` ciągłych zakresów (start, end)."""
+    parts = max(1, min(parts, page_count))
+    size, extra = divmod(page_count, parts)
+    ranges = []
+    start = 0
+    for i in range(parts):
+        end = start + size + (1 if i < extra else 0)
+        ranges.append((start, end))
+        start = end
+    return ranges
+
+
+def detect_encoding(sample: bytes) -> str:
+    """
+    Kodowanie tekstu na podstawie próbki: BOM, poprawność UTF-8, a dla
+    kodowań jednobajtowych - statystyka polskich liter (cp1250 vs iso-8859-2).
+    """
+    for bom, encoding in _BOMS:
+        if sample.startswith(bom):
+            return encoding
+
+    try:
+        # final=False - próbka może uciąć znak wielobajtowy na końcu
+        codecs.getincrementaldecoder('utf-8')().decode(sample, final=False)
+        return 'utf-8'
+    except UnicodeDecodeError:
+        pass
+
+    return _single_byte_encoding([sample])
+
+
+def _single_byte_encoding(chunks: Iterable) -> str:
+    """cp1250 albo iso-8859-2 ze statystyki polskich liter w kolejnych porcjach bajtów."""
+    cp1250_score = iso_score = 0
+    for chunk in chunks:
+        for byte in chunk:
+            if byte < 0x80:
+                continue
+            if byte in _CP1250_UNDEFINED:
+                return 'iso-8859-2'
+            if byte in _CP1250_ONLY:
+                cp1250_score += 1
+            elif byte in _ISO_8859_2_ONLY:
+                iso_score += 1
+            elif byte < 0xA0:
+                # Znaki sterujące w iso-8859-2, interpunkcja (cudzysłowy, myślniki) w cp1250
+                cp1250_score += 1
+    return 'iso-8859-2' if iso_score > cp1250_score else 'cp1250'
+
+
+def _iter_chunks(view: memoryview) -> Iterator[memoryview]:
+    """Kolejne wycinki DECODE_CHUNK_BYTES (widoki, bez kopii bajtów)."""
+    for start in range(0, len(view), DECODE_CHUNK_BYTES):
+        yield view[start:start + DECODE_CHUNK_BYTES]
+
+
+def _decode_chunks(view: memoryview, encoding: str, errors: str = 'strict') -> str:
+    """Dekoduje porcjami dekoderem przyrostowym (znak wielobajtowy na granicy porcji jest buforowany)."""
+    decoder = codecs.getincrementaldecoder(encoding)(errors)
+    parts = [decoder.decode(chunk) for chunk in _iter_chunks(view)]
+    parts.append(decoder.decode(b'', final=True))
+    return ''.join(parts)
+
+
+def decode_text(data) -> str:
+    """Dekoduje bajty (lub mmap) kodowaniem wykrytym z początku danych."""
+    with memoryview(data) as view:
+        sample = bytes(view[:ENCODING_SAMPLE_BYTES])
+        encoding = detect_encoding(sample)
+        try:
+            return str(view, encoding)
+        except UnicodeDecodeError:
+            # Próbka była poprawna, dalsza część nie - kodowanie z całości, porcjami
+            for bom, bom_encoding in _BOMS:
+                if sample.startswith(bom):
+                    encoding = bom_encoding
+                    break
+            else:
+                encoding = _single_byte_encoding(_iter_chunks(view))
+            return _decode_chunks(view, encoding, errors='replace')
+
+
+def _iter_pdf_pages(source: PdfSource, backend: str, start: int = 0, end: Optional[int] = None) -> Iterator[str]:
+    """Tekst kolejnych stron [start, end) - strona po stronie, bez trzymania poprzednich."""
+    if backend == "pypdf2":
+        from PyPDF2 import PdfReader
+        reader = PdfReader(_open_pdf_source(source))
+        count = len(reader.pages)
+        for index in range(start, count if end is None else min(end, count)):
+            yield reader.pages[index].extract_text() or ''
+    else:
+        import pdfplumber
+        with pdfplumber.open(_open_pdf_source(source)) as pdf:
+            for page in pdf.pages[start:end]:
+                yield page.extract_text() or ''
+                # Zwolnij sparsowane obiekty strony (pdfplumber trzyma je w cache)
+                page.flush_cache()
+
+
+def _extract_pdf_range(source: PdfSource, start: int, end: int, backend: str) -> List[str]:
+    """
+    Tekst stron [start, end) - puste strony pominięte.
+
+    Funkcja modułu (nie metoda), żeby dało się ją wysłać do procesu roboczego;
+    każdy proces otwiera plik sam.
+    """
+    return [text for text in _iter_pdf_pages(source, backend, start, end) if text]
+
+
 def format_file_list(files: List[SourceFile], max_name_length: int = 45) -> str:
     """
     Formatuje listę plików do wyświetlenia.
@@ -3,80 +3,21 @@ import json
 import os
 import webbrowser
 from datetime import datetime
+from html import escape
 from pathlib import Path
-from typing import Optional
+from string import Template
+from typing import Any, Iterator, Optional, TextIO
 
 
-def generate_html_report(
-    full_report: dict,
-    output_dir: str,
-    mode: str = "exploration",
-    auto_open: bool = True
-) -> str:
-    """
-    Generuje raport HTML z danych JSON.
-
-    Args:
-        full_report: Pełny raport ze wszystkich agentów
-        output_dir: Katalog wyjściowy
-        mode: Tryb (exploration/development/polish)
-        auto_open: Czy automatycznie otworzyć w przeglądarce
-
-    Returns:
-        Ścieżka do wygenerowanego pliku HTML
-    """
-    html_content = _build_html(full_report, mode)
-
-    output_path = os.path.join(output_dir, "report.html")
-    with open(output_path, "w", encoding="utf-8") as f:
-        f.write(html_content)
-
-    if auto_open:
-        webbrowser.open(f"file://{os.path.abspath(output_path)}")
-
-    return output_path
-
-
-def _build_html(report: dict, mode: str) -> str:
-    """Buduje zawartość HTML - prosty linearny layout."""
-
-    mode_names = {
-        "exploration": "EKSPLORACJA",
-        "development": "ROZWINIĘCIE",
-        "polish": "SZLIF"
-    }
-    mode_name = mode_names.get(mode, mode.upper())
-
-    inner_report = report.get("report", {})
-    report_type = inner_report.get("type", mode)
-
-    # Buduj sekcje w zależności od trybu
-    content_html = ""
-
-    # Brief - na samej górze (jeśli dostępny)
-    brief_html = _build_brief_section(inner_report)
-
-    if report_type == "exploration":
-        content_html = _build_exploration_content(inner_report)
-    elif report_type == "development":
-        content_html = _build_development_content(inner_report)
-    elif report_type == "polish":
-        content_html = _build_polish_content(inner_report)
-
-    # Zbierz hooki z agentów analitycznych
-    hooks_html = _build_hooks_section(inner_report)
-
-    # Sekcje agentów
-    agents_html = _build_agents_section(inner_report)
-
-    return f'''<!DOCTYPE html>
+# Szkielet strony kompilowany raz przy imporcie (CSS bez zmian między raportami)
+_PAGE_HEAD = Template('''<!DOCTYPE html>
 <html lang="pl">
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Social Media Analyzer - {mode_name}</title>
+    <title>Social Media Analyzer - $mode_name</title>
     <style>
-        :root {{
+        :root {
             --bg: #1a1a2e;
             --bg-light: #25253d;
             --accent: #4361ee;
@@ -86,11 +27,11 @@ def _build_html(report: dict, mode: str) -> str:
             --text: #f0f0f5;
             --text-dim: #9090a0;
             --border: #3a3a5a;
-        }}
+        }
 
-        * {{ margin: 0; padding: 0; box-sizing: border-box; }}
+        * { margin: 0; padding: 0; box-sizing: border-box; }
 
-        body {{
+        body {
             font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
             background: var(--bg);
             color: var(--text);
@@ -98,186 +39,284 @@ def _build_html(report: dict, mode: str) -> str:
             padding: 2rem;
             max-width: 900px;
             margin: 0 auto;
-        }}
+        }
 
-        h1 {{
+        h1 {
             font-size: 1.8rem;
             margin-bottom: 0.5rem;
             background: linear-gradient(135deg, var(--accent), var(--accent2));
             -webkit-background-clip: text;
             -webkit-text-fill-color: transparent;
-        }}
+        }
 
-        .meta {{
+        .meta {
             color: var(--text-dim);
             margin-bottom: 2rem;
             font-size: 0.9rem;
-        }}
+        }
 
-        h2 {{
+        h2 {
             font-size: 1.3rem;
             margin: 2rem 0 1rem 0;
             padding-bottom: 0.5rem;
             border-bottom: 2px solid var(--accent);
             color: var(--accent);
-        }}
+        }
 
-        h3 {{
+        h3 {
             font-size: 1.1rem;
             margin: 1.5rem 0 0.5rem 0;
             color: var(--text);
-        }}
+        }
 
-        p {{ margin-bottom: 1rem; }}
+        p { margin-bottom: 1rem; }
 
-        .hook {{
+        .hook {
             background: var(--bg-light);
             border-left: 4px solid var(--accent);
             padding: 1rem 1.5rem;
             margin: 1rem 0;
             border-radius: 0 8px 8px 0;
-        }}
+        }
 
-        .hook-text {{
+        .hook-text {
             font-size: 1.05rem;
             font-style: italic;
-        }}
+        }
 
-        .hook-meta {{
+        .hook-meta {
             display: flex;
             justify-content: space-between;
             margin-top: 0.5rem;
             font-size: 0.85rem;
             color: var(--text-dim);
-        }}
+        }
 
-        .strength {{
+        .strength {
             color: var(--green);
             font-weight: 700;
-        }}
+        }
 
-        .card {{
+        .card {
             background: var(--bg-light);
             border: 1px solid var(--border);
             border-radius: 8px;
             padding: 1rem 1.5rem;
             margin: 1rem 0;
-        }}
+        }
 
-        .card-title {{
+        .card-title {
             font-weight: 600;
             color: var(--accent);
             margin-bottom: 0.5rem;
-        }}
+        }
 
-        .tension {{
+        .tension {
             display: grid;
             grid-template-columns: 1fr 1fr;
             gap: 1rem;
             margin: 0.5rem 0;
-        }}
+        }
 
-        .tension-side {{
+        .tension-side {
             background: var(--bg);
             padding: 0.75rem;
             border-radius: 6px;
             font-size: 0.9rem;
-        }}
+        }
 
-        .tension-side strong {{
+        .tension-side strong {
             color: var(--accent);
-        }}
+        }
 
-        ul {{
+        ul {
             margin: 0.5rem 0 1rem 1.5rem;
-        }}
+        }
 
-        li {{
+        li {
             margin-bottom: 0.5rem;
-        }}
+        }
 
-        .quote {{
+        .quote {
             background: var(--bg);
             border-left: 3px solid var(--accent2);
             padding: 0.75rem 1rem;
             margin: 0.5rem 0;
             font-style: italic;
             color: var(--text-dim);
-        }}
+        }
 
-        .recommendation {{
+        .recommendation {
             background: linear-gradient(135deg, rgba(67, 97, 238, 0.15), rgba(114, 9, 183, 0.15));
             border: 1px solid var(--accent);
             border-radius: 8px;
             padding: 1.5rem;
             margin: 1.5rem 0;
-        }}
+        }
 
-        .recommendation h3 {{
+        .recommendation h3 {
             color: var(--green);
             margin-top: 0;
-        }}
+        }
 
-        .agent-section {{
+        .agent-section {
             margin-top: 2rem;
             padding-top: 1rem;
             border-top: 1px solid var(--border);
-        }}
+        }
 
-        .agent-title {{
+        .agent-title {
             font-size: 1rem;
             color: var(--accent2);
             margin-bottom: 1rem;
-        }}
+        }
 
-        .agent-item {{
+        .agent-item {
             background: var(--bg-light);
             padding: 0.75rem 1rem;
             margin: 0.5rem 0;
             border-radius: 6px;
             font-size: 0.95rem;
-        }}
+        }
 
-        .agent-label {{
+        .agent-label {
             font-size: 0.75rem;
             color: var(--accent);
             text-transform: uppercase;
             margin-bottom: 0.25rem;
-        }}
+        }
 
-        footer {{
+        footer {
             margin-top: 3rem;
             padding-top: 1rem;
             border-top: 1px solid var(--border);
             text-align: center;
             color: var(--text-dim);
             font-size: 0.85rem;
-        }}
+        }
 
-        @media (max-width: 600px) {{
-            body {{ padding: 1rem; }}
-            .tension {{ grid-template-columns: 1fr; }}
-        }}
+        @media (max-width: 600px) {
+            body { padding: 1rem; }
+            .tension { grid-template-columns: 1fr; }
+        }
     </style>
 </head>
 <body>
     <h1>Social Media Analyzer</h1>
-    <p class="meta">Tryb: {mode_name} | Wygenerowano: {datetime.now().strftime("%Y-%m-%d %H:%M")}</p>
-
-    {brief_html}
-
-    {content_html}
-
-    {hooks_html}
+    <p class="meta">Tryb: $mode_name | Wygenerowano: $generated</p>
 
-    {agents_html}
+''')
 
-    <footer>
+_PAGE_FOOT = '''<footer>
         Social Media Analyzer v3
     </footer>
 </body>
 </html>'''
 
+_SECTION_SEPARATOR = "\n\n    "
+
+
+def generate_html_report(
+    full_report: dict,
+    output_dir: str,
+    mode: str = "exploration",
+    auto_open: bool = True
+) -> str:
+    """
+    Generuje raport HTML z danych JSON.
+
+    Sekcje zapisywane są do pliku kolejno, bez składania całej strony w pamięci.
+    Raport renderowany jest raz przy zapisie wyników - podgląd otwiera gotowy plik.
+
+    Args:
+        full_report: Pełny raport ze wszystkich agentów
+        output_dir: Katalog wyjściowy
+        mode: Tryb (exploration/development/polish)
+        auto_open: Czy automatycznie otworzyć w przeglądarce
+
+    Returns:
+        Ścieżka do wygenerowanego pliku HTML
+    """
+    output_path = os.path.join(output_dir, "report.html")
+    with open(output_path, "w", encoding="utf-8") as f:
+        write_html(f, full_report, mode)
+
+    if auto_open:
+        open_report(output_path)
+
+    return output_path
+
+
+def open_report(path: str) -> None:
+    """Otwiera raport HTML w przeglądarce (wywoływać z wątku UI/CLI, nie z wątku zapisu)."""
+    webbrowser.open(f"file://{os.path.abspath(path)}")
+
+
+def write_html(out: TextIO, report: dict, mode: str) -> None:
+    """Zapisuje stronę HTML do strumienia tekstowego sekcja po sekcji."""
+    for fragment in _iter_html(report, mode):
+        out.write(fragment)
+
+
+def _build_html(report: dict, mode: str) -> str:
+    """Cała strona HTML jako tekst (gdy potrzebna w pamięci, np. do podglądu)."""
+    return "".join(_iter_html(report, mode))
+
+
+def _esc(value: Any) -> str:
+    """
+    Tekst od modelu bezpieczny w treści elementu HTML.
+
+    Cudzysłowy zostają - wartości nie trafiają do atrybutów. Większość tekstów
+    nie ma znaków specjalnych i wraca bez kopiowania.
+    """
+    text = value if isinstance(value, str) else str(value)
+    if "&" in text or "<" in text or ">" in text:
+        return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+    return text
+
+
+def _iter_html(report: dict, mode: str) -> Iterator[str]:
+    """Fragmenty strony w kolejności - prosty linearny layout."""
+
+    mode_names = {
+        "exploration": "EKSPLORACJA",
+        "development": "ROZWINIĘCIE",
+        "polish": "SZLIF"
+    }
+    mode_name = mode_names.get(mode, mode.upper())
+
+    inner_report = report.get("report") or {}
+    report_type = inner_report.get("type", mode)
+
+    yield _PAGE_HEAD.substitute(
+        mode_name=escape(mode_name),
+        generated=datetime.now().strftime("%Y-%m-%d %H:%M"),
+    )
+
+    # Brief - na samej górze (jeśli dostępny)
+    yield _build_brief_section(inner_report)
+    yield _SECTION_SEPARATOR
+
+    # Sekcje w zależności od trybu
+    if report_type == "exploration":
+        yield _build_exploration_content(inner_report)
+    elif report_type == "development":
+        yield _build_development_content(inner_report)
+    elif report_type == "polish":
+        yield _build_polish_content(inner_report)
+    yield _SECTION_SEPARATOR
+
+    # Zbierz hooki z agentów analitycznych
+    yield _build_hooks_section(inner_report)
+    yield _SECTION_SEPARATOR
+
+    # Sekcje agentów
+    yield from _iter_agents_section(inner_report)
+    yield _SECTION_SEPARATOR
+
+    yield _PAGE_FOOT
+
 
 def _build_brief_section(report: dict) -> str:
     """Buduje sekcję briefu - najważniejsze elementy na górze."""
@@ -295,14 +334,14 @@ def _build_brief_section(report: dict) -> str:
     if hooks:
         html += '<h3 style="margin-top: 1rem;">🎣 Najlepsze hooki</h3>'
         for i, hook in enumerate(hooks[:3], 1):
-            html += f'<div class="hook"><div class="hook-text">{i}. {hook}</div></div>'
+            html += f'<div class="hook"><div class="hook-text">{i}. {_esc(hook)}</div></div>'
 
     # Kluczowe insighty
     insights = brief.get("kluczowe_insighty", [])
     if insights:
         html += '<h3>💡 Kluczowe insighty</h3><ul>'
         for insight in insights[:3]:
-            html += f'<li>{insight}</li>'
+            html += f'<li>{_esc(insight)}</li>'
         html += '</ul>'
 
     # Gotowe do użycia
@@ -313,16 +352,16 @@ def _build_brief_section(report: dict) -> str:
             if isinstance(item, dict):
                 typ = item.get("typ", "Element")
                 text = item.get("tekst", "")
-                html += f'<div class="agent-item"><div class="agent-label">{typ}</div>{text}</div>'
+                html += f'<div class="agent-item"><div class="agent-label">{_esc(typ)}</div>{_esc(text)}</div>'
             else:
-                html += f'<div class="agent-item">{item}</div>'
+                html += f'<div class="agent-item">{_esc(item)}</div>'
 
     # Polskie konteksty
     polish = brief.get("polskie_konteksty", [])
     if polish:
         html += '<h3>🇵🇱 Polskie konteksty</h3><ul>'
         for ctx in polish[:3]:
-            html += f'<li>{ctx}</li>'
+            html += f'<li>{_esc(ctx)}</li>'
         html += '</ul>'
 
     # Ostrzeżenia
@@ -330,7 +369,7 @@ def _build_brief_section(report: dict) -> str:
     if warnings:
         html += '<h3 style="color: #ff6b6b;">⚠️ Ostrzeżenia</h3><ul>'
         for warning in warnings[:3]:
-            html += f'<li style="color: #ff9f43;">{warning}</li>'
+            html += f'<li style="color: #ff9f43;">{_esc(warning)}</li>'
         html += '</ul>'
 
     html += '</div>'
@@ -352,13 +391,13 @@ def _build_exploration_content(report: dict) -> str:
         for angle in angles:
             html += f'''
             <div class="card">
-                <div class="card-title">{angle.get("nazwa", "Kąt")}</div>
-                <p>{angle.get("opis", "")}</p>
+                <div class="card-title">{_esc(angle.get("nazwa", "Kąt"))}</div>
+                <p>{_esc(angle.get("opis", ""))}</p>
                 <div class="hook">
-                    <div class="hook-text">{angle.get("hook", "")}</div>
+                    <div class="hook-text">{_esc(angle.get("hook", ""))}</div>
                     <div class="hook-meta">
-                        <span>Dla: {angle.get("dla_kogo", "")}</span>
-                        <span class="strength">{angle.get("siła", "?")}/10</span>
+                        <span>Dla: {_esc(angle.get("dla_kogo", ""))}</span>
+                        <span class="strength">{_esc(angle.get("siła", "?"))}/10</span>
                     </div>
                 </div>
             </div>
@@ -371,10 +410,10 @@ def _build_exploration_content(report: dict) -> str:
         for t in tensions:
             html += f'''
             <div class="card">
-                <div class="card-title">{t.get("napięcie", "")}</div>
+                <div class="card-title">{_esc(t.get("napięcie", ""))}</div>
                 <div class="tension">
-                    <div class="tension-side"><strong>Strona A:</strong> {t.get("strona_A", "")}</div>
-                    <div class="tension-side"><strong>Strona B:</strong> {t.get("strona_B", "")}</div>
+                    <div class="tension-side"><strong>Strona A:</strong> {_esc(t.get("strona_A", ""))}</div>
+                    <div class="tension-side"><strong>Strona B:</strong> {_esc(t.get("strona_B", ""))}</div>
                 </div>
             </div>
             '''
@@ -384,7 +423,7 @@ def _build_exploration_content(report: dict) -> str:
     if polish:
         html += "<h2>Polski kontekst</h2><ul>"
         for ctx in polish:
-            html += f'<li><strong>{ctx.get("kontekst", "")}:</strong> {ctx.get("jak_podpiąć", "")}</li>'
+            html += f'<li><strong>{_esc(ctx.get("kontekst", ""))}:</strong> {_esc(ctx.get("jak_podpiąć", ""))}</li>'
         html += "</ul>"
 
     # Pytania
@@ -392,7 +431,7 @@ def _build_exploration_content(report: dict) -> str:
     if questions:
         html += "<h2>Pytania warte zadania</h2><ul>"
         for q in questions:
-            html += f'<li>{q}</li>'
+            html += f'<li>{_esc(q)}</li>'
         html += "</ul>"
 
     # Pułapki
@@ -400,7 +439,7 @@ def _build_exploration_content(report: dict) -> str:
     if traps:
         html += "<h2>Pułapki do uniknięcia</h2><ul>"
         for trap in traps:
-            html += f'<li><strong>{trap.get("pułapka", "")}:</strong> {trap.get("dlaczego_zła", "")}</li>'
+            html += f'<li><strong>{_esc(trap.get("pułapka", ""))}:</strong> {_esc(trap.get("dlaczego_zła", ""))}</li>'
         html += "</ul>"
 
     # Rekomendacja
@@ -408,10 +447,10 @@ def _build_exploration_content(report: dict) -> str:
     if rec:
         html += f'''
         <div class="recommendation">
-            <h3>🎯 Rekomendowany kąt: {rec.get("nazwa", "")}</h3>
-            <p>{rec.get("uzasadnienie", "")}</p>
+            <h3>🎯 Rekomendowany kąt: {_esc(rec.get("nazwa", ""))}</h3>
+            <p>{_esc(rec.get("uzasadnienie", ""))}</p>
             <div class="hook">
-                <div class="hook-text">{rec.get("hook", "")}</div>
+                <div class="hook-text">{_esc(rec.get("hook", ""))}</div>
             </div>
         </div>
         '''
@@ -433,10 +472,10 @@ def _build_development_content(report: dict) -> str:
         html += f'''
         <h2>Ocena Twojego kierunku</h2>
         <div class="card">
-            <p><strong>Kierunek:</strong> {assessment.get("kierunek_usera", "")}</p>
-            <p><strong>Ocena:</strong> <span class="strength">{assessment.get("ocena", "?")}/10</span></p>
-            <p><strong>Co działa:</strong> {assessment.get("co_działa", "")}</p>
-            <p><strong>Co ulepszyć:</strong> {assessment.get("co_ulepszyć", "")}</p>
+            <p><strong>Kierunek:</strong> {_esc(assessment.get("kierunek_usera", ""))}</p>
+            <p><strong>Ocena:</strong> <span class="strength">{_esc(assessment.get("ocena", "?"))}/10</span></p>
+            <p><strong>Co działa:</strong> {_esc(assessment.get("co_działa", ""))}</p>
+            <p><strong>Co ulepszyć:</strong> {_esc(assessment.get("co_ulepszyć", ""))}</p>
         </div>
         '''
 
@@ -447,14 +486,14 @@ def _build_development_content(report: dict) -> str:
         for v in variants:
             html += f'''
             <div class="card">
-                <div class="card-title">{v.get("typ", "")}</div>
-                <p>{v.get("opis", "")}</p>
-                <p><strong>Teza:</strong> {v.get("główna_teza", "")}</p>
+                <div class="card-title">{_esc(v.get("typ", ""))}</div>
+                <p>{_esc(v.get("opis", ""))}</p>
+                <p><strong>Teza:</strong> {_esc(v.get("główna_teza", ""))}</p>
                 <div class="hook">
-                    <div class="hook-text">{v.get("hook", "")}</div>
+                    <div class="hook-text">{_esc(v.get("hook", ""))}</div>
                     <div class="hook-meta">
-                        <span>Ryzyko: {v.get("ryzyko", "")}</span>
-                        <span class="strength">{v.get("potencjał", "?")}/10</span>
+                        <span>Ryzyko: {_esc(v.get("ryzyko", ""))}</span>
+                        <span class="strength">{_esc(v.get("potencjał", "?"))}/10</span>
                     </div>
                 </div>
             </div>
@@ -465,17 +504,17 @@ def _build_development_content(report: dict) -> str:
     if hooks:
         html += "<h2>Propozycje hooków</h2>"
         for i, hook in enumerate(hooks, 1):
-            html += f'<div class="hook"><div class="hook-text">{i}. {hook}</div></div>'
+            html += f'<div class="hook"><div class="hook-text">{i}. {_esc(hook)}</div></div>'
 
     # Rekomendacja
     rec = dev.get("rekomendowany_wariant", {})
     if rec:
         html += f'''
         <div class="recommendation">
-            <h3>🎯 Rekomendowany wariant: {rec.get("typ", "")}</h3>
-            <p>{rec.get("uzasadnienie", "")}</p>
+            <h3>🎯 Rekomendowany wariant: {_esc(rec.get("typ", ""))}</h3>
+            <p>{_esc(rec.get("uzasadnienie", ""))}</p>
             <div class="hook">
-                <div class="hook-text">{rec.get("hook", "")}</div>
+                <div class="hook-text">{_esc(rec.get("hook", ""))}</div>
             </div>
         </div>
         '''
@@ -495,7 +534,7 @@ def _build_polish_content(report: dict) -> str:
     score = quality.get("ocena", "?")
     status = quality.get("status", "")
     html += f'''
-    <h2>Ocena: <span class="strength">{score}/10</span> [{status}]</h2>
+    <h2>Ocena: <span class="strength">{_esc(score)}/10</span> [{_esc(status)}]</h2>
     '''
 
     # Mocne strony
@@ -503,7 +542,7 @@ def _build_polish_content(report: dict) -> str:
     if strengths:
         html += "<h3>✅ Mocne strony</h3><ul>"
         for s in strengths:
-            html += f'<li>{s}</li>'
+            html += f'<li>{_esc(s)}</li>'
         html += "</ul>"
 
     # Problemy
@@ -514,13 +553,13 @@ def _build_polish_content(report: dict) -> str:
             if isinstance(issue, dict):
                 html += f'''
                 <div class="card">
-                    <div class="card-title">{issue.get("problem", "")}</div>
-                    <p><strong>Gdzie:</strong> {issue.get("gdzie", "")}</p>
-                    <p><strong>Wpływ:</strong> {issue.get("wpływ", "")}</p>
+                    <div class="card-title">{_esc(issue.get("problem", ""))}</div>
+                    <p><strong>Gdzie:</strong> {_esc(issue.get("gdzie", ""))}</p>
+                    <p><strong>Wpływ:</strong> {_esc(issue.get("wpływ", ""))}</p>
                 </div>
                 '''
             else:
-                html += f'<div class="card">{issue}</div>'
+                html += f'<div class="card">{_esc(issue)}</div>'
 
     # Poprawki
     corrections = quality.get("poprawki_inline", [])
@@ -530,10 +569,10 @@ def _build_polish_content(report: dict) -> str:
             html += f'''
             <div class="card">
                 <p><strong>BYŁO:</strong></p>
-                <div class="quote">{corr.get("oryginał", corr.get("oryginal", ""))}</div>
+                <div class="quote">{_esc(corr.get("oryginał", corr.get("oryginal", "")))}</div>
                 <p><strong>JEST:</strong></p>
-                <div class="quote" style="border-color: var(--green);">{corr.get("poprawka", "")}</div>
-                <p><em>Powód: {corr.get("powód", corr.get("powod", ""))}</em></p>
+                <div class="quote" style="border-color: var(--green);">{_esc(corr.get("poprawka", ""))}</div>
+                <p><em>Powód: {_esc(corr.get("powód", corr.get("powod", "")))}</em></p>
             </div>
             '''
 
@@ -542,7 +581,7 @@ def _build_polish_content(report: dict) -> str:
     if improved:
         html += f'''
         <h3>📝 Wersja po poprawkach</h3>
-        <div class="card" style="white-space: pre-wrap;">{improved}</div>
+        <div class="card" style="white-space: pre-wrap;">{_esc(improved)}</div>
         '''
 
     # Alternatywne hooki
@@ -550,7 +589,7 @@ def _build_polish_content(report: dict) -> str:
     if alt_hooks:
         html += "<h3>🎣 Alternatywne hooki</h3>"
         for i, hook in enumerate(alt_hooks, 1):
-            html += f'<div class="hook"><div class="hook-text">{i}. {hook}</div></div>'
+            html += f'<div class="hook"><div class="hook-text">{i}. {_esc(hook)}</div></div>'
 
     return html
 
@@ -670,10 +709,10 @@ def _build_hooks_section(report: dict) -> str:
     for hook in unique_hooks[:8]:
         html += f'''
         <div class="hook">
-            <div class="hook-text">{hook["text"]}</div>
+            <div class="hook-text">{_esc(hook["text"])}</div>
             <div class="hook-meta">
-                <span>{hook["source"]}</span>
-                <span class="strength">{hook["strength"]}</span>
+                <span>{_esc(hook["source"])}</span>
+                <span class="strength">{_esc(hook["strength"])}</span>
             </div>
         </div>
         '''
@@ -681,9 +720,8 @@ def _build_hooks_section(report: dict) -> str:
     return html
 
 
-def _build_agents_section(report: dict) -> str:
-    """Buduje sekcję z raportami agentów analitycznych."""
-    html = ""
+def _iter_agents_section(report: dict) -> Iterator[str]:
+    """Sekcje raportów agentów analitycznych - po jednym fragmencie na agenta."""
 
     # Mapowanie danych - podstawowe agenty
     direct_data = {
@@ -722,18 +760,18 @@ def _build_agents_section(report: dict) -> str:
         verdict = source_analysis_data.get("werdykt_zaufania", "")
         level = source_analysis_data.get("poziom_zaufania", 0)
         color = {"MOCNE": "var(--green)", "UMIARKOWANE": "var(--yellow)", "SŁABE": "#ff9f43", "WĄTPLIWE": "#ff6b6b"}.get(verdict, "var(--text-dim)")
-        agent_html += f'<div class="agent-item"><div class="agent-label">Wiarygodność</div><span style="color:{color};font-weight:bold;">{verdict}</span> ({level}/10)</div>'
+        agent_html += f'<div class="agent-item"><div class="agent-label">Wiarygodność</div><span style="color:{color};font-weight:bold;">{_esc(verdict)}</span> ({_esc(level)}/10)</div>'
 
         # Tłumaczenie dla laika
         summary = source_analysis_data.get("tlumaczenie_dla_laika", "")
         if summary:
-            agent_html += f'<div class="agent-item"><div class="agent-label">Podsumowanie dla laika</div><div class="quote">{summary}</div></div>'
+            agent_html += f'<div class="agent-item"><div class="agent-label">Podsumowanie dla laika</div><div class="quote">{_esc(summary)}</div></div>'
 
         # Metodologia
         methodology = source_analysis_data.get("jak", {})
         if methodology:
             method_str = f"N={methodology.get('proba_n', '?')}, {methodology.get('metodologia', '')}"
-            agent_html += f'<div class="agent-item"><div class="agent-label">Metodologia</div>{method_str}</div>'
+            agent_html += f'<div class="agent-item"><div class="agent-label">Metodologia</div>{_esc(method_str)}</div>'
 
         # Kluczowe ograniczenia
         limitations = source_analysis_data.get("ograniczenia", [])
@@ -741,14 +779,14 @@ def _build_agents_section(report: dict) -> str:
             if isinstance(lim, dict):
                 impact = lim.get("wplyw", "")
                 impact_color = {"KRYTYCZNE": "#ff6b6b", "ISTOTNE": "var(--yellow)", "DROBNE": "var(--text-dim)"}.get(impact, "var(--text-dim)")
-                agent_html += f'<div class="agent-item"><div class="agent-label">Ograniczenie <span style="color:{impact_color};">[{impact}]</span></div>{lim.get("ograniczenie", "")} - {lim.get("co_to_znaczy", "")}</div>'
+                agent_html += f'<div class="agent-item"><div class="agent-label">Ograniczenie <span style="color:{impact_color};">[{_esc(impact)}]</span></div>{_esc(lim.get("ograniczenie", ""))} - {_esc(lim.get("co_to_znaczy", ""))}</div>'
 
         # Bezpieczne twierdzenia
         safe = source_analysis_data.get("bezpieczne_twierdzenia", [])
         if safe:
             agent_html += '<div class="agent-item"><div class="agent-label">Bezpieczne twierdzenia</div><ul style="margin:0.5rem 0 0 1rem;">'
             for s in safe[:3]:
-                agent_html += f'<li style="color:var(--green);">{s}</li>'
+                agent_html += f'<li style="color:var(--green);">{_esc(s)}</li>'
             agent_html += '</ul></div>'
 
         # Ryzykowne twierdzenia
@@ -756,18 +794,18 @@ def _build_agents_section(report: dict) -> str:
         if risky:
             agent_html += '<div class="agent-item"><div class="agent-label">Ryzykowne twierdzenia</div><ul style="margin:0.5rem 0 0 1rem;">'
             for r in risky[:3]:
-                agent_html += f'<li style="color:#ff6b6b;">{r}</li>'
+                agent_html += f'<li style="color:#ff6b6b;">{_esc(r)}</li>'
             agent_html += '</ul></div>'
 
         agent_html += '</div>'
-        html += agent_html
+        yield agent_html
 
     # Renderuj podstawowe agenty
     for agent_name, data in direct_data.items():
         if not data:
             continue
 
-        agent_html = f'<div class="agent-section"><h3 class="agent-title">{agent_name}</h3>'
+        agent_html = f'<div class="agent-section"><h3 class="agent-title">{_esc(agent_name)}</h3>'
 
         # Antropolog
         if agent_name == "Antropolog":
@@ -777,9 +815,9 @@ def _build_agents_section(report: dict) -> str:
                     if isinstance(item, dict):
                         main = item.get("scena", item.get("podzial", item.get("emocja", "")))
                         quote = item.get("cytat", "")
-                        agent_html += f'<div class="agent-item"><div class="agent-label">{label}</div>{main}'
+                        agent_html += f'<div class="agent-item"><div class="agent-label">{_esc(label)}</div>{_esc(main)}'
                         if quote:
-                            agent_html += f'<div class="quote">"{quote}"</div>'
+                            agent_html += f'<div class="quote">"{_esc(quote)}"</div>'
                         agent_html += '</div>'
 
         # Polski Kontekstualizator
@@ -790,9 +828,9 @@ def _build_agents_section(report: dict) -> str:
                     if isinstance(item, dict):
                         main = item.get("polskie", item.get("temat", item.get("co", item.get("zagraniczne", ""))))
                         detail = item.get("jak_podpiac", item.get("liczba", ""))
-                        agent_html += f'<div class="agent-item"><div class="agent-label">{label}</div>{main}'
+                        agent_html += f'<div class="agent-item"><div class="agent-label">{_esc(label)}</div>{_esc(main)}'
                         if detail:
-                            agent_html += f'<br><small>{detail}</small>'
+                            agent_html += f'<br><small>{_esc(detail)}</small>'
                         agent_html += '</div>'
 
         # Kurator Popkultury
@@ -802,71 +840,70 @@ def _build_agents_section(report: dict) -> str:
                 for item in items[:2]:
                     if isinstance(item, dict):
                         main = item.get("analogia", item.get("źródło", ""))
-                        agent_html += f'<div class="agent-item"><div class="agent-label">{label}</div>{main}</div>'
+                        agent_html += f'<div class="agent-item"><div class="agent-label">{_esc(label)}</div>{_esc(main)}</div>'
 
         agent_html += '</div>'
-        html += agent_html
+        yield agent_html
 
     # Renderuj nowe agenty kreatywne
     for agent_name, data in creative_data.items():
         if not data:
             continue
 
-        agent_html = f'<div class="agent-section"><h3 class="agent-title">{agent_name}</h3>'
+        agent_html = f'<div class="agent-section"><h3 class="agent-title">{_esc(agent_name)}</h3>'
 
         # Archeolog Historii
         if agent_name == "Archeolog Historii":
             if data.get("post_narracyjny"):
-                agent_html += f'<div class="agent-item"><div class="agent-label">Post narracyjny</div><div class="quote">{data["post_narracyjny"]}</div></div>'
+                agent_html += f'<div class="agent-item"><div class="agent-label">Post narracyjny</div><div class="quote">{_esc(data["post_narracyjny"])}</div></div>'
             for item in data.get("alternatywne_katy", [])[:3]:
                 if isinstance(item, dict):
-                    agent_html += f'<div class="agent-item"><div class="agent-label">{item.get("perspektywa", "Kąt")}</div>{item.get("hook", "")}</div>'
+                    agent_html += f'<div class="agent-item"><div class="agent-label">{_esc(item.get("perspektywa", "Kąt"))}</div>{_esc(item.get("hook", ""))}</div>'
 
         # Architekt Napięcia
         elif agent_name == "Architekt Napięcia":
             verdict = data.get("werdykt", "")
             if verdict:
                 color = {"NAPIĘCIE": "var(--green)", "PRZEWIDYWALNE": "var(--yellow)", "PŁASKIE": "#ff6b6b"}.get(verdict, "var(--text-dim)")
-                agent_html += f'<div class="agent-item"><div class="agent-label">Werdykt</div><span style="color:{color};font-weight:bold;">{verdict}</span> (napięcie: {data.get("napiecie_lacznie", "?")}/10)</div>'
+                agent_html += f'<div class="agent-item"><div class="agent-label">Werdykt</div><span style="color:{color};font-weight:bold;">{_esc(verdict)}</span> (napięcie: {_esc(data.get("napiecie_lacznie", "?"))}/10)</div>'
             transform = data.get("transformacja", {})
             if transform.get("po"):
-                agent_html += f'<div class="agent-item"><div class="agent-label">Transformacja</div><div class="quote">{transform.get("po", "")}</div><small>{transform.get("co_zmienione", "")}</small></div>'
+                agent_html += f'<div class="agent-item"><div class="agent-label">Transformacja</div><div class="quote">{_esc(transform.get("po", ""))}</div><small>{_esc(transform.get("co_zmienione", ""))}</small></div>'
 
         # Antropolog Absurdu
         elif agent_name == "Antropolog Absurdu":
             verdict = data.get("werdykt", "")
             if verdict:
                 color = {"GŁĘBIA": "var(--green)", "POWIERZCHNIA": "var(--yellow)", "MANUAL": "#ff6b6b"}.get(verdict, "var(--text-dim)")
-                agent_html += f'<div class="agent-item"><div class="agent-label">Werdykt</div><span style="color:{color};font-weight:bold;">{verdict}</span> (głębia: {data.get("poziom_glebi", "?")}/10)</div>'
+                agent_html += f'<div class="agent-item"><div class="agent-label">Werdykt</div><span style="color:{color};font-weight:bold;">{_esc(verdict)}</span> (głębia: {_esc(data.get("poziom_glebi", "?"))}/10)</div>'
             for item in data.get("bledy_poznawcze", [])[:2]:
                 if isinstance(item, dict):
-                    agent_html += f'<div class="agent-item"><div class="agent-label">{item.get("nazwa", "Błąd")}</div>{item.get("zdanie", item.get("w_kontekscie", ""))}</div>'
+                    agent_html += f'<div class="agent-item"><div class="agent-label">{_esc(item.get("nazwa", "Błąd"))}</div>{_esc(item.get("zdanie", item.get("w_kontekscie", "")))}</div>'
 
         # Komik
         elif agent_name == "Komik":
-            agent_html += f'<div class="agent-item"><div class="agent-label">Potencjał humoru</div>{data.get("potencjal_humoru", "?")}/10 (dial: {data.get("rekomendowany_dial", "?")}/5)</div>'
+            agent_html += f'<div class="agent-item"><div class="agent-label">Potencjał humoru</div>{_esc(data.get("potencjal_humoru", "?"))}/10 (dial: {_esc(data.get("rekomendowany_dial", "?"))}/5)</div>'
             versions = data.get("wersje_wg_dial", {})
             for key, version in list(versions.items())[:2]:
                 if version:
-                    agent_html += f'<div class="agent-item"><div class="agent-label">{key}</div><div class="quote">{version}</div></div>'
+                    agent_html += f'<div class="agent-item"><div class="agent-label">{_esc(key)}</div><div class="quote">{_esc(version)}</div></div>'
 
         # Inżynier Zaangażowania
         elif agent_name == "Inżynier Zaangażowania":
-            agent_html += f'<div class="agent-item"><div class="agent-label">Potencjał zaangażowania</div>{data.get("potencjal_zaangazowania", "?")}/10</div>'
+            agent_html += f'<div class="agent-item"><div class="agent-label">Potencjał zaangażowania</div>{_esc(data.get("potencjal_zaangazowania", "?"))}/10</div>'
             cta = data.get("opcje_cta", {})
             for key, value in list(cta.items())[:3]:
                 if value:
-                    agent_html += f'<div class="agent-item"><div class="agent-label">CTA: {key}</div>{value}</div>'
+                    agent_html += f'<div class="agent-item"><div class="agent-label">CTA: {_esc(key)}</div>{_esc(value)}</div>'
 
         # Adwokat Diabła
         elif agent_name == "Adwokat Diabła":
             verdict = data.get("werdykt", "")
             color = {"OK": "var(--green)", "WYMAGA_POPRAWEK": "var(--yellow)", "NIE_PUBLIKUJ": "#ff6b6b"}.get(verdict, "var(--text-dim)")
-            agent_html += f'<div class="agent-item"><div class="agent-label">Werdykt</div><span style="color:{color};font-weight:bold;">{verdict}</span> (siła argumentu: {data.get("sila_argumentu", "?")}/10)</div>'
+            agent_html += f'<div class="agent-item"><div class="agent-label">Werdykt</div><span style="color:{color};font-weight:bold;">{_esc(verdict)}</span> (siła argumentu: {_esc(data.get("sila_argumentu", "?"))}/10)</div>'
             for q in data.get("niewygodne_pytania", [])[:3]:
-                agent_html += f'<div class="agent-item"><div class="agent-label">Pytanie</div>{q}</div>'
+                agent_html += f'<div class="agent-item"><div class="agent-label">Pytanie</div>{_esc(q)}</div>'
 
         agent_html += '</div>'
-        html += agent_html
+        yield agent_html
 
-    return html
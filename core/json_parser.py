@@ -0,0 +1,405 @@
+"""
+Parser odpowiedzi JSON modeli - jeden przebieg, także przyrostowo (delty strumienia).
+
+Zastępuje kopiowane w agentach regexy ```json i `_repair_truncated_json`:
+- znajduje początek JSON (blok ```json / ``` albo pierwszy { lub [); w pełnej
+  odpowiedzi blok ```json ma pierwszeństwo, a nawiasy w prozie ("[1]") są pomijane
+- w jednym przebiegu śledzi stringi, escape'y i stos nawiasów
+- kończy, gdy zamknie się wartość najwyższego poziomu (reszta tekstu jest ignorowana)
+- ucięcie naprawia strukturalnie: cofa do ostatniego kompletnego elementu
+  (albo domyka ucięty string-wartość) i zamyka nawiasy w odwrotnej kolejności
+- usuwa przecinki przed } i ] (częsty błąd modeli)
+"""
+
+import json
+import re
+from dataclasses import dataclass, field
+from typing import Any, Optional, List, Tuple
+
+# Zmiana logiki parsera = nowa wersja (np. unieważnia cache sparsowanych wyników)
+PARSER_VERSION = 2
+
+# Ile razy szukać kolejnego kandydata, gdy poprzedni nie dał obiektu JSON
+# ({nawias} albo [1] w tekście przed właściwym JSON)
+_MAX_RESTARTS = 8
+
+_JSON_FENCE = re.compile(r"```[ \t]*json[ \t]*\n", re.IGNORECASE)
+
+_SEEK = re.compile(r"```|[{\[]")
+# Strumień (objects_only): obiekt od początku linii albo dowolny { w bloku ```json
+_SEEK_OBJECT = re.compile(r"```|^[ \t]*\{", re.MULTILINE)
+_SEEK_FENCED_OBJECT = re.compile(r"```|\{")
+_STRUCT = re.compile(r'[{}\[\]",:]')
+_IN_STRING = re.compile(r'["\\]')
+_CLOSERS = {"{": "}", "[": "]"}
+_DECODER = json.JSONDecoder(strict=False)
+
+
+@dataclass
+class ParseDiagnostics:
+    """Co parser znalazł i co musiał naprawić."""
+    source: str = "none"  # "fence" (blok ```), "raw" (JSON w tekście) lub "none"
+    complete: bool = False  # wartość najwyższego poziomu zamknięta przez model
+    truncated: bool = False  # odpowiedź urwana w środku JSON
+    repaired: bool = False  # wynik wymagał naprawy
+    dropped_chars: int = 0  # odcięty niekompletny ogon
+    closed_containers: int = 0  # dopisane } / ]
+    closed_string: bool = False  # domknięty ucięty string-wartość
+    trailing_commas: int = 0  # usunięte przecinki przed } / ]
+    restarts: int = 0  # pominięci kandydaci (np. {nawias} w tekście przed JSON)
+    error: Optional[str] = None
+    error_pos: int = 0
+
+    def summary(self) -> str:
+        """Krótki opis do logów."""
+        parts = [self.source]
+        if self.truncated:
+            parts.append(f"ucięte, odcięto {self.dropped_chars} zn.")
+        if self.closed_string:
+            parts.append("domknięty string")
+        if self.closed_containers:
+            parts.append(f"zamknięto {self.closed_containers} nawiasów")
+        if self.trailing_commas:
+            parts.append(f"usunięto {self.trailing_commas} przecinków")
+        if self.error:
+            parts.append(f"błąd: {self.error}")
+        return ", ".join(parts)
+
+
+@dataclass
+class ParseResult:
+    """Wynik parsowania: dane + diagnostyka."""
+    data: Any = None
+    diagnostics: ParseDiagnostics = field(default_factory=ParseDiagnostics)
+
+    @property
+    def ok(self) -> bool:
+        return self.diagnostics.error is None and self.data is not None
+
+    def as_dict(self) -> dict:
+        """Dane jako słownik (pusty, jeśli to nie obiekt)."""
+        return self.data if isinstance(self.data, dict) else {}
+
+
+class IncrementalJSONParser:
+    """
+    Przyrostowy parser JSON z odpowiedzi modelu.
+
+    Użycie:
+        parser = IncrementalJSONParser()
+        for delta in stream:
+            parser.feed(delta)
+            if parser.complete:
+                break  # obiekt zamknięty - dalszy tekst niepotrzebny
+        result = parser.result()
+
+    objects_only (strumień z wczesnym zatrzymaniem): wartość zaczyna się tylko
+    od "{" na początku linii albo w bloku ```json - nawias w prozie przed
+    właściwym JSON ("Analiza [wstępna] poniżej:") nie zamyka strumienia.
+    """
+
+    def __init__(self, objects_only: bool = False):
+        self._objects_only = objects_only
+        self._in_block = False
+        self._text = ""
+        self._pos = 0
+        self._phase = "seek"  # seek -> value -> done
+        self._fenced = False
+        self._start = 0
+        self._end = 0
+        self._stack: List[str] = []
+        self._in_string = False
+        self._string_is_key = False
+        self._last_sig = ""  # ostatni znaczący znak poza stringiem ("v" = wartość skalarna)
+        self._last_comma = -1
+        self._safe_points: List[Tuple[int, Tuple[str, ...]]] = []
+        self._dropped_commas: List[int] = []
+
+    @property
+    def complete(self) -> bool:
+        """Czy wartość najwyższego poziomu została zamknięta."""
+        return self._phase == "done"
+
+    @property
+    def started(self) -> bool:
+        """Czy znaleziono początek JSON."""
+        return self._phase != "seek"
+
+    @property
+    def fenced(self) -> bool:
+        """Czy JSON był w bloku ```."""
+        return self._fenced
+
+    @property
+    def start_offset(self) -> Optional[int]:
+        """Pozycja początku wartości najwyższego poziomu (None = jeszcze nie znaleziona)."""
+        return self._start if self._phase != "seek" else None
+
+    @property
+    def end_offset(self) -> Optional[int]:
+        """Pozycja za zamknięciem wartości najwyższego poziomu (None = jeszcze otwarta)."""
+        return self._end if self._phase == "done" else None
+
+    def feed(self, chunk: str) -> None:
+        """Dokłada fragment odpowiedzi i przesuwa skaner."""
+        self.feed_pending(chunk)
+        if self._phase == "value":
+            self._scan()
+
+    def parse_text(self, text: str) -> ParseResult:
+        """
+        Parsuje pełną odpowiedź.
+
+        Poprawny JSON dekoduje od razu dekoder C (raw_decode od znalezionego
+        początku); skaner znaków rusza tylko, gdy trzeba naprawiać.
+        """
+        self.feed_pending(text)
+        if self._phase == "value":
+            try:
+                data, end = _DECODER.raw_decode(self._text, self._start)
+            except json.JSONDecodeError:
+                self._scan()
+            else:
+                self._phase = "done"
+                self._end = end
+                diagnostics = ParseDiagnostics(source="fence" if self._fenced else "raw", complete=True)
+                return ParseResult(data=data, diagnostics=diagnostics)
+        return self.result()
+
+    def feed_pending(self, chunk: str) -> None:
+        """Dokłada tekst i szuka początku JSON, bez skanowania wartości."""
+        if self._phase == "done" or not chunk:
+            return
+        self._text += chunk
+        if self._phase == "seek":
+            self._seek()
+
+    def _seek(self) -> None:
+        text = self._text
+        while True:
+            if not self._objects_only:
+                pattern = _SEEK
+            else:
+                pattern = _SEEK_FENCED_OBJECT if self._fenced else _SEEK_OBJECT
+            match = pattern.search(text, self._pos)
+            if not match:
+                # Zostaw ewentualny początek ``` na następną deltę
+                self._pos = max(self._pos, len(text) - 2)
+                return
+
+            if match.group() == "```":
+                line_end = text.find("\n", match.end())
+                if line_end < 0:
+                    # Czekamy na koniec linii z językiem bloku
+                    self._pos = match.start()
+                    return
+                if self._objects_only:
+                    # ``` na przemian otwiera i zamyka blok; obiekt szukany tylko w ```json / ```
+                    self._in_block = not self._in_block
+                    language = text[match.end():line_end].strip().lower()
+                    self._fenced = self._in_block and language in ("", "json")
+                else:
+                    self._fenced = True
+                self._pos = line_end + 1
+                continue
+
+            start = match.end() - 1 if self._objects_only else match.start()
+            self._phase = "value"
+            self._start = start
+            self._pos = start
+            return
+
+    def _scan(self) -> None:
+        text = self._text
+        length = len(text)
+        pos = self._pos
+
+        while pos < length:
+            if self._in_string:
+                match = _IN_STRING.search(text, pos)
+                if not match:
+                    pos = length
+                    break
+                idx = match.start()
+                if text[idx] == "\\":
+                    if idx + 1 >= length:
+                        pos = idx  # escape rozdzielony między delty
+                        break
+                    pos = idx + 2
+                    continue
+                # Koniec stringa
+                self._in_string = False
+                self._last_sig = '"'
+                pos = idx + 1
+                if not self._string_is_key:
+                    self._safe_points.append((pos, tuple(self._stack)))
+                continue
+
+            match = _STRUCT.search(text, pos)
+            if not match:
+                if text[pos:].strip():
+                    self._last_sig = "v"
+                pos = length
+                break
+
+            idx = match.start()
+            char = text[idx]
+            if idx > pos and text[pos:idx].strip():
+                self._last_sig = "v"
+
+            if char == '"':
+                self._in_string = True
+                self._string_is_key = bool(self._stack) and self._stack[-1] == "{" and self._last_sig in ("{", ",")
+            elif char in "{[":
+                self._stack.append(char)
+                self._last_sig = char
+                self._safe_points.append((idx + 1, tuple(self._stack)))
+            elif char in "}]":
+                if self._last_sig == ",":
+                    self._dropped_commas.append(self._last_comma)
+                if self._stack:
+                    self._stack.pop()
+                self._last_sig = char
+                if not self._stack:
+                    self._phase = "done"
+                    self._end = idx + 1
+                    self._pos = idx + 1
+                    return
+                self._safe_points.append((idx + 1, tuple(self._stack)))
+            elif char == ",":
+                self._safe_points.append((idx, tuple(self._stack)))
+                self._last_comma = idx
+                self._last_sig = ","
+            else:  # ":"
+                self._last_sig = ":"
+
+            pos = idx + 1
+
+        self._pos = pos
+
+    def result(self) -> ParseResult:
+        """Zwraca wynik dla dotychczas podanego tekstu (z naprawą ucięcia)."""
+        diagnostics = ParseDiagnostics(source="fence" if self._fenced else "raw")
+
+        if self._phase == "seek":
+            diagnostics.source = "none"
+            diagnostics.error = "Brak JSON w odpowiedzi"
+            return ParseResult(diagnostics=diagnostics)
+
+        if self._phase == "done":
+            diagnostics.complete = True
+            segment = self._segment(self._start, self._end, diagnostics)
+            return self._load(segment, diagnostics)
+
+        diagnostics.truncated = True
+        diagnostics.repaired = True
+
+        # Ucięcie w środku stringa-wartości - zachowaj tekst, domknij cudzysłów
+        if self._in_string and not self._string_is_key:
+            partial = self._segment(self._start, len(self._text), diagnostics)
+            partial = _trim_incomplete_escape(partial)
+            closers = _closers(self._stack)
+            result = self._try_load(partial + '"' + closers)
+            if result is not None:
+                diagnostics.closed_string = True
+                diagnostics.closed_containers = len(self._stack)
+                return ParseResult(data=result, diagnostics=diagnostics)
+
+        for cut, stack in reversed(self._safe_points):
+            segment = self._segment(self._start, cut, diagnostics, count_commas=False)
+            data = self._try_load(segment + _closers(stack))
+            if data is not None:
+                diagnostics.dropped_chars = len(self._text) - cut
+                diagnostics.closed_containers = len(stack)
+                diagnostics.trailing_commas = sum(1 for c in self._dropped_commas if c < cut)
+                return ParseResult(data=data, diagnostics=diagnostics)
+
+        diagnostics.error = "Nie udało się naprawić uciętego JSON"
+        return ParseResult(diagnostics=diagnostics)
+
+    def _segment(self, start: int, end: int, diagnostics: ParseDiagnostics, count_commas: bool = True) -> str:
+        """Fragment tekstu bez przecinków przed } / ]."""
+        drops = [c for c in self._dropped_commas if start <= c < end]
+        if count_commas:
+            diagnostics.trailing_commas = len(drops)
+            if drops:
+                diagnostics.repaired = True
+        if not drops:
+            return self._text[start:end]
+        parts = []
+        prev = start
+        for comma in drops:
+            parts.append(self._text[prev:comma])
+            prev = comma + 1
+        parts.append(self._text[prev:end])
+        return "".join(parts)
+
+    def _load(self, segment: str, diagnostics: ParseDiagnostics) -> ParseResult:
+        try:
+            return ParseResult(data=json.loads(segment, strict=False), diagnostics=diagnostics)
+        except json.JSONDecodeError as e:
+            diagnostics.error = e.msg
+            diagnostics.error_pos = self._start + e.pos
+            return ParseResult(diagnostics=diagnostics)
+
+    @staticmethod
+    def _try_load(segment: str) -> Any:
+        try:
+            return json.loads(segment, strict=False)
+        except json.JSONDecodeError:
+            return None
+
+
+def _closers(stack) -> str:
+    return "".join(_CLOSERS[c] for c in reversed(stack))
+
+
+def _trim_incomplete_escape(text: str) -> str:
+    """Usuwa niedokończoną sekwencję escape z końca uciętego stringa."""
+    backslashes = len(text) - len(text.rstrip("\\"))
+    if backslashes % 2:
+        return text[:-1]
+    unicode_escape = re.search(r"\\u[0-9a-fA-F]{0,3}$", text)
+    if unicode_escape and (len(text[:unicode_escape.start()]) - len(text[:unicode_escape.start()].rstrip("\\"))) % 2 == 0:
+        return text[:unicode_escape.start()]
+    return text
+
+
+def parse_json_response(text: str) -> ParseResult:
+    """
+    Parsuje JSON z pełnej odpowiedzi modelu.
+
+    Blok ```json ma pierwszeństwo przed nawiasami w tekście przed nim. Bez bloku
+    (albo gdy nie ma w nim obiektu) brany jest pierwszy kandydat, który daje
+    obiekt: niepoprawny ({nawias}) albo nie-obiekt ([1], [1, 2]) jest pomijany -
+    do _MAX_RESTARTS razy. Gdy żaden kandydat nie daje obiektu, zwracany jest
+    wynik pierwszego.
+    """
+    fence = _JSON_FENCE.search(text)
+    if fence:
+        result = IncrementalJSONParser().parse_text(text[fence.start():])
+        if result.ok and isinstance(result.data, dict):
+            return result
+
+    first = None
+    offset = 0
+    restarts = 0
+    while True:
+        parser = IncrementalJSONParser()
+        result = parser.parse_text(text[offset:])
+        result.diagnostics.restarts = restarts
+        if result.ok and isinstance(result.data, dict):
+            return result
+        if first is None:
+            first = result
+        if not parser.started or restarts >= _MAX_RESTARTS:
+            return first
+
+        start = parser._start
+        if parser.complete and result.ok:
+            offset += parser._end  # zamknięty nie-obiekt ([1, 2]) - szukaj za nim
+        elif parser.complete or parser._text[start] == "[":
+            offset += start + 1  # niepoprawny kandydat albo niezamknięty [ w prozie
+        else:
+            return first  # ucięty obiekt bez naprawy - jego wnętrze nie jest odpowiedzią
+        restarts += 1
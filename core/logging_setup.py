@@ -0,0 +1,127 @@
+"""
+Logowanie bez blokowania wątków wywołań API.
+
+Loggery odkładają rekordy do kolejki w pamięci (QueueHandler), a zapis do
+plików z rotacją po rozmiarze wykonuje jeden wątek QueueListener - kilkadziesiąt
+równoległych wywołań agentów nie czeka na dysk. Konfiguracja raz przy starcie
+aplikacji (cli_v3.main, app.py); moduły tylko pobierają logger.
+
+Pliki w logs/:
+- orchestrator_v3.log - orkiestrator i agenci (loggery "orchestrator_v3", "agents.*")
+- api.log - pozostałe (klient API, czytnik plików, magazyn wyników...)
+"""
+
+import atexit
+import logging
+import os
+import queue
+import threading
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from pathlib import Path
+from typing import Optional
+
+LOG_DIR = Path(__file__).parent.parent / "logs"
+
+DEFAULT_LEVEL = "INFO"
+DEFAULT_MAX_MB = 10
+DEFAULT_BACKUPS = 5
+
+ORCHESTRATOR_LOGGERS = ("orchestrator_v3", "agents")
+
+_listener: Optional[QueueListener] = None
+_queue_handler: Optional[QueueHandler] = None
+_lock = threading.Lock()
+
+
+class _LoggerPrefixFilter(logging.Filter):
+    """Przepuszcza rekordy loggerów z listy (include=True) albo wszystkie pozostałe."""
+
+    def __init__(self, prefixes: tuple, include: bool):
+        super().__init__()
+        self.prefixes = prefixes
+        self.include = include
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        matched = any(
+            record.name == prefix or record.name.startswith(prefix + ".")
+            for prefix in self.prefixes
+        )
+        return matched == self.include
+
+
+def _file_handler(path: Path, max_bytes: int, backup_count: int, fmt: str, include: bool) -> RotatingFileHandler:
+    handler = RotatingFileHandler(
+        path, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8", delay=True
+    )
+    handler.setFormatter(logging.Formatter(fmt))
+    handler.addFilter(_LoggerPrefixFilter(ORCHESTRATOR_LOGGERS, include=include))
+    return handler
+
+
+def setup_logging(
+    log_dir: Optional[Path] = None,
+    level: Optional[str] = None,
+    max_mb: Optional[float] = None,
+    backup_count: Optional[int] = None,
+) -> QueueListener:
+    """
+    Podpina kolejkę logów pod root logger i uruchamia wątek zapisu.
+
+    Kolejne wywołania (np. reruny Streamlit) nic nie zmieniają.
+
+    Args:
+        log_dir: Katalog logów (domyślnie logs/)
+        level: Poziom (domyślnie LOG_LEVEL lub INFO)
+        max_mb: Rozmiar pliku przed rotacją (domyślnie LOG_MAX_MB lub 10; 0 = bez rotacji)
+        backup_count: Liczba starych plików (domyślnie LOG_BACKUPS lub 5)
+    """
+    global _listener, _queue_handler
+    with _lock:
+        if _listener is not None:
+            return _listener
+
+        log_dir = Path(log_dir) if log_dir else LOG_DIR
+        log_dir.mkdir(parents=True, exist_ok=True)
+        level = (level or os.getenv("LOG_LEVEL", DEFAULT_LEVEL)).upper()
+        if max_mb is None:
+            max_mb = float(os.getenv("LOG_MAX_MB", str(DEFAULT_MAX_MB)))
+        if backup_count is None:
+            backup_count = int(os.getenv("LOG_BACKUPS", str(DEFAULT_BACKUPS)))
+        max_bytes = int(max_mb * 1024 * 1024)
+
+        handlers = (
+            _file_handler(
+                log_dir / "api.log", max_bytes, backup_count,
+                "%(asctime)s - %(levelname)s - %(message)s", include=False,
+            ),
+            _file_handler(
+                log_dir / "orchestrator_v3.log", max_bytes, backup_count,
+                "%(asctime)s [%(levelname)s] %(name)s: %(message)s", include=True,
+            ),
+        )
+
+        # Kolejka bez limitu - pełna kolejka blokowałaby wątek wywołania API
+        log_queue: "queue.SimpleQueue" = queue.SimpleQueue()
+        _queue_handler = QueueHandler(log_queue)
+        root = logging.getLogger()
+        root.setLevel(level)
+        root.addHandler(_queue_handler)
+
+        _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+        _listener.start()
+        atexit.register(shutdown_logging)
+        return _listener
+
+
+def shutdown_logging() -> None:
+    """Zapisuje rekordy z kolejki i zamyka pliki (wywoływane przy wyjściu)."""
+    global _listener, _queue_handler
+    with _lock:
+        if _listener is None:
+            return
+        logging.getLogger().removeHandler(_queue_handler)
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+        _queue_handler = None
@@ -0,0 +1,101 @@
+"""Trwały cache tekstu wyciągniętego z plików źródłowych (PDF, DOCX)."""
+
+import hashlib
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+PARSE_CACHE_DIR = Path(__file__).parent.parent / "logs" / "parse_cache"
+
+# Domyślny limit rozmiaru cache na dysku
+DEFAULT_MAX_MB = 200
+
+_write_lock = threading.Lock()
+
+
+class ParseCache:
+    """
+    Tekst pliku zapisany pod kluczem (ścieżka, rozmiar, mtime, wersja parsera).
+
+    Zmiana pliku zmienia rozmiar lub mtime, zmiana logiki ekstrakcji - wersję,
+    więc nieaktualne wpisy nigdy nie są trafiane; wypadają przy przekroczeniu
+    limitu (najdawniej używane pierwsze - trafienie odświeża mtime wpisu).
+    """
+
+    def __init__(self, directory: Optional[Path] = None, max_bytes: int = DEFAULT_MAX_MB * 1024 * 1024):
+        self.directory = Path(directory) if directory else PARSE_CACHE_DIR
+        self.max_bytes = max_bytes
+
+    @classmethod
+    def from_env(cls) -> Optional["ParseCache"]:
+        """Cache wg PARSE_CACHE / PARSE_CACHE_MAX_MB (None = wyłączony)."""
+        if os.getenv("PARSE_CACHE", "1").lower() in ("0", "false", "nie"):
+            return None
+        max_mb = float(os.getenv("PARSE_CACHE_MAX_MB", str(DEFAULT_MAX_MB)))
+        return cls(max_bytes=int(max_mb * 1024 * 1024))
+
+    def key(self, path: Path, version: int) -> str:
+        resolved = Path(path).resolve()
+        stat = resolved.stat()
+        raw = f"{resolved}|{stat.st_size}|{stat.st_mtime_ns}|{version}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, path: Path, version: int) -> Optional[str]:
+        """Tekst z cache lub None."""
+        entry = self.directory / f"{self.key(path, version)}.txt"
+        try:
+            text = entry.read_text(encoding="utf-8")
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            logger.warning(f"Nie udało się odczytać cache parsowania: {e}")
+            return None
+        try:
+            os.utime(entry)
+        except OSError:
+            pass
+        return text
+
+    def put(self, path: Path, version: int, text: str) -> None:
+        """Zapisuje tekst (atomowo) i przycina cache do limitu. Błędy zapisu nie przerywają pracy."""
+        try:
+            entry = self.directory / f"{self.key(path, version)}.txt"
+            self.directory.mkdir(parents=True, exist_ok=True)
+            tmp = entry.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp.write_text(text, encoding="utf-8")
+            os.replace(tmp, entry)
+            with _write_lock:
+                self._evict()
+        except OSError as e:
+            logger.warning(f"Nie udało się zapisać cache parsowania: {e}")
+
+    def _evict(self) -> None:
+        entries = []
+        for item in self.directory.glob("*.txt"):
+            try:
+                stat = item.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, item))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, item in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                item.unlink()
+                total -= size
+            except OSError:
+                continue
+
+    def clear(self) -> None:
+        """Usuwa wszystkie wpisy."""
+        for item in self.directory.glob("*.txt"):
+            try:
+                item.unlink()
+            except OSError:
+                continue
@@ -0,0 +1,110 @@
+"""Statystyki parsowania odpowiedzi JSON per agent i model - które prompty się psują."""
+
+import json
+import logging
+import threading
+from dataclasses import dataclass, asdict
+from datetime import datetime
+from pathlib import Path
+from typing import Optional, List, Dict, Tuple
+
+logger = logging.getLogger(__name__)
+
+PARSE_STATS_PATH = Path(__file__).parent.parent / "logs" / "parse_stats.jsonl"
+
+# Wyniki parsowania
+OUTCOME_OK = "ok"  # poprawny JSON od razu
+OUTCOME_LOCAL_REPAIR = "local_repair"  # naprawa strukturalna (core/json_parser)
+OUTCOME_MODEL_REPAIR = "model_repair"  # naprawa szybkim modelem
+OUTCOME_FAILED = "failed"  # pusty raport
+
+_write_lock = threading.Lock()
+
+
+@dataclass
+class ParseRecord:
+    """Wynik parsowania jednej odpowiedzi agenta."""
+    agent: str
+    model_key: str
+    outcome: str
+    chars: int = 0
+    repair_model: Optional[str] = None
+    validation_errors: int = 0  # błędy względem schematu (core/schema_validator)
+    reasked: bool = False  # agent zapytany ponownie z listą błędów
+    timestamp: str = ""
+
+    def __post_init__(self):
+        if not self.timestamp:
+            self.timestamp = datetime.now().isoformat(timespec="seconds")
+
+
+@dataclass
+class ParseStats:
+    """Zagregowane wyniki parsowania dla (agent, model)."""
+    count: int
+    ok: int = 0
+    local_repair: int = 0
+    model_repair: int = 0
+    failed: int = 0
+    invalid: int = 0  # odpowiedzi niezgodne ze schematem
+
+    @property
+    def repair_rate(self) -> float:
+        """Odsetek odpowiedzi wymagających jakiejkolwiek naprawy lub nieudanych."""
+        return (self.local_repair + self.model_repair + self.failed) / self.count if self.count else 0.0
+
+    @property
+    def failure_rate(self) -> float:
+        return self.failed / self.count if self.count else 0.0
+
+    @property
+    def invalid_rate(self) -> float:
+        return self.invalid / self.count if self.count else 0.0
+
+
+def record_parse(record: ParseRecord, path: Optional[Path] = None) -> None:
+    """Dopisuje wynik parsowania (JSONL). Błędy zapisu nie przerywają pracy."""
+    target = Path(path) if path else PARSE_STATS_PATH
+    try:
+        target.parent.mkdir(parents=True, exist_ok=True)
+        line = json.dumps(asdict(record), ensure_ascii=False)
+        with _write_lock:
+            with open(target, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+    except OSError as e:
+        logger.warning(f"Nie udało się zapisać statystyk parsowania: {e}")
+
+
+def load_parse_records(path: Optional[Path] = None, limit: int = 5000) -> List[ParseRecord]:
+    """Wczytuje ostatnie `limit` wyników parsowania."""
+    target = Path(path) if path else PARSE_STATS_PATH
+    if not target.exists():
+        return []
+
+    try:
+        with open(target, "r", encoding="utf-8") as f:
+            lines = f.readlines()
+    except OSError as e:
+        logger.warning(f"Nie udało się wczytać statystyk parsowania: {e}")
+        return []
+
+    records = []
+    for line in lines[-limit:]:
+        try:
+            records.append(ParseRecord(**json.loads(line)))
+        except (json.JSONDecodeError, TypeError):
+            continue
+    return records
+
+
+def summarize_parse_stats(records: List[ParseRecord]) -> Dict[Tuple[str, str], ParseStats]:
+    """Agreguje wyniki parsowania po (agent, model), od najczęściej naprawianych."""
+    stats: Dict[Tuple[str, str], ParseStats] = {}
+    for rec in records:
+        entry = stats.setdefault((rec.agent, rec.model_key), ParseStats(count=0))
+        entry.count += 1
+        if rec.outcome in (OUTCOME_OK, OUTCOME_LOCAL_REPAIR, OUTCOME_MODEL_REPAIR, OUTCOME_FAILED):
+            setattr(entry, rec.outcome, getattr(entry, rec.outcome) + 1)
+        if rec.validation_errors:
+            entry.invalid += 1
+    return dict(sorted(stats.items(), key=lambda item: item[1].repair_rate, reverse=True))
@@ -0,0 +1,204 @@
+"""
+Przyrostowy indeks folderu z plikami źródłowymi (posts/).
+
+Indeks (nazwa -> rozmiar, mtime) jest trzymany w pamięci i zapisywany obok
+folderu (.posts_index.json). Odświeżenie przy niezmienionym mtime katalogu
+nic nie skanuje - dodanie, usunięcie i zmiana nazwy pliku zmieniają mtime
+katalogu. Edycja pliku w miejscu go nie zmienia, dlatego co FULL_RESCAN_SECONDS
+wykonywany jest pełny przegląd.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+INDEX_VERSION = 1
+
+# Co ile sekund przejrzeć pliki mimo niezmienionego katalogu (edycje w miejscu)
+FULL_RESCAN_SECONDS = 60.0
+
+_indexes: Dict[Tuple[Path, frozenset], "PostsIndex"] = {}
+_indexes_lock = threading.Lock()
+
+
+@dataclass
+class IndexPage:
+    """Strona wyników zapytania do indeksu."""
+    files: list  # List[SourceFile]
+    total: int  # liczba wszystkich pasujących plików
+
+
+class PostsIndex:
+    """Indeks plików jednego folderu (posortowany od najnowszych)."""
+
+    def __init__(self, folder: Path, extensions: Iterable[str], index_path: Optional[Path] = None):
+        self.folder = Path(folder).resolve()
+        self.extensions = frozenset(extensions)
+        self.index_path = index_path or self.folder.parent / f".{self.folder.name}_index.json"
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Tuple[int, int]] = {}  # nazwa -> (rozmiar, mtime_ns)
+        self._dir_mtime_ns: Optional[int] = None
+        self._last_full_scan = 0.0
+        self._sorted: Optional[list] = None
+        self._load()
+
+    def refresh(self, full: bool = False) -> int:
+        """
+        Uzgadnia indeks z dyskiem.
+
+        Args:
+            full: Wymuś przegląd wszystkich plików (wykrywa edycje w miejscu)
+
+        Returns:
+            Liczba zmienionych wpisów (dodane + usunięte + zmienione)
+        """
+        with self._lock:
+            try:
+                dir_mtime_ns = self.folder.stat().st_mtime_ns
+            except OSError:
+                changed = len(self._entries)
+                self._entries.clear()
+                self._sorted = None
+                return changed
+
+            now = time.monotonic()
+            if (
+                not full
+                and dir_mtime_ns == self._dir_mtime_ns
+                and now - self._last_full_scan < FULL_RESCAN_SECONDS
+            ):
+                return 0
+
+            changed = self._scan()
+            dir_changed = dir_mtime_ns != self._dir_mtime_ns
+            self._dir_mtime_ns = dir_mtime_ns
+            self._last_full_scan = now
+            if changed:
+                self._sorted = None
+            if changed or dir_changed:
+                self._save()
+            return changed
+
+    def _scan(self) -> int:
+        seen = {}
+        with os.scandir(self.folder) as it:
+            for entry in it:
+                if os.path.splitext(entry.name)[1].lower() not in self.extensions:
+                    continue
+                try:
+                    if not entry.is_file():
+                        continue
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                seen[entry.name] = (stat.st_size, stat.st_mtime_ns)
+
+        changed = len(self._entries.keys() - seen.keys())
+        changed += sum(1 for name, meta in seen.items() if self._entries.get(name) != meta)
+        self._entries = seen
+        return changed
+
+    def query(
+        self,
+        extensions: Optional[Iterable[str]] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        search: Optional[str] = None,
+        offset: int = 0,
+        limit: Optional[int] = None,
+    ) -> IndexPage:
+        """
+        Pliki od najnowszych, z filtrami i stronicowaniem (po odświeżeniu indeksu).
+
+        Args:
+            extensions: Tylko te rozszerzenia (np. {".pdf"})
+            since / until: Zakres daty modyfikacji
+            search: Fragment nazwy (bez rozróżniania wielkości liter)
+            offset / limit: Stronicowanie
+        """
+        self.refresh()
+        with self._lock:
+            files = self._sorted_files()
+
+        if extensions:
+            wanted = {ext.lower() if ext.startswith('.') else f".{ext.lower()}" for ext in extensions}
+            files = [f for f in files if f.extension in wanted]
+        if since:
+            files = [f for f in files if f.modified_time >= since]
+        if until:
+            files = [f for f in files if f.modified_time <= until]
+        if search:
+            needle = search.lower()
+            files = [f for f in files if needle in f.name.lower()]
+
+        end = None if limit is None else offset + limit
+        return IndexPage(files=files[offset:end], total=len(files))
+
+    def _sorted_files(self) -> list:
+        if self._sorted is None:
+            from .file_reader import SourceFile
+
+            files = [
+                SourceFile(
+                    path=self.folder / name,
+                    name=name,
+                    extension=os.path.splitext(name)[1].lower(),
+                    size_bytes=size,
+                    modified_time=datetime.fromtimestamp(mtime_ns / 1e9),
+                )
+                for name, (size, mtime_ns) in self._entries.items()
+            ]
+            files.sort(key=lambda f: f.modified_time, reverse=True)
+            self._sorted = files
+        return self._sorted
+
+    def _load(self) -> None:
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Nie udało się wczytać indeksu {self.index_path}: {e}")
+            return
+
+        if data.get("version") != INDEX_VERSION or data.get("folder") != str(self.folder):
+            return
+        self._entries = {name: tuple(meta) for name, meta in data.get("entries", {}).items()}
+        self._dir_mtime_ns = data.get("dir_mtime_ns")
+        # Zapisany indeks zastępuje pierwszy pełny przegląd (nowa sesja CLI / proces)
+        self._last_full_scan = time.monotonic()
+
+    def _save(self) -> None:
+        """Zapis atomowy; błąd (np. folder tylko do odczytu) zostawia indeks w pamięci."""
+        data = {
+            "version": INDEX_VERSION,
+            "folder": str(self.folder),
+            "dir_mtime_ns": self._dir_mtime_ns,
+            "entries": self._entries,
+        }
+        tmp = self.index_path.with_name(f"{self.index_path.name}.{os.getpid()}.tmp")
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp, self.index_path)
+        except OSError as e:
+            logger.warning(f"Nie udało się zapisać indeksu {self.index_path}: {e}")
+
+
+def get_index(folder: Path, extensions: Iterable[str]) -> PostsIndex:
+    """Wspólny indeks folderu w procesie (reruny Streamlit tworzą nowy FileReader)."""
+    key = (Path(folder).resolve(), frozenset(extensions))
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is None:
+            index = _indexes[key] = PostsIndex(folder, extensions)
+        return index
@@ -0,0 +1,544 @@
+"""
+Schematy odpowiedzi agentów (JSON Schema) dla structured output dostawców.
+
+Schematy odpowiadają formatom z promptów agentów (klucze po polsku). Używane przez
+UnifiedAPIClient: OpenAI/OpenRouter - response_format json_schema, Anthropic -
+wymuszone narzędzie z input_schema, Gemini - response_schema.
+
+Wymagane są tylko klucze najwyższego poziomu - zagnieżdżone pola są opcjonalne,
+żeby model nie wymyślał wartości, których nie ma w źródle.
+"""
+
+import copy
+from typing import Optional, Dict
+
+STR = {"type": "string"}
+INT = {"type": "integer"}
+NUM = {"type": "number"}
+BOOL = {"type": "boolean"}
+
+
+def _obj(properties: dict) -> dict:
+    return {"type": "object", "properties": properties}
+
+
+def _arr(items: dict) -> dict:
+    return {"type": "array", "items": items}
+
+
+def _report(properties: dict) -> dict:
+    """Schemat raportu agenta - wszystkie klucze najwyższego poziomu wymagane."""
+    return {"type": "object", "properties": properties, "required": list(properties)}
+
+
+# Klucz = nazwa agenta (BaseAgent.name) lub nazwa wywołania (np. "brief_extraction")
+RESPONSE_SCHEMAS = {
+    "extractor": _report({
+        "źródło": _obj({
+            "tytuł": STR,
+            "autor": STR,
+            "data": STR,
+            "link": STR,
+            "typ": STR,
+            "kluczowe_fakty": _arr(STR),
+        }),
+        "cytaty": _arr(_obj({
+            "cytat": STR,
+            "kto": STR,
+        })),
+        "liczby": _arr(_obj({
+            "wartosc": STR,
+            "kontekst": STR,
+        })),
+        "wnioski": _arr(STR),
+        "uwagi_usera": _obj({
+            "treść": STR,
+            "kierunek": STR,
+            "priorytet": STR,
+        }),
+    }),
+    "source_analyst": _report({
+        "poziom_zaufania": INT,
+        "werdykt_zaufania": STR,
+        "kto": _obj({
+            "autorzy": STR,
+            "wiarygodnosc": STR,
+            "konflikt_interesow": STR,
+        }),
+        "co": _obj({
+            "przedmiot": STR,
+            "hipoteza": STR,
+            "kontekst": STR,
+        }),
+        "jak": _obj({
+            "metodologia": STR,
+            "proba_n": STR,
+            "proba_kto": STR,
+            "warunki": STR,
+            "czas_trwania": STR,
+            "grupa_kontrolna": STR,
+        }),
+        "wyniki": _obj({
+            "glowny_wynik": STR,
+            "wielkosc_efektu": STR,
+            "istotnosc": STR,
+            "dodatkowe": STR,
+        }),
+        "ograniczenia": _arr(_obj({
+            "ograniczenie": STR,
+            "wplyw": STR,
+            "co_to_znaczy": STR,
+        })),
+        "tlumaczenie_dla_laika": STR,
+        "kluczowe_liczby": _arr(_obj({
+            "liczba": STR,
+            "co_znaczy": STR,
+            "kontekst": STR,
+        })),
+        "bezpieczne_twierdzenia": _arr(STR),
+        "ryzykowne_twierdzenia": _arr(STR),
+    }),
+    "resonance_hunter": _report({
+        "uwaga_usera_ocena": _obj({
+            "kierunek_usera": STR,
+            "ocena": STR,
+        }),
+        "filtry_bazowe": _arr(_obj({
+            "hook": STR,
+            "źródło": STR,
+            "siła": INT,
+        })),
+        "filtry_kontekstowe": _arr(_obj({
+            "hook": STR,
+            "kontekst": STR,
+            "siła": INT,
+        })),
+        "filtry_nieoczywiste": _arr(_obj({
+            "hook": STR,
+            "typ": STR,
+            "siła": INT,
+        })),
+        "top3": _arr(_obj({
+            "hook": STR,
+            "siła": INT,
+        })),
+    }),
+    "anthropologist": _report({
+        "etnografia": _arr(_obj({
+            "scena": STR,
+            "cytat": STR,
+        })),
+        "socjologia": _arr(_obj({
+            "podzial": STR,
+            "cytat": STR,
+        })),
+        "psychologia": _arr(_obj({
+            "emocja": STR,
+            "cytat": STR,
+        })),
+        "osoby": _arr(_obj({
+            "kto": STR,
+            "cytat": STR,
+        })),
+        "top3_cytaty": _arr(_obj({
+            "cytat": STR,
+            "typ": STR,
+        })),
+    }),
+    "polish_contextualizer": _report({
+        "przeliczenia": _arr(_obj({
+            "zagraniczne": STR,
+            "polskie": STR,
+        })),
+        "polskie_tematy": _arr(_obj({
+            "temat": STR,
+            "jak_podpiac": STR,
+        })),
+        "gdzie_szukac_glosow": _arr(_obj({
+            "typ_eksperta": STR,
+            "instytucje": _arr(STR),
+            "jak_znalezc": STR,
+            "co_by_wiedzial": STR,
+        })),
+        "polskie_liczby": _arr(_obj({
+            "co": STR,
+            "liczba": STR,
+        })),
+        "top3": _arr(_obj({
+            "hook_pl": STR,
+            "siła": INT,
+        })),
+    }),
+    "popculture_curator": _report({
+        "filmy_seriale": _arr(_obj({
+            "źródło": STR,
+            "analogia": STR,
+        })),
+        "sport": _arr(_obj({
+            "analogia": STR,
+            "uwaga": STR,
+        })),
+        "codzienność": _arr(_obj({
+            "analogia": STR,
+        })),
+        "memy": _arr(_obj({
+            "mem": STR,
+        })),
+        "literatura": _arr(_obj({
+            "źródło": STR,
+            "analogia": STR,
+        })),
+        "top3": _arr(_obj({
+            "analogia": STR,
+            "ze_źródła": BOOL,
+            "siła": INT,
+        })),
+    }),
+    "story_excavator": _report({
+        "potencjal_narracyjny": INT,
+        "postacie": _arr(_obj({
+            "kto": STR,
+            "rola": STR,
+            "potencjal": STR,
+        })),
+        "konflikt": _obj({
+            "glowny": STR,
+            "stawka": STR,
+            "antagonista": STR,
+        }),
+        "luk_transformacji": _obj({
+            "przed": STR,
+            "wyzwalacz": STR,
+            "po": STR,
+            "znaczenie": STR,
+        }),
+        "post_narracyjny": STR,
+        "brakujace_elementy": _arr(STR),
+        "alternatywne_katy": _arr(_obj({
+            "perspektywa": STR,
+            "hook": STR,
+        })),
+    }),
+    "tension_architect": _report({
+        "werdykt": STR,
+        "poziom_zaskoczenia": INT,
+        "poziom_paradoksu": INT,
+        "napiecie_lacznie": INT,
+        "diagnoza_struktury": _obj({
+            "typ": STR,
+            "przewidywalnosc": STR,
+            "wstep": STR,
+            "zakonczenie": STR,
+        }),
+        "klisze": _arr(_obj({
+            "element": STR,
+            "jak_zlamac": STR,
+        })),
+        "dostepne_paradoksy": _arr(_obj({
+            "nazwa": STR,
+            "formula": STR,
+            "zdanie": STR,
+        })),
+        "struktury_kontrastu": _arr(_obj({
+            "typ": STR,
+            "propozycja": STR,
+        })),
+        "transformacja": _obj({
+            "przed": STR,
+            "po": STR,
+            "co_zmienione": STR,
+        }),
+        "puenty_paradoks": _arr(_obj({
+            "puenta": STR,
+            "typ": STR,
+        })),
+    }),
+    "context_shifter": _report({
+        "werdykt": STR,
+        "poziom_glebi": INT,
+        "drugie_dno": BOOL,
+        "obecna_warstwa": _obj({
+            "co_mowi": STR,
+            "co_moglby_znaczyc": STR,
+        }),
+        "rytualy_absurdy": _arr(_obj({
+            "obserwacja": STR,
+            "rytual": STR,
+            "propozycja": STR,
+        })),
+        "bledy_poznawcze": _arr(_obj({
+            "nazwa": STR,
+            "w_kontekscie": STR,
+            "zdanie": STR,
+        })),
+        "cytaty": _arr(_obj({
+            "autor": STR,
+            "cytat": STR,
+            "zastosowanie": STR,
+        })),
+        "transformacja": _obj({
+            "przed": STR,
+            "po": STR,
+            "dlaczego": STR,
+        }),
+        "perspektywa_obserwatora": _obj({
+            "co_zauwazyby": STR,
+            "hook": STR,
+        }),
+        "analogie": _arr(_obj({
+            "temat": STR,
+            "analogia": STR,
+            "rozwinienie": STR,
+        })),
+        "propozycje_poglebiania": _arr(STR),
+    }),
+    "comedian": _report({
+        "potencjal_humoru": INT,
+        "rekomendowany_dial": INT,
+        "okazje_na_humor": _arr(_obj({
+            "lokalizacja": STR,
+            "typ": STR,
+            "sugestia": STR,
+            "dial": INT,
+        })),
+        "momenty_self_deprecation": _arr(STR),
+        "wersje_wg_dial": _obj({
+            "dial_2_linkedin": STR,
+            "dial_3_facebook": STR,
+            "dial_4_twitter": STR,
+        }),
+        "ostrzezenia": _arr(STR),
+        "techniki": _arr(_obj({
+            "nazwa": STR,
+            "przyklad": STR,
+        })),
+    }),
+    "engagement": _report({
+        "potencjal_zaangazowania": INT,
+        "obecne_haki": _arr(STR),
+        "brakujace_elementy": _arr(STR),
+        "wzmacniacze": _arr(_obj({
+            "technika": STR,
+            "implementacja": STR,
+            "efekt": STR,
+        })),
+        "ulepszenia_pytan": _arr(_obj({
+            "obecne": STR,
+            "lepsze": STR,
+            "dlaczego": STR,
+        })),
+        "opcje_cta": _obj({
+            "porada": STR,
+            "opinia": STR,
+            "historia": STR,
+            "debata": STR,
+        }),
+        "momenty_relatable": _arr(STR),
+        "cta_platformy": _obj({
+            "linkedin": STR,
+            "facebook": STR,
+            "twitter": STR,
+        }),
+    }),
+    "devils_advocate": _report({
+        "sila_argumentu": INT,
+        "czerwone_flagi": _arr(_obj({
+            "problem": STR,
+            "jak_naprawic": STR,
+        })),
+        "weryfikacja_twierdzen": _arr(_obj({
+            "twierdzenie": STR,
+            "dowod": STR,
+            "jak_naprawic": STR,
+        })),
+        "kontrargumenty": _arr(_obj({
+            "argument": STR,
+            "kontra": STR,
+            "sila_kontry": INT,
+        })),
+        "nieadresowane_obiekcje": _arr(_obj({
+            "obiekcja": STR,
+            "jak_zaadresowac": STR,
+        })),
+        "niewygodne_pytania": _arr(STR),
+        "ocena_cringe": _obj({
+            "humble_brag": INT,
+            "virtue_signaling": INT,
+            "ryzyko_screenshota": STR,
+            "komentarz": STR,
+        }),
+        "brakujace_perspektywy": _arr(_obj({
+            "kto": STR,
+            "ich_argument": STR,
+            "jak_zaadresowac": STR,
+        })),
+        "alternatywne_interpretacje": _arr(_obj({
+            "dane": STR,
+            "alternatywa": STR,
+        })),
+        "sugestie_wzmocnienia": _arr(STR),
+        "werdykt": STR,
+    }),
+    "exploration_agent": _report({
+        "możliwe_kąty": _arr(_obj({
+            "nazwa": STR,
+            "opis": STR,
+            "hook": STR,
+            "dla_kogo": STR,
+            "siła": INT,
+        })),
+        "punkty_napięcia": _arr(_obj({
+            "napięcie": STR,
+            "strona_A": STR,
+            "strona_B": STR,
+            "potencjał_dyskusji": STR,
+        })),
+        "polski_kontekst": _arr(_obj({
+            "kontekst": STR,
+            "jak_podpiąć": STR,
+        })),
+        "pytania_warte_zadania": _arr(STR),
+        "pułapki_do_uniknięcia": _arr(_obj({
+            "pułapka": STR,
+            "dlaczego_zła": STR,
+        })),
+        "rekomendowany_kąt": _obj({
+            "nazwa": STR,
+            "uzasadnienie": STR,
+            "hook": STR,
+        }),
+    }),
+    "development_agent": _report({
+        "ocena_kierunku": _obj({
+            "kierunek_usera": STR,
+            "ocena": INT,
+            "co_działa": STR,
+            "co_ulepszyć": STR,
+            "ryzyko": STR,
+        }),
+        "warianty_rozwinięcia": _arr(_obj({
+            "typ": STR,
+            "opis": STR,
+            "główna_teza": STR,
+            "hook": STR,
+            "potencjał": INT,
+            "ryzyko": STR,
+        })),
+        "propozycje_hooków": _arr(STR),
+        "co_wzmocnić": _arr(_obj({
+            "element": STR,
+            "dlaczego": STR,
+        })),
+        "co_pominąć": _arr(_obj({
+            "element": STR,
+            "dlaczego": STR,
+        })),
+        "kontrargumenty": _arr(_obj({
+            "obiekcja": STR,
+            "jak_odpowiedzieć": STR,
+        })),
+        "rekomendowany_wariant": _obj({
+            "typ": STR,
+            "uzasadnienie": STR,
+            "hook": STR,
+        }),
+    }),
+    "quality_polish": _report({
+        "ocena": INT,
+        "status": STR,
+        "mocne_strony": _arr(STR),
+        "problemy": _arr(_obj({
+            "problem": STR,
+            "gdzie": STR,
+            "wpływ": STR,
+        })),
+        "poprawki_inline": _arr(_obj({
+            "oryginał": STR,
+            "poprawka": STR,
+            "powód": STR,
+        })),
+        "wersja_po_poprawkach": STR,
+        "alternatywne_hooki": _arr(STR),
+    }),
+    "brief_extraction": _report({
+        "agent": STR,
+        "top_hooki": _arr(STR),
+        "top_insighty": _arr(STR),
+        "top_propozycje": _arr(STR),
+        "ostrzezenia": _arr(STR),
+        "polskie": _arr(STR),
+    }),
+    "brief_synthesizer": _report({
+        "najlepsze_hooki": _arr(STR),
+        "kluczowe_insighty": _arr(STR),
+        "gotowe_do_uzycia": _arr(_obj({
+            "typ": STR,
+            "tekst": STR,
+        })),
+        "ostrzezenia": _arr(STR),
+        "polskie_konteksty": _arr(STR),
+    }),
+    "microblog_agent": _report({
+        "platform": STR,
+        "main_post": STR,
+        "is_thread": BOOL,
+        "thread": _arr(STR),
+        "hook_variants": _arr(STR),
+        "post_type": STR,
+    }),
+    "video_agent": _report({
+        "platform": STR,
+        "hook": STR,
+        "tekst_do_kamery": STR,
+        "cta": STR,
+        "warianty_hooka": _arr(STR),
+        "szacowany_czas": STR,
+        "wskazówki": STR,
+    }),
+}
+
+
+def get_response_schema(name: str) -> Optional[dict]:
+    """Zwraca schemat odpowiedzi agenta lub None (agent bez formatu JSON)."""
+    schema = RESPONSE_SCHEMAS.get(name)
+    return copy.deepcopy(schema) if schema else None
+
+
+def combine_schemas(schemas: Dict[str, dict]) -> dict:
+    """Schemat obiektu z sekcją per agent (tryb fuzji perspektyw)."""
+    return _report({key: copy.deepcopy(schema) for key, schema in schemas.items()})
+
+
+def to_gemini_schema(schema: dict) -> Optional[dict]:
+    """
+    Konwertuje schemat do podzbioru OpenAPI obsługiwanego przez Gemini.
+
+    Gemini wymaga typów wielkimi literami i niepustych `properties` dla obiektów.
+    Zwraca None, jeśli schematu nie da się przekonwertować (wtedy sam JSON mode).
+    """
+    converted = {}
+    schema_type = schema.get("type")
+    if not schema_type:
+        return None
+    converted["type"] = schema_type.upper()
+
+    if schema_type == "object":
+        properties = {}
+        for key, value in schema.get("properties", {}).items():
+            sub = to_gemini_schema(value)
+            if sub is None:
+                return None
+            properties[key] = sub
+        if not properties:
+            return None
+        converted["properties"] = properties
+        if schema.get("required"):
+            converted["required"] = list(schema["required"])
+
+    if schema_type == "array":
+        items = to_gemini_schema(schema.get("items", STR))
+        if items is None:
+            return None
+        converted["items"] = items
+
+    return converted
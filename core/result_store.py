@@ -0,0 +1,681 @@
+"""
+Magazyn wyników workflow w jednym pliku SQLite (tryb WAL).
+
+Zamiast tysięcy folderów w output/ - jedna baza z indeksami po dacie, trybie,
+hashu źródła i modelu. Układ folderów (full_results.json, agents/, raporty)
+powstaje na żądanie przez eksport (OrchestratorV3.export_run).
+
+WAL pozwala czytać (UI, wyszukiwanie) w trakcie zapisu z wątku w tle;
+unikalność nazwy przebiegu pilnuje UNIQUE w bazie, nie pętla po dysku.
+
+Dane agentów i tekst źródłowy zapisywane są raz, adresowane treścią (sha256):
+wynik przebiegu i raporty agentów trzymają tylko odwołania {"$blob": hash},
+a ten sam materiał źródłowy w kolejnych przebiegach nie zajmuje miejsca ponownie.
+W folderze wyników to samo robi write_result_folder: full_results.json odwołuje
+się do agents/*.json i source.txt ({"$ref": ścieżka}) zamiast powtarzać ich treść.
+
+Bloby mogą być kompresowane (gzip lub zstd ze słownikiem wytrenowanym na
+wcześniejszych raportach - powtarzalny polski tekst kompresuje się wtedy
+wielokrotnie lepiej). Każdy blob pamięta swój kodek, więc zmiana ustawienia nie
+psuje odczytu starszych wpisów. Szkielet wyniku zostaje nieskompresowanym JSON-em:
+listowanie i load_field / load_agent_report dekompresują tylko potrzebne bloby.
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+RESULT_STORE_PATH = Path(__file__).parent.parent / "output" / "results.db"
+
+SCHEMA_VERSION = 4
+
+COMPRESSION_CODECS = ("none", "gzip", "zstd")
+GZIP_LEVEL = 6
+ZSTD_LEVEL = 9
+# Słownik zstd: rozmiar i liczba ostatnich blobów użytych do treningu
+ZSTD_DICT_SIZE = 112 * 1024
+ZSTD_DICT_SAMPLES = 2000
+MIN_DICT_SAMPLES = 20
+
+# Miejsce tekstu źródłowego w WorkflowResult.to_dict() - po czyszczeniu (to dostają
+# agenci) i sprzed czyszczenia (tylko gdy czyszczenie coś usunęło)
+SOURCE_TEXT_PATH = ("report", "raw_source_text")
+SOURCE_RAW_PATH = ("report", "source_text_before_cleaning")
+# Teksty źródłowe w folderze wyników: ścieżka w wyniku -> plik
+SOURCE_FILES = ((SOURCE_TEXT_PATH, "source.txt"), (SOURCE_RAW_PATH, "source_raw.txt"))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    run_key TEXT NOT NULL UNIQUE,
+    created_at TEXT NOT NULL,
+    mode TEXT NOT NULL,
+    success INTEGER NOT NULL,
+    model_key TEXT,
+    source_hash TEXT,
+    topic_slug TEXT,
+    total_duration REAL,
+    result_json TEXT NOT NULL,
+    pinned INTEGER NOT NULL DEFAULT 0  -- przypięte przebiegi pomija retencja
+);
+CREATE INDEX IF NOT EXISTS runs_created_at ON runs (created_at);
+CREATE INDEX IF NOT EXISTS runs_mode ON runs (mode, created_at);
+CREATE INDEX IF NOT EXISTS runs_source_hash ON runs (source_hash);
+CREATE INDEX IF NOT EXISTS runs_model_key ON runs (model_key, created_at);
+
+CREATE TABLE IF NOT EXISTS agent_reports (
+    run_id INTEGER NOT NULL REFERENCES runs (id) ON DELETE CASCADE,
+    agent_key TEXT NOT NULL,
+    report_json TEXT NOT NULL,
+    PRIMARY KEY (run_id, agent_key)
+);
+
+CREATE TABLE IF NOT EXISTS blobs (
+    hash TEXT PRIMARY KEY,
+    data BLOB NOT NULL,
+    codec TEXT NOT NULL DEFAULT 'json'  -- json | gzip | zstd | zstd:<id słownika>
+);
+
+CREATE TABLE IF NOT EXISTS zstd_dicts (
+    id INTEGER PRIMARY KEY,
+    created_at TEXT NOT NULL,
+    data BLOB NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS run_blobs (
+    run_id INTEGER NOT NULL REFERENCES runs (id) ON DELETE CASCADE,
+    hash TEXT NOT NULL,
+    PRIMARY KEY (run_id, hash)
+);
+CREATE INDEX IF NOT EXISTS run_blobs_hash ON run_blobs (hash);
+
+CREATE TABLE IF NOT EXISTS drafts (
+    run_id INTEGER NOT NULL REFERENCES runs (id) ON DELETE CASCADE,
+    platform TEXT NOT NULL,
+    draft_json TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS drafts_run ON drafts (run_id);
+"""
+
+
+@dataclass
+class RunSummary:
+    """Wiersz listy przebiegów (bez treści wyników)."""
+    run_key: str
+    created_at: str
+    mode: str
+    success: bool
+    model_key: Optional[str]
+    source_hash: Optional[str]
+    topic_slug: Optional[str]
+    total_duration: Optional[float]
+    pinned: bool = False
+
+
+@dataclass
+class AgentReport:
+    """Raport jednego agenta wyjęty z wyniku workflow."""
+    agent_key: str
+    agent_name: str
+    mode: str
+    data: Any
+    path: Tuple[str, ...]  # położenie danych w WorkflowResult.to_dict()
+    timestamp: str = ""
+
+    def __post_init__(self):
+        if not self.timestamp:
+            self.timestamp = datetime.now().isoformat()
+
+    def to_dict(self, data: Any = None) -> dict:
+        """Postać pliku agents/<agent>.json (data można podmienić na odwołanie)."""
+        return {
+            "agent_name": self.agent_name,
+            "mode": self.mode,
+            "data": self.data if data is None else data,
+            "timestamp": self.timestamp,
+        }
+
+
+def _replace_at(value: dict, path: Tuple[str, ...], new: Any) -> dict:
+    """Kopia słownika z podmienioną wartością pod ścieżką (kopiowane tylko słowniki na ścieżce)."""
+    if not path or not isinstance(value, dict) or path[0] not in value:
+        return value
+    copy = dict(value)
+    copy[path[0]] = new if len(path) == 1 else _replace_at(value[path[0]], path[1:], new)
+    return copy
+
+
+def _get_at(value: Any, path: Tuple[str, ...]) -> Any:
+    for key in path:
+        if not isinstance(value, dict):
+            return None
+        value = value.get(key)
+    return value
+
+
+def _canonical(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+
+
+def write_result_folder(result_dir: Path, result: dict, agent_reports: Dict[str, AgentReport]) -> None:
+    """
+    Zapisuje JSON-y wyniku do folderu bez powtórzeń.
+
+    Dane agentów trafiają tylko do agents/<agent>.json, tekst źródłowy do source.txt
+    (sprzed czyszczenia: source_raw.txt); full_results.json zawiera w tych miejscach
+    {"$ref": "agents/<agent>.json"} (dane w polu "data" pliku agenta) / {"$ref": "source.txt"}.
+    """
+    skeleton = result
+    if agent_reports:
+        agents_dir = result_dir / "agents"
+        agents_dir.mkdir(exist_ok=True)
+        for agent_key, report in agent_reports.items():
+            with open(agents_dir / f"{agent_key}.json", "w", encoding="utf-8") as f:
+                json.dump(report.to_dict(), f, ensure_ascii=False, indent=2)
+            skeleton = _replace_at(skeleton, report.path, {"$ref": f"agents/{agent_key}.json"})
+
+    for path, filename in SOURCE_FILES:
+        source = _get_at(result, path)
+        if isinstance(source, str) and source:
+            (result_dir / filename).write_text(source, encoding="utf-8")
+            skeleton = _replace_at(skeleton, path, {"$ref": filename})
+
+    with open(result_dir / "full_results.json", "w", encoding="utf-8") as f:
+        json.dump(skeleton, f, ensure_ascii=False, indent=2)
+
+
+def _zstd():
+    try:
+        import zstandard
+    except ImportError:
+        raise ImportError("Kompresja zstd wymaga pakietu zstandard: pip install zstandard")
+    return zstandard
+
+
+def source_hash(text: Optional[str]) -> Optional[str]:
+    """Hash tekstu źródłowego - wyszukiwanie przebiegów na tym samym materiale."""
+    if not text:
+        return None
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class ResultStore:
+    """Wyniki workflow, raporty agentów i drafty w SQLite."""
+
+    def __init__(self, path: Optional[Path] = None, durable: bool = False, compression: str = "none"):
+        """
+        Args:
+            path: Plik bazy (domyślnie output/results.db)
+            durable: synchronous=FULL - każda transakcja na dysku (wolniej)
+            compression: Kompresja nowych blobów: none, gzip, zstd (wymaga zstandard)
+
+        Raises:
+            ValueError: Nieznana kompresja
+        """
+        if compression not in COMPRESSION_CODECS:
+            raise ValueError(
+                f"Nieznana kompresja wyników: {compression} (dostępne: {', '.join(COMPRESSION_CODECS)})"
+            )
+        if compression == "zstd":
+            _zstd()
+        self.path = Path(path) if path else RESULT_STORE_PATH
+        self.durable = durable
+        self.compression = compression
+        self._local = threading.local()
+        self._zstd_dicts: Dict[int, Any] = {}
+
+    def _connect(self) -> sqlite3.Connection:
+        """Połączenie per wątek (sqlite3 nie współdzieli połączeń między wątkami)."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(f"PRAGMA synchronous={'FULL' if self.durable else 'NORMAL'}")
+            conn.execute("PRAGMA foreign_keys=ON")
+            conn.executescript(_SCHEMA)
+            # Baza z wersji 2: bloby bez kodeka (wszystkie jako czysty JSON)
+            if "codec" not in {row["name"] for row in conn.execute("PRAGMA table_info(blobs)")}:
+                conn.execute("ALTER TABLE blobs ADD COLUMN codec TEXT NOT NULL DEFAULT 'json'")
+            # Baza z wersji 3: bez przypinania
+            if "pinned" not in {row["name"] for row in conn.execute("PRAGMA table_info(runs)")}:
+                conn.execute("ALTER TABLE runs ADD COLUMN pinned INTEGER NOT NULL DEFAULT 0")
+            conn.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+            self._local.conn = conn
+        return conn
+
+    def save_run(
+        self,
+        base_key: str,
+        result: dict,
+        agent_reports: Dict[str, AgentReport],
+        model_key: Optional[str] = None,
+        source_text: Optional[str] = None,
+        topic_slug: Optional[str] = None,
+    ) -> str:
+        """
+        Zapisuje przebieg w jednej transakcji.
+
+        Args:
+            base_key: Proponowana nazwa (jak folder: "2025-01-01-120000-exploration");
+                zajęta dostaje sufiks -1, -2...
+            result: WorkflowResult.to_dict()
+            agent_reports: Raporty agentów (klucz agenta -> raport)
+
+        Returns:
+            Nadana nazwa przebiegu (run_key)
+        """
+        conn = self._connect()
+        draft = result.get("draft")
+
+        # Dane agentów i źródło jako bloby adresowane treścią
+        blobs: Dict[str, str] = {}
+
+        def intern(value: Any) -> dict:
+            text = _canonical(value)
+            digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+            blobs[digest] = text
+            return {"$blob": digest}
+
+        skeleton = result
+        agent_rows = []
+        for agent_key, report in agent_reports.items():
+            ref = intern(report.data)
+            skeleton = _replace_at(skeleton, report.path, ref)
+            agent_rows.append((agent_key, json.dumps(report.to_dict(ref), ensure_ascii=False)))
+        for path, _ in SOURCE_FILES:
+            source = _get_at(result, path)
+            if isinstance(source, str) and source:
+                skeleton = _replace_at(skeleton, path, intern(source))
+
+        # Kompresja tylko blobów, których jeszcze nie ma w bazie (poza blokadą zapisu;
+        # w transakcji sprawdzane ponownie - retencja mogła je w międzyczasie usunąć)
+        encoder = self._encoder()
+        existing = self._existing_blobs(conn, blobs)
+        encoded_blobs = {digest: encoder(text) for digest, text in blobs.items() if digest not in existing}
+
+        row = (
+            datetime.now().isoformat(timespec="seconds"),
+            result.get("mode", "unknown"),
+            int(bool(result.get("success"))),
+            model_key,
+            source_hash(source_text),
+            topic_slug,
+            result.get("total_duration"),
+            json.dumps(skeleton, ensure_ascii=False),
+        )
+
+        counter = 0
+        while True:
+            run_key = base_key if counter == 0 else f"{base_key}-{counter}"
+            try:
+                with conn:
+                    # Blokada zapisu od początku: między sprawdzeniem blobów a odwołaniem
+                    # do nich w run_blobs nie wejdzie _prune_blobs z delete_run
+                    conn.execute("BEGIN IMMEDIATE")
+                    for digest in set(existing) - self._existing_blobs(conn, existing):
+                        encoded_blobs[digest] = encoder(blobs[digest])
+                    cursor = conn.execute(
+                        "INSERT INTO runs (run_key, created_at, mode, success, model_key, source_hash, "
+                        "topic_slug, total_duration, result_json) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        (run_key, *row),
+                    )
+                    run_id = cursor.lastrowid
+                    conn.executemany(
+                        "INSERT OR IGNORE INTO blobs (hash, codec, data) VALUES (?, ?, ?)",
+                        [(digest, *encoded) for digest, encoded in encoded_blobs.items()],
+                    )
+                    conn.executemany(
+                        "INSERT INTO run_blobs (run_id, hash) VALUES (?, ?)",
+                        [(run_id, digest) for digest in blobs],
+                    )
+                    conn.executemany(
+                        "INSERT INTO agent_reports (run_id, agent_key, report_json) VALUES (?, ?, ?)",
+                        [(run_id, key, report_json) for key, report_json in agent_rows],
+                    )
+                    if draft:
+                        conn.execute(
+                            "INSERT INTO drafts (run_id, platform, draft_json) VALUES (?, ?, ?)",
+                            (run_id, draft.get("platform", "unknown"), json.dumps(draft, ensure_ascii=False)),
+                        )
+                return run_key
+            except sqlite3.IntegrityError as e:
+                # Zajęta nazwa -> kolejny sufiks; inne naruszenia to błąd zapisu
+                if "runs.run_key" not in str(e):
+                    raise
+                counter += 1
+
+    @staticmethod
+    def _existing_blobs(conn: sqlite3.Connection, digests) -> set:
+        """Które z podanych hashy są już w tabeli blobs."""
+        digests = list(digests)
+        if not digests:
+            return set()
+        placeholders = ",".join("?" * len(digests))
+        return {
+            row["hash"] for row in conn.execute(
+                f"SELECT hash FROM blobs WHERE hash IN ({placeholders})", digests
+            )
+        }
+
+    def find_runs(
+        self,
+        mode: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        source_text_hash: Optional[str] = None,
+        model_key: Optional[str] = None,
+        search: Optional[str] = None,
+        limit: int = 50,
+        offset: int = 0,
+    ) -> List[RunSummary]:
+        """Przebiegi od najnowszych, filtrowane po indeksowanych kolumnach (bez odczytu blobów)."""
+        clauses, params = [], []
+        if mode:
+            clauses.append("mode = ?")
+            params.append(mode)
+        if since:
+            clauses.append("created_at >= ?")
+            params.append(since.isoformat(timespec="seconds"))
+        if until:
+            clauses.append("created_at <= ?")
+            params.append(until.isoformat(timespec="seconds"))
+        if source_text_hash:
+            clauses.append("source_hash = ?")
+            params.append(source_text_hash)
+        if model_key:
+            clauses.append("model_key = ?")
+            params.append(model_key)
+        if search:
+            clauses.append("(run_key LIKE ? OR topic_slug LIKE ?)")
+            params.extend([f"%{search}%"] * 2)
+
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = self._connect().execute(
+            "SELECT run_key, created_at, mode, success, model_key, source_hash, topic_slug, total_duration, pinned "
+            f"FROM runs {where} ORDER BY created_at DESC, id DESC LIMIT ? OFFSET ?",
+            (*params, limit, offset),
+        ).fetchall()
+        return [
+            RunSummary(**{**dict(row), "success": bool(row["success"]), "pinned": bool(row["pinned"])})
+            for row in rows
+        ]
+
+    def load_run(self, run_key: str) -> Optional[dict]:
+        """Pełny wynik przebiegu (WorkflowResult.to_dict()) lub None."""
+        row = self._connect().execute(
+            "SELECT result_json FROM runs WHERE run_key = ?", (run_key,)
+        ).fetchone()
+        return self._resolve(json.loads(row["result_json"])) if row else None
+
+    def load_agent_reports(self, run_key: str) -> Dict[str, dict]:
+        rows = self._connect().execute(
+            "SELECT a.agent_key, a.report_json FROM agent_reports a "
+            "JOIN runs r ON r.id = a.run_id WHERE r.run_key = ?",
+            (run_key,),
+        ).fetchall()
+        return self._resolve({row["agent_key"]: json.loads(row["report_json"]) for row in rows})
+
+    def load_field(self, run_key: str, path: Sequence[str]) -> Any:
+        """
+        Jedno pole wyniku, np. ("report", "quality_report", "ocena").
+
+        Czytany jest szkielet przebiegu i tylko bloby w wybranym poddrzewie.
+        """
+        row = self._connect().execute(
+            "SELECT result_json FROM runs WHERE run_key = ?", (run_key,)
+        ).fetchone()
+        if row is None:
+            return None
+        value = json.loads(row["result_json"])
+        for index, key in enumerate(path):
+            if isinstance(value, dict) and len(value) == 1 and "$blob" in value:
+                # Pole wewnątrz danych agenta - rozwiń tylko ten blob
+                return _get_at(self._resolve(value), tuple(path[index:]))
+            if not isinstance(value, dict):
+                return None
+            value = value.get(key)
+        return self._resolve(value)
+
+    def load_source(self, run_key: str, before_cleaning: bool = False) -> Optional[str]:
+        """
+        Tekst źródłowy przebiegu (jeden blob) - ten, który dostali agenci.
+
+        before_cleaning: tekst sprzed czyszczenia (CLEAN_SOURCE); gdy czyszczenie
+        niczego nie usunęło, zapisany jest tylko jeden tekst i to on jest zwracany.
+        """
+        if before_cleaning:
+            raw = self.load_field(run_key, SOURCE_RAW_PATH)
+            if raw:
+                return raw
+        return self.load_field(run_key, SOURCE_TEXT_PATH)
+
+    def load_agent_report(self, run_key: str, agent_key: str) -> Optional[dict]:
+        """Raport jednego agenta (jeden blob) lub None."""
+        row = self._connect().execute(
+            "SELECT a.report_json FROM agent_reports a JOIN runs r ON r.id = a.run_id "
+            "WHERE r.run_key = ? AND a.agent_key = ?",
+            (run_key, agent_key),
+        ).fetchone()
+        return self._resolve(json.loads(row["report_json"])) if row else None
+
+    def pin_run(self, run_key: str, pinned: bool = True) -> bool:
+        """Przypina przebieg (retencja go nie usunie). False = brak przebiegu."""
+        conn = self._connect()
+        with conn:
+            cursor = conn.execute("UPDATE runs SET pinned = ? WHERE run_key = ?", (int(pinned), run_key))
+        return cursor.rowcount > 0
+
+    def run_footprints(self) -> List[dict]:
+        """
+        Przebiegi z szacowanym miejscem na dysku (dla retencji).
+
+        Blob współdzielony przez kilka przebiegów liczony jest każdemu proporcjonalnie.
+        """
+        rows = self._connect().execute(
+            """
+            SELECT r.run_key, r.created_at, r.source_hash, r.pinned,
+                   length(r.result_json)
+                   + COALESCE((SELECT SUM(length(a.report_json)) FROM agent_reports a WHERE a.run_id = r.id), 0)
+                   + COALESCE((SELECT SUM(length(d.draft_json)) FROM drafts d WHERE d.run_id = r.id), 0)
+                   + COALESCE((
+                       SELECT SUM(length(b.data) * 1.0 / (SELECT COUNT(*) FROM run_blobs x WHERE x.hash = b.hash))
+                       FROM run_blobs rb JOIN blobs b ON b.hash = rb.hash WHERE rb.run_id = r.id
+                   ), 0) AS size_bytes
+            FROM runs r
+            """
+        ).fetchall()
+        return [{**dict(row), "pinned": bool(row["pinned"]), "size_bytes": int(row["size_bytes"])} for row in rows]
+
+    def vacuum(self) -> None:
+        """Oddaje systemowi miejsce po usuniętych przebiegach (przepisuje cały plik)."""
+        self._connect().execute("VACUUM")
+
+    def delete_run(self, run_key: str) -> bool:
+        """Usuwa przebieg i bloby, do których nie odwołuje się już żaden inny."""
+        conn = self._connect()
+        with conn:
+            cursor = conn.execute("DELETE FROM runs WHERE run_key = ?", (run_key,))
+            self._prune_blobs(conn)
+        return cursor.rowcount > 0
+
+    def _prune_blobs(self, conn: sqlite3.Connection) -> int:
+        cursor = conn.execute(
+            "DELETE FROM blobs WHERE NOT EXISTS (SELECT 1 FROM run_blobs rb WHERE rb.hash = blobs.hash)"
+        )
+        return cursor.rowcount
+
+    def _resolve(self, value: Any) -> Any:
+        """Podmienia odwołania {"$blob": hash} na treść (jedno zapytanie na wszystkie)."""
+        refs: List[dict] = []
+
+        def collect(item):
+            if isinstance(item, dict):
+                if len(item) == 1 and "$blob" in item:
+                    refs.append(item)
+                else:
+                    for sub in item.values():
+                        collect(sub)
+            elif isinstance(item, list):
+                for sub in item:
+                    collect(sub)
+
+        collect(value)
+        if not refs:
+            return value
+
+        digests = list({ref["$blob"] for ref in refs})
+        placeholders = ",".join("?" * len(digests))
+        data = {
+            row["hash"]: json.loads(self._decompress(row["codec"], row["data"]))
+            for row in self._connect().execute(
+                f"SELECT hash, codec, data FROM blobs WHERE hash IN ({placeholders})", digests
+            )
+        }
+
+        def substitute(item):
+            if isinstance(item, dict):
+                if len(item) == 1 and "$blob" in item:
+                    return data.get(item["$blob"])
+                return {key: substitute(sub) for key, sub in item.items()}
+            if isinstance(item, list):
+                return [substitute(sub) for sub in item]
+            return item
+
+        return substitute(value)
+
+    # --- kompresja ---
+
+    def _encoder(self):
+        """Funkcja tekst -> (kodek, dane) dla bieżącego ustawienia kompresji."""
+        if self.compression == "gzip":
+            return lambda text: ("gzip", gzip.compress(text.encode("utf-8"), GZIP_LEVEL, mtime=0))
+        if self.compression == "zstd":
+            dict_id, compressor = self._zstd_compressor()
+            codec = f"zstd:{dict_id}" if dict_id else "zstd"
+            return lambda text: (codec, compressor.compress(text.encode("utf-8")))
+        return lambda text: ("json", text)
+
+    def _zstd_compressor(self) -> Tuple[Optional[int], Any]:
+        """Kompresor z najnowszym słownikiem (per wątek - ZstdCompressor nie jest wątkowo bezpieczny)."""
+        row = self._connect().execute("SELECT MAX(id) AS id FROM zstd_dicts").fetchone()
+        dict_id = row["id"]
+        cached = getattr(self._local, "zstd_compressor", None)
+        if cached is None or cached[0] != dict_id:
+            zstd = _zstd()
+            options = {"level": ZSTD_LEVEL}
+            if dict_id:
+                options["dict_data"] = self._zstd_dict(dict_id)
+            cached = self._local.zstd_compressor = (dict_id, zstd.ZstdCompressor(**options))
+        return cached
+
+    def _zstd_dict(self, dict_id: int):
+        zstd_dict = self._zstd_dicts.get(dict_id)
+        if zstd_dict is None:
+            row = self._connect().execute("SELECT data FROM zstd_dicts WHERE id = ?", (dict_id,)).fetchone()
+            if row is None:
+                raise KeyError(f"Brak słownika zstd {dict_id} w {self.path}")
+            zstd_dict = self._zstd_dicts[dict_id] = _zstd().ZstdCompressionDict(row["data"])
+        return zstd_dict
+
+    def _decompress(self, codec: str, data) -> Any:
+        """Dane bloba jako tekst/bajty JSON."""
+        if codec == "json":
+            return data
+        if codec == "gzip":
+            return gzip.decompress(data)
+        if codec.startswith("zstd"):
+            dict_id = int(codec.partition(":")[2] or 0)
+            decompressors = getattr(self._local, "zstd_decompressors", None)
+            if decompressors is None:
+                decompressors = self._local.zstd_decompressors = {}
+            decompressor = decompressors.get(dict_id)
+            if decompressor is None:
+                options = {"dict_data": self._zstd_dict(dict_id)} if dict_id else {}
+                decompressor = decompressors[dict_id] = _zstd().ZstdDecompressor(**options)
+            return decompressor.decompress(data)
+        raise ValueError(f"Nieznany kodek bloba: {codec}")
+
+    def train_dictionary(self, size: int = ZSTD_DICT_SIZE, max_samples: int = ZSTD_DICT_SAMPLES) -> int:
+        """
+        Trenuje słownik zstd na ostatnich blobach; nowe bloby zstd będą go używać.
+
+        Returns:
+            Id słownika
+
+        Raises:
+            ValueError: Za mało zapisanych blobów
+        """
+        zstd = _zstd()
+        conn = self._connect()
+        rows = conn.execute(
+            "SELECT codec, data FROM blobs ORDER BY rowid DESC LIMIT ?", (max_samples,)
+        ).fetchall()
+        if len(rows) < MIN_DICT_SAMPLES:
+            raise ValueError(
+                f"Za mało zapisanych raportów do treningu słownika ({len(rows)} < {MIN_DICT_SAMPLES})"
+            )
+        samples = []
+        for row in rows:
+            sample = self._decompress(row["codec"], row["data"])
+            samples.append(sample.encode("utf-8") if isinstance(sample, str) else bytes(sample))
+        trained = zstd.train_dictionary(size, samples)
+        with conn:
+            cursor = conn.execute(
+                "INSERT INTO zstd_dicts (created_at, data) VALUES (?, ?)",
+                (datetime.now().isoformat(timespec="seconds"), trained.as_bytes()),
+            )
+        logger.info(f"Słownik zstd {cursor.lastrowid}: {len(samples)} próbek, {len(trained.as_bytes())} B")
+        return cursor.lastrowid
+
+    def recompress(self, batch_size: int = 200) -> int:
+        """
+        Przepisuje bloby w innym kodeku niż bieżące ustawienie (np. po treningu słownika).
+
+        Returns:
+            Liczba przepisanych blobów
+        """
+        conn = self._connect()
+        encoder = self._encoder()
+        target = encoder("")[0]
+        hashes = [
+            row["hash"] for row in conn.execute("SELECT hash FROM blobs WHERE codec != ?", (target,))
+        ]
+        for start in range(0, len(hashes), batch_size):
+            batch = hashes[start:start + batch_size]
+            placeholders = ",".join("?" * len(batch))
+            rows = conn.execute(
+                f"SELECT hash, codec, data FROM blobs WHERE hash IN ({placeholders})", batch
+            ).fetchall()
+            updates = []
+            for row in rows:
+                raw = self._decompress(row["codec"], row["data"])
+                text = raw if isinstance(raw, str) else bytes(raw).decode("utf-8")
+                updates.append((*encoder(text), row["hash"]))
+            with conn:
+                conn.executemany("UPDATE blobs SET codec = ?, data = ? WHERE hash = ?", updates)
+        return len(hashes)
+
+
+_stores: Dict[Path, ResultStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_store(path: Optional[Path] = None, durable: bool = False, compression: str = "none") -> ResultStore:
+    """Wspólny magazyn dla ścieżki (połączenia są per wątek wewnątrz; parametry z pierwszego wywołania)."""
+    key = Path(path) if path else RESULT_STORE_PATH
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = _stores[key] = ResultStore(key, durable=durable, compression=compression)
+        return store
@@ -0,0 +1,422 @@
+"""
+Retencja wyników i logów - usuwanie starych przebiegów z output/ i logs/.
+
+Przebieg to folder wyników w output/ i/lub wpis w magazynie (results.db) o tej
+samej nazwie. Polityka (łączone dowolnie):
+- wiek: starsze niż max_age_days
+- na źródło: tylko keep_per_source najnowszych przebiegów na tym samym materiale
+- rozmiar: najstarsze ponad max_total_mb
+
+Przypiętych przebiegów (ResultStore.pin_run albo plik PIN_MARKER w folderze)
+retencja nie dotyka, tak samo jak przebiegów młodszych niż MIN_AGE_SECONDS
+(mogą być jeszcze zapisywane w tle). Z logs/ usuwane są stare nagrane
+odpowiedzi (logs/responses/) i śledzenia przebiegów (logs/traces/) - logi
+tekstowe rotuje core/logging_setup.
+
+Użycie:
+    python -m core.retention --max-age-days 90 --keep-per-source 5       # raport (dry run)
+    python -m core.retention --max-total-mb 2000 --apply
+    python -m core.retention --pin 2025-01-01-ai-w-pracy
+"""
+
+import argparse
+import logging
+import os
+import shutil
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from .result_store import ResultStore, source_hash
+
+logger = logging.getLogger(__name__)
+
+OUTPUT_DIR = Path(__file__).parent.parent / "output"
+LOGS_DIR = Path(__file__).parent.parent / "logs"
+
+# Plik w folderze przebiegu chroniący go przed retencją
+PIN_MARKER = ".pinned"
+# Młodszych przebiegów nie ruszamy - zapis w tle może jeszcze trwać
+MIN_AGE_SECONDS = 3600
+# Foldery w output/, które nie są przebiegami
+SKIP_FOLDERS = {"benchmarks"}
+# Katalogi w logs/ czyszczone wg wieku
+LOG_SUBDIRS = ("responses", "traces")
+
+_scheduler: Optional["RetentionScheduler"] = None
+_scheduler_lock = threading.Lock()
+
+
+@dataclass
+class RetentionPolicy:
+    """Reguły retencji (None = reguła wyłączona)."""
+    max_age_days: Optional[float] = None
+    max_total_mb: Optional[float] = None
+    keep_per_source: Optional[int] = None
+
+    @property
+    def enabled(self) -> bool:
+        return any(v is not None for v in (self.max_age_days, self.max_total_mb, self.keep_per_source))
+
+    @classmethod
+    def from_env(cls) -> "RetentionPolicy":
+        """Polityka wg RETENTION_MAX_AGE_DAYS / RETENTION_MAX_MB / RETENTION_KEEP_PER_SOURCE."""
+        def number(name: str, kind=float):
+            value = os.getenv(name, "").strip()
+            return kind(value) if value else None
+
+        return cls(
+            max_age_days=number("RETENTION_MAX_AGE_DAYS"),
+            max_total_mb=number("RETENTION_MAX_MB"),
+            keep_per_source=number("RETENTION_KEEP_PER_SOURCE", int),
+        )
+
+
+@dataclass
+class RunEntry:
+    """Przebieg widziany przez retencję (folder i/lub wpis w magazynie)."""
+    key: str
+    created: datetime
+    size_bytes: int = 0
+    source_hash: Optional[str] = None
+    folder: Optional[Path] = None
+    in_store: bool = False
+    pinned: bool = False
+
+
+@dataclass
+class RetentionAction:
+    entry: RunEntry
+    reason: str  # age | per_source | size | log_age
+
+
+@dataclass
+class RetentionReport:
+    """Wynik przebiegu retencji (w dry run - plan)."""
+    dry_run: bool
+    actions: List[RetentionAction] = field(default_factory=list)
+    kept: int = 0
+    pinned: int = 0
+    errors: List[str] = field(default_factory=list)
+
+    @property
+    def freed_bytes(self) -> int:
+        return sum(action.entry.size_bytes for action in self.actions)
+
+    def to_dict(self) -> dict:
+        return {
+            "dry_run": self.dry_run,
+            "deleted": [
+                {
+                    "key": a.entry.key,
+                    "reason": a.reason,
+                    "created": a.entry.created.isoformat(timespec="seconds"),
+                    "size_bytes": a.entry.size_bytes,
+                    "folder": str(a.entry.folder) if a.entry.folder else None,
+                    "in_store": a.entry.in_store,
+                }
+                for a in self.actions
+            ],
+            "kept": self.kept,
+            "pinned": self.pinned,
+            "freed_bytes": self.freed_bytes,
+            "errors": self.errors,
+        }
+
+    def format(self) -> str:
+        verb = "Do usunięcia" if self.dry_run else "Usunięto"
+        lines = [
+            f"{verb}: {len(self.actions)} ({self.freed_bytes / 1024 / 1024:.1f} MB), "
+            f"zostaje: {self.kept}, przypiętych: {self.pinned}"
+        ]
+        for action in self.actions:
+            entry = action.entry
+            if action.reason == "log_age":
+                where = "log"
+            else:
+                where = "+".join(
+                    part for part, present in (("folder", entry.folder), ("magazyn", entry.in_store)) if present
+                )
+            lines.append(
+                f"  - {entry.key} [{action.reason}] {entry.created:%Y-%m-%d} "
+                f"{entry.size_bytes / 1024:.0f} KB ({where})"
+            )
+        for error in self.errors:
+            lines.append(f"  ❌ {error}")
+        return "\n".join(lines)
+
+
+def _dir_size(path: Path) -> int:
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.stat(os.path.join(root, name)).st_size
+            except OSError:
+                pass
+    return total
+
+
+def _folder_source_hash(folder: Path) -> Optional[str]:
+    """Hash źródła z source.txt (foldery zapisane bez magazynu)."""
+    try:
+        return source_hash((folder / "source.txt").read_text(encoding="utf-8"))
+    except OSError:
+        return None
+
+
+def collect_runs(output_dir: Path, store: Optional[ResultStore]) -> List[RunEntry]:
+    """Przebiegi z folderów output/ i magazynu, połączone po nazwie."""
+    entries: Dict[str, RunEntry] = {}
+
+    if store is not None and store.path.exists():
+        for row in store.run_footprints():
+            entries[row["run_key"]] = RunEntry(
+                key=row["run_key"],
+                created=datetime.fromisoformat(row["created_at"]),
+                size_bytes=row["size_bytes"],
+                source_hash=row["source_hash"],
+                in_store=True,
+                pinned=row["pinned"],
+            )
+
+    if output_dir.is_dir():
+        with os.scandir(output_dir) as it:
+            for item in it:
+                if not item.is_dir() or item.name in SKIP_FOLDERS or item.name.startswith("."):
+                    continue
+                folder = Path(item.path)
+                entry = entries.get(item.name)
+                if entry is None:
+                    entry = entries[item.name] = RunEntry(
+                        key=item.name,
+                        created=datetime.fromtimestamp(item.stat().st_mtime),
+                        source_hash=_folder_source_hash(folder),
+                    )
+                entry.folder = folder
+                entry.size_bytes += _dir_size(folder)
+                entry.pinned = entry.pinned or (folder / PIN_MARKER).exists()
+
+    return list(entries.values())
+
+
+def plan_retention(entries: List[RunEntry], policy: RetentionPolicy, now: Optional[datetime] = None) -> RetentionReport:
+    """Wybiera przebiegi do usunięcia (bez zmian na dysku)."""
+    now = now or datetime.now()
+    report = RetentionReport(dry_run=True)
+    newest_first = sorted(entries, key=lambda e: e.created, reverse=True)
+    protected_after = now - timedelta(seconds=MIN_AGE_SECONDS)
+    doomed: Dict[str, str] = {}
+
+    def deletable(entry: RunEntry) -> bool:
+        return not entry.pinned and entry.created < protected_after and entry.key not in doomed
+
+    if policy.max_age_days is not None:
+        cutoff = now - timedelta(days=policy.max_age_days)
+        for entry in newest_first:
+            if entry.created < cutoff and deletable(entry):
+                doomed[entry.key] = "age"
+
+    if policy.keep_per_source is not None:
+        seen: Dict[str, int] = {}
+        for entry in newest_first:
+            if not entry.source_hash:
+                continue
+            seen[entry.source_hash] = seen.get(entry.source_hash, 0) + 1
+            if seen[entry.source_hash] > policy.keep_per_source and deletable(entry):
+                doomed[entry.key] = "per_source"
+
+    if policy.max_total_mb is not None:
+        budget = int(policy.max_total_mb * 1024 * 1024)
+        total = sum(e.size_bytes for e in entries if e.key not in doomed)
+        for entry in reversed(newest_first):
+            if total <= budget:
+                break
+            if deletable(entry):
+                doomed[entry.key] = "size"
+                total -= entry.size_bytes
+
+    for entry in newest_first:
+        if entry.key in doomed:
+            report.actions.append(RetentionAction(entry=entry, reason=doomed[entry.key]))
+        else:
+            report.kept += 1
+            report.pinned += entry.pinned
+    return report
+
+
+def _log_entries(logs_dir: Path, policy: RetentionPolicy, now: datetime) -> List[RetentionAction]:
+    """Stare pliki w logs/responses/ i logs/traces/ (tylko reguła wieku)."""
+    if policy.max_age_days is None:
+        return []
+    cutoff = (now - timedelta(days=policy.max_age_days)).timestamp()
+    actions = []
+    for subdir in LOG_SUBDIRS:
+        directory = logs_dir / subdir
+        if not directory.is_dir():
+            continue
+        for path in directory.iterdir():
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            if path.is_file() and stat.st_mtime < cutoff:
+                entry = RunEntry(
+                    key=f"logs/{subdir}/{path.name}",
+                    created=datetime.fromtimestamp(stat.st_mtime),
+                    size_bytes=stat.st_size,
+                    folder=path,
+                )
+                actions.append(RetentionAction(entry=entry, reason="log_age"))
+    return actions
+
+
+def apply_retention(
+    policy: RetentionPolicy,
+    output_dir: Optional[Path] = None,
+    logs_dir: Optional[Path] = None,
+    dry_run: bool = True,
+    vacuum: bool = False,
+) -> RetentionReport:
+    """
+    Stosuje politykę retencji.
+
+    Args:
+        dry_run: Tylko raport - nic nie jest usuwane
+        vacuum: Po usunięciu przebiegów z magazynu zmniejsz plik bazy (VACUUM)
+    """
+    output_dir = Path(output_dir) if output_dir else OUTPUT_DIR
+    logs_dir = Path(logs_dir) if logs_dir else LOGS_DIR
+    now = datetime.now()
+
+    # Osobna instancja - wspólna z get_store() przejęłaby parametry pierwszego wywołania
+    db_path = output_dir / "results.db"
+    store = ResultStore(db_path) if db_path.exists() else None
+    report = plan_retention(collect_runs(output_dir, store), policy, now)
+    report.actions.extend(_log_entries(logs_dir, policy, now))
+    report.dry_run = dry_run
+    if dry_run:
+        return report
+
+    deleted_from_store = False
+    for action in report.actions:
+        entry = action.entry
+        try:
+            if entry.in_store and store is not None:
+                deleted_from_store |= store.delete_run(entry.key)
+            if entry.folder is not None:
+                if entry.folder.is_dir():
+                    shutil.rmtree(entry.folder)
+                else:
+                    entry.folder.unlink(missing_ok=True)
+        except (OSError, RuntimeError) as e:
+            report.errors.append(f"{entry.key}: {e}")
+            logger.warning(f"Retencja: nie udało się usunąć {entry.key}: {e}")
+
+    if vacuum and deleted_from_store:
+        store.vacuum()
+    logger.info(
+        f"Retencja: usunięto {len(report.actions) - len(report.errors)} "
+        f"({report.freed_bytes / 1024 / 1024:.1f} MB)"
+    )
+    return report
+
+
+def pin_run(run_key: str, pinned: bool = True, output_dir: Optional[Path] = None) -> bool:
+    """Przypina/odpina przebieg w magazynie i w folderze. False = nie znaleziono."""
+    output_dir = Path(output_dir) if output_dir else OUTPUT_DIR
+    found = False
+    db_path = output_dir / "results.db"
+    if db_path.exists():
+        found = ResultStore(db_path).pin_run(run_key, pinned)
+    folder = output_dir / run_key
+    if folder.is_dir():
+        marker = folder / PIN_MARKER
+        if pinned:
+            marker.touch()
+        else:
+            marker.unlink(missing_ok=True)
+        found = True
+    return found
+
+
+class RetentionScheduler:
+    """Okresowa retencja w wątku w tle."""
+
+    def __init__(self, policy: RetentionPolicy, interval_hours: float, output_dir: Optional[Path] = None):
+        self.policy = policy
+        self.interval = interval_hours * 3600
+        self.output_dir = output_dir
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="retention", daemon=True)
+
+    def start(self) -> "RetentionScheduler":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                apply_retention(self.policy, self.output_dir, dry_run=False)
+            except Exception as e:
+                logger.error(f"Retencja w tle nieudana: {e}")
+            self._stop.wait(self.interval)
+
+
+def start_retention_task() -> Optional[RetentionScheduler]:
+    """Uruchamia retencję w tle wg RETENTION_INTERVAL_HOURS (raz na proces; None = wyłączona)."""
+    global _scheduler
+    interval = float(os.getenv("RETENTION_INTERVAL_HOURS", "0") or 0)
+    policy = RetentionPolicy.from_env()
+    if interval <= 0 or not policy.enabled:
+        return None
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = RetentionScheduler(policy, interval).start()
+        return _scheduler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Retencja wyników (output/) i logów (logs/)")
+    parser.add_argument("--max-age-days", type=float, default=None)
+    parser.add_argument("--max-total-mb", type=float, default=None)
+    parser.add_argument("--keep-per-source", type=int, default=None)
+    parser.add_argument("--output-dir", type=Path, default=None)
+    parser.add_argument("--apply", action="store_true", help="Usuń (domyślnie tylko raport)")
+    parser.add_argument("--vacuum", action="store_true", help="Po usunięciu zmniejsz plik results.db")
+    parser.add_argument("--pin", metavar="RUN", help="Przypnij przebieg")
+    parser.add_argument("--unpin", metavar="RUN", help="Odepnij przebieg")
+    args = parser.parse_args()
+
+    if args.pin or args.unpin:
+        run_key = args.pin or args.unpin
+        if not pin_run(run_key, pinned=bool(args.pin), output_dir=args.output_dir):
+            print(f"❌ Nie znaleziono przebiegu: {run_key}")
+            raise SystemExit(1)
+        print(f"📌 {'Przypięto' if args.pin else 'Odpięto'}: {run_key}")
+        return
+
+    policy = RetentionPolicy.from_env()
+    if args.max_age_days is not None:
+        policy.max_age_days = args.max_age_days
+    if args.max_total_mb is not None:
+        policy.max_total_mb = args.max_total_mb
+    if args.keep_per_source is not None:
+        policy.keep_per_source = args.keep_per_source
+    if not policy.enabled:
+        print("Brak reguł retencji (--max-age-days / --max-total-mb / --keep-per-source lub RETENTION_* w .env)")
+        raise SystemExit(1)
+
+    report = apply_retention(policy, args.output_dir, dry_run=not args.apply, vacuum=args.vacuum)
+    print(report.format())
+    if report.dry_run and report.actions:
+        print("\nTo tylko raport - uruchom z --apply, żeby usunąć.")
+
+
+if __name__ == "__main__":
+    main()
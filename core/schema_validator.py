@@ -0,0 +1,116 @@
+"""
+Walidacja odpowiedzi agentów względem schematów z core/response_schemas.py.
+
+Schemat jest kompilowany raz do drzewa funkcji (bez interpretowania słownika przy
+każdym sprawdzeniu). Sprawdzane jest to, co psuje dalsze etapy (raporty, HTML, brief):
+- obecność wymaganych kluczy najwyższego poziomu
+- typy kontenerów: obiekt tam, gdzie obiekt, lista tam, gdzie lista
+- wartości skalarne nie mogą być obiektem ani listą
+
+Typy skalarów nie są rozróżniane - "8" zamiast 8 nie psuje raportu, a ponowne
+pytanie modelu kosztuje. null jest dozwolony (pole opcjonalne).
+"""
+
+from typing import Any, Callable, Dict, List, Optional
+
+from .response_schemas import RESPONSE_SCHEMAS
+
+# Więcej błędów nie wnosi informacji (i wydłuża prośbę o poprawkę)
+MAX_ERRORS = 20
+
+# check(value, path, errors, prune) -> czy wartość ma właściwy typ
+Check = Callable[[Any, str, List[str], bool], bool]
+
+_compiled: Dict[str, Check] = {}
+
+
+def _type_name(value: Any) -> str:
+    if isinstance(value, dict):
+        return "obiekt"
+    if isinstance(value, list):
+        return "lista"
+    return type(value).__name__
+
+
+def _add(errors: List[str], message: str) -> None:
+    if len(errors) < MAX_ERRORS:
+        errors.append(message)
+
+
+def compile_schema(schema: dict) -> Check:
+    """Kompiluje schemat (podzbiór JSON Schema z response_schemas) do funkcji sprawdzającej."""
+    kind = schema.get("type")
+
+    if kind == "object":
+        properties = [(key, compile_schema(sub)) for key, sub in schema.get("properties", {}).items()]
+        required = tuple(schema.get("required", ()))
+
+        def check_object(value, path, errors, prune):
+            if not isinstance(value, dict):
+                _add(errors, f"{path or '$'}: oczekiwano obiektu, jest {_type_name(value)}")
+                return False
+            for key in required:
+                if key not in value:
+                    _add(errors, f"{path}.{key}: brak wymaganego pola" if path else f"{key}: brak wymaganego pola")
+            for key, check in properties:
+                item = value.get(key)
+                if item is None:
+                    continue
+                if not check(item, f"{path}.{key}" if path else key, errors, prune) and prune:
+                    del value[key]
+            return True
+
+        return check_object
+
+    if kind == "array":
+        check_item = compile_schema(schema.get("items", {}))
+
+        def check_array(value, path, errors, prune):
+            if not isinstance(value, list):
+                _add(errors, f"{path or '$'}: oczekiwano listy, jest {_type_name(value)}")
+                return False
+            valid = [check_item(item, f"{path}[{i}]", errors, prune) for i, item in enumerate(value)]
+            if prune and not all(valid):
+                value[:] = [item for item, ok in zip(value, valid) if ok]
+            return True
+
+        return check_array
+
+    def check_scalar(value, path, errors, prune):
+        if isinstance(value, (dict, list)):
+            _add(errors, f"{path or '$'}: oczekiwano wartości ({kind or 'dowolna'}), jest {_type_name(value)}")
+            return False
+        return True
+
+    return check_scalar
+
+
+def get_validator(name: str) -> Optional[Check]:
+    """Skompilowany walidator dla agenta (None = agent bez schematu)."""
+    check = _compiled.get(name)
+    if check is None:
+        schema = RESPONSE_SCHEMAS.get(name)
+        if schema is None:
+            return None
+        check = _compiled[name] = compile_schema(schema)
+    return check
+
+
+def validate_report(name: str, data: Any, prune: bool = False) -> List[str]:
+    """
+    Sprawdza odpowiedź agenta.
+
+    Args:
+        name: Nazwa schematu (BaseAgent.name lub np. "brief_extraction")
+        data: Sparsowany JSON
+        prune: Usuwa wartości o złym typie (raport dostaje wtedy wartości domyślne z .get())
+
+    Returns:
+        Lista błędów ("ścieżka: opis"); pusta = poprawny lub brak schematu
+    """
+    check = get_validator(name)
+    if check is None:
+        return []
+    errors: List[str] = []
+    check(data, "", errors, prune)
+    return errors
@@ -0,0 +1,237 @@
+"""
+Czyszczenie tekstu źródłowego przed wysłaniem do agentów.
+
+Tekst źródłowy idzie w całości do kilku agentów, więc każdy zbędny znak jest
+opłacany wielokrotnie. Usuwane są:
+- nagłówki i stopki PDF: linie powtarzające się na wielu stronach, numery stron
+  i typowe formułki (cookies, prawa autorskie, "pobrano z http...") - tylko
+  na górze lub dole strony (tekst bez stron to jedna strona)
+- powtórzone akapity (ten sam blok wklejony/wyekstrahowany kilka razy)
+- bibliografia na końcu dokumentu, jeśli linie pod nagłówkiem wyglądają jak
+  pozycje bibliograficzne (zastępowana jednolinijkową notką)
+
+Reguły są ostrożne - tekst trafia też do raportu (raw_source_text), więc
+wycięta treść ginie w każdym raporcie.
+
+Porównanie linii odbywa się na postaci znormalizowanej (małe litery, zwinięte
+spacje, w krótkich liniach cyfry zamienione na #) przez hashe i liczniki.
+"""
+
+import hashlib
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from .usage_log import estimate_tokens
+
+# Separator stron we wklejonym tekście (i w cache parsowania PDF); strony z pliku
+# przychodzą osobno - FileReader.read_pages
+PAGE_BREAK = "\f"
+
+# Linia jest nagłówkiem/stopką, jeśli występuje na tylu stronach...
+MIN_REPEATED_PAGES = 3
+# ...i na co najmniej takim odsetku stron
+MIN_REPEATED_PAGE_SHARE = 0.3
+# Dłuższe linie to treść, nie nagłówki
+MAX_BOILERPLATE_LINE = 200
+# Krótkie linie porównywane bez cyfr ("Strona 3 z 20", "Journal 12(3), 45");
+# w dłuższych cyfry zostają, żeby nie skleić np. wierszy tabel
+MAX_NUMBERED_LINE_WORDS = 8
+# Krótsze akapity mogą się legalnie powtarzać ("Tak.", "---")
+MIN_DUPLICATE_BLOCK = 80
+# Numery stron i formułki usuwane tylko z tylu niepustych linii na górze i dole strony
+EDGE_LINES = 2
+# Bibliografia szukana tylko w końcowej części tekstu...
+REFERENCES_TAIL_SHARE = 0.4
+# ...i usuwana, gdy tyle z pierwszych linii pod nagłówkiem wygląda jak cytowania
+REFERENCES_SAMPLE_LINES = 20
+MIN_CITATION_SHARE = 0.6
+MIN_CITATION_LINES = 3
+
+_DIGITS = re.compile(r"\d+")
+_SPACES = re.compile(r"\s+")
+_PAGE_NUMBER = re.compile(
+    r"^\s*(?:page|strona|str\.|s\.)?\s*[-–]?\s*\d{1,4}\s*[-–]?\s*(?:(?:/|of|z)\s*\d{1,4})?\s*$",
+    re.IGNORECASE,
+)
+_REFERENCES_HEADING = re.compile(
+    r"^\s*(?:\d+\.?\s*)?(?:references|bibliography|works cited|literature cited|"
+    r"bibliografia|literatura|przypisy|źródła)\s*:?\s*$",
+    re.IGNORECASE,
+)
+_BOILERPLATE = re.compile(
+    r"(?:we use|this (?:site|website) uses|ta strona używa|używamy)\s+(?:plików\s+)?(?:cookies|ciasteczek)|"
+    r"all rights reserved|wszelkie prawa zastrzeżone|"
+    r"(?:downloaded from|pobrano z)\s+(?:https?://|www\.)|"
+    r"this article is licensed under|licensed under a creative commons|"
+    r"subscribe to our newsletter|zapisz się do newslettera|"
+    r"accept all cookies|akceptuj wszystkie (?:pliki cookies|ciasteczka)",
+    re.IGNORECASE,
+)
+# Pozycja bibliografii: rok w nawiasie, et al., DOI/URL, numeracja [1] / 1. na początku
+_CITATION = re.compile(
+    r"\(\d{4}[a-z]?\)|\b(?:19|20)\d{2}[a-z]?[.;,)]|\bet al\.|\bi in\.|\bdoi\b|https?://|"
+    r"^\s*(?:\[\d+\]|\d+\.\s)|\bpp?\.\s*\d|\bs\.\s*\d|\bvol\.|\bnr\b",
+    re.IGNORECASE,
+)
+_BLANK_LINES = re.compile(r"\n{3,}")
+
+
+@dataclass
+class CleanResult:
+    """Tekst po czyszczeniu i statystyki usuniętych fragmentów."""
+    text: str
+    raw_text: str
+    removed_by_reason: Dict[str, int] = field(default_factory=dict)  # powód -> znaki
+
+    @property
+    def removed_chars(self) -> int:
+        return max(0, len(self.raw_text) - len(self.text))
+
+    @property
+    def removed_tokens(self) -> int:
+        """Szacunek tokenów oszczędzonych na każdym agencie czytającym źródło."""
+        return estimate_tokens(self.removed_chars)
+
+    @property
+    def removed_share(self) -> float:
+        return self.removed_chars / len(self.raw_text) if self.raw_text else 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            "raw_chars": len(self.raw_text),
+            "clean_chars": len(self.text),
+            "removed_chars": self.removed_chars,
+            "removed_tokens": self.removed_tokens,
+            "removed_by_reason": self.removed_by_reason,
+        }
+
+
+def _normalize(text: str) -> str:
+    return _SPACES.sub(" ", text.lower()).strip()
+
+
+def _line_key(line: str) -> bytes:
+    normalized = _normalize(line)
+    if normalized.count(" ") < MAX_NUMBERED_LINE_WORDS:
+        normalized = _DIGITS.sub("#", normalized)
+    return _hash(normalized)
+
+
+def _hash(text: str) -> bytes:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest()
+
+
+def _repeated_page_lines(pages: List[List[str]], edges: List[set]) -> set:
+    """Hashe linii z góry/dołu strony występujących na wielu stronach (nagłówki, stopki)."""
+    if len(pages) < MIN_REPEATED_PAGES:
+        return set()
+    counts: Counter = Counter()
+    for lines, page_edges in zip(pages, edges):
+        counts.update({
+            _line_key(lines[index]) for index in page_edges
+            if len(lines[index]) <= MAX_BOILERPLATE_LINE
+        })
+    threshold = max(MIN_REPEATED_PAGES, MIN_REPEATED_PAGE_SHARE * len(pages))
+    return {key for key, count in counts.items() if count >= threshold}
+
+
+def _edge_lines(lines: List[str]) -> set:
+    """Indeksy EDGE_LINES pierwszych i ostatnich niepustych linii strony."""
+    filled = [index for index, line in enumerate(lines) if line.strip()]
+    return set(filled[:EDGE_LINES]) | set(filled[-EDGE_LINES:])
+
+
+def _looks_like_references(section: str) -> bool:
+    """Czy linie pod nagłówkiem to pozycje bibliograficzne (a nie np. rozdział "Źródła")."""
+    lines = [line for line in section.splitlines()[1:] if line.strip()][:REFERENCES_SAMPLE_LINES]
+    if len(lines) < MIN_CITATION_LINES:
+        return False
+    citations = sum(1 for line in lines if _CITATION.search(line))
+    return citations >= MIN_CITATION_SHARE * len(lines)
+
+
+def _strip_references(text: str, removed: Dict[str, int]) -> str:
+    """
+    Obcina bibliografię z końca tekstu: ostatni nagłówek w końcowych
+    REFERENCES_TAIL_SHARE tekstu, pod którym są cytowania.
+    """
+    tail_start = int(len(text) * (1 - REFERENCES_TAIL_SHARE))
+    headings = []
+    offset = 0
+    for line in text.splitlines(keepends=True):
+        if offset >= tail_start and _REFERENCES_HEADING.match(line):
+            headings.append(offset)
+        offset += len(line)
+    heading = next((start for start in reversed(headings) if _looks_like_references(text[start:])), None)
+    if heading is None:
+        return text
+
+    section = text[heading:]
+    entries = sum(1 for line in section.splitlines()[1:] if line.strip())
+    note = f"[Bibliografia pominięta: {entries} linii]\n"
+    removed["references"] = removed.get("references", 0) + len(section) - len(note)
+    return text[:heading] + note
+
+
+def clean_source_text(text: str, pages: Optional[List[str]] = None) -> CleanResult:
+    """
+    Usuwa powtarzalne i nieistotne fragmenty z tekstu źródłowego.
+
+    Args:
+        text: Tekst źródłowy (oryginał w CleanResult.raw_text)
+        pages: Strony dokumentu (FileReader.read_pages), złączone dają text;
+            bez nich strony rozdziela PAGE_BREAK. Jedna strona (czysty tekst,
+            wklejka) = bez reguły nagłówków/stopek i numerów stron, a formułki
+            usuwane są tylko z początku i końca tekstu.
+    """
+    removed: Dict[str, int] = {}
+
+    def drop(reason: str, chars: int) -> None:
+        removed[reason] = removed.get(reason, 0) + chars
+
+    pages = [page.splitlines() for page in (pages if pages else text.split(PAGE_BREAK))]
+    paged = len(pages) > 1
+    edges = [_edge_lines(lines) for lines in pages]
+    repeated = _repeated_page_lines(pages, edges) if paged else set()
+
+    seen_blocks = set()
+    kept_pages = []
+    for lines, page_edges in zip(pages, edges):
+        kept_lines = []
+        for index, line in enumerate(lines):
+            stripped = line.strip()
+            if not stripped:
+                kept_lines.append("")
+                continue
+            at_edge = index in page_edges
+            if paged and at_edge and _PAGE_NUMBER.match(stripped):
+                drop("page_numbers", len(line) + 1)
+                continue
+            if repeated and at_edge and len(line) <= MAX_BOILERPLATE_LINE and _line_key(line) in repeated:
+                drop("headers_footers", len(line) + 1)
+                continue
+            if at_edge and len(line) <= MAX_BOILERPLATE_LINE and _BOILERPLATE.search(line):
+                drop("boilerplate", len(line) + 1)
+                continue
+            kept_lines.append(line)
+
+        # Powtórzone akapity (w obrębie całego dokumentu)
+        blocks = "\n".join(kept_lines).split("\n\n")
+        kept_blocks = []
+        for block in blocks:
+            if len(block.strip()) >= MIN_DUPLICATE_BLOCK:
+                key = _hash(_normalize(block))
+                if key in seen_blocks:
+                    drop("duplicate_blocks", len(block) + 2)
+                    continue
+                seen_blocks.add(key)
+            kept_blocks.append(block)
+        kept_pages.append("\n\n".join(kept_blocks).strip("\n"))
+
+    cleaned = "\n\n".join(page for page in kept_pages if page)
+    cleaned = _BLANK_LINES.sub("\n\n", cleaned)
+    cleaned = _strip_references(cleaned, removed)
+
+    return CleanResult(text=cleaned.strip(), raw_text=text, removed_by_reason=removed)
@@ -0,0 +1,377 @@
+"""
+Śledzenie czasu przebiegu (spany) - gdzie idą minuty workflow.
+
+Span to nazwany odcinek czasu z atrybutami (model, dostawca, tokeny, koszt,
+trafienie w cache...). Spany zagnieżdżają się przez contextvars: span otwarty
+wewnątrz innego staje się jego dzieckiem, także w innym wątku, jeśli kontekst
+został przekazany (activate).
+
+Rodzaje (category): workflow, stage, agent, api, retry, parse, save, read.
+
+Spany są zbierane tylko wewnątrz aktywnego śledzenia (start_trace, TRACING=1) -
+poza nim span() nic nie kosztuje poza jednym odczytem contextvar.
+
+Eksport do logs/traces/:
+- <trace_id>.jsonl - jeden span na linię (porównania między przebiegami)
+- <trace_id>.json - Chrome trace (chrome://tracing, ui.perfetto.dev)
+
+Podsumowanie (ścieżka krytyczna ostatniego przebiegu, czasy spanów vs
+wcześniejsze przebiegi):
+    python -m core.tracing
+    python -m core.tracing --last 20
+"""
+
+import argparse
+import contextvars
+import json
+import logging
+import os
+import statistics
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass, field, fields
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+TRACES_DIR = Path(__file__).parent.parent / "logs" / "traces"
+
+# Span dłuższy niż mediana wcześniejszych przebiegów o tyle - podejrzenie regresji
+REGRESSION_RATIO = 1.5
+
+_current_trace: contextvars.ContextVar[Optional["Trace"]] = contextvars.ContextVar("trace", default=None)
+_current_span: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar("span", default=None)
+
+
+@dataclass
+class Span:
+    """Odcinek czasu w przebiegu (start/end w sekundach od początku śledzenia)."""
+    name: str
+    category: str
+    span_id: int
+    parent_id: Optional[int] = None
+    start: float = 0.0
+    end: Optional[float] = None
+    thread: int = 0
+    attributes: dict = field(default_factory=dict)
+    error: Optional[str] = None
+    _trace: Optional["Trace"] = field(default=None, repr=False, compare=False)
+    _token: Optional[contextvars.Token] = field(default=None, repr=False, compare=False)
+
+    @property
+    def duration(self) -> float:
+        return (self.end if self.end is not None else self.start) - self.start
+
+    def set(self, **attributes) -> None:
+        """Dopisuje atrybuty (None pomijane)."""
+        self.attributes.update({key: value for key, value in attributes.items() if value is not None})
+
+    def finish(self, error: Optional[str] = None) -> None:
+        """Zamyka span otwarty przez start_span (kolejne wywołania nic nie zmieniają)."""
+        if self.end is not None:
+            return
+        if error:
+            self.error = error
+        self.end = self._trace.now() if self._trace else self.start
+        if self._token is not None:
+            _current_span.reset(self._token)
+            self._token = None
+
+    def to_dict(self) -> dict:
+        return {f.name: getattr(self, f.name) for f in fields(self) if not f.name.startswith("_")}
+
+
+class _NullSpan:
+    """Span poza śledzeniem - set() i finish() nic nie robią."""
+
+    def set(self, **attributes) -> None:
+        pass
+
+    def finish(self, error: Optional[str] = None) -> None:
+        pass
+
+
+NULL_SPAN = _NullSpan()
+
+
+class Trace:
+    """Spany jednego przebiegu (workflow + draft + zapis)."""
+
+    def __init__(self, name: str, trace_id: Optional[str] = None):
+        self.name = name
+        self.trace_id = trace_id or (
+            f"{datetime.now().strftime('%Y%m%d_%H%M%S')}-{name}-{uuid.uuid4().hex[:6]}"
+        )
+        self.started_at = datetime.now().isoformat(timespec="seconds")
+        self.spans: List[Span] = []
+        self._origin = time.perf_counter()
+        self._next_id = 1
+        self._lock = threading.Lock()
+
+    def now(self) -> float:
+        return time.perf_counter() - self._origin
+
+    def open_span(self, name: str, category: str, parent: Optional[Span], attributes: dict) -> Span:
+        with self._lock:
+            span_id = self._next_id
+            self._next_id += 1
+        item = Span(
+            name=name,
+            category=category,
+            span_id=span_id,
+            parent_id=parent.span_id if parent else None,
+            start=self.now(),
+            thread=threading.get_ident(),
+        )
+        item.set(**attributes)
+        with self._lock:
+            self.spans.append(item)
+        return item
+
+    def to_chrome(self) -> dict:
+        """Format Chrome trace: zdarzenia "X" (czas w mikrosekundach)."""
+        pid = os.getpid()
+        threads: Dict[int, int] = {}
+        events = []
+        for item in self.spans:
+            tid = threads.setdefault(item.thread, len(threads) + 1)
+            args = dict(item.attributes)
+            if item.error:
+                args["error"] = item.error
+            events.append({
+                "name": item.name,
+                "cat": item.category,
+                "ph": "X",
+                "ts": round(item.start * 1e6),
+                "dur": round(item.duration * 1e6),
+                "pid": pid,
+                "tid": tid,
+                "args": args,
+            })
+        events.append({"name": "process_name", "ph": "M", "pid": pid, "args": {"name": self.trace_id}})
+        return {"traceEvents": events, "displayTimeUnit": "ms", "otherData": {"started_at": self.started_at}}
+
+    def export(self, directory: Optional[Path] = None) -> Optional[Path]:
+        """
+        Zapisuje spany do <trace_id>.jsonl i <trace_id>.json (nadpisuje - przebieg
+        eksportowany jest po workflow, po drafcie i po zapisie). Błędy nie przerywają pracy.
+
+        Returns:
+            Ścieżka pliku Chrome trace lub None przy błędzie zapisu
+        """
+        directory = Path(directory) if directory else TRACES_DIR
+        with self._lock:
+            spans = list(self.spans)
+        try:
+            directory.mkdir(parents=True, exist_ok=True)
+            with open(directory / f"{self.trace_id}.jsonl", "w", encoding="utf-8") as f:
+                for item in spans:
+                    record = {"trace_id": self.trace_id, "started_at": self.started_at, **item.to_dict()}
+                    f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            chrome_path = directory / f"{self.trace_id}.json"
+            with open(chrome_path, "w", encoding="utf-8") as f:
+                json.dump(self.to_chrome(), f, ensure_ascii=False)
+            return chrome_path
+        except OSError as e:
+            logger.warning(f"Nie udało się zapisać śledzenia {self.trace_id}: {e}")
+            return None
+
+
+def current_trace() -> Optional[Trace]:
+    return _current_trace.get()
+
+
+def start_span(name: str, category: str = "stage", **attributes):
+    """
+    Otwiera span (dziecko bieżącego spanu) - do zamknięcia przez finish().
+
+    Dla pętli, w których blok with wymagałby przebudowy kodu (np. try/finally
+    w próbach wywołań API). Poza śledzeniem zwraca NULL_SPAN.
+    """
+    trace = _current_trace.get()
+    if trace is None:
+        return NULL_SPAN
+    item = trace.open_span(name, category, _current_span.get(), attributes)
+    item._trace = trace
+    item._token = _current_span.set(item)
+    return item
+
+
+@contextmanager
+def span(name: str, category: str = "stage", **attributes) -> Iterator:
+    """
+    Mierzy blok kodu jako span (dziecko bieżącego spanu).
+
+    Poza śledzeniem zwraca NULL_SPAN. Wyjątek z bloku jest zapisywany
+    w span.error i rzucany dalej.
+    """
+    item = start_span(name, category, **attributes)
+    try:
+        yield item
+    except BaseException as e:
+        item.finish(error=f"{type(e).__name__}: {e}")
+        raise
+    finally:
+        item.finish()
+
+
+@contextmanager
+def start_trace(name: str, enabled: bool = True, **attributes) -> Iterator[Optional[Trace]]:
+    """
+    Rozpoczyna śledzenie przebiegu ze spanem głównym (category "workflow").
+
+    Wewnątrz już aktywnego śledzenia tworzy tylko span podrzędny - eksport
+    należy do zewnętrznego start_trace.
+
+    Returns:
+        Trace (None, gdy wyłączone lub zagnieżdżone)
+    """
+    if _current_trace.get() is not None or not enabled:
+        with span(name, "workflow", **attributes):
+            yield None
+        return
+
+    trace = Trace(name)
+    token = _current_trace.set(trace)
+    try:
+        with span(name, "workflow", **attributes):
+            yield trace
+    finally:
+        _current_trace.reset(token)
+
+
+@contextmanager
+def activate(trace: Optional[Trace], parent: Optional[Span] = None) -> Iterator[Optional[Trace]]:
+    """
+    Przywraca śledzenie przebiegu w innym miejscu (draft, wątek zapisu).
+
+    Spany otwarte wewnątrz trafiają do trace jako dzieci parent
+    (domyślnie spanu głównego).
+    """
+    if trace is None:
+        yield None
+        return
+    if parent is None and trace.spans:
+        parent = trace.spans[0]
+    trace_token = _current_trace.set(trace)
+    span_token = _current_span.set(parent)
+    try:
+        yield trace
+    finally:
+        _current_span.reset(span_token)
+        _current_trace.reset(trace_token)
+
+
+# ==========================================
+# ANALIZA
+# ==========================================
+
+def load_traces(directory: Optional[Path] = None, last: Optional[int] = None) -> Dict[str, List[Span]]:
+    """Wczytuje spany z plików JSONL (od najstarszego przebiegu), opcjonalnie tylko ostatnie `last`."""
+    directory = Path(directory) if directory else TRACES_DIR
+    if not directory.is_dir():
+        return {}
+    paths = sorted(directory.glob("*.jsonl"))
+    if last:
+        paths = paths[-last:]
+
+    traces = {}
+    for path in paths:
+        spans = []
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    record = json.loads(line)
+                    record.pop("trace_id", None)
+                    record.pop("started_at", None)
+                    spans.append(Span(**record))
+        except (OSError, json.JSONDecodeError, TypeError) as e:
+            logger.warning(f"Pominięto śledzenie {path.name}: {e}")
+            continue
+        if spans:
+            traces[path.stem] = spans
+    return traces
+
+
+def critical_path(spans: List[Span]) -> List[Span]:
+    """
+    Ścieżka krytyczna: od spanu głównego w dół, zawsze dziecko kończące się najpóźniej.
+
+    Etapy workflow są sekwencyjne, więc to łańcuch spanów, których skrócenie
+    skraca cały przebieg.
+    """
+    children: Dict[Optional[int], List[Span]] = {}
+    for item in spans:
+        children.setdefault(item.parent_id, []).append(item)
+
+    path = []
+    level = children.get(None, [])
+    while level:
+        last = max(level, key=lambda item: item.end if item.end is not None else item.start)
+        path.append(last)
+        level = children.get(last.span_id, [])
+    return path
+
+
+def span_durations(traces: Dict[str, List[Span]]) -> Dict[tuple, List[float]]:
+    """(category, name) -> łączny czas spanów w kolejnych przebiegach."""
+    durations: Dict[tuple, List[float]] = {}
+    for spans in traces.values():
+        per_trace: Dict[tuple, float] = {}
+        for item in spans:
+            key = (item.category, item.name)
+            per_trace[key] = per_trace.get(key, 0.0) + item.duration
+        for key, seconds in per_trace.items():
+            durations.setdefault(key, []).append(seconds)
+    return durations
+
+
+def _format_attributes(item: Span) -> str:
+    keys = ("model", "provider", "input_tokens", "output_tokens", "cost_usd", "cache_hit", "attempt")
+    return ", ".join(f"{key}={item.attributes[key]}" for key in keys if key in item.attributes)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Podsumowanie śledzenia przebiegów (logs/traces/)")
+    parser.add_argument("--dir", type=Path, default=None, help="Katalog śledzeń")
+    parser.add_argument("--last", type=int, default=50, help="Liczba ostatnich przebiegów do porównania")
+    args = parser.parse_args()
+
+    traces = load_traces(args.dir, args.last)
+    if not traces:
+        print("Brak śledzeń - uruchom workflow z TRACING=1")
+        return
+
+    trace_id, spans = list(traces.items())[-1]
+    root = critical_path(spans)
+    # Od startu workflow do końca ostatniego spanu (draft i zapis kończą się po workflow)
+    total = max(item.end if item.end is not None else item.start for item in spans) - spans[0].start
+    print(f"⏱️  Ścieżka krytyczna {trace_id} ({total:.1f}s)\n")
+    for depth, item in enumerate(root):
+        share = item.duration / total if total else 0.0
+        attrs = _format_attributes(item)
+        print(f"  {'  ' * depth}{item.category}:{item.name} {item.duration:.2f}s ({share:.0%})"
+              + (f" [{attrs}]" if attrs else ""))
+
+    if len(traces) < 2:
+        return
+    print(f"\n📈 Ostatni przebieg vs mediana {len(traces) - 1} wcześniejszych\n")
+    print(f"  {'span':<40} {'mediana':>9} {'ostatni':>9}")
+    print("  " + "─" * 60)
+    latest = span_durations({trace_id: spans})
+    history = span_durations({key: value for key, value in traces.items() if key != trace_id})
+    for key, (seconds,) in sorted(latest.items(), key=lambda item: -item[1][0]):
+        previous = history.get(key)
+        if not previous:
+            continue
+        median = statistics.median(previous)
+        flag = " ⚠️" if median and seconds > median * REGRESSION_RATIO else ""
+        print(f"  {key[0] + ':' + key[1]:<40} {median:>8.2f}s {seconds:>8.2f}s{flag}")
+
+
+if __name__ == "__main__":
+    main()
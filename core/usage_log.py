@@ -0,0 +1,365 @@
+"""Log zużycia tokenów per agent - podstawa kalibracji estymacji kosztów."""
+
+import json
+import logging
+import os
+import threading
+from dataclasses import dataclass, asdict
+from datetime import datetime
+from pathlib import Path
+from typing import Optional, List, Dict, Tuple
+
+logger = logging.getLogger(__name__)
+
+USAGE_LOG_PATH = Path(__file__).parent.parent / "logs" / "usage.jsonl"
+RESPONSES_DIR = Path(__file__).parent.parent / "logs" / "responses"
+
+# Ile ostatnich wpisów brać pod uwagę przy kalibracji
+DEFAULT_HISTORY_LIMIT = 5000
+
+# Po przekroczeniu rozmiaru log jest przycinany do DEFAULT_HISTORY_LIMIT ostatnich
+# wpisów, a poprzednia wersja zostaje jako usage.jsonl.1 (jedna kopia)
+USAGE_LOG_MAX_BYTES = 10 * 1024 * 1024
+# Blok czytany od końca pliku przy wczytywaniu ostatnich wpisów
+_TAIL_BLOCK = 64 * 1024
+
+# Średnia znaków na token (tekst polski), gdy brak danych z historii
+DEFAULT_CHARS_PER_TOKEN = 3.2
+
+_write_lock = threading.Lock()
+
+
+@dataclass
+class UsageRecord:
+    """Pojedyncze wywołanie modelu przypisane do agenta."""
+    agent: str
+    model_key: str
+    provider: str
+    input_tokens: int
+    output_tokens: int
+    elapsed_seconds: float
+    cost_usd: float
+    input_chars: int = 0
+    max_tokens: Optional[int] = None
+    json_tail_tokens: Optional[int] = None  # tokeny tekstu po zamknięciu obiektu JSON (pełne odpowiedzi)
+    stopped_early: bool = False  # strumień przerwany po zamknięciu obiektu JSON
+    saved_output_tokens: int = 0  # szacunek tokenów oszczędzonych przez przerwanie
+    timestamp: str = ""
+
+    def __post_init__(self):
+        if not self.timestamp:
+            self.timestamp = datetime.now().isoformat(timespec="seconds")
+
+
+@dataclass
+class UsageStats:
+    """Zagregowane zużycie dla grupy wywołań (np. agent + model)."""
+    count: int
+    mean_input_tokens: float
+    mean_output_tokens: float
+    mean_elapsed_seconds: float
+    chars_per_token: Optional[float] = None  # None jeśli brak danych o znakach
+
+
+def record_usage(record: UsageRecord, path: Optional[Path] = None) -> None:
+    """Dopisuje wpis do logu zużycia (JSONL). Błędy zapisu nie przerywają pracy."""
+    target = Path(path) if path else USAGE_LOG_PATH
+    try:
+        target.parent.mkdir(parents=True, exist_ok=True)
+        line = json.dumps(asdict(record), ensure_ascii=False)
+        with _write_lock:
+            with open(target, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+                size = f.tell()
+            if size > USAGE_LOG_MAX_BYTES:
+                _compact_log(target)
+    except OSError as e:
+        logger.warning(f"Nie udało się zapisać zużycia tokenów: {e}")
+
+
+def _compact_log(target: Path) -> None:
+    """
+    Przycina log do ostatnich wpisów (najwyżej DEFAULT_HISTORY_LIMIT i połowa
+    USAGE_LOG_MAX_BYTES, żeby nie przycinać przy każdym zapisie); pełna
+    poprzednia wersja -> <nazwa>.1.
+    """
+    lines, _ = _read_tail(target, DEFAULT_HISTORY_LIMIT)
+    budget = USAGE_LOG_MAX_BYTES // 2
+    keep = 0
+    for line in reversed(lines):
+        budget -= len(line.encode("utf-8")) + 1
+        if budget < 0:
+            break
+        keep += 1
+    lines = lines[len(lines) - keep:]
+    tmp = target.with_name(target.name + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.writelines(line + "\n" for line in lines)
+    os.replace(target, target.with_name(target.name + ".1"))
+    os.replace(tmp, target)
+    logger.info(f"Log zużycia przycięty do {len(lines)} ostatnich wpisów ({target.name}.1 - poprzednia wersja)")
+
+
+def _read_tail(target: Path, limit: int) -> Tuple[List[str], int]:
+    """
+    Ostatnie `limit` pełnych linii pliku, czytane blokami od końca (bez wczytywania
+    całego logu), oraz pozycja za ostatnią pełną linią.
+    """
+    with open(target, "rb") as f:
+        end = f.seek(0, os.SEEK_END)
+        pos = end
+        data = b""
+        while pos > 0 and data.count(b"\n") <= limit:
+            step = min(_TAIL_BLOCK, pos)
+            pos -= step
+            f.seek(pos)
+            data = f.read(step) + data
+
+    complete = data.rfind(b"\n") + 1  # niedopisana linia na końcu zostaje na później
+    lines = data[:complete].decode("utf-8", errors="replace").splitlines()
+    if pos > 0:
+        lines = lines[1:]  # pierwsza linia bloku może być niepełna
+    return lines[-limit:] if limit else [], pos + complete
+
+
+def _read_from(target: Path, offset: int) -> Tuple[List[str], int]:
+    """Pełne linie dopisane od pozycji offset i pozycja za ostatnią z nich."""
+    with open(target, "rb") as f:
+        f.seek(offset)
+        data = f.read()
+    complete = data.rfind(b"\n") + 1
+    return data[:complete].decode("utf-8", errors="replace").splitlines(), offset + complete
+
+
+def _parse_records(lines: List[str]) -> List[UsageRecord]:
+    records = []
+    for line in lines:
+        try:
+            records.append(UsageRecord(**json.loads(line)))
+        except (json.JSONDecodeError, TypeError):
+            continue
+    return records
+
+
+def record_response(agent: str, model_key: str, content: str, directory: Optional[Path] = None) -> None:
+    """Zapisuje surową odpowiedź agenta (korpus dla benchmarks/json_parser.py)."""
+    target = Path(directory) if directory else RESPONSES_DIR
+    stamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+    try:
+        target.mkdir(parents=True, exist_ok=True)
+        (target / f"{agent}__{model_key}__{stamp}.txt").write_text(content, encoding="utf-8")
+    except OSError as e:
+        logger.warning(f"Nie udało się zapisać odpowiedzi agenta: {e}")
+
+
+def load_usage(path: Optional[Path] = None, limit: int = DEFAULT_HISTORY_LIMIT) -> List[UsageRecord]:
+    """
+    Wczytuje ostatnie `limit` wpisów z logu zużycia (czytany jest tylko koniec pliku).
+
+    Przy wielokrotnym odczycie (każde wywołanie API, rerun Streamlit) lepiej
+    cached_usage - po dopisaniu wpisów czyta tylko nowe linie.
+    """
+    target = Path(path) if path else USAGE_LOG_PATH
+    if not target.exists():
+        return []
+
+    try:
+        lines, _ = _read_tail(target, limit)
+    except OSError as e:
+        logger.warning(f"Nie udało się wczytać logu zużycia: {e}")
+        return []
+    return _parse_records(lines)
+
+
+def summarize_usage(records: List[UsageRecord]) -> Dict[Tuple[str, str], UsageStats]:
+    """
+    Agreguje zużycie po (agent, model).
+
+    Dodatkowo dla każdego agenta tworzy wpis (agent, "*") ze wszystkimi modelami,
+    a dla każdego modelu wpis ("*", model) - do kalibracji gdy brak danych szczegółowych.
+    """
+    groups: Dict[Tuple[str, str], List[UsageRecord]] = {}
+    for rec in records:
+        for key in ((rec.agent, rec.model_key), (rec.agent, "*"), ("*", rec.model_key)):
+            groups.setdefault(key, []).append(rec)
+
+    stats = {}
+    for key, recs in groups.items():
+        n = len(recs)
+        total_chars = sum(r.input_chars for r in recs)
+        total_in = sum(r.input_tokens for r in recs)
+        stats[key] = UsageStats(
+            count=n,
+            mean_input_tokens=total_in / n,
+            mean_output_tokens=sum(r.output_tokens for r in recs) / n,
+            mean_elapsed_seconds=sum(r.elapsed_seconds for r in recs) / n,
+            chars_per_token=(total_chars / total_in) if total_chars and total_in else None,
+        )
+    return stats
+
+
+# ==========================================
+# ADAPTACYJNE max_tokens
+# ==========================================
+
+# Minimalna liczba wywołań agenta, od której ufamy historii
+MIN_SAMPLES_FOR_LIMIT = 8
+# Percentyl tokenów wyjściowych + zapas
+LIMIT_PERCENTILE = 95
+LIMIT_HEADROOM = 1.25
+# Nigdy poniżej tej wartości i nigdy powyżej 2x wartości z kodu agenta
+MIN_MAX_TOKENS = 512
+MAX_LIMIT_MULTIPLIER = 2.0
+# Output >= 98% limitu traktujemy jako ucięty
+TRUNCATION_RATIO = 0.98
+# Powyżej tego odsetka uciętych odpowiedzi podnosimy limit
+MAX_TRUNCATION_RATE = 0.05
+
+_records_cache: Dict[str, "_UsageCache"] = {}
+_cache_lock = threading.Lock()
+
+
+@dataclass
+class _UsageCache:
+    """Wczytane ostatnie wpisy logu i pozycja, do której plik został przeczytany."""
+    inode: int
+    offset: int
+    records: List[UsageRecord]
+
+
+@dataclass
+class OutputLimit:
+    """Sugerowany limit tokenów wyjściowych dla agenta."""
+    max_tokens: int
+    samples: int = 0
+    percentile_tokens: Optional[int] = None
+    truncation_rate: float = 0.0
+    adaptive: bool = False  # False = za mało historii, użyto wartości domyślnej
+
+
+def is_truncated(output_tokens: int, max_tokens: Optional[int]) -> bool:
+    """Czy odpowiedź najpewniej została ucięta na limicie max_tokens."""
+    return bool(max_tokens) and output_tokens >= max_tokens * TRUNCATION_RATIO
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Percentyl z interpolacją liniową (jak numpy.percentile)."""
+    if not values:
+        raise ValueError("Pusta lista wartości")
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def suggest_max_tokens(
+    agent: str,
+    model_key: str,
+    default: int,
+    records: Optional[List[UsageRecord]] = None,
+) -> OutputLimit:
+    """
+    Wylicza max_tokens dla agenta na podstawie historii zużycia.
+
+    Bierze percentyl LIMIT_PERCENTILE tokenów wyjściowych (najpierw dla pary
+    agent + model, przy braku danych - dla agenta na wszystkich modelach) i dodaje
+    zapas. Jeśli w historii jest dużo uciętych odpowiedzi, rozkład jest zaniżony -
+    wtedy limit rośnie ponad największy limit, na którym odpowiedź była ucięta.
+
+    Args:
+        agent: Nazwa agenta (jak w UsageRecord.agent)
+        model_key: Klucz modelu
+        default: Limit zapisany w kodzie agenta
+        records: Historia (domyślnie: logs/usage.jsonl, z cache)
+    """
+    if records is None:
+        records = cached_usage()
+
+    agent_records = [r for r in records if r.agent == agent]
+    samples = [r for r in agent_records if r.model_key == model_key]
+    if len(samples) < MIN_SAMPLES_FOR_LIMIT:
+        samples = agent_records
+    if len(samples) < MIN_SAMPLES_FOR_LIMIT:
+        return OutputLimit(max_tokens=default, samples=len(samples))
+
+    outputs = [r.output_tokens for r in samples]
+    p = percentile(outputs, LIMIT_PERCENTILE)
+    truncated = [r for r in samples if is_truncated(r.output_tokens, r.max_tokens)]
+    truncation_rate = len(truncated) / len(samples)
+
+    limit = p * LIMIT_HEADROOM
+    if truncation_rate > MAX_TRUNCATION_RATE:
+        largest_truncated = max(r.max_tokens for r in truncated)
+        limit = max(limit, largest_truncated * 1.5)
+
+    ceiling = int(default * MAX_LIMIT_MULTIPLIER)
+    limit = min(max(int(limit), MIN_MAX_TOKENS), ceiling)
+    # Zaokrąglenie w górę do 64 - stabilniejsze wartości w logach
+    limit = min(-(-limit // 64) * 64, ceiling)
+
+    return OutputLimit(
+        max_tokens=limit,
+        samples=len(samples),
+        percentile_tokens=int(p),
+        truncation_rate=truncation_rate,
+        adaptive=True,
+    )
+
+
+def estimate_tokens(chars: int) -> int:
+    """Przybliżona liczba tokenów dla tekstu o danej długości."""
+    return int(chars / DEFAULT_CHARS_PER_TOKEN) + 1 if chars else 0
+
+
+def estimate_json_tail_tokens(
+    agent: str,
+    model_key: str,
+    records: Optional[List[UsageRecord]] = None,
+) -> int:
+    """
+    Średnia liczba tokenów, które agent generuje po zamknięciu obiektu JSON.
+
+    Liczona z pełnych (nieprzerwanych) odpowiedzi - para agent + model, a przy
+    braku danych agent na wszystkich modelach. 0 = brak historii.
+    """
+    if records is None:
+        records = cached_usage()
+
+    agent_records = [r for r in records if r.agent == agent and r.json_tail_tokens is not None]
+    samples = [r for r in agent_records if r.model_key == model_key] or agent_records
+    if not samples:
+        return 0
+    return int(sum(r.json_tail_tokens for r in samples) / len(samples))
+
+
+def cached_usage(path: Optional[Path] = None, limit: int = DEFAULT_HISTORY_LIMIT) -> List[UsageRecord]:
+    """
+    Ostatnie `limit` wpisów logu zużycia z cache w pamięci.
+
+    Po dopisaniu wpisów czytane są tylko nowe linie (od zapamiętanej pozycji);
+    cały koniec pliku jest wczytywany ponownie tylko po przycięciu logu
+    (nowy plik) albo zmianie limitu.
+    """
+    target = Path(path) if path else USAGE_LOG_PATH
+    key = str(target)
+    with _cache_lock:
+        try:
+            stat = target.stat()
+            cached = _records_cache.get(key)
+            if (
+                cached
+                and cached.inode == stat.st_ino
+                and cached.offset <= stat.st_size
+                and len(cached.records) <= limit
+            ):
+                if cached.offset < stat.st_size:
+                    lines, cached.offset = _read_from(target, cached.offset)
+                    cached.records.extend(_parse_records(lines))
+                    del cached.records[:-limit]
+            else:
+                lines, offset = _read_tail(target, limit)
+                cached = _records_cache[key] = _UsageCache(stat.st_ino, offset, _parse_records(lines))
+        except OSError:
+            return []
+        return list(cached.records)